@@ -0,0 +1,369 @@
+# action_executor.py
+# -*- coding: utf-8 -*-
+
+"""
+可取消的后台动作执行器 (姿态回正、视觉抓取等耗时运动)。
+
+每个机械臂一个 ActionExecutor (单个工作线程)，界面事件只提交任务并立即返回，
+运动期间界面刷新和遥操作输入不受影响。任务状态:
+    PENDING -> RUNNING -> DONE / FAILED / CANCELLED
+同一执行器中提交新任务会取消尚未完成的旧任务 (最新动作优先)。
+
+取消时立即在调用方线程执行任务的 on_cancel (通常是控制器的 stop)，机械臂马上停下；
+任务函数在下一次检查取消 (task.check_cancelled / task.sleep / run_motion 轮询) 时退出。
+长时间运动使用 run_motion(): 以非阻塞方式下发关节运动，再轮询机器人状态、按关节
+距离更新进度，取代 move_robot(..., block=True) 中不可中断的等待循环。
+"""
+
+import threading
+import time
+import traceback
+from typing import Callable, Optional, Sequence, Tuple
+
+ACTION_PENDING = "pending"
+ACTION_RUNNING = "running"
+ACTION_DONE = "done"
+ACTION_FAILED = "failed"
+ACTION_CANCELLED = "cancelled"
+ACTION_STATE_NAMES = {ACTION_PENDING: "等待", ACTION_RUNNING: "执行中", ACTION_DONE: "完成",
+                      ACTION_FAILED: "失败", ACTION_CANCELLED: "已取消"}
+
+MOTION_TIMEOUT = 180.0  # 单段运动的最长等待时间 (秒)，与 moveByJoint 阻塞模式一致
+MOTION_POLL_INTERVAL = 0.1  # 运动中查询机器人状态的间隔 (秒)
+MOTION_START_GRACE = 0.5  # 下发后该时间内状态仍为停止时不视为完成 (控制器可能尚未开始运动)
+ROBOT_STATE_STOPPED = '0'
+ROBOT_STATE_ERRORS = {'2': "急停", '4': "报警", '5': "碰撞"}  # Elibot getRobotState 返回值
+
+
+class ActionCancelled(BaseException):
+    """任务被取消。与 asyncio.CancelledError 一样继承 BaseException，不会被动作代码中的 except Exception 吞掉。"""
+
+
+class ActionTask:
+    """
+    一个后台动作。由 ActionExecutor.submit() 创建，任务函数以 fn(task, *args) 调用，
+    返回 False 视为失败，其他返回值视为完成。
+
+    Args:
+        name (str): 动作名称 (界面显示用)。
+        fn (Callable): 任务函数。
+        args (tuple): 任务函数的额外参数。
+        on_cancel (Callable[[], Any], optional): 运行中被取消时立即调用 (例如控制器 stop)。
+        on_finish (Callable[[ActionTask], Any], optional): 任务执行结束后在工作线程中调用。
+    """
+
+    def __init__(self, name: str, fn: Callable, args: tuple = (), on_cancel: Optional[Callable] = None,
+                 on_finish: Optional[Callable] = None):
+        self.name = name
+        self.state = ACTION_PENDING
+        self.progress = 0.0  # 0.0 - 1.0
+        self.message = ""  # 失败或取消原因
+        self.result = None
+        self.created_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._fn = fn
+        self._args = args
+        self._on_cancel = on_cancel
+        self._on_finish = on_finish
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已请求取消 (任务函数据此尽快退出)。"""
+        return self._cancel_event.is_set()
+
+    def is_finished(self) -> bool:
+        return self._done_event.is_set()
+
+    def set_progress(self, fraction: float):
+        self.progress = min(1.0, max(0.0, float(fraction)))
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise ActionCancelled(self.message)
+
+    def sleep(self, seconds: float):
+        """可被取消打断的等待。"""
+        if self._cancel_event.wait(seconds):
+            raise ActionCancelled(self.message)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待任务结束，返回是否已结束。"""
+        return self._done_event.wait(timeout)
+
+    def cancel(self, reason: str = "") -> bool:
+        """请求取消。运行中的任务立即调用 on_cancel；返回是否确实取消了一个未结束的任务。"""
+        with self._lock:
+            if self._done_event.is_set() or self._cancel_event.is_set():
+                return False
+            self.message = reason
+            self._cancel_event.set()
+            was_pending = self.state == ACTION_PENDING
+            if was_pending:
+                self._finish(ACTION_CANCELLED)  # 尚未开始，无需停止机械臂
+        if not was_pending and self._on_cancel:
+            try:
+                self._on_cancel()
+            except Exception as e:
+                print(f"[Action {self.name}] 取消时停止机械臂出错: {e}")
+        return True
+
+    def status_text(self) -> str:
+        text = f"{self.name} {ACTION_STATE_NAMES.get(self.state, self.state)}"
+        if self.state == ACTION_RUNNING:
+            text += f" {self.progress * 100:.0f}%"
+        elif self.message and self.state in (ACTION_FAILED, ACTION_CANCELLED):
+            text += f" ({self.message})"
+        return text
+
+    def _finish(self, state: str):
+        self.state = state
+        if state == ACTION_DONE:
+            self.progress = 1.0
+        self.finished_at = time.monotonic()
+        self._done_event.set()
+
+    def _run(self):
+        with self._lock:
+            if self._cancel_event.is_set():
+                return  # 等待期间已被取消
+            self.state = ACTION_RUNNING
+            self.started_at = time.monotonic()
+        final_state = ACTION_DONE
+        try:
+            self.result = self._fn(self, *self._args)
+            if self.result is False:
+                final_state = ACTION_FAILED
+        except ActionCancelled:
+            final_state = ACTION_CANCELLED
+        except Exception as e:
+            print(f"[Action {self.name}] 执行出错: {e}")
+            traceback.print_exc()
+            self.message = str(e)
+            final_state = ACTION_FAILED
+        with self._lock:
+            if self._cancel_event.is_set():
+                final_state = ACTION_CANCELLED  # 取消与完成同时发生时按取消处理 (机械臂已被停止)
+            self._finish(final_state)
+        print(f"[Action {self.name}] {ACTION_STATE_NAMES[final_state]} "
+              f"({self.finished_at - self.started_at:.1f} s){' - ' + self.message if self.message else ''}")
+        if self._on_finish:
+            try:
+                self._on_finish(self)
+            except Exception as e:
+                print(f"[Action {self.name}] 结束回调出错: {e}")
+
+
+class ActionExecutor:
+    """
+    单工作线程的动作执行器，待执行槽位深度为 1 (最新动作优先)。
+
+    Args:
+        name (str): 线程名与日志前缀 (例如 'left' / 'right')。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending: Optional[ActionTask] = None
+        self._current: Optional[ActionTask] = None
+        self._last: Optional[ActionTask] = None
+        self._closed = False
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self._thread = threading.Thread(target=self._run, name=f"ActionExecutor-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, fn: Callable, *args, on_cancel: Optional[Callable] = None,
+               on_finish: Optional[Callable] = None) -> ActionTask:
+        """提交动作并立即返回任务对象；同一执行器中未完成的旧动作被取消。"""
+        task = ActionTask(name, fn, args, on_cancel=on_cancel, on_finish=on_finish)
+        with self._cond:
+            if self._closed:
+                task.cancel("执行器已关闭")
+                return task
+            replaced, running = self._pending, self._current
+            self._pending = task
+            self.submitted += 1
+            self._cond.notify_all()
+        if replaced is not None and replaced.cancel(f"被 {name} 替换"):
+            self.cancelled += 1  # 已移出槽位，工作线程不会再计数
+        if running is not None:
+            running.cancel(f"被 {name} 替换")
+        return task
+
+    def cancel(self, reason: str = "") -> bool:
+        """取消待执行和执行中的动作，返回是否取消了任何动作。"""
+        with self._cond:
+            tasks = [t for t in (self._pending, self._current) if t is not None]
+        cancelled_any = False
+        for task in tasks:
+            cancelled_any = task.cancel(reason) or cancelled_any
+        return cancelled_any
+
+    def is_busy(self) -> bool:
+        with self._cond:
+            return any(t is not None and not t.is_finished() for t in (self._pending, self._current))
+
+    def latest(self) -> Optional[ActionTask]:
+        """最近的动作 (待执行 > 执行中 > 最近结束)，界面显示用。"""
+        with self._cond:
+            return self._pending or self._current or self._last
+
+    def stats_text(self) -> str:
+        return f"提交 {self.submitted}, 完成 {self.completed}, 失败 {self.failed}, 取消 {self.cancelled}"
+
+    def close(self, timeout: float = 1.0):
+        self.cancel("执行器关闭")
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def _take(self) -> Optional[ActionTask]:
+        with self._cond:
+            while self._pending is None and not self._closed:
+                self._cond.wait()
+            task, self._pending = self._pending, None
+            self._current = task
+            return task
+
+    def _run(self):
+        while True:
+            task = self._take()
+            if task is None:
+                return  # 已关闭
+            task._run()  # 等待期间已被取消的任务直接返回
+            if task.state == ACTION_DONE:
+                self.completed += 1
+            elif task.state == ACTION_FAILED:
+                self.failed += 1
+            else:
+                self.cancelled += 1
+            with self._cond:
+                self._current = None
+                self._last = task
+
+
+# ----------------------------------------------------------------------
+# 可取消的关节运动
+# ----------------------------------------------------------------------
+def _joint_progress(start: Sequence[float], target: Sequence[float], current: Sequence[float]) -> float:
+    """按最大关节差计算运动完成比例。"""
+    total = max(abs(t - s) for s, t in zip(start, target))
+    if total < 1e-3:
+        return 1.0
+    remaining = max(abs(t - c) for c, t in zip(current, target))
+    return min(1.0, max(0.0, 1.0 - remaining / total))
+
+
+def run_motion(task: ActionTask, controller, move_func_name: str, target_pose: Sequence[float], speed: float,
+               progress_range: Tuple[float, float] = (0.0, 1.0), timeout: float = MOTION_TIMEOUT) -> bool:
+    """
+    以非阻塞方式调用 controller.<move_func_name>(target_pose, speed, block=False)
+    ('move_robot' / 'move_right_robot')，然后等待运动结束，期间更新 task 进度并响应取消。
+
+    Returns:
+        bool: 运动到位返回 True；下发失败、机器人报警或超时返回 False。被取消时抛出 ActionCancelled。
+    """
+    task.check_cancelled()
+    move_method = getattr(controller, move_func_name)
+    start_joints = controller.getJointPos()
+    target_joints = controller.inverseKinematic(list(target_pose)) if start_joints is not None else None
+    task.check_cancelled()
+    if not move_method(list(target_pose), speed=speed, block=False):
+        return False
+    if task.cancelled:
+        controller.stop()  # 取消发生在下发过程中: on_cancel 的 stop 可能早于运动指令到达
+        task.check_cancelled()
+
+    return wait_for_motions(task, [(controller, start_joints, target_joints)], progress_range, timeout)
+
+
+def wait_for_motions(task: ActionTask, motions: Sequence[tuple], progress_range: Tuple[float, float] = (0.0, 1.0),
+                     timeout: float = MOTION_TIMEOUT) -> bool:
+    """
+    等待一个或多个已下发的关节运动全部结束 (多臂同时运动时总耗时取决于最慢的一臂)。
+
+    Args:
+        motions: [(controller, start_joints, target_joints), ...]，关节值未知时传 None (不计算进度)。
+        progress_range: 本段运动在整个任务中对应的进度区间，进度按最慢的一臂计算。
+    Returns:
+        bool: 全部到位返回 True；任一臂报警或超时返回 False。被取消时抛出 ActionCancelled。
+    """
+    low, high = progress_range
+    start = time.monotonic()
+    moving_seen = [False] * len(motions)
+    finished = [False] * len(motions)
+    fractions = [0.0] * len(motions)
+    while True:
+        task.check_cancelled()
+        elapsed = time.monotonic() - start
+        if elapsed > timeout:
+            print(f"[Action {task.name}] 错误: 等待运动完成超时 ({timeout:.0f} 秒)!")
+            return False
+        retry = False
+        for i, (controller, start_joints, target_joints) in enumerate(motions):
+            if finished[i]: continue
+            state = controller.getRobotState()
+            if state is None:
+                retry = True  # 获取失败稍等重试
+                continue
+            if state in ROBOT_STATE_ERRORS:
+                task.message = f"机器人{ROBOT_STATE_ERRORS[state]}"
+                return False
+            if state == ROBOT_STATE_STOPPED:
+                if moving_seen[i] or elapsed >= MOTION_START_GRACE:
+                    finished[i], fractions[i] = True, 1.0
+            else:
+                moving_seen[i] = True
+                if start_joints is not None and target_joints is not None:
+                    current_joints = controller.getJointPos()
+                    if current_joints is not None:
+                        fractions[i] = _joint_progress(start_joints, target_joints, current_joints)
+        task.set_progress(low + (high - low) * min(fractions))
+        if all(finished):
+            return True
+        task.sleep(1.0 if retry else MOTION_POLL_INTERVAL)
+
+
+# ----------------------------------------------------------------------
+# 自检
+# ----------------------------------------------------------------------
+def self_check():
+    executor = ActionExecutor("self-check")
+    stops = []
+
+    def slow(task, steps):
+        for i in range(steps):
+            task.set_progress(i / steps)
+            task.sleep(0.02)
+        return True
+
+    first = executor.submit("慢动作", slow, 50, on_cancel=lambda: stops.append("first"))
+    time.sleep(0.1)
+    assert first.state == ACTION_RUNNING and 0.0 < first.progress < 1.0, first.status_text()
+    second = executor.submit("替换动作", slow, 5, on_cancel=lambda: stops.append("second"))
+    assert second.wait(2.0) and second.state == ACTION_DONE, second.status_text()
+    assert first.state == ACTION_CANCELLED and stops == ["first"], (first.status_text(), stops)
+
+    failing = executor.submit("失败动作", lambda task: False)
+    assert failing.wait(1.0) and failing.state == ACTION_FAILED
+
+    blocker = executor.submit("占位动作", slow, 50)
+    queued = executor.submit("排队动作", slow, 1)
+    assert blocker.wait(1.0) and blocker.state == ACTION_CANCELLED
+    assert executor.cancel("停止按钮") and queued.wait(1.0) and queued.state == ACTION_CANCELLED
+    assert not executor.is_busy()
+    executor.close()
+    print(f"自检通过: {executor.stats_text()}")
+
+
+if __name__ == "__main__":
+    self_check()
@@ -0,0 +1,120 @@
+# arm_dispatch.py
+# -*- coding: utf-8 -*-
+
+"""
+每个机械臂一个常驻的指令发送线程。
+
+控制周期把两臂的指令同时投递给各自的发送线程，然后等待两边都返回 (或到达截止时间)。
+两臂的网络往返并行进行，右臂不再总是晚一个往返，一侧卡住也不会阻塞另一侧。
+待发送槽位深度为 1，采用"最新值优先": 上一条指令还没开始发送时被新指令替换。
+"""
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+def send_succeeded(result: Any) -> bool:
+    """驱动调用是否成功: CPSClient 返回 (ret, result, id)，其他返回 bool 或 None。"""
+    if isinstance(result, tuple): return bool(result[0]) if result else False
+    return result is not False
+
+
+class ArmCommandDispatcher:
+    """
+    Args:
+        name (str): 线程名与日志前缀 (例如 'left' / 'right')。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending = None  # (seq, fn, args)，深度为 1 的待发送槽位
+        self._seq = 0  # 最近一次投递的序号
+        self._done_seq = 0  # 最近一次发送完成的序号 (被替换的指令视为随之完成)
+        self._ok_seq = 0  # 最近一次发送成功的序号
+        self._closed = False
+        self.submitted = 0
+        self.replaced = 0  # 尚未发送就被新指令替换的次数
+        self.errors = 0
+        self.deadline_misses = 0  # wait() 到截止时间仍未完成的次数
+        self.last_duration = 0.0  # 最近一次发送耗时 (秒)
+        self.max_duration = 0.0
+        self.last_send = (0, 0.0, 0.0)  # 最近一次发送完成的 (序号, 开始时间, 返回时间)，延迟追踪用
+        self._thread = threading.Thread(target=self._run, name=f"ArmDispatch-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args) -> int:
+        """投递一条指令 fn(*args) 并立即返回其序号。"""
+        with self._cond:
+            if self._closed:
+                return self._seq
+            self._seq += 1
+            if self._pending is not None:
+                self.replaced += 1
+            self._pending = (self._seq, fn, args)
+            self.submitted += 1
+            self._cond.notify_all()
+            return self._seq
+
+    def wait(self, seq: int, deadline: float) -> bool:
+        """等待序号为 seq 的指令发送完成，直到 monotonic 时间 deadline。超时返回 False。"""
+        with self._cond:
+            while self._done_seq < seq and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.deadline_misses += 1
+                    return False
+                self._cond.wait(remaining)
+            return self._done_seq >= seq
+
+    def succeeded(self, seq: int) -> Optional[bool]:
+        """序号为 seq 的指令是否已成功送达: 尚未完成返回 None，失败或被替换返回 False。"""
+        with self._cond:
+            if self._done_seq < seq: return None
+            return self._ok_seq == seq
+
+    def busy(self) -> bool:
+        with self._cond:
+            return self._done_seq < self._seq
+
+    def stats_text(self) -> str:
+        return (f"投递 {self.submitted}, 替换 {self.replaced}, 超时 {self.deadline_misses}, "
+                f"异常 {self.errors}, 最长 {self.max_duration * 1000:.1f} ms")
+
+    def close(self, timeout: float = 1.0):
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify_all()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def _take(self) -> Optional[tuple]:
+        with self._cond:
+            while self._pending is None and not self._closed:
+                self._cond.wait()
+            item, self._pending = self._pending, None
+            return item
+
+    def _run(self):
+        while True:
+            item = self._take()
+            if item is None:
+                return  # 已关闭
+            seq, fn, args = item
+            start = time.monotonic()
+            ok = False
+            try:
+                ok = send_succeeded(fn(*args))
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1 or self.errors % 100 == 0:
+                    print(f"[ArmDispatch {self.name}] 发送指令出错 (第 {self.errors} 次): {e}")
+            self.last_duration = time.monotonic() - start
+            self.max_duration = max(self.max_duration, self.last_duration)
+            with self._cond:
+                self._done_seq = seq
+                if ok: self._ok_seq = seq
+                self.last_send = (seq, start, start + self.last_duration)
+                self._cond.notify_all()
@@ -0,0 +1,609 @@
+# arm_worker.py
+# -*- coding: utf-8 -*-
+
+"""
+每个机械臂一个工作进程 (settings.arm_processes)。
+
+协调进程 (DualArmController) 只负责输入、速度计算和界面；arms 注册表中的每个臂由一个工作进程独占
+连接、夹爪和指令发送，各臂的 socket 通信与协议编解码不再在同一个解释器里争用 GIL:
+- 速度指令与夹爪目标位置: 共享内存中的最新值槽，协调进程写入后唤醒工作进程，不等待发送完成；
+- 工作进程状态 (初始化结果、最近一次发送时间、夹爪状态快照): 写入共享内存，协调进程随时读取；
+- 其他驱动调用 (回正、抓取、夹爪激活与开合、IK 等): 经队列远程调用。ArmProxy 提供与 CPSClient 相同的方法，
+  ActionExecutor / GripperCommandWorker / vision_interaction 不需要修改。工作进程在线程池中执行这些调用，
+  与直接调用 CPSClient 一样由驱动内部的 _io_lock 串行化通信。
+
+每个共享内存块只有一个写入方 (协调进程中由锁串行化)，读取方用序号检查读到的是完整的一次写入 (seqlock)。
+工作进程以 spawn 方式启动，不继承主进程的 pygame、相机与线程状态。
+
+自检 (假驱动，不连接机械臂): python arm_worker.py
+"""
+
+import itertools
+import multiprocessing
+import pickle
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from arm_dispatch import send_succeeded
+from CPS import CPSClient
+from elibot.gripper_monitor import GripperSnapshot
+from elibot.gripper_streamer import GripperPositionStreamer
+from robot_control import initialize_robot, initialize_hans_robot, send_jog_command
+
+try:
+    from hans_robot.CPS import CPSClient as HansCPSClient
+    from hans_robot.long_jog_teleop import HansLongJogTeleop
+
+    HANS_AVAILABLE = True
+except ImportError:
+    HANS_AVAILABLE = False
+    HansCPSClient = None
+    HansLongJogTeleop = None
+
+ARM_INIT_TIMEOUT = 60.0  # 等待工作进程完成连接与初始化 (上电、使能) 的最长时间 (秒)
+WAKE_TIMEOUT = 0.05  # 工作进程无新指令时的唤醒周期 (秒)，同时是夹爪快照的发布周期
+RPC_THREADS = 4  # 工作进程中并发执行远程调用的线程数 (回正运动期间仍可开合夹爪、发送停止)
+ELIBOT_PORT = 8055
+
+# 速度指令类型
+KIND_SPEEDL = 1  # Elibot moveBySpeedl (XYZ 模式)
+KIND_JOG = 2  # Elibot jog (RPY 模式)
+KIND_STOP = 3  # Elibot stop
+KIND_TELEOP = 4  # Hans 长点动 update
+KIND_TELEOP_STOP = 5  # Hans 长点动 stop
+
+# 共享内存布局 (float64)。每块第一个元素为序号: 奇数表示正在写入
+CMD_BLOCK = (0, 15)  # [序号, 指令号, 类型, 速度 x6, acc, arot, t, min_speed, max_speed, 提交时间]
+GRIP_BLOCK = (15, 3)  # [序号, 目标号, 目标位置]
+STATE_BLOCK = (18, 18)  # [序号, 初始化, 已执行指令号, 发送开始, 发送结束, 发送数, 失败数, 快照有效, 夹爪快照 x9, 成功指令号]
+SHARED_SIZE = 36
+INIT_PENDING, INIT_FAILED, INIT_OK = -1.0, 0.0, 1.0
+
+
+class SeqBlock:
+    """共享数组中的一个 seqlock 块 (单一写入方)。"""
+
+    def __init__(self, shared: np.ndarray, block: Tuple[int, int]):
+        start, size = block
+        self.array = shared[start:start + size]
+
+    def write(self, values: Sequence[float]):
+        array = self.array
+        array[0] += 1  # 奇数: 写入中
+        array[1:1 + len(values)] = values
+        array[0] += 1
+
+    def read(self) -> np.ndarray:
+        array = self.array
+        while True:
+            seq = array[0]
+            if seq % 2 == 0:
+                data = array[1:].copy()
+                if array[0] == seq: return data
+            time.sleep(0)  # 写入方正在写入 (写入只有几十纳秒)
+
+
+def connect_arm(name: str, arm, options: Mapping[str, Any]):
+    """
+    在工作进程中连接并初始化机械臂 (默认的驱动工厂)。
+
+    Returns:
+        (client, teleop): Elibot 的 teleop 为 None；Hans 的 client 为 Hans CPSClient。失败时返回 (None, None)。
+    """
+    if arm.type == 'hans':
+        if not HANS_AVAILABLE:
+            print(f"  错误: {name} 配置为 Hans，但 Hans 接口不可用。")
+            return None, None
+        client = HansCPSClient()
+        if not initialize_hans_robot(client, arm.hans_box_id, arm.ip, arm.port or options['hans_port'], name):
+            return None, None
+        return client, HansLongJogTeleop(client, box_id=arm.hans_box_id,
+                                         keepalive_period=options['hans_keepalive_period'])
+    client = CPSClient(arm.ip, arm.port or ELIBOT_PORT, gripper_slave_id=arm.gripper_id, gripper_port=arm.gripper_port)
+    if not client.connect():
+        print(f"  错误: {name} 连接失败")
+        return None, None
+    if not initialize_robot(client, name):
+        client.disconnect()
+        return None, None
+    return client, None
+
+
+# ----------------------------------------------------------------------
+# 工作进程
+# ----------------------------------------------------------------------
+class _ArmWorkerServer:
+    """工作进程主体: 主线程执行最新的速度指令并发布状态，远程调用在线程池中执行。"""
+
+    def __init__(self, name, arm, options, driver_factory, shared, wake, stop_event, requests, replies):
+        self.name = name
+        self.arm = arm
+        self.options = options
+        self.driver_factory = driver_factory
+        array = np.frombuffer(shared, dtype=np.float64)
+        self.cmd = SeqBlock(array, CMD_BLOCK)
+        self.grip = SeqBlock(array, GRIP_BLOCK)
+        self.state = SeqBlock(array, STATE_BLOCK)
+        self.wake = wake
+        self.stop_event = stop_event
+        self.requests = requests
+        self.replies = replies
+        self.client = None
+        self.teleop = None
+        self.streamer: Optional[GripperPositionStreamer] = None
+        self.pool = ThreadPoolExecutor(max_workers=RPC_THREADS, thread_name_prefix=f"ArmRPC-{name}")
+        self._state = np.zeros(STATE_BLOCK[1] - 1)
+        self._state[0] = INIT_PENDING
+        self._last_snapshot_seq = None
+
+    def run(self):
+        try:
+            self.client, self.teleop = self.driver_factory(self.name, self.arm, self.options)
+        except Exception as e:
+            print(f"[ArmWorker {self.name}] 初始化异常: {e}")
+            traceback.print_exc()
+        self._state[0] = INIT_OK if self.client is not None else INIT_FAILED
+        self.state.write(self._state)
+        rpc_thread = threading.Thread(target=self._serve, name=f"ArmRPCServe-{self.name}", daemon=True)
+        rpc_thread.start()
+        last_cmd_id, last_grip_id = 0.0, 0.0
+        try:
+            while not self.stop_event.is_set():
+                self.wake.wait(WAKE_TIMEOUT)
+                self.wake.clear()  # 清除后再读取: 之后的写入会再次唤醒
+                cmd = self.cmd.read()
+                if cmd[0] != last_cmd_id:
+                    last_cmd_id = cmd[0]
+                    self._execute(cmd)
+                grip = self.grip.read()
+                if grip[0] != last_grip_id:
+                    last_grip_id = grip[0]
+                    if self.streamer is not None: self.streamer.set_target(int(grip[1]))
+                self._publish_gripper()
+        finally:
+            self._shutdown()
+
+    def _execute(self, cmd: np.ndarray):
+        kind, speed = int(cmd[1]), cmd[2:8]
+        send_start = time.monotonic()
+        ok = False
+        try:
+            if kind == KIND_SPEEDL:
+                ok = send_succeeded(self.client.moveBySpeedl(list(speed), cmd[8], cmd[9], cmd[10]))
+            elif kind == KIND_JOG:
+                ok = send_succeeded(send_jog_command(self.client, speed, cmd[11], cmd[12]))
+            elif kind == KIND_STOP:
+                ok = send_succeeded(self.client.stop())
+            elif kind == KIND_TELEOP:
+                self.teleop.update(speed)
+                ok = True
+            elif kind == KIND_TELEOP_STOP:
+                self.teleop.stop()
+                ok = True
+        except Exception as e:
+            print(f"[ArmWorker {self.name}] 发送指令异常: {e}")
+        state = self._state
+        state[1], state[2], state[3] = cmd[0], send_start, time.monotonic()
+        state[4] += 1
+        if ok: state[16] = cmd[0]
+        else: state[5] += 1
+        self.state.write(state)
+
+    def _publish_gripper(self):
+        monitor = getattr(self.client, 'gripper_monitor', None) if self.client is not None else None
+        snapshot = monitor.snapshot if monitor is not None else None
+        if snapshot is None or snapshot.seq == self._last_snapshot_seq: return
+        self._last_snapshot_seq = snapshot.seq
+        self._state[6] = 1.0
+        self._state[7:16] = snapshot
+        self.state.write(self._state)
+
+    def _serve(self):
+        while True:
+            request = self.requests.get()
+            if request is None: break
+            self.pool.submit(self._call, *request)
+
+    def _call(self, call_id: int, method: str, args: tuple, kwargs: dict):
+        try:
+            handler = getattr(self, f"rpc_{method}", None)
+            if handler is None:
+                if self.client is None: raise ConnectionError(f"{self.name} 未连接")
+                handler = getattr(self.client, method)
+            result = handler(*args, **kwargs)
+            pickle.dumps(result)  # 不能序列化的返回值在这里报错，而不是让调用方一直等待
+            self.replies.put((call_id, True, result))
+        except Exception as e:
+            self.replies.put((call_id, False, f"{type(e).__name__}: {e}"))
+
+    # 工作进程中执行、需要访问本地对象的远程调用
+    def rpc_start_gripper_monitor(self, rate_hz: float) -> bool:
+        return self.client.start_gripper_monitor(rate_hz) is not None  # 监视器留在工作进程，快照经共享内存发布
+
+    def rpc_start_gripper_streamer(self, rate_hz: float, force: int, speed: int) -> bool:
+        if self.streamer is None:
+            self.streamer = GripperPositionStreamer(self.client, rate_hz=rate_hz, force=force, speed=speed,
+                                                    name=self.name)
+        return True
+
+    def rpc_stop_gripper_streamer(self) -> Dict[str, int]:
+        streamer, self.streamer = self.streamer, None
+        if streamer is None: return {}
+        streamer.close()
+        return {'updates': streamer.updates, 'writes': streamer.writes, 'coalesced': streamer.coalesced,
+                'skipped': streamer.skipped, 'failed': streamer.failed}
+
+    def rpc_teleop_stats(self) -> Dict[str, Any]:
+        return self.teleop.get_stats() if self.teleop is not None else {}
+
+    def _shutdown(self):
+        if self.streamer is not None: self.rpc_stop_gripper_streamer()
+        if self.teleop is not None:
+            try:
+                self.teleop.close()
+            except Exception as e:
+                print(f"[ArmWorker {self.name}] 关闭长点动驱动时出错: {e}")
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.client is not None:
+            try:
+                if self.arm.type == 'hans':
+                    self.client.HRIF_DisConnect(self.arm.hans_box_id)
+                else:
+                    self.client.disconnect()
+            except Exception as e:
+                print(f"[ArmWorker {self.name}] 断开连接时出错: {e}")
+
+
+def _worker_main(name, arm, options, driver_factory, shared, wake, stop_event, requests, replies):
+    _ArmWorkerServer(name, arm, options, driver_factory, shared, wake, stop_event, requests, replies).run()
+
+
+# ----------------------------------------------------------------------
+# 协调进程
+# ----------------------------------------------------------------------
+class ArmWorker:
+    """
+    一个机械臂的工作进程句柄 (在协调进程中使用)。
+
+    Args:
+        name (str): arms 注册表中的名称。
+        arm (ArmConfig): 机械臂配置。
+        options (Mapping[str, Any]): hans_port、hans_keepalive_period 等共用设置。
+        driver_factory (Callable): 在工作进程中调用 driver_factory(name, arm, options) -> (client, teleop)，
+            必须是模块级函数 (spawn 时按名称传递)。
+    """
+
+    def __init__(self, name: str, arm, options: Mapping[str, Any], driver_factory: Callable = connect_arm):
+        self.name = name
+        self.arm = arm
+        self.port = arm.port or (options.get('hans_port') if arm.type == 'hans' else ELIBOT_PORT)
+        ctx = multiprocessing.get_context('spawn')
+        self._shared = ctx.RawArray('d', SHARED_SIZE)
+        array = np.frombuffer(self._shared, dtype=np.float64)
+        array[STATE_BLOCK[0] + 1] = INIT_PENDING
+        self._cmd = SeqBlock(array, CMD_BLOCK)
+        self._grip = SeqBlock(array, GRIP_BLOCK)
+        self._state = SeqBlock(array, STATE_BLOCK)
+        self._wake = ctx.Event()
+        self._stop_event = ctx.Event()
+        self._requests = ctx.Queue()
+        self._replies = ctx.Queue()
+        self.process = ctx.Process(target=_worker_main, name=f"ArmWorker-{name}", daemon=True,
+                                   args=(name, arm, dict(options), driver_factory, self._shared, self._wake,
+                                         self._stop_event, self._requests, self._replies))
+        self._write_lock = threading.Lock()  # 协调进程中的多个线程写入同一指令槽
+        self._cmd_id = 0
+        self._grip_id = 0
+        self._call_ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+        self._closed = False
+        self.submitted = 0
+
+    def start(self):
+        self.process.start()
+        self._reader = threading.Thread(target=self._read_replies, name=f"ArmReplies-{self.name}", daemon=True)
+        self._reader.start()
+
+    @property
+    def init_state(self) -> float:
+        return self._state.read()[0]
+
+    @property
+    def init_ok(self) -> bool:
+        return bool(self.init_state == INIT_OK)
+
+    def submit(self, kind: int, speed: Sequence[float], acc: float = 0.0, arot: float = 0.0, t: float = 0.0,
+               min_speed: float = 0.0, max_speed: float = 0.0) -> int:
+        """写入最新速度指令并唤醒工作进程 (不等待发送)。未执行的旧指令被覆盖。返回指令号。"""
+        with self._write_lock:
+            self._cmd_id += 1
+            self._cmd.write((self._cmd_id, kind, *speed, acc, arot, t, min_speed, max_speed, time.monotonic()))
+            self.submitted += 1
+        self._wake.set()
+        return self._cmd_id
+
+    def set_gripper_target(self, position: int):
+        with self._write_lock:
+            self._grip_id += 1
+            self._grip.write((self._grip_id, position))
+        self._wake.set()
+
+    def state(self) -> Dict[str, Any]:
+        data = self._state.read()
+        return {'init': data[0], 'done_id': int(data[1]), 'send_start': data[2], 'send_end': data[3],
+                'sends': int(data[4]), 'errors': int(data[5]), 'ok_id': int(data[16]), 'submitted': self.submitted}
+
+    def succeeded(self, cmd_id: int) -> Optional[bool]:
+        """指令 cmd_id 是否已成功发送: 尚未执行返回 None，失败或被新指令覆盖返回 False。"""
+        data = self._state.read()
+        if data[1] < cmd_id: return None
+        return bool(data[16] == cmd_id)
+
+    def gripper_snapshot(self) -> Optional[GripperSnapshot]:
+        data = self._state.read()
+        if not data[6]: return None
+        values = data[7:16]
+        return GripperSnapshot(int(values[0]), bool(values[1]), *(int(v) for v in values[2:7]), float(values[7]),
+                               int(values[8]))
+
+    def call_async(self, method: str, *args, **kwargs) -> Future:
+        future = Future()
+        if self._closed or not self.process.is_alive():
+            future.set_exception(ConnectionError(f"{self.name} 工作进程未运行"))
+            return future
+        call_id = next(self._call_ids)
+        with self._pending_lock:
+            self._pending[call_id] = future
+        self._requests.put((call_id, method, args, kwargs))
+        return future
+
+    def call(self, method: str, *args, _rpc_timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        在工作进程中调用驱动方法并等待返回 (驱动抛出的异常以 RuntimeError 重新抛出)。
+        _rpc_timeout 为等待返回的时间；其余参数 (包括驱动方法自己的 timeout) 原样传给驱动。
+        """
+        return self.call_async(method, *args, **kwargs).result(_rpc_timeout)
+
+    def _read_replies(self):
+        while True:
+            try:
+                call_id, ok, result = self._replies.get(timeout=0.5)
+            except Exception:  # queue.Empty: 检查工作进程是否意外退出
+                if self._closed or not self.process.is_alive():
+                    self._fail_pending(ConnectionError(f"{self.name} 工作进程已退出"))
+                    if self._closed or not self.process.is_alive(): return
+                continue
+            with self._pending_lock:
+                future = self._pending.pop(call_id, None)
+            if future is None: continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(result))
+
+    def _fail_pending(self, error: Exception):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(error)
+
+    def close(self, timeout: float = 3.0):
+        if self._closed: return
+        self._closed = True
+        self._stop_event.set()
+        self._wake.set()
+        self._requests.put(None)
+        self.process.join(timeout)
+        if self.process.is_alive():
+            print(f"[ArmWorker {self.name}] 工作进程未在 {timeout} s 内退出，强制结束")
+            self.process.terminate()
+            self.process.join(1.0)
+        if self._reader is not None: self._reader.join(1.0)
+        self._fail_pending(ConnectionError(f"{self.name} 工作进程已关闭"))
+
+
+class RemoteGripperMonitor:
+    """工作进程中夹爪监视器的只读视图 (snapshot 来自共享内存)。不支持 wait_for，is_running() 返回 False。"""
+
+    def __init__(self, worker: ArmWorker):
+        self.worker = worker
+
+    @property
+    def snapshot(self) -> Optional[GripperSnapshot]:
+        return self.worker.gripper_snapshot()
+
+    def is_running(self) -> bool:
+        return False
+
+
+class RemoteGripperStreamer:
+    """工作进程中的 GripperPositionStreamer: set_target 写入共享内存，统计在 close 后可用。"""
+
+    def __init__(self, worker: ArmWorker):
+        self.worker = worker
+        self.updates = self.writes = self.coalesced = self.skipped = self.failed = 0
+
+    def set_target(self, position: int):
+        self.worker.set_gripper_target(position)
+
+    def close(self, timeout: float = 1.0):
+        try:
+            stats = self.worker.call('stop_gripper_streamer', _rpc_timeout=timeout)
+        except Exception as e:
+            print(f"[ArmWorker {self.worker.name}] 停止夹爪位置流时出错: {e}")
+            return
+        for key, value in stats.items():
+            setattr(self, key, value)
+
+
+class RemoteTeleop:
+    """工作进程中的 Hans 长点动驱动 (与 HansLongJogTeleop 的 update / stop / close / get_stats 接口相同)。"""
+
+    def __init__(self, worker: ArmWorker):
+        self.worker = worker
+
+    def update(self, speed_vector: Sequence[float]):
+        self.worker.submit(KIND_TELEOP, speed_vector)
+
+    def stop(self):
+        self.worker.submit(KIND_TELEOP_STOP, (0.0,) * 6)
+
+    def close(self):
+        self.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        try:
+            return self.worker.call('teleop_stats', _rpc_timeout=1.0)
+        except Exception as e:
+            return {'error': str(e)}
+
+
+class ArmProxy:
+    """
+    工作进程中 CPSClient 的代理: 方法调用转为远程调用并等待返回；ip / port 取自配置，
+    gripper_monitor 为共享内存中的快照视图。
+    """
+
+    def __init__(self, worker: ArmWorker):
+        self.worker = worker
+        self.ip = worker.arm.ip
+        self.port = worker.port
+
+    @property
+    def gripper_monitor(self) -> Optional[RemoteGripperMonitor]:
+        return RemoteGripperMonitor(self.worker) if self.worker.gripper_snapshot() is not None else None
+
+    def start_gripper_streamer(self, rate_hz: float, force: int, speed: int) -> RemoteGripperStreamer:
+        self.worker.call('start_gripper_streamer', rate_hz, force, speed)
+        return RemoteGripperStreamer(self.worker)
+
+    def __getattr__(self, method: str):
+        if method.startswith('_'): raise AttributeError(method)
+
+        def remote_call(*args, **kwargs):
+            return self.worker.call(method, *args, **kwargs)
+
+        remote_call.__name__ = method
+        return remote_call
+
+
+class ArmFleet:
+    """
+    arms 注册表中所有臂的工作进程。
+
+    Args:
+        arms (Mapping[str, ArmConfig]): 名称 -> 机械臂配置。
+        options (Mapping[str, Any]): 传给驱动工厂的共用设置。
+        driver_factory (Callable): 见 ArmWorker。
+    """
+
+    def __init__(self, arms: Mapping, options: Mapping[str, Any], driver_factory: Callable = connect_arm):
+        self.workers: Dict[str, ArmWorker] = {name: ArmWorker(name, arm, options, driver_factory)
+                                              for name, arm in arms.items()}
+
+    def start(self, timeout: float = ARM_INIT_TIMEOUT) -> Dict[str, bool]:
+        """同时启动所有工作进程 (各臂并行连接和初始化)，等待全部完成或超时。返回各臂是否初始化成功。"""
+        for worker in self.workers.values():
+            worker.start()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(worker.init_state != INIT_PENDING or not worker.process.is_alive()
+                   for worker in self.workers.values()):
+                break
+            time.sleep(0.05)
+        return {name: worker.init_ok for name, worker in self.workers.items()}
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: {key: value for key, value in worker.state().items() if key in ('sends', 'errors', 'submitted')}
+                | {'ok': worker.init_ok, 'alive': worker.process.is_alive()}
+                for name, worker in self.workers.items()}
+
+    def stats_text(self) -> str:
+        return "; ".join(f"{name}: 提交 {s['submitted']}, 发送 {s['sends']}, 失败 {s['errors']}"
+                         for name, s in self.status().items())
+
+    def close(self):
+        for worker in self.workers.values():
+            worker.close()
+
+
+# ----------------------------------------------------------------------
+# 自检 (假驱动)
+# ----------------------------------------------------------------------
+class _FakeClient:
+    def __init__(self, name: str):
+        self.name = name
+        self.speedl = 0
+        self.stops = 0
+
+    def moveBySpeedl(self, speed, acc, arot, t):
+        time.sleep(0.002)
+        self.speedl += 1
+        return True, True, 0
+
+    def stop(self):
+        self.stops += 1
+        return True, True, 0
+
+    def getTCPPose(self):
+        return [float(self.speedl), 0.0, 0.0, 0.0, 0.0, float(self.stops)]
+
+    def fail(self):
+        raise ValueError("故意失败")
+
+    def disconnect(self):
+        pass
+
+
+def _fake_driver(name, arm, options):
+    return _FakeClient(name), None
+
+
+def self_check():
+    from runtime_config import ArmConfig
+
+    arms = {name: ArmConfig(ip=f"10.0.0.{i}") for i, name in enumerate(('left', 'right', 'third'))}
+    fleet = ArmFleet(arms, {}, driver_factory=_fake_driver)
+    start = time.monotonic()
+    results = fleet.start(timeout=20.0)
+    print(f"启动 {len(results)} 个工作进程: {results} ({time.monotonic() - start:.2f} s)")
+    assert all(results.values())
+    try:
+        latencies = []
+        for i in range(200):
+            for name, worker in fleet.workers.items():
+                t0 = time.monotonic()
+                cmd_id = worker.submit(KIND_SPEEDL, [float(i)] * 6, 100, 20, 0.1)
+                if name == 'left':  # 提交到工作进程开始发送的延迟
+                    while worker.state()['done_id'] < cmd_id: time.sleep(0.0001)
+                    latencies.append(worker.state()['send_start'] - t0)
+            time.sleep(0.004)
+        time.sleep(0.1)
+        proxy = ArmProxy(fleet.workers['third'])
+        pose = proxy.getTCPPose()
+        assert pose[0] > 0, pose
+        try:
+            proxy.fail()
+            raise AssertionError("远程异常未传回")
+        except RuntimeError as e:
+            assert "故意失败" in str(e)
+        proxy.stop()
+        assert proxy.getTCPPose()[5] == 1.0
+        print(f"远程调用: getTCPPose -> {pose}")
+        lat = np.array(latencies) * 1000
+        print(f"提交 -> 工作进程开始发送: p50 {np.percentile(lat, 50):.3f} ms, p99 {np.percentile(lat, 99):.3f} ms")
+        print(fleet.stats_text())
+    finally:
+        fleet.close()
+    assert not any(worker.process.is_alive() for worker in fleet.workers.values())
+
+
+if __name__ == "__main__":
+    self_check()
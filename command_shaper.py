@@ -0,0 +1,101 @@
+# command_shaper.py
+# -*- coding: utf-8 -*-
+
+"""
+速度指令流整形: 减少发给控制器的无效指令。
+
+每个机械臂一个 CommandShaper，控制周期对每条指令调用 decide():
+- 指令从运动变为静止 (全部分量接近 0) 时发送停止 (ACTION_STOP)。调用方投递后用 track_stop() 登记送达检查，
+  确认送达后静止期间不再发送；发送失败、被替换或 keepalive_period 内仍未确认时重发停止；
+- 运动中与上次发送的指令相差不超过死区 (deadband) 时跳过；
+- 跳过期间按 keepalive_period 重发一次，保证控制器端指令不过期
+  (moveBySpeedl 的持续时间 t 到期后机械臂会停下，jog 超过 1 秒未收到指令会停止)。
+"""
+
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+ACTION_SEND = "send"  # 发送本条速度指令
+ACTION_STOP = "stop"  # 发送停止
+ACTION_SKIP = "skip"  # 不发送
+
+IDLE_EPSILON = 1e-3  # 各分量绝对值都不超过该值视为静止
+
+
+class CommandShaper:
+    """
+    Args:
+        deadband (float): 与上次发送指令的最大分量差不超过该值时视为相同 (mm/s 或 deg/s)。
+        keepalive_period (float): 运动中相同指令的重发周期 (秒)。
+        name (str): 日志前缀。
+    """
+
+    def __init__(self, deadband: float, keepalive_period: float, name: str = "arm"):
+        self.deadband = float(deadband)
+        self.keepalive_period = float(keepalive_period)
+        self.name = name
+        self.mode: Optional[str] = None
+        self._last_sent: Optional[np.ndarray] = None  # 最近一次发送的运动指令，静止后为 None
+        self._last_send_time = 0.0
+        self._stopped = True  # 控制器当前被认为处于静止 (停止已确认送达或从未运动)
+        self._stop_issued = False  # 已决定发送停止，等待确认送达
+        self._stop_check: Optional[Callable[[], Optional[bool]]] = None  # 停止是否送达: None 表示尚未完成
+        self.sent = 0
+        self.stops = 0  # 确认送达的停止
+        self.stop_retries = 0  # 停止未确认送达而重发的次数
+        self.skipped_idle = 0  # 静止期间跳过的指令
+        self.skipped_deadband = 0  # 运动中因与上次相同而跳过的指令
+        self.keepalives = 0  # 因保活而重发的指令
+
+    def reset(self, mode: Optional[str] = None, stopped: bool = True):
+        """模式切换或外部已发送停止时调用。"""
+        self.mode = mode
+        self._last_sent = None
+        self._stopped = stopped
+        self._stop_issued = False
+        self._stop_check = None
+
+    def track_stop(self, check: Callable[[], Optional[bool]]):
+        """登记最近一次 ACTION_STOP 的送达检查 (例如 partial(dispatcher.succeeded, seq))。"""
+        if self._stop_issued: self._stop_check = check
+
+    def decide(self, command: np.ndarray, now: Optional[float] = None) -> str:
+        now = time.monotonic() if now is None else now
+        if not np.any(np.abs(command) > IDLE_EPSILON):
+            if self._stopped:
+                self.skipped_idle += 1
+                return ACTION_SKIP
+            if self._stop_issued:
+                delivered = self._stop_check() if self._stop_check is not None else None
+                if delivered:
+                    self._stopped, self._stop_issued, self._stop_check = True, False, None
+                    self.stops += 1
+                    self.skipped_idle += 1
+                    return ACTION_SKIP
+                if delivered is None and now - self._last_send_time < self.keepalive_period:
+                    self.skipped_idle += 1
+                    return ACTION_SKIP
+                self.stop_retries += 1  # 发送失败、被替换或超时未确认
+            self._stop_issued, self._stop_check = True, None
+            self._last_sent = None
+            self._last_send_time = now
+            return ACTION_STOP
+
+        if self._last_sent is not None and np.max(np.abs(command - self._last_sent)) <= self.deadband:
+            if now - self._last_send_time < self.keepalive_period:
+                self.skipped_deadband += 1
+                return ACTION_SKIP
+            self.keepalives += 1
+        self._stopped = self._stop_issued = False
+        self._stop_check = None
+        self._last_sent = np.array(command, dtype=float)
+        self._last_send_time = now
+        self.sent += 1
+        return ACTION_SEND
+
+    def stats_text(self) -> str:
+        skipped = self.skipped_idle + self.skipped_deadband
+        return (f"发送 {self.sent} (保活 {self.keepalives}), 停止 {self.stops} (重发 {self.stop_retries}), "
+                f"跳过 {skipped} (静止 {self.skipped_idle}, 死区 {self.skipped_deadband})")
@@ -27,13 +27,51 @@ DEFAULT_T = 0.1
 DEFAULT_TRIGGER_THRESHOLD = 0.1
 DEFAULT_GRIPPER_SPEED = 150
 DEFAULT_GRIPPER_FORCE = 100
+DEFAULT_GRIPPER_MONITOR_RATE = 20.0 # 夹爪状态监视频率 (Hz, 0=不启用)
+DEFAULT_GRIPPER_CONTROL_MODE = 'toggle' # 夹爪控制方式: 'toggle' (按钮开合) 或 'analog' (扳机按比例)
+DEFAULT_GRIPPER_STREAM_RATE = 20.0 # analog 模式下夹爪目标位置的最大发送频率 (Hz)
+DEFAULT_GRASP_CURRENT_THRESHOLD = 60 # 抓取检测: 电流 gCU 不低于该值且位置不再变化视为抓稳 (0-255, 0=只用 gOBJ)
 DEFAULT_LONG_PRESS_DURATION = 0.8
+DEFAULT_CONTROL_RATE = 30.0 # 控制线程频率 (Hz, 30-250)
+DEFAULT_UI_FPS = 30 # 界面刷新帧率
+DEFAULT_INPUT_STALE_TIMEOUT = 0.5 # 手柄快照超过该时间 (秒) 未更新时按无输入处理
+DEFAULT_DISPATCH_DEADLINE = 0.05 # 控制周期等待两臂指令返回的最长时间 (秒)
+STOP_CONFIRM_TIMEOUT = 0.5 # 模式切换/退出时等待零速度停止送达的最长时间 (秒)
+DEFAULT_COMMAND_DEADBAND = 0.5 # 与上次发送的速度指令相差不超过该值时不重复发送 (mm/s 或 deg/s)
+DEFAULT_SPEEDL_KEEPALIVE_FRACTION = 0.5 # moveBySpeedl 相同指令按 t * 该比例重发
+DEFAULT_JOG_KEEPALIVE_PERIOD = 0.3 # jog 相同指令的重发周期 (秒, 控制器 1 秒未收到即停止)
+DEFAULT_ACTION_CANCEL_AXES = [0, 1, 3, 4] # 偏离中位即取消回正/抓取动作的摇杆轴 (左右摇杆)
+DEFAULT_ACTION_CANCEL_THRESHOLD = 0.5 # 摇杆轴绝对值超过该值视为有输入
 DEFAULT_MODE_SWITCH_BUTTON = 7
 DEFAULT_SPEED_INC_BUTTON = 1
 DEFAULT_SPEED_DEC_BUTTON = 6
 DEFAULT_GRIPPER_L_BUTTON = 9
 DEFAULT_GRIPPER_R_BUTTON = 10
 DEFAULT_RESET_SPEED = 50 # 新增默认回正速度
+DEFAULT_RESET_RPY_SPEED = 30.0 # RPY 姿态设置的运动速度
+DEFAULT_RESET_RPY_ACC = 50.0
+DEFAULT_RESET_RPY_AROT = 20.0
+DEFAULT_RESET_RPY_T_INTERVAL = 0.1
+DEFAULT_RESET_TIME_SCALING = True # 双臂同时回正时按关节行程缩放速度，使两臂同时到达
+DEFAULT_ROBOT_TYPE = 'elibot' # 机械臂类型: 'elibot' 或 'hans'
+DEFAULT_HANS_PORT = 10003
+DEFAULT_LEFT_MOUNT_RPY = [65.0, 0.0, 10.0] # 左臂安装姿态 (xyz 欧拉角, 度)，用于 XYZ 模式速度变换
+DEFAULT_RIGHT_MOUNT_RPY = [65.334, -4.208, -9.079] # 右臂安装姿态
+DEFAULT_HANS_KEEPALIVE_PERIOD = 0.2 # Hans 长点动保活周期 (秒, <=0.5)
+DEFAULT_HEADLESS = False # 无界面模式: 不创建窗口、不加载字体和音频
+DEFAULT_HEADLESS_INPUT = 'joystick' # 无界面模式输入源: 'joystick' / 'evdev' / 'none'
+DEFAULT_HEADLESS_STATUS = 'console' # 无界面模式状态输出: 'console' 或 'udp://host:port'
+DEFAULT_HEADLESS_STATUS_PERIOD = 1.0 # 无界面模式状态输出周期 (秒)
+DEFAULT_UDP_LISTEN = '0.0.0.0:47200' # 网络遥操作 (headless_input: udp) 监听地址
+DEFAULT_UDP_INPUT_DEADLINE = 0.15 # 超过该时间 (秒) 没有新数据包则速度归零、按钮全部松开
+DEFAULT_WATCHDOG_MISS_LIMIT = 5 # 控制循环连续超时/无进展的周期数达到该值时停止机械臂 (0 = 不启用看门狗)
+DEFAULT_LATENCY_TRACE = False # 记录每个控制周期的输入/计算/发送/返回时间，退出时导出 Chrome trace JSON
+DEFAULT_LATENCY_TRACE_FILE = 'latency_trace.json'
+DEFAULT_LATENCY_MOTION_PROBE_PERIOD = 0.0 # 轮询 TCP 位姿观察实际运动的周期 (秒，0 = 不探测)
+DEFAULT_ESTOP_FAST_PATH = True # 为每臂建立专用停止连接，停止/急停经快速通道发送控制器原生停止指令
+DEFAULT_CONFIG_HOT_RELOAD = True # 监视配置文件与标定文件，修改后校验并在控制周期之间应用
+DEFAULT_CONFIG_RELOAD_POLL_PERIOD = 1.0 # 文件状态检查周期 (秒，inotify 可用时只作为兜底)
+DEFAULT_ARM_PROCESSES = False # 每个机械臂一个工作进程 (连接、夹爪、速度指令发送)，与主进程经共享内存和队列通信
 
 # Pygame 颜色 (也可以移到 ui.py)
 C_WHITE = (255, 255, 255)
@@ -84,68 +122,64 @@ def load_config(filepath):
         traceback.print_exc()
         return None
 
-def load_and_set_config_variables(controller_instance, config_path=CONFIG_FILE):
-    """加载 YAML 配置文件并设置控制器实例变量"""
-    print(f"正在加载配置文件并设置变量: {config_path}")
-    try:
-        config = load_config(config_path)
-        if config is None:
-            raise ValueError("无法加载配置")
-
-        controller_instance.config = config # 保存原始配置
-
-        setup_cfg = config.get('setup', {})
-        settings_cfg = config.get('settings', {})
-        controls_cfg = config.get('controls', {})
-        audio_cfg = config.get('audio_files', {})
-
-        # 从 setup 加载
-        controller_instance.font_path = setup_cfg.get('font_path', DEFAULT_FONT_PATH)
-        controller_instance.left_robot_ip = setup_cfg.get('left_robot_ip', DEFAULT_IP)
-        controller_instance.right_robot_ip = setup_cfg.get('right_robot_ip', DEFAULT_IP)
-        controller_instance.left_gripper_id = setup_cfg.get('left_gripper_id', DEFAULT_GRIPPER_ID)
-        controller_instance.right_gripper_id = setup_cfg.get('right_gripper_id', DEFAULT_GRIPPER_ID)
-        controller_instance.window_width = setup_cfg.get('window_width', DEFAULT_WINDOW_WIDTH)
-        controller_instance.window_height = setup_cfg.get('window_height', DEFAULT_WINDOW_HEIGHT)
-        controller_instance.font_size = setup_cfg.get('font_size', DEFAULT_FONT_SIZE)
-
-        # 从 settings 加载
-        controller_instance.current_speed_xy = settings_cfg.get('initial_xy_speed', DEFAULT_XY_SPEED)
-        controller_instance.current_speed_z = settings_cfg.get('initial_z_speed', DEFAULT_Z_SPEED)
-        controller_instance.rpy_speed = settings_cfg.get('rpy_speed', DEFAULT_RPY_SPEED)
-        controller_instance.speed_increment = settings_cfg.get('speed_increment', DEFAULT_SPEED_INCREMENT)
-        controller_instance.min_speed = settings_cfg.get('min_speed', DEFAULT_MIN_SPEED)
-        controller_instance.max_speed = settings_cfg.get('max_speed', DEFAULT_MAX_SPEED)
-        controller_instance.acc = settings_cfg.get('acc', DEFAULT_ACC)
-        controller_instance.arot = settings_cfg.get('arot', DEFAULT_AROT)
-        controller_instance.t_interval = settings_cfg.get('t', DEFAULT_T)
-        controller_instance.trigger_threshold = settings_cfg.get('trigger_threshold', DEFAULT_TRIGGER_THRESHOLD)
-        controller_instance.gripper_speed = settings_cfg.get('gripper_speed', DEFAULT_GRIPPER_SPEED)
-        controller_instance.gripper_force = settings_cfg.get('gripper_force', DEFAULT_GRIPPER_FORCE)
-        controller_instance.long_press_duration = settings_cfg.get('long_press_duration', DEFAULT_LONG_PRESS_DURATION)
-        controller_instance.reset_speed = settings_cfg.get('reset_speed', DEFAULT_RESET_SPEED)
-
-        # 从 controls 加载
+def apply_runtime_config(controller_instance, runtime, changed=None):
+    """
+    把 RuntimeConfig 设置为控制器属性。changed 为 runtime_config.diff_config 给出的变化项时
+    只设置其中的项 (热重载，未修改的项保留运行中的值，例如用按钮调整过的速度)。
+    """
+    from runtime_config import SETTING_ATTRS
+
+    def wanted(path):
+        return changed is None or path in changed
+
+    # setup / settings: 编译后的字段直接成为控制器属性 (settings 中少数键的属性名不同)
+    for name in runtime.setup.__slots__:
+        if wanted(f"setup.{name}"): setattr(controller_instance, name, getattr(runtime.setup, name))
+    for name in runtime.settings.__slots__:
+        if wanted(f"settings.{name}"):
+            setattr(controller_instance, SETTING_ATTRS.get(name, name), getattr(runtime.settings, name))
+
+    # 从 controls 加载 (字典形式，轴控制已补全默认阈值)
+    if changed is None or any(path.startswith('controls.') for path in changed):
+        controls_cfg = runtime.controls_map()
         controller_instance.controls_map = controls_cfg
         controller_instance.mode_switch_control = controls_cfg.get('mode_switch_button', {'type': 'button', 'index': DEFAULT_MODE_SWITCH_BUTTON})
         controller_instance.speed_inc_control = controls_cfg.get('speed_increase_alt', {'type': 'button', 'index': DEFAULT_SPEED_INC_BUTTON})
         controller_instance.speed_dec_control = controls_cfg.get('speed_decrease', {'type': 'button', 'index': DEFAULT_SPEED_DEC_BUTTON})
         controller_instance.gripper_toggle_left_ctrl = controls_cfg.get('gripper_toggle_left', {'type': 'button', 'index': DEFAULT_GRIPPER_L_BUTTON})
         controller_instance.gripper_toggle_right_ctrl = controls_cfg.get('gripper_toggle_right', {'type': 'button', 'index': DEFAULT_GRIPPER_R_BUTTON})
+        controller_instance.gripper_analog_left_ctrl = controls_cfg.get('gripper_analog_left')
+        controller_instance.gripper_analog_right_ctrl = controls_cfg.get('gripper_analog_right')
         controller_instance.reset_left_arm_ctrl = controls_cfg.get('reset_left_arm')
         controller_instance.reset_right_arm_ctrl = controls_cfg.get('reset_right_arm')
 
-        # 设置轴阈值默认值
-        for control in controller_instance.controls_map.values():
-             if isinstance(control, dict) and control.get('type') == 'axis' and 'threshold' not in control:
-                 control['threshold'] = controller_instance.trigger_threshold
+    # 回正姿态 (只读 numpy 数组) 与提示音
+    if changed is None or any(path.startswith('reset_rpy_poses.') for path in changed):
+        controller_instance.reset_rpy_poses_config = runtime.reset_rpy_poses
+    if wanted('audio_files'): controller_instance.audio_files_config = runtime.audio_files
+
 
-        # 从 audio_files 加载
-        controller_instance.audio_files_config = audio_cfg
+def load_and_set_config_variables(controller_instance, config_path=CONFIG_FILE):
+    """加载 YAML 配置文件，校验并编译为 RuntimeConfig (见 runtime_config.py)，再设置控制器实例变量"""
+    from runtime_config import ConfigError, compile_config  # runtime_config 依赖本模块的默认值
+    print(f"正在加载配置文件并设置变量: {config_path}")
+    try:
+        config = load_config(config_path)
+        if config is None:
+            raise ValueError("无法加载配置")
+        runtime = compile_config(config)  # 未知键、类型或取值错误在这里以完整路径报告
+
+        controller_instance.config = config # 保存原始配置
+        controller_instance.runtime_config = runtime
+
+        apply_runtime_config(controller_instance, runtime)
 
         print("配置文件加载并设置变量成功。")
         return True
 
+    except ConfigError as e:
+        print(f"错误: 配置文件 {config_path} 校验失败: {e}")
+        return False
     except FileNotFoundError:
         print(f"错误: 配置文件未找到: {config_path}")
         return False
@@ -0,0 +1,189 @@
+# config_watcher.py
+# -*- coding: utf-8 -*-
+
+"""
+配置文件监视 (热重载)。
+
+FileWatcher 在后台线程中监视一组文件 (dual_arm_config.yaml 与各臂的标定 YAML)，内容变化后调用
+on_change(变化的路径集合)。检测方式:
+- inotify (需要 inotify_simple): 监视文件所在目录，编辑器常用的 "写临时文件再改名" 也能检测到；
+- 轮询: 每 poll_period 秒比较一次文件状态 (mtime_ns, size, inode)。inotify 可用时同样执行，作为兜底。
+检测到变化后等待 settle 秒直到文件状态不再变化 (编辑器分多次写入)，每次保存只回调一次。
+
+回调在监视线程中执行，负责校验与构建新配置；控制器在控制周期之间替换配置 (见 DualArmController.reload_config)。
+
+自检: python config_watcher.py
+"""
+
+import os
+import tempfile
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INotify = inotify_flags = None
+    INOTIFY_AVAILABLE = False
+
+DEFAULT_SETTLE = 0.2  # 最后一次变化后文件状态保持不变的时间 (秒)
+
+FileSignature = Optional[Tuple[int, int, int]]
+
+
+def file_signature(path: str) -> FileSignature:
+    """文件状态 (mtime_ns, size, inode)，文件不存在时为 None。"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class FileWatcher:
+    """
+    Args:
+        paths (Iterable[str]): 要监视的文件。
+        on_change (Callable[[Set[str]], None]): 文件内容变化后在监视线程中调用 (参数为变化的路径)。
+        poll_period (float): 轮询周期 (秒)。
+        settle (float): 变化后等待文件稳定的时间 (秒)。
+        name (str): 线程名与日志前缀。
+    """
+
+    def __init__(self, paths: Iterable[str], on_change: Callable[[Set[str]], None], poll_period: float = 1.0,
+                 settle: float = DEFAULT_SETTLE, name: str = "config"):
+        self.on_change = on_change
+        self.poll_period = float(poll_period)
+        self.settle = float(settle)
+        self.name = name
+        self.changes = 0
+        self._lock = threading.Lock()
+        self._signatures: Dict[str, FileSignature] = {}
+        self._inotify = None
+        self._dir_watches: Dict[str, int] = {}  # 目录 -> inotify watch descriptor
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.set_paths(paths)
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "polling"
+
+    @property
+    def paths(self) -> Tuple[str, ...]:
+        with self._lock:
+            return tuple(self._signatures)
+
+    def set_paths(self, paths: Iterable[str]):
+        """替换监视的文件列表 (重载后标定文件路径可能变化)。新文件以当前状态为基准。"""
+        with self._lock:
+            old = self._signatures
+            self._signatures = {path: old[path] if path in old else file_signature(path)
+                                for path in (os.path.abspath(p) for p in paths if p)}
+        if self._inotify is not None: self._add_dir_watches()
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        if INOTIFY_AVAILABLE and self._inotify is None:
+            try:
+                self._inotify = INotify()
+                self._add_dir_watches()
+            except OSError as e:  # 例如 inotify 实例数达到上限
+                print(f"[Watcher {self.name}] inotify 不可用 ({e})，改为轮询")
+                self._inotify = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"FileWatcher-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive(): self._thread.join(timeout=timeout)
+        self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify, self._dir_watches = None, {}
+
+    def _add_dir_watches(self):
+        mask = (inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE
+                | inotify_flags.DELETE | inotify_flags.MODIFY)
+        for directory in {os.path.dirname(path) for path in self.paths}:
+            if directory in self._dir_watches: continue
+            try:
+                self._dir_watches[directory] = self._inotify.add_watch(directory, mask)
+            except OSError as e:
+                print(f"[Watcher {self.name}] 无法监视目录 {directory}: {e} (由轮询检测)")
+
+    def _wait_for_event(self):
+        """等待被监视目录中的文件系统事件，最多一个轮询周期 (是否为相关文件由 check 比较文件状态判断)。"""
+        if self._inotify is None:
+            self._stop_event.wait(self.poll_period)
+            return
+        try:
+            self._inotify.read(timeout=int(self.poll_period * 1000))
+        except OSError:
+            self._stop_event.wait(self.poll_period)
+
+    def _changed_paths(self) -> Set[str]:
+        with self._lock:
+            return {path for path, signature in self._signatures.items() if file_signature(path) != signature}
+
+    def check(self) -> Set[str]:
+        """检查一次 (变化后等待文件稳定)，有变化时调用 on_change 并返回变化的路径。"""
+        changed = self._changed_paths()
+        if not changed: return set()
+        while not self._stop_event.is_set():  # 等到 settle 时间内不再变化
+            before = {path: file_signature(path) for path in changed}
+            if self._stop_event.wait(self.settle): break
+            changed |= self._changed_paths()
+            if all(file_signature(path) == signature for path, signature in before.items()): break
+        with self._lock:
+            for path in changed:
+                if path in self._signatures: self._signatures[path] = file_signature(path)
+        self.changes += 1
+        try:
+            self.on_change(changed)
+        except Exception as e:
+            print(f"[Watcher {self.name}] 处理文件变化时异常: {e}")
+            traceback.print_exc()
+        return changed
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wait_for_event()
+            if self._stop_event.is_set(): break
+            self.check()
+
+
+# ----------------------------------------------------------------------
+# 自检
+# ----------------------------------------------------------------------
+def self_check():
+    with tempfile.TemporaryDirectory() as tmp:
+        watched, other = os.path.join(tmp, "watched.yaml"), os.path.join(tmp, "other.yaml")
+        with open(watched, 'w') as f: f.write("a: 1\n")
+        events = []
+        watcher = FileWatcher([watched], events.append, poll_period=0.05, settle=0.05, name="check")
+        watcher.start()
+        # 直接写入
+        with open(watched, 'w') as f: f.write("a: 2\n")
+        deadline = time.monotonic() + 2.0
+        while not events and time.monotonic() < deadline: time.sleep(0.01)
+        assert events == [{watched}], events
+        # 写临时文件再改名 (编辑器保存方式)；其他文件的变化不触发
+        with open(other, 'w') as f: f.write("b: 1\n")
+        with open(watched + ".tmp", 'w') as f: f.write("a: 3\n")
+        os.replace(watched + ".tmp", watched)
+        deadline = time.monotonic() + 2.0
+        while len(events) < 2 and time.monotonic() < deadline: time.sleep(0.01)
+        time.sleep(0.2)
+        backend = watcher.backend
+        watcher.stop()
+        assert events == [{watched}, {watched}], events
+        print(f"文件监视自检通过 ({backend})，检测到 {watcher.changes} 次变化")
+
+
+if __name__ == "__main__":
+    self_check()
@@ -0,0 +1,269 @@
+# control_bindings.py
+# -*- coding: utf-8 -*-
+
+"""
+把 dual_arm_config.yaml 中 controls 部分的移动控制编译为 numpy 绑定表。
+
+每种移动模式 (XYZ / RPY) 在首次使用时编译一次 (手柄的轴/按钮/hat 数量变化时重新编译):
+- 手柄状态展开为一个向量: [axes..., buttons..., hat0.x, hat0.y, hat1.x, ...]；
+- 每个绑定记录它读取的状态下标、方向 (+1/-1)、阈值以及是否为模拟量 (axis)；
+- 绑定矩阵 B (绑定数 x 6N) 把每个绑定映射到 [左臂 6 维, 右臂 6 维, ...] 的某一维，值为 +1/-1，
+  并预先乘上各维的基准速度 (速度调整后重新缩放一次)。
+  动作名为 <模式>_<臂名>_arm_<分量>_pos/neg，臂的顺序由 arms 给出 (默认 left, right)。
+每个控制周期只需: 取下标 -> 按方向和阈值得到激活量 (死区) -> 一次矩阵乘得到两臂速度。
+
+与逐项匹配字符串的旧实现相比，同一维度上同时激活的正反向绑定会相加抵消，
+而不是由字典顺序中最后一项决定。
+
+基准测试: python control_bindings.py [配置文件]
+"""
+
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+import config
+
+MOVEMENT_MODES = (config.MODE_XYZ, config.MODE_RPY)
+# (动作名中的关键字, 速度分量下标)，匹配顺序与旧版 _calculate_speed_commands 相同
+AXIS_KEYWORDS = {
+    config.MODE_XYZ: (('_x', 0), ('_y', 1), ('_z', 2)),
+    config.MODE_RPY: (('_roll', 3), ('_pitch', 4), ('_yaw', 5)),
+}
+DEFAULT_ARMS = ('left', 'right')  # 默认的臂及输出顺序
+BUTTON_THRESHOLD = 0.5  # 按钮 / hat 的激活阈值 (状态值为 0/1 或 -1/0/1)
+
+
+class CompiledBindings:
+    """一种模式在固定手柄布局下的绑定表。"""
+
+    def __init__(self, state_index: np.ndarray, direction: np.ndarray, threshold: np.ndarray,
+                 analog: np.ndarray, matrix: np.ndarray, names: Tuple[str, ...]):
+        self.state_index = state_index  # (n,) 每个绑定读取的状态向量下标
+        self.direction = direction  # (n,) +1 / -1
+        self.threshold = threshold  # (n,) 激活阈值 (死区)
+        # 激活后 (值*方向 > 阈值): 模拟量取 值*方向 (即 |值|)，按钮/hat 取 1
+        self.analog_gain = analog.astype(float)
+        self.digital_offset = 1.0 - self.analog_gain
+        self.matrix = matrix  # (n, 6N) 绑定到 [左臂6, 右臂6, ...] 的 +1/-1 映射
+        self.names = names
+        self._scale_key: Optional[tuple] = None
+        self._scaled_matrix = matrix
+
+    @classmethod
+    def compile(cls, controls_map: dict, mode: str, num_axes: int, num_buttons: int, num_hats: int,
+                default_threshold: float, arms: Tuple[str, ...] = DEFAULT_ARMS) -> "CompiledBindings":
+        prefix = mode.lower() + "_"
+        rows = []
+        for action, control_cfg in controls_map.items():
+            if not isinstance(control_cfg, dict): continue
+            if not (action.startswith(prefix) and '_arm' in action): continue
+            arm, _, component = action[len(prefix):].partition('_arm')
+            if arm not in arms: continue
+            arm_offset = 6 * arms.index(arm)
+            axis_idx = next((idx for keyword, idx in AXIS_KEYWORDS.get(mode, ()) if keyword in component), -1)
+            if axis_idx == -1: continue
+            sign = 1.0 if '_pos' in component else -1.0 if '_neg' in component else 1.0
+
+            ctrl_type, ctrl_index = control_cfg.get('type'), control_cfg.get('index', -1)
+            direction = control_cfg.get('direction', 1)
+            if ctrl_type == 'axis':
+                if not (0 <= ctrl_index < num_axes): continue
+                state_index, threshold, analog = ctrl_index, control_cfg.get('threshold', default_threshold), True
+            elif ctrl_type == 'button':
+                if not (0 <= ctrl_index < num_buttons): continue
+                state_index, threshold, analog, direction = num_axes + ctrl_index, BUTTON_THRESHOLD, False, 1
+            elif ctrl_type == 'hat':
+                if not (0 <= ctrl_index < num_hats): continue
+                component = 0 if control_cfg.get('axis', 'x') == 'x' else 1
+                state_index = num_axes + num_buttons + 2 * ctrl_index + component
+                threshold, analog = BUTTON_THRESHOLD, False
+            else:
+                continue
+            rows.append((action, state_index, direction, threshold, analog, arm_offset + axis_idx, sign))
+
+        n = len(rows)
+        matrix = np.zeros((n, 6 * len(arms)))
+        for i, row in enumerate(rows):
+            matrix[i, row[5]] = row[6]
+        return cls(np.array([r[1] for r in rows], dtype=np.intp),
+                   np.array([r[2] for r in rows], dtype=float),
+                   np.array([r[3] for r in rows], dtype=float),
+                   np.array([r[4] for r in rows], dtype=bool),
+                   matrix, tuple(r[0] for r in rows))
+
+    def scaled_matrix(self, speed_scale: tuple) -> np.ndarray:
+        """绑定矩阵乘上各维基准速度 (speed_scale 为 6 元组，变化时才重新计算)。"""
+        if speed_scale != self._scale_key:
+            self._scaled_matrix = self.matrix * np.tile(np.asarray(speed_scale, dtype=float), self.matrix.shape[1] // 6)
+            self._scale_key = speed_scale
+        return self._scaled_matrix
+
+    def evaluate(self, state: np.ndarray, speed_scale: tuple) -> np.ndarray:
+        """
+        Args:
+            state: 手柄状态向量。
+            speed_scale: 6 元组，各速度分量的基准速度。
+        Returns:
+            np.ndarray: (6N,) [左臂6, 右臂6, ...] 速度指令。
+        """
+        projected = state[self.state_index] * self.direction
+        activation = (projected > self.threshold) * (projected * self.analog_gain + self.digital_offset)
+        return activation @ self.scaled_matrix(speed_scale)
+
+
+def snapshot_state_vector(snapshot) -> np.ndarray:
+    """把 JoystickSnapshot 展开为 [axes..., buttons..., hat.x, hat.y, ...] 状态向量。"""
+    return np.array(snapshot.axes + snapshot.buttons + sum(snapshot.hats, ()), dtype=float)
+
+
+class ControlBindingTable:
+    """
+    按 (模式, 手柄布局) 缓存编译好的绑定表。controls_map 修改后调用 invalidate()。
+
+    Args:
+        controls_map (dict): YAML 中的 controls 部分。
+        default_threshold (float): 未配置 threshold 的轴使用的阈值。
+        arms (Tuple[str, ...]): 输出的臂及顺序 (动作名中的臂名)。
+    """
+
+    def __init__(self, controls_map: dict, default_threshold: float, arms: Tuple[str, ...] = DEFAULT_ARMS):
+        self.controls_map = controls_map
+        self.default_threshold = default_threshold
+        self.arms = tuple(arms)
+        self._compiled: Dict[tuple, CompiledBindings] = {}
+
+    def invalidate(self, controls_map: Optional[dict] = None, default_threshold: Optional[float] = None):
+        if controls_map is not None: self.controls_map = controls_map
+        if default_threshold is not None: self.default_threshold = default_threshold
+        self._compiled = {}
+
+    def get(self, mode: str, num_axes: int, num_buttons: int, num_hats: int) -> CompiledBindings:
+        key = (mode, num_axes, num_buttons, num_hats)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = CompiledBindings.compile(self.controls_map, mode, num_axes, num_buttons, num_hats,
+                                                self.default_threshold, self.arms)
+            self._compiled[key] = compiled
+        return compiled
+
+    def speed_commands(self, mode: str, snapshot, speed_scale: tuple) -> Tuple[np.ndarray, ...]:
+        """按 arms 的顺序返回各臂速度 (默认 (左臂, 右臂))；非移动模式或无快照时为 0。"""
+        if snapshot is None or mode not in MOVEMENT_MODES:
+            return tuple(np.zeros(6) for _ in self.arms)
+        compiled = self.get(mode, len(snapshot.axes), len(snapshot.buttons), len(snapshot.hats))
+        out = compiled.evaluate(snapshot_state_vector(snapshot), speed_scale)
+        if len(self.arms) == 2: return out[:6], out[6:]
+        return tuple(out[6 * i:6 * i + 6] for i in range(len(self.arms)))
+
+
+# ----------------------------------------------------------------------
+# 基准测试: 旧的逐项匹配实现 vs 编译后的绑定表
+# ----------------------------------------------------------------------
+def _legacy_speed_commands(controls_map, mode, snapshot, speed_xy, speed_z, rpy_speed, default_threshold):
+    """旧版 _calculate_speed_commands 的逻辑 (改为读取快照)，仅用于对比。"""
+    speed_left_cmd, speed_right_cmd = np.zeros(6), np.zeros(6)
+    current_mode_prefix = mode.lower() + "_"
+    for action, control_cfg in controls_map.items():
+        if not isinstance(control_cfg, dict): continue
+        if action.startswith(current_mode_prefix) and ('_arm' in action):
+            ctrl_type, ctrl_index = control_cfg.get('type'), control_cfg.get('index', -1)
+            active = False
+            if ctrl_type == 'button':
+                active = 0 <= ctrl_index < len(snapshot.buttons) and snapshot.get_button(ctrl_index) == 1
+            elif ctrl_type == 'axis':
+                if 0 <= ctrl_index < len(snapshot.axes):
+                    axis_val = snapshot.get_axis(ctrl_index)
+                    threshold = control_cfg.get('threshold', default_threshold)
+                    d = control_cfg.get('direction', 1)
+                    active = (d == 1 and axis_val > threshold) or (d == -1 and axis_val < -threshold)
+            elif ctrl_type == 'hat':
+                if 0 <= ctrl_index < len(snapshot.hats):
+                    hat = snapshot.get_hat(ctrl_index)
+                    d = control_cfg.get('direction', 1)
+                    active = hat[0 if control_cfg.get('axis', 'x') == 'x' else 1] == d
+            if not active: continue
+            target_array = speed_left_cmd if 'left_arm' in action else speed_right_cmd if 'right_arm' in action else None
+            if target_array is None: continue
+            axis_idx, base_speed = -1, 0.0
+            direction = 1.0 if '_pos' in action else -1.0 if '_neg' in action else 1.0
+            if mode == config.MODE_XYZ:
+                if '_x' in action:
+                    axis_idx, base_speed = 0, speed_xy
+                elif '_y' in action:
+                    axis_idx, base_speed = 1, speed_xy
+                elif '_z' in action:
+                    axis_idx, base_speed = 2, speed_z
+            elif mode == config.MODE_RPY:
+                if '_roll' in action:
+                    axis_idx, base_speed = 3, rpy_speed
+                elif '_pitch' in action:
+                    axis_idx, base_speed = 4, rpy_speed
+                elif '_yaw' in action:
+                    axis_idx, base_speed = 5, rpy_speed
+            if axis_idx != -1:
+                if ctrl_type == 'axis':
+                    target_array[axis_idx] = base_speed * abs(snapshot.get_axis(ctrl_index)) * direction
+                else:
+                    target_array[axis_idx] = base_speed * direction
+    return speed_left_cmd, speed_right_cmd
+
+
+def _single_input_snapshots(num_axes, num_buttons, num_hats):
+    """每次只激活一个输入的快照 (用于等价性检查，不存在正反向同时激活的情况)。"""
+    from control_loop import JoystickSnapshot
+    rest_axes = (0.0,) * num_axes
+    rest_buttons = (0,) * num_buttons
+    rest_hats = ((0, 0),) * num_hats
+    for i in range(num_axes):
+        for value in (-0.9, -0.3, 0.05, 0.3, 0.9):
+            axes = list(rest_axes); axes[i] = value
+            yield JoystickSnapshot(tuple(axes), rest_buttons, rest_hats, 0.0)
+    for i in range(num_buttons):
+        buttons = list(rest_buttons); buttons[i] = 1
+        yield JoystickSnapshot(rest_axes, tuple(buttons), rest_hats, 0.0)
+    for i in range(num_hats):
+        for hat in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            hats = list(rest_hats); hats[i] = hat
+            yield JoystickSnapshot(rest_axes, rest_buttons, tuple(hats), 0.0)
+
+
+def benchmark(config_path: str = config.CONFIG_FILE, iterations: int = 20000):
+    import yaml
+    from control_loop import JoystickSnapshot
+    with open(config_path, 'r', encoding='utf-8') as f:
+        controls_map = (yaml.safe_load(f) or {}).get('controls', {})
+    threshold = config.DEFAULT_TRIGGER_THRESHOLD
+    num_axes, num_buttons, num_hats = 6, 12, 1
+    speed_xy, speed_z, rpy_speed = config.DEFAULT_XY_SPEED, config.DEFAULT_Z_SPEED, config.DEFAULT_RPY_SPEED
+    scale = (speed_xy, speed_xy, speed_z, rpy_speed, rpy_speed, rpy_speed)
+    table = ControlBindingTable(controls_map, threshold)
+
+    checked = 0
+    for mode in MOVEMENT_MODES:
+        for snap in _single_input_snapshots(num_axes, num_buttons, num_hats):
+            old_l, old_r = _legacy_speed_commands(controls_map, mode, snap, speed_xy, speed_z, rpy_speed, threshold)
+            new_l, new_r = table.speed_commands(mode, snap, scale)
+            assert np.allclose(old_l, new_l) and np.allclose(old_r, new_r), (mode, snap, old_l, new_l, old_r, new_r)
+            checked += 1
+    print(f"等价性检查通过: {checked} 个单输入快照 (XYZ / RPY)。")
+
+    snap = JoystickSnapshot((0.0, 0.0, 0.7, 0.0, 0.0, -1.0), (0, 1, 0, 0, 1) + (0,) * 7, ((1, 0),), 0.0)
+    for mode in MOVEMENT_MODES:
+        print(f"模式 {mode}: 绑定数 {len(table.get(mode, num_axes, num_buttons, num_hats).names)}")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            _legacy_speed_commands(controls_map, mode, snap, speed_xy, speed_z, rpy_speed, threshold)
+        legacy_us = (time.perf_counter() - start) / iterations * 1e6
+        start = time.perf_counter()
+        for _ in range(iterations):
+            table.speed_commands(mode, snap, scale)
+        compiled_us = (time.perf_counter() - start) / iterations * 1e6
+        print(f"  旧实现 (逐项匹配): {legacy_us:7.2f} us/周期")
+        print(f"  绑定表 (矩阵乘):   {compiled_us:7.2f} us/周期  ({legacy_us / compiled_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else config.CONFIG_FILE)
@@ -0,0 +1,126 @@
+# control_loop.py
+# -*- coding: utf-8 -*-
+
+"""
+与 pygame 事件/渲染循环解耦的固定频率控制线程。
+
+主线程 (pygame) 负责处理事件和绘制界面，每帧把手柄状态采样为不可变的
+JoystickSnapshot 发布出去；控制线程按 monotonic 时钟以固定频率运行，
+读取最新快照、计算并发送速度指令，再把结果发布为 ControlState 供界面显示。
+两边只通过引用替换交换数据，渲染耗时、阻塞的事件处理都不会拉长控制周期。
+"""
+
+import threading
+import time
+import traceback
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+MIN_CONTROL_RATE = 30.0  # 控制频率下限 (Hz)
+MAX_CONTROL_RATE = 250.0  # 控制频率上限 (Hz)
+MAX_CATCHUP_PERIODS = 3  # 落后超过该周期数时不再追赶，直接对齐到当前时间
+
+
+class JoystickSnapshot(NamedTuple):
+    """一次手柄采样 (不可变)。访问方法与 pygame.joystick.Joystick 相同，可直接替代手柄对象读取。"""
+    axes: Tuple[float, ...]
+    buttons: Tuple[int, ...]
+    hats: Tuple[Tuple[int, int], ...]
+    timestamp: float  # 采样时间 (time.monotonic)
+    event_time: float = 0.0  # 最近一次输入变化的时间 (time.monotonic，延迟追踪用)
+
+    def get_axis(self, index: int) -> float:
+        return self.axes[index]
+
+    def get_button(self, index: int) -> int:
+        return self.buttons[index]
+
+    def get_hat(self, index: int) -> Tuple[int, int]:
+        return self.hats[index]
+
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+
+class ControlState(NamedTuple):
+    """控制线程每个周期发布的结果 (不可变)。"""
+    speed_left: np.ndarray  # 左臂最终速度指令
+    speed_right: np.ndarray  # 右臂最终速度指令
+    seq: int  # 控制周期序号
+    timestamp: float  # 本周期开始时间 (time.monotonic)
+
+
+class FixedRateControlThread:
+    """
+    以固定频率调用 tick_fn 的线程。
+
+    调度基于 monotonic 时钟的绝对时间网格 (next_tick += period)，单次超时后
+    立即执行下一周期以追回进度；落后超过 MAX_CATCHUP_PERIODS 个周期时放弃追赶，
+    从当前时间重新对齐，被跳过的周期计入 skipped_ticks。
+
+    Args:
+        tick_fn (Callable[[], None]): 每个周期调用一次。
+        rate_hz (float): 控制频率，限制在 MIN_CONTROL_RATE - MAX_CONTROL_RATE 之间。
+        name (str): 线程名与日志前缀。
+    """
+
+    def __init__(self, tick_fn: Callable[[], None], rate_hz: float, name: str = "control"):
+        self.tick_fn = tick_fn
+        self.name = name
+        self.rate_hz = max(MIN_CONTROL_RATE, min(MAX_CONTROL_RATE, float(rate_hz)))
+        self.period = 1.0 / self.rate_hz
+        self.ticks = 0
+        self.overruns = 0  # 周期执行时间超过剩余时间的次数
+        self.skipped_ticks = 0  # 放弃追赶时跳过的周期数
+        self.errors = 0
+        self.max_tick_time = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"ControlThread-{self.name}", daemon=True)
+        self._thread.start()
+        print(f"[ControlThread {self.name}] 已启动 ({self.rate_hz:.0f} Hz)。")
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stats_text(self) -> str:
+        return (f"周期 {self.ticks}, 超时 {self.overruns}, 跳过 {self.skipped_ticks}, "
+                f"异常 {self.errors}, 最长 {self.max_tick_time * 1000:.1f} ms")
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            start = time.monotonic()
+            try:
+                self.tick_fn()
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1 or self.errors % 100 == 0:
+                    print(f"[ControlThread {self.name}] 控制周期异常 (第 {self.errors} 次): {e}")
+                    traceback.print_exc()
+            self.ticks += 1
+            end = time.monotonic()
+            self.max_tick_time = max(self.max_tick_time, end - start)
+
+            next_tick += self.period
+            delay = next_tick - end
+            if delay > 0:
+                self._stop_event.wait(delay)
+                continue
+            self.overruns += 1
+            lag_periods = int(-delay / self.period)
+            if lag_periods >= MAX_CATCHUP_PERIODS:
+                self.skipped_ticks += lag_periods
+                next_tick = end  # 放弃追赶，从当前时间重新对齐
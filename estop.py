@@ -0,0 +1,279 @@
+# estop.py
+# -*- coding: utf-8 -*-
+
+"""
+紧急停止快速通道。
+
+急停原来与 stop_all_movement 一样经各臂的主连接发送零速度: 与进行中的阻塞调用 (moveByJoint 轮询、TCI 读写) 共用
+socket 和 _io_lock，停止指令要排在它们后面。EmergencyStop 在机器人初始化后为每个臂建立一条专用 TCP 连接，
+并预先编码好控制器原生的停止帧与状态查询帧:
+- Elibot: JSON-RPC "stop" (端口 8055)，getRobotState == '0' 视为已停止；
+- Hans: "GrpStop,<rbt>,;" (端口 10003)，ReadRobotState 的运动状态为 0 视为已停止。
+
+快速通道只用于急停按钮与控制循环看门狗 (trigger_emergency_stop)；模式切换与退出仍由 stop_all_movement
+经主连接发送零速度，按正常加速度减速。
+
+每条连接一个常驻线程等待触发，trigger() 只设置各通道的事件，各臂同时发出停止帧，不经过任何指令队列、
+_io_lock 或 control_lock。发出后轮询状态确认停止，未停止时每 RESEND_INTERVAL 重发一次停止帧
+(主连接上已在途的速度指令可能晚于停止帧到达)。空闲时按 HEARTBEAT_PERIOD 查询一次状态，保持连接并提前发现断线。
+
+每次触发记录从触发 (按钮事件处理) 到停止帧发出、收到回复、确认停止的时间，stats_text() 给出百分位。
+"""
+
+import json
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+from loop_watchdog import SampleRing
+
+CONNECT_TIMEOUT = 1.0  # 建立专用连接的超时 (秒)
+IO_TIMEOUT = 0.3  # 单次回复的等待时间 (秒)
+CONFIRM_TIMEOUT = 1.0  # 确认停止的最长时间 (秒)
+CONFIRM_POLL = 0.01  # 状态查询间隔 (秒)
+RESEND_INTERVAL = 0.1  # 确认期间仍未停止时重发停止帧的间隔 (秒)
+HEARTBEAT_PERIOD = 2.0  # 空闲时的连接检查周期 (秒)
+
+
+class StopChannel(ABC):
+    """
+    一个机械臂的专用停止连接。子类提供 stop_frame / state_frame 与回复解析
+    (抽象方法未实现的子类在创建时即报错，而不是在急停过程中)。
+
+    Args:
+        name (str): 日志中的机械臂名称。
+        host (str): 控制器 IP。
+        port (int): 控制器端口。
+    """
+
+    stop_frame = b""
+    state_frame = b""
+
+    def __init__(self, name: str, host: str, port: int):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.sock: Optional[socket.socket] = None
+        self._rx = b""
+        self._trigger_event = threading.Event()
+        self._trigger_time = 0.0
+        self._closed = False
+        self.done = threading.Event()  # 本次触发处理完成 (last_result 有效)
+        self.done.set()
+        self.last_result: Optional[dict] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self) -> bool:
+        try:
+            self._connect()
+        except OSError as e:
+            print(f"[EStop] {self.name}: 建立专用停止连接 {self.host}:{self.port} 失败: {e}")
+            return False
+        self._thread = threading.Thread(target=self._run, name=f"EStop-{self.name}", daemon=True)
+        self._thread.start()
+        return True
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(IO_TIMEOUT)
+        self.sock, self._rx = sock, b""
+
+    def _disconnect(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock, self._rx = None, b""
+
+    def fire(self, trigger_time: float):
+        """立即返回；停止帧由本通道的常驻线程发出。"""
+        self._trigger_time = trigger_time
+        self.done.clear()
+        self._trigger_event.set()
+
+    @abstractmethod
+    def _recv_reply(self) -> Any:
+        """读取一条完整的回复 (超时抛出 socket.timeout)。"""
+
+    @abstractmethod
+    def _ack_ok(self, reply: Any) -> bool:
+        """停止帧的回复是否表示控制器已接受。"""
+
+    @abstractmethod
+    def _is_stopped(self, reply: Any) -> bool:
+        """状态查询的回复是否表示机械臂已停止。"""
+
+    def _query_stopped(self) -> bool:
+        self.sock.sendall(self.state_frame)
+        return self._is_stopped(self._recv_reply())
+
+    def _run(self):
+        while not self._closed:
+            if not self._trigger_event.wait(HEARTBEAT_PERIOD):
+                self._heartbeat()
+                continue
+            self._trigger_event.clear()
+            if self._closed: break
+            self.last_result = self._stop_and_confirm(self._trigger_time)
+            self.done.set()
+
+    def _heartbeat(self):
+        try:
+            if self.sock is None: self._connect()
+            self._query_stopped()
+        except OSError as e:
+            if self.sock is not None: print(f"[EStop] {self.name}: 专用停止连接断开 ({e})，将重新连接")
+            self._disconnect()
+
+    def _stop_and_confirm(self, t0: float) -> dict:
+        result = {'arm': self.name, 'sent': None, 'ack': None, 'confirmed': None, 'error': None}
+        try:
+            if self.sock is None: self._connect()  # 断线后在触发时重连 (会增加延迟)
+            self.sock.sendall(self.stop_frame)
+            result['sent'] = time.monotonic() - t0
+            if not self._ack_ok(self._recv_reply()):
+                result['error'] = "控制器拒绝停止指令"
+            result['ack'] = time.monotonic() - t0
+            last_send = time.monotonic()
+            while time.monotonic() - t0 < CONFIRM_TIMEOUT:
+                if self._query_stopped():
+                    result['confirmed'] = time.monotonic() - t0
+                    break
+                if time.monotonic() - last_send >= RESEND_INTERVAL:
+                    self.sock.sendall(self.stop_frame)
+                    self._recv_reply()
+                    last_send = time.monotonic()
+                time.sleep(CONFIRM_POLL)
+        except OSError as e:
+            result['error'] = str(e)
+            self._disconnect()
+        return result
+
+    def close(self):
+        self._closed = True
+        self._trigger_event.set()
+        if self._thread is not None: self._thread.join(timeout=CONFIRM_TIMEOUT + IO_TIMEOUT)
+        self._disconnect()
+
+
+class ElibotStopChannel(StopChannel):
+    """Elibot JSON-RPC 专用停止连接 (帧格式与 CPSClient.sendCMD 相同)。"""
+
+    stop_frame = (json.dumps({"jsonrpc": "2.0", "method": "stop", "params": {}, "id": 9001}) + "\n").encode('utf-8')
+    state_frame = (json.dumps({"jsonrpc": "2.0", "method": "getRobotState", "params": {}, "id": 9002}) + "\n").encode('utf-8')
+
+    def __init__(self, name: str, host: str, port: int = 8055):
+        super().__init__(name, host, port)
+        self._decoder = json.JSONDecoder()
+
+    def _recv_reply(self) -> dict:
+        while True:
+            text = self._rx.decode('utf-8', 'ignore').lstrip()
+            if text:
+                try:
+                    reply, end = self._decoder.raw_decode(text)
+                    self._rx = text[end:].encode('utf-8')
+                    return reply
+                except json.JSONDecodeError:
+                    pass
+            chunk = self.sock.recv(4096)
+            if not chunk: raise ConnectionError("连接已被控制器关闭")
+            self._rx += chunk
+
+    def _ack_ok(self, reply: dict) -> bool:
+        return "result" in reply
+
+    def _is_stopped(self, reply: dict) -> bool:
+        return str(reply.get("result")) == '0'
+
+
+class HansStopChannel(StopChannel):
+    """Hans 专用停止连接 (文本协议，回复以 ';' 结束: 'GrpStop,OK,;')。"""
+
+    def __init__(self, name: str, host: str, port: int = 10003, rbt_id: int = 0):
+        super().__init__(name, host, port)
+        self.stop_frame = f"GrpStop,{rbt_id},;".encode()
+        self.state_frame = f"ReadRobotState,{rbt_id},;".encode()
+
+    def _recv_reply(self) -> list:
+        while b";" not in self._rx:
+            chunk = self.sock.recv(4096)
+            if not chunk: raise ConnectionError("连接已被控制器关闭")
+            self._rx += chunk
+        reply, _, self._rx = self._rx.partition(b";")
+        return reply.decode('utf-8', 'ignore').split(',')
+
+    def _ack_ok(self, reply: list) -> bool:
+        return len(reply) > 1 and reply[1] == "OK"
+
+    def _is_stopped(self, reply: list) -> bool:
+        return len(reply) > 2 and reply[1] == "OK" and reply[2].strip() == '0'  # 运动状态
+
+
+class EmergencyStop:
+    """所有机械臂的专用停止通道，并行触发并统计按钮到停止的延迟。"""
+
+    def __init__(self):
+        self.channels: Dict[str, StopChannel] = {}
+        self.latency: Dict[str, SampleRing] = {key: SampleRing() for key in ('sent', 'ack', 'confirmed')}
+        self.triggers = 0
+        self.failures = 0
+        self._report_lock = threading.Lock()
+
+    def add_channel(self, side: str, channel: StopChannel) -> bool:
+        if not channel.open(): return False
+        self.channels[side] = channel
+        return True
+
+    def trigger(self, reason: str, trigger_time: Optional[float] = None,
+                on_report: Optional[Callable[[str, bool], None]] = None) -> float:
+        """
+        各臂同时发出停止帧并立即返回 (不等待回复)。确认结果在后台线程中汇总打印，
+        on_report(报告文本, 是否全部确认停止) 在汇总后调用。
+        """
+        t0 = time.monotonic() if trigger_time is None else trigger_time
+        channels = list(self.channels.values())
+        for channel in channels:
+            channel.fire(t0)
+        self.triggers += 1
+        threading.Thread(target=self._report, args=(reason, channels, on_report), name="EStopReport",
+                         daemon=True).start()
+        return t0
+
+    def _report(self, reason: str, channels, on_report):
+        parts, all_ok = [], True
+        for channel in channels:
+            channel.done.wait(CONFIRM_TIMEOUT + 2 * IO_TIMEOUT + CONNECT_TIMEOUT)
+            result = channel.last_result or {}
+            ok = result.get('confirmed') is not None and not result.get('error')
+            all_ok &= ok
+            with self._report_lock:
+                for key, ring in self.latency.items():
+                    if result.get(key) is not None: ring.add(result[key])
+
+            def ms(key):
+                return f"{result[key] * 1000:.1f}" if result.get(key) is not None else "-"
+
+            text = f"{channel.name}: 发出 {ms('sent')} ms, 回复 {ms('ack')} ms, 确认停止 {ms('confirmed')} ms"
+            if result.get('error'): text += f" (错误: {result['error']})"
+            parts.append(text)
+        if not all_ok: self.failures += 1
+        report = f"[EStop] {reason} -> " + " | ".join(parts)
+        print(report)
+        if on_report is not None: on_report(report, all_ok)
+
+    def stats_text(self) -> str:
+        def fmt(key: str) -> str:
+            s = self.latency[key].summary()
+            return f"{key} p50/p95/max {s['p50']:.1f}/{s['p95']:.1f}/{s['max']:.1f} ms" if s else f"{key} -"
+
+        return f"触发 {self.triggers}, 未确认 {self.failures}; " + ", ".join(fmt(key) for key in self.latency)
+
+    def close(self):
+        for channel in self.channels.values():
+            channel.close()
+        self.channels = {}
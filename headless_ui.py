@@ -0,0 +1,152 @@
+# headless_ui.py
+# -*- coding: utf-8 -*-
+
+"""
+无界面模式 (无显示器的遥操作工控机)。
+
+HeadlessUIManager 与 UIManager 接口相同，但:
+- 不创建窗口、不加载字体和音频 (play_sound 为空操作)；
+- 输入来自可替换的输入源 (input_sources)，事件交给 UIManager 相同的处理逻辑；
+- draw_display 不渲染，按 headless_status_period 输出一行状态到控制台，或以 JSON 数据报发送到
+  UDP 地址 (settings.headless_status: udp://host:port)，供本机其他进程或监控面板读取。
+"""
+
+import json
+import socket
+import time
+from typing import Any, Optional
+
+import numpy as np
+import pygame
+
+import config
+from input_sources import InputSource, NullInputSource, create_input_source
+from joystick_state import JoystickStateCache
+from ui import UIManager
+
+
+class StatusPublisher:
+    """
+    Args:
+        target (str): 'console' 或 'udp://host:port'。
+    """
+
+    def __init__(self, target: str):
+        self.target = target
+        self._sock: Optional[socket.socket] = None
+        self._addr = None
+        if str(target).startswith('udp://'):
+            host, _, port = target[len('udp://'):].rpartition(':')
+            self._addr = (host or '127.0.0.1', int(port))
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+
+    @property
+    def is_ipc(self) -> bool:
+        return self._sock is not None
+
+    def publish(self, status: dict, text: str):
+        if self._sock is None:
+            print(f"[Status] {text}")
+            return
+        try:
+            self._sock.sendto(json.dumps(status, ensure_ascii=False).encode('utf-8'), self._addr)
+        except OSError:
+            pass  # 没有接收方或缓冲区满时丢弃，下个周期再发
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class HeadlessUIManager(UIManager):
+    def __init__(self, controller_instance: Any):
+        super().__init__(controller_instance)
+        self.input_source: InputSource = NullInputSource()
+        self.status_publisher: Optional[StatusPublisher] = None
+        self._last_status_time = 0.0
+        self._last_status_text = ""
+
+    def init_pygame(self) -> bool:
+        """无界面初始化: 只打开输入源，不创建窗口、不加载字体和音频。"""
+        controller = self.controller
+        print(f"正在初始化无界面模式 (输入源: {controller.headless_input}, 状态输出: {controller.headless_status})...")
+        try:
+            device = controller.udp_listen if controller.headless_input == 'udp' else controller.headless_evdev_device
+            self.input_source = create_input_source(controller.headless_input, device, controller.udp_input_deadline)
+            if not self.input_source.open():
+                self.input_source.close()
+                self.input_source = NullInputSource()
+                self.status_message = "错误: 未检测到手柄！"
+                print(self.status_message)
+            elif self.input_source.num_axes + self.input_source.num_buttons + self.input_source.num_hats > 0:
+                source = self.input_source
+                self.num_axes, self.num_buttons, self.num_hats = source.num_axes, source.num_buttons, source.num_hats
+                print(f"  已初始化输入设备: {source.device_name}")
+                print(f"    能力: Hats={self.num_hats}, Axes={self.num_axes}, Buttons={self.num_buttons}")
+                self.input_cache = JoystickStateCache(self.num_axes, self.num_buttons, self.num_hats, source.instance_id)
+                source.seed(self.input_cache)
+                self.status_message = f"手柄: {source.device_name} 已连接"
+                if source.live: controller.live_input = source  # 控制线程每周期直接读取最新数据包
+            else:
+                self.status_message = "无手柄输入"
+            self.status_publisher = StatusPublisher(controller.headless_status)
+            self.clock = pygame.time.Clock()  # 只用于主循环限速，不需要 pygame.init
+            print("无界面模式初始化完成.")
+            return True
+        except Exception as e:
+            self.status_message = f"无界面模式初始化失败: {e}"
+            print(self.status_message)
+            return False
+
+    def handle_events(self):
+        if not self.controller.running: return
+        for event in self.input_source.poll():
+            if not self._dispatch_event(event): return
+
+    def build_status(self, speed_left_final: np.ndarray, speed_right_final: np.ndarray) -> dict:
+        controller = self.controller
+        status = {
+            'time': time.time(),
+            'mode': controller.control_mode,
+            'estop_latched': controller.estop_latched,
+            'left_ok': bool(controller.left_init_ok),
+            'right_ok': bool(controller.right_init_ok),
+            'gripper': {'left': self._format_gripper_status('left'), 'right': self._format_gripper_status('right')},
+            'actions': {side: self._format_action_status(side) for side in controller.action_executors},
+            'speed_left': [round(float(v), 2) for v in speed_left_final],
+            'speed_right': [round(float(v), 2) for v in speed_right_final],
+            'message': self.status_message,
+        }
+        if controller.loop_watchdog is not None:
+            status['loop'] = controller.loop_watchdog.stats()  # 控制循环计时统计 (UDP 状态输出中可直接读取)
+        if controller.arm_fleet is not None:
+            status['arms'] = controller.arm_fleet.status()  # 各臂工作进程: 提交/发送/失败次数
+        if controller.control_mode in [config.MODE_XYZ, config.MODE_RPY]:
+            status['speed_setting'] = {'xy': controller.current_speed_xy, 'z': controller.current_speed_z,
+                                       'rpy': controller.rpy_speed}
+        return status
+
+    def draw_display(self, speed_left_final: np.ndarray, speed_right_final: np.ndarray):
+        """不渲染: 每 headless_status_period 秒输出一次状态 (控制台只在内容变化时打印)。"""
+        now = time.monotonic()
+        if self.status_publisher is None or now - self._last_status_time < self.controller.headless_status_period:
+            return
+        self._last_status_time = now
+        status = self.build_status(speed_left_final, speed_right_final)
+        actions = " ".join(f"{side}:{text}" for side, text in status['actions'].items())
+        text = (f"模式 {status['mode']}{' (急停中)' if status['estop_latched'] else ''} | 左臂 {'OK' if status['left_ok'] else 'ERR'} "
+                f"右臂 {'OK' if status['right_ok'] else 'ERR'} | 夹爪 L {status['gripper']['left']} "
+                f"R {status['gripper']['right']} | 动作 {actions or '-'} | "
+                f"速度 L {status['speed_left']} R {status['speed_right']} | {status['message']}")
+        if text == self._last_status_text and not self.status_publisher.is_ipc:
+            return
+        self._last_status_text = text
+        self.status_publisher.publish(status, text)
+
+    def quit(self):
+        print("正在退出 HeadlessUIManager...")
+        self.controller.live_input = None
+        self.input_source.close()
+        if self.status_publisher is not None: self.status_publisher.close()
@@ -0,0 +1,249 @@
+# input_sources.py
+# -*- coding: utf-8 -*-
+
+"""
+无界面模式的手柄输入源。
+
+输入源把设备输入转换为 pygame 手柄事件 (JOYAXISMOTION / JOYBUTTONDOWN / JOYBUTTONUP / JOYHATMOTION)，
+由 HeadlessUIManager 逐个交给 UIManager 的事件处理逻辑，按钮映射、上升沿和长按判断与有界面时完全相同:
+- PygameJoystickSource ('joystick'): pygame 手柄接口，使用 SDL dummy 视频驱动，不创建窗口；
+- EvdevJoystickSource ('evdev'): 直接读取 Linux /dev/input 事件设备 (需要 python-evdev)，不初始化 SDL；
+- NullInputSource ('none'): 无手柄输入 (仅由视觉/外部指令驱动)；
+- UdpInputSource ('udp', 见 udp_teleop.py): 网络遥操作数据包，控制线程直接读取 (live = True)。
+
+open() 成功后 num_axes / num_buttons / num_hats 有效；poll() 在主线程中非阻塞调用，返回自上次以来的事件。
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+try:
+    import evdev
+    from evdev import ecodes
+
+    EVDEV_AVAILABLE = True
+except ImportError:
+    evdev = None
+    ecodes = None
+    EVDEV_AVAILABLE = False
+
+
+class InputSource:
+    """输入源基类 (同时也是无输入的实现)。"""
+
+    kind = "none"
+    live = False  # True 表示控制线程可直接调用 latest() 读取最新输入 (不经主线程帧率)
+
+    def __init__(self):
+        self.num_axes = 0
+        self.num_buttons = 0
+        self.num_hats = 0
+        self.device_name = ""
+        self.instance_id: Optional[int] = None  # 只接受该 instance_id 的事件 (None 表示全部)
+
+    def open(self) -> bool:
+        return True
+
+    def seed(self, cache):
+        """把设备当前状态写入 JoystickStateCache (open 之后调用一次)。"""
+
+    def poll(self) -> list:
+        return []
+
+    def close(self):
+        pass
+
+
+class NullInputSource(InputSource):
+    """没有手柄: 不产生任何输入事件。"""
+
+
+class PygameJoystickSource(InputSource):
+    """
+    Args:
+        index (int): pygame 手柄序号。
+    """
+
+    kind = "joystick"
+
+    def __init__(self, index: int = 0):
+        super().__init__()
+        self.index = index
+        self.joystick: Optional[pygame.joystick.Joystick] = None
+
+    def open(self) -> bool:
+        # pygame 的事件队列依赖视频子系统；dummy 驱动不创建窗口，也不需要显示器
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        try:
+            pygame.display.init()
+            pygame.joystick.init()
+        except pygame.error as e:
+            print(f"  错误: 初始化 pygame 手柄子系统失败: {e}")
+            return False
+        if pygame.joystick.get_count() <= self.index:
+            print(f"  错误: 未检测到手柄 (序号 {self.index})")
+            return False
+        self.joystick = pygame.joystick.Joystick(self.index)
+        self.joystick.init()
+        self.device_name = self.joystick.get_name()
+        self.num_axes = self.joystick.get_numaxes()
+        self.num_buttons = self.joystick.get_numbuttons()
+        self.num_hats = self.joystick.get_numhats()
+        self.instance_id = self.joystick.get_instance_id() if hasattr(self.joystick, 'get_instance_id') else None
+        return True
+
+    def seed(self, cache):
+        if self.joystick is not None: cache.seed(self.joystick)
+
+    def poll(self) -> list:
+        if not pygame.display.get_init(): return []
+        return pygame.event.get()
+
+    def close(self):
+        if pygame.joystick.get_init(): pygame.joystick.quit()
+        if pygame.display.get_init(): pygame.display.quit()
+
+
+class EvdevJoystickSource(InputSource):
+    """
+    直接读取 Linux 输入事件设备。轴按事件码排序编号 (跳过 hat)，按钮先 BTN_JOYSTICK 之后的事件码、
+    再 BTN_MISC..BTN_JOYSTICK，与 SDL 在 Linux 上的编号规则一致，YAML 中的按钮/轴序号无需修改。
+
+    Args:
+        device_path (str, optional): 事件设备路径 (如 /dev/input/event5)，None 表示自动选择第一个手柄。
+    """
+
+    kind = "evdev"
+
+    def __init__(self, device_path: Optional[str] = None):
+        super().__init__()
+        self.device_path = device_path
+        self.device = None
+        self._axis_map: Dict[int, Tuple[int, float, float]] = {}  # 事件码 -> (轴序号, 中点, 半量程)
+        self._button_map: Dict[int, int] = {}  # 事件码 -> 按钮序号
+        self._hat_map: Dict[int, Tuple[int, int]] = {}  # 事件码 -> (hat 序号, 0=x / 1=y)
+        self._hat_values: List[List[int]] = []
+        self._pending: list = []  # open 时读取的初始状态，第一次 poll 返回
+
+    @staticmethod
+    def find_gamepad() -> Optional[str]:
+        """返回第一个带手柄按钮的事件设备路径。"""
+        for path in evdev.list_devices():
+            try:
+                device = evdev.InputDevice(path)
+            except OSError:
+                continue
+            keys = device.capabilities().get(ecodes.EV_KEY, [])
+            device.close()
+            if ecodes.BTN_GAMEPAD in keys or ecodes.BTN_JOYSTICK in keys:
+                return path
+        return None
+
+    def open(self) -> bool:
+        if not EVDEV_AVAILABLE:
+            print("  错误: 未安装 evdev (pip install evdev)，无法读取输入事件设备")
+            return False
+        path = self.device_path or self.find_gamepad()
+        if not path:
+            print("  错误: 未找到手柄事件设备 (/dev/input/event*)")
+            return False
+        try:
+            self.device = evdev.InputDevice(path)
+        except OSError as e:
+            print(f"  错误: 打开事件设备 {path} 失败: {e}")
+            return False
+        self.device_name = f"{self.device.name} ({path})"
+
+        hat_codes = {ecodes.ABS_HAT0X + i: (i // 2, i % 2) for i in range(8)}  # HAT0X..HAT3Y
+        caps = self.device.capabilities(absinfo=True)
+        for code, info in sorted(caps.get(ecodes.EV_ABS, []), key=lambda item: item[0]):
+            if code in hat_codes:
+                self._hat_map[code] = hat_codes[code]
+                continue
+            center = (info.max + info.min) / 2.0
+            half_range = (info.max - info.min) / 2.0 or 1.0
+            self._axis_map[code] = (len(self._axis_map), center, half_range)
+        self.num_axes = len(self._axis_map)
+        self.num_hats = max((hat + 1 for hat, _ in self._hat_map.values()), default=0)
+        self._hat_values = [[0, 0] for _ in range(self.num_hats)]
+
+        keys = [code for code in caps.get(ecodes.EV_KEY, []) if code >= ecodes.BTN_MISC]
+        ordered = sorted(c for c in keys if c >= ecodes.BTN_JOYSTICK) + sorted(c for c in keys if c < ecodes.BTN_JOYSTICK)
+        self._button_map = {code: i for i, code in enumerate(ordered)}
+        self.num_buttons = len(self._button_map)
+
+        # 初始状态: 当前轴/hat 值与已按下的按钮
+        for code, info in caps.get(ecodes.EV_ABS, []):
+            self._pending.append(self._abs_event(code, info.value))
+        for code in self.device.active_keys():
+            if code in self._button_map:
+                self._pending.append(pygame.event.Event(pygame.JOYBUTTONDOWN, button=self._button_map[code], instance_id=0))
+        self._pending = [event for event in self._pending if event is not None]
+        return True
+
+    def _abs_event(self, code: int, value: int):
+        if code in self._axis_map:
+            axis, center, half_range = self._axis_map[code]
+            normalized = max(-1.0, min(1.0, (value - center) / half_range))
+            return pygame.event.Event(pygame.JOYAXISMOTION, axis=axis, value=normalized, instance_id=0)
+        if code in self._hat_map:
+            hat, component = self._hat_map[code]
+            direction = (value > 0) - (value < 0)
+            self._hat_values[hat][component] = direction if component == 0 else -direction  # evdev 向上为负
+            return pygame.event.Event(pygame.JOYHATMOTION, hat=hat, value=tuple(self._hat_values[hat]), instance_id=0)
+        return None
+
+    def poll(self) -> list:
+        events, self._pending = self._pending, []
+        if self.device is None: return events
+        try:
+            for raw in self.device.read():
+                if raw.type == ecodes.EV_ABS:
+                    event = self._abs_event(raw.code, raw.value)
+                elif raw.type == ecodes.EV_KEY and raw.code in self._button_map and raw.value in (0, 1):  # 2 为自动重复
+                    event_type = pygame.JOYBUTTONDOWN if raw.value else pygame.JOYBUTTONUP
+                    event = pygame.event.Event(event_type, button=self._button_map[raw.code], instance_id=0)
+                else:
+                    event = None
+                if event is not None: events.append(event)
+        except BlockingIOError:
+            pass  # 没有新事件
+        except OSError as e:
+            print(f"[Input] 事件设备断开: {e}，所有输入回到中位")
+            events.extend(self._release_all())
+            self.close()
+        return events
+
+    def _release_all(self) -> list:
+        events = [pygame.event.Event(pygame.JOYAXISMOTION, axis=i, value=0.0, instance_id=0) for i in range(self.num_axes)]
+        events += [pygame.event.Event(pygame.JOYBUTTONUP, button=i, instance_id=0) for i in range(self.num_buttons)]
+        events += [pygame.event.Event(pygame.JOYHATMOTION, hat=i, value=(0, 0), instance_id=0) for i in range(self.num_hats)]
+        return events
+
+    def close(self):
+        if self.device is None: return
+        try:
+            self.device.close()
+        except OSError:
+            pass
+        self.device = None
+
+
+def create_input_source(kind: str, device: Optional[str] = None, deadline: float = 0.15) -> InputSource:
+    """
+    按 settings.headless_input 创建输入源: 'joystick' / 'evdev' / 'udp' / 'none'。
+    device: joystick 为手柄序号，evdev 为设备路径，udp 为监听地址 'host:port'；deadline 仅 udp 使用。
+    """
+    kind = str(kind).lower()
+    if kind == 'udp':
+        from udp_teleop import UdpInputSource  # udp_teleop 依赖本模块的 InputSource
+        return UdpInputSource(device, deadline)
+    if kind == PygameJoystickSource.kind:
+        return PygameJoystickSource(int(device) if device is not None else 0)
+    if kind == EvdevJoystickSource.kind:
+        return EvdevJoystickSource(device)
+    if kind != NullInputSource.kind:
+        print(f"  警告: 未知输入源 '{kind}'，将不使用手柄输入")
+    return NullInputSource()
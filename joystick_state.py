@@ -0,0 +1,258 @@
+# joystick_state.py
+# -*- coding: utf-8 -*-
+
+"""
+事件驱动的手柄状态缓存。
+
+pygame 的 JOYAXISMOTION / JOYBUTTONDOWN / JOYBUTTONUP / JOYHATMOTION 事件在
+handle_events 中逐个写入预分配的 numpy 数组 (轴、按钮、hat 的 x/y 依次排列)，
+每个元素记录最近一次变化的 monotonic 时间。读取输入不再逐个调用 pygame 的
+get_axis / get_button / get_hat:
+- snapshot(): 没有新事件时直接复用上次构建的元组，只更新时间戳；
+- control_active(): 按控制配置 (button / axis / hat) 读取缓存判断是否激活；
+- control_pressed(): 带锁存的上升沿检测 (一次性动作，松开或回中后才能再次触发)；
+- hold_time() / last_hold_time(): 按钮当前按住时长 / 最近一次按下到松开的时长 (长按判断)。
+
+基准测试: python joystick_state.py
+"""
+
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from control_loop import JoystickSnapshot
+
+try:
+    import pygame
+
+    PYGAME_AVAILABLE = True
+except ImportError:
+    pygame = None
+    PYGAME_AVAILABLE = False
+
+
+def control_key(control_config: dict) -> tuple:
+    """控制配置的唯一键 (用于上升沿锁存)。"""
+    ctrl_type = control_config.get('type')
+    ctrl_index = control_config.get('index', -1)
+    if ctrl_type == 'axis':
+        return 'axis', ctrl_index, control_config.get('direction', 1)
+    if ctrl_type == 'hat':
+        return 'hat', ctrl_index, control_config.get('axis', 'x'), control_config.get('direction', 1)
+    return ctrl_type, ctrl_index
+
+
+def evaluate_control(control_config: dict, axes: Sequence[float], buttons: Sequence[int],
+                     hats: Sequence[Sequence[int]], default_threshold: float) -> bool:
+    """判断单个控制配置在给定的轴/按钮/hat 状态下是否激活 (索引越界视为未激活)。"""
+    ctrl_type = control_config.get('type')
+    ctrl_index = control_config.get('index', -1)
+    if ctrl_type == 'button':
+        return 0 <= ctrl_index < len(buttons) and buttons[ctrl_index] == 1
+    if ctrl_type == 'axis':
+        if not (0 <= ctrl_index < len(axes)): return False
+        axis_val = axes[ctrl_index]
+        threshold = control_config.get('threshold', default_threshold)
+        direction = control_config.get('direction', 1)
+        return (direction == 1 and axis_val > threshold) or (direction == -1 and axis_val < -threshold)
+    if ctrl_type == 'hat':
+        if not (0 <= ctrl_index < len(hats)): return False
+        component = 0 if control_config.get('axis', 'x') == 'x' else 1
+        return hats[ctrl_index][component] == control_config.get('direction', 1)
+    return False
+
+
+class JoystickStateCache:
+    """
+    Args:
+        num_axes (int): 轴数量。
+        num_buttons (int): 按钮数量。
+        num_hats (int): hat 数量。
+        instance_id (int, optional): 只接受该手柄的事件 (None 表示接受全部)。
+    """
+
+    def __init__(self, num_axes: int, num_buttons: int, num_hats: int, instance_id: Optional[int] = None):
+        self.num_axes = num_axes
+        self.num_buttons = num_buttons
+        self.num_hats = num_hats
+        self.instance_id = instance_id
+        size = num_axes + num_buttons + 2 * num_hats
+        self.values = np.zeros(size)  # [轴..., 按钮..., hat0.x, hat0.y, ...]
+        self.stamps = np.zeros(size)  # 各元素最近一次变化的时间 (time.monotonic)
+        self._button_base = num_axes
+        self._hat_base = num_axes + num_buttons
+        # 按区段的视图，evaluate_control 直接按索引读取
+        self.axes = self.values[:num_axes]
+        self.buttons = self.values[num_axes:self._hat_base]
+        self.hats = self.values[self._hat_base:].reshape(num_hats, 2)
+        self._press_start = np.zeros(num_buttons)
+        self._last_hold = np.zeros(num_buttons)
+        self._latched: Dict[tuple, bool] = {}  # 一次性动作已触发、等待松开/回中的控制
+        self._snapshot_parts: Optional[tuple] = None  # 上次构建的 (axes, buttons, hats) 元组
+        self.events = 0
+        self.last_event_time = 0.0  # 最近一次输入事件的时间 (写入快照，延迟追踪用)
+
+    def seed(self, joystick):
+        """从 pygame 手柄读取一次完整状态 (初始化或重新连接时调用，之后只由事件更新)。"""
+        now = time.monotonic()
+        for i in range(self.num_axes):
+            self.axes[i] = joystick.get_axis(i)
+        for i in range(self.num_buttons):
+            self.buttons[i] = joystick.get_button(i)
+            if self.buttons[i]: self._press_start[i] = now
+        for i in range(self.num_hats):
+            self.hats[i] = joystick.get_hat(i)
+        self.stamps[:] = now
+        self.last_event_time = now
+        self._snapshot_parts = None
+
+    def handle_event(self, event) -> bool:
+        """用一个 pygame 事件更新缓存，返回该事件是否为本手柄的输入事件。"""
+        event_type = event.type
+        if event_type not in (pygame.JOYAXISMOTION, pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYHATMOTION):
+            return False
+        if self.instance_id is not None and getattr(event, 'instance_id', self.instance_id) != self.instance_id:
+            return False
+        now = time.monotonic()
+        if event_type == pygame.JOYAXISMOTION:
+            if not (0 <= event.axis < self.num_axes): return False
+            self.axes[event.axis] = event.value
+            self.stamps[event.axis] = now
+        elif event_type == pygame.JOYHATMOTION:
+            if not (0 <= event.hat < self.num_hats): return False
+            self.hats[event.hat] = event.value
+            slot = self._hat_base + 2 * event.hat
+            self.stamps[slot:slot + 2] = now
+        else:
+            button = event.button
+            if not (0 <= button < self.num_buttons): return False
+            if event_type == pygame.JOYBUTTONDOWN:
+                self.buttons[button] = 1
+                self._press_start[button] = now
+            else:
+                self.buttons[button] = 0
+                self._last_hold[button] = now - self._press_start[button]
+            self.stamps[self._button_base + button] = now
+        self._snapshot_parts = None
+        self.last_event_time = now
+        self.events += 1
+        return True
+
+    def snapshot(self) -> JoystickSnapshot:
+        """当前状态的不可变快照。没有新事件时复用上次的元组，仅更新时间戳。"""
+        parts = self._snapshot_parts
+        if parts is None:
+            parts = self._snapshot_parts = (
+                tuple(self.axes.tolist()),
+                tuple(int(v) for v in self.buttons),
+                tuple((int(x), int(y)) for x, y in self.hats))
+        return JoystickSnapshot(parts[0], parts[1], parts[2], time.monotonic(), self.last_event_time)
+
+    # pygame.joystick.Joystick 兼容的读取接口
+    def get_axis(self, index: int) -> float:
+        return float(self.axes[index])
+
+    def get_button(self, index: int) -> int:
+        return int(self.buttons[index])
+
+    def get_hat(self, index: int) -> tuple:
+        return int(self.hats[index][0]), int(self.hats[index][1])
+
+    def control_active(self, control_config: Optional[dict], default_threshold: float) -> bool:
+        if not control_config: return False
+        return evaluate_control(control_config, self.axes, self.buttons, self.hats, default_threshold)
+
+    def control_pressed(self, control_config: Optional[dict], default_threshold: float) -> bool:
+        """上升沿检测: 控制从未激活变为激活时返回一次 True，回到未激活后才能再次触发。"""
+        if not control_config: return False
+        key = control_key(control_config)
+        if self.control_active(control_config, default_threshold):
+            if not self._latched.get(key, False):
+                self._latched[key] = True
+                return True
+        elif key in self._latched:
+            self._latched[key] = False
+        return False
+
+    def hold_time(self, button: int) -> float:
+        """按钮当前已按住的时间 (秒)，未按下返回 0。"""
+        if not (0 <= button < self.num_buttons) or not self.buttons[button]: return 0.0
+        return time.monotonic() - self._press_start[button]
+
+    def last_hold_time(self, button: int) -> float:
+        """按钮最近一次从按下到松开的时长 (秒)，在 JOYBUTTONUP 事件之后读取。"""
+        if not (0 <= button < self.num_buttons): return 0.0
+        return float(self._last_hold[button])
+
+    def element_age(self, index: int) -> float:
+        """values 中第 index 个元素距最近一次变化的时间 (秒)。"""
+        return time.monotonic() - self.stamps[index]
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+class _PolledJoystick:
+    """模拟 pygame 手柄的逐个查询接口 (每次调用有少量开销)，仅用于对比。"""
+
+    def __init__(self, axes, buttons, hats):
+        self.axes, self.buttons, self.hats = list(axes), list(buttons), list(hats)
+
+    def get_axis(self, i): return self.axes[i]
+
+    def get_button(self, i): return self.buttons[i]
+
+    def get_hat(self, i): return self.hats[i]
+
+
+def benchmark(iterations: int = 20000):
+    num_axes, num_buttons, num_hats = 6, 15, 1
+    joystick = _PolledJoystick([0.0] * num_axes, [0] * num_buttons, [(0, 0)] * num_hats)
+    cache = JoystickStateCache(num_axes, num_buttons, num_hats)
+    cache.seed(joystick)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        JoystickSnapshot(tuple(joystick.get_axis(i) for i in range(num_axes)),
+                         tuple(joystick.get_button(i) for i in range(num_buttons)),
+                         tuple(joystick.get_hat(i) for i in range(num_hats)), time.monotonic())
+    polled_us = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        cache.snapshot()
+    cached_us = (time.perf_counter() - start) / iterations * 1e6
+    print(f"快照: 逐个查询 {polled_us:.2f} us, 事件缓存 {cached_us:.2f} us ({polled_us / cached_us:.1f}x)")
+    if not PYGAME_AVAILABLE:
+        print("未安装 pygame，跳过事件更新检查。")
+        return
+
+    # 事件更新、上升沿与长按
+    events = [pygame.event.Event(pygame.JOYAXISMOTION, axis=2, value=0.8, instance_id=0),
+              pygame.event.Event(pygame.JOYBUTTONDOWN, button=7, instance_id=0),
+              pygame.event.Event(pygame.JOYHATMOTION, hat=0, value=(1, -1), instance_id=0)]
+    for event in events:
+        assert cache.handle_event(event)
+    snap = cache.snapshot()
+    assert snap.get_axis(2) == 0.8 and snap.get_button(7) == 1 and snap.get_hat(0) == (1, -1)
+    trigger = {'type': 'axis', 'index': 2, 'threshold': 0.1, 'direction': 1}
+    assert cache.control_pressed(trigger, 0.1) and not cache.control_pressed(trigger, 0.1)
+    cache.handle_event(pygame.event.Event(pygame.JOYAXISMOTION, axis=2, value=-1.0, instance_id=0))
+    assert not cache.control_pressed(trigger, 0.1)
+    cache.handle_event(pygame.event.Event(pygame.JOYAXISMOTION, axis=2, value=0.9, instance_id=0))
+    assert cache.control_pressed(trigger, 0.1)
+    assert cache.control_active({'type': 'hat', 'index': 0, 'axis': 'y', 'direction': -1}, 0.1)
+    time.sleep(0.05)
+    assert cache.hold_time(7) >= 0.05
+    cache.handle_event(pygame.event.Event(pygame.JOYBUTTONUP, button=7, instance_id=0))
+    assert cache.last_hold_time(7) >= 0.05 and cache.hold_time(7) == 0.0
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        cache.handle_event(events[0])
+    update_us = (time.perf_counter() - start) / iterations * 1e6
+    print(f"事件更新 {update_us:.2f} us/事件; 上升沿/长按检查通过。")
+
+
+if __name__ == "__main__":
+    benchmark()
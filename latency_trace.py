@@ -0,0 +1,279 @@
+# latency_trace.py
+# -*- coding: utf-8 -*-
+
+"""
+输入到运动的端到端延迟追踪。
+
+控制线程每个周期调用 record_tick() 写入一条记录 (全部为 time.monotonic 时间戳，缺失为 NaN):
+- input: 本周期使用的手柄状态最近一次变化的时间 (事件处理时刻，见 JoystickStateCache.last_event_time)；
+- compute_start / compute_end: 读取输入与得到最终速度的时间；
+- <臂>_send / <臂>_reply: 该臂指令开始发送与收到控制器回复的时间 (指令发送线程中测量)；
+- <臂>_motion: 可选，MotionProbe 轮询 TCP 位姿观察到运动开始/停止的时间，
+  记在该臂指令由零变为非零 (或相反) 的那个周期上。
+记录保存在预分配的 numpy 环形缓冲区中 (每周期一次行写入，不分配对象)，
+export() 导出 Chrome trace / Perfetto 可直接打开的 JSON，原始记录附在 latencyRecords 字段中。
+
+分析: python latency_trace.py latency_trace.json   (各阶段延迟分布)
+自检: python latency_trace.py --self-check
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+TRACE_CAPACITY = 8192  # 保留的最近周期数 (100 Hz 约 80 秒)
+ARMS = ('left', 'right')
+FIELDS = ('seq', 'input', 'compute_start', 'compute_end') + tuple(
+    f'{arm}_{stage}' for arm in ARMS for stage in ('send', 'reply', 'motion'))
+F = {name: i for i, name in enumerate(FIELDS)}  # 字段名 -> 列序号
+ARM_COLUMNS = {arm: (F[f'{arm}_send'], F[f'{arm}_reply'], F[f'{arm}_motion']) for arm in ARMS}
+_NAN_TAIL = [float('nan')] * (len(FIELDS) - 4)
+MOTION_THRESHOLD = 0.5  # 位姿变化率 (mm/s 与 deg/s 合成) 超过该值视为在运动
+STAGES = (  # (阶段名, 起点字段, 终点字段, 是否只统计输入刚变化的周期)
+    ('input_to_compute', 'input', 'compute_start', True),
+    ('compute', 'compute_start', 'compute_end', False),
+) + tuple(stage for arm in ARMS for stage in (
+    (f'{arm}_queue', 'compute_end', f'{arm}_send', False),
+    (f'{arm}_round_trip', f'{arm}_send', f'{arm}_reply', False),
+    (f'{arm}_input_to_reply', 'input', f'{arm}_reply', True),
+    (f'{arm}_send_to_motion', f'{arm}_send', f'{arm}_motion', False),
+    (f'{arm}_input_to_motion', 'input', f'{arm}_motion', False),
+))
+
+
+class LatencyTracer:
+    """
+    Args:
+        capacity (int): 环形缓冲区的记录数。
+    """
+
+    def __init__(self, capacity: int = TRACE_CAPACITY):
+        self._data = np.full((capacity, len(FIELDS)), np.nan)
+        self.count = 0
+        self._cmd_active = {arm: False for arm in ARMS}
+        self._pending_motion: Dict[str, Optional[tuple]] = {arm: None for arm in ARMS}  # (行号, seq)
+
+    def record_tick(self, seq: int, input_time: float, compute_start: float, compute_end: float,
+                    send_times: Dict[str, tuple], speeds: Dict[str, np.ndarray]):
+        """控制线程每周期调用一次。send_times: 臂 -> (发送时间, 回复时间)；speeds: 臂 -> 最终速度指令。"""
+        slot = self.count % len(self._data)
+        row = [seq, input_time, compute_start, compute_end] + _NAN_TAIL  # 拼好整行后一次写入
+        for arm, (send, reply) in send_times.items():
+            columns = ARM_COLUMNS[arm]
+            row[columns[0]], row[columns[1]] = send, reply
+        self._data[slot] = row
+        for arm, speed in speeds.items():
+            active = bool(speed.any())
+            if active != self._cmd_active[arm]:  # 指令由零变为非零 (或相反): 等待探测到实际运动变化
+                self._cmd_active[arm] = active
+                self._pending_motion[arm] = (slot, seq)
+        self.count += 1
+
+    def mark_motion(self, arm: str, observed_time: float):
+        """MotionProbe 观察到该臂运动状态变化时调用，记到最近一次指令变化的周期上。"""
+        pending, self._pending_motion[arm] = self._pending_motion[arm], None
+        if pending is None: return
+        slot, seq = pending
+        if self._data[slot, 0] == seq: self._data[slot, ARM_COLUMNS[arm][2]] = observed_time  # 未被覆盖
+
+    def records(self) -> np.ndarray:
+        """按时间顺序的记录副本 (行 x FIELDS)。"""
+        capacity = len(self._data)
+        if self.count <= capacity: return self._data[:self.count].copy()
+        start = self.count % capacity
+        return np.concatenate((self._data[start:], self._data[:start]))
+
+    def export(self, path: str) -> bool:
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(chrome_trace(self.records()), f)
+            return True
+        except OSError as e:
+            print(f"[Trace] 导出延迟追踪到 {path} 失败: {e}")
+            return False
+
+
+class MotionProbe:
+    """
+    在专用连接上轮询一个臂的 TCP 位姿，运动状态 (静止/运动) 变化时调用 tracer.mark_motion。
+    观察时间取请求发出与收到回复的中点。
+
+    Args:
+        arm (str): 'left' / 'right'。
+        read_pose (Callable[[], Optional[Sequence[float]]]): 读取 [x, y, z, rx, ry, rz] (mm / deg)。
+        tracer (LatencyTracer): 追踪记录。
+        period (float): 轮询周期 (秒)。
+        close_fn (Callable[[], None], optional): 停止时关闭专用连接。
+    """
+
+    def __init__(self, arm: str, read_pose: Callable[[], Optional[Sequence[float]]], tracer: LatencyTracer,
+                 period: float, close_fn: Optional[Callable[[], None]] = None):
+        self.arm = arm
+        self.read_pose = read_pose
+        self.tracer = tracer
+        self.period = period
+        self.close_fn = close_fn
+        self.polls = 0
+        self.changes = 0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"MotionProbe-{arm}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        last_pose, last_time, moving = None, 0.0, False
+        while not self._stop_event.wait(self.period):
+            request_time = time.monotonic()
+            try:
+                pose = self.read_pose()
+            except Exception as e:
+                print(f"[Trace] {self.arm} 位姿读取失败: {e}，停止运动探测")
+                return
+            observed = (request_time + time.monotonic()) / 2.0
+            self.polls += 1
+            if pose is None: continue
+            pose = np.asarray(pose, dtype=float)
+            if last_pose is not None and observed > last_time:
+                now_moving = float(np.linalg.norm(pose - last_pose)) / (observed - last_time) > MOTION_THRESHOLD
+                if now_moving != moving:
+                    moving = now_moving
+                    self.changes += 1
+                    self.tracer.mark_motion(self.arm, observed)
+            last_pose, last_time = pose, observed
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread.is_alive(): self._thread.join(timeout=timeout)
+        if self.close_fn is not None:
+            try:
+                self.close_fn()
+            except Exception as e:
+                print(f"[Trace] 关闭 {self.arm} 运动探测连接时出错: {e}")
+
+
+# ----------------------------------------------------------------------
+# 导出与分析
+# ----------------------------------------------------------------------
+def _input_changed(records: np.ndarray) -> np.ndarray:
+    """每行的输入时间是否与上一行不同 (即输入变化后第一次被控制周期读取)，第一行无法判断，视为未变化。"""
+    inputs = records[:, F['input']]
+    changed = ~np.isnan(inputs)
+    changed[1:] &= inputs[1:] != inputs[:-1]
+    changed[:1] = False
+    return changed
+
+
+def chrome_trace(records: np.ndarray) -> dict:
+    """Chrome trace event 格式 (时间单位为微秒，以第一条记录的计算开始为零点)。"""
+    events = [{'ph': 'M', 'pid': 1, 'tid': tid, 'name': 'thread_name', 'args': {'name': name}}
+              for tid, name in enumerate(('input', 'control') + ARMS)]
+    if len(records):
+        origin = np.nanmin(records[:, F['compute_start']])
+
+        def us(value: float) -> float:
+            return round((value - origin) * 1e6, 1)
+
+        for row, changed in zip(records, _input_changed(records)):
+            seq = int(row[F['seq']])
+            if changed:
+                events.append({'ph': 'i', 's': 't', 'pid': 1, 'tid': 0, 'name': 'input', 'ts': us(row[F['input']]),
+                               'args': {'seq': seq}})
+            events.append({'ph': 'X', 'pid': 1, 'tid': 1, 'name': 'compute', 'ts': us(row[F['compute_start']]),
+                           'dur': round((row[F['compute_end']] - row[F['compute_start']]) * 1e6, 1), 'args': {'seq': seq}})
+            for tid, arm in enumerate(ARMS, start=2):
+                send, reply, motion = (row[F[f'{arm}_{stage}']] for stage in ('send', 'reply', 'motion'))
+                if not np.isnan(send) and not np.isnan(reply):
+                    events.append({'ph': 'X', 'pid': 1, 'tid': tid, 'name': 'send', 'ts': us(send),
+                                   'dur': round((reply - send) * 1e6, 1), 'args': {'seq': seq}})
+                if not np.isnan(motion):
+                    events.append({'ph': 'i', 's': 't', 'pid': 1, 'tid': tid, 'name': 'motion', 'ts': us(motion),
+                                   'args': {'seq': seq}})
+    rows = [[None if np.isnan(v) else float(v) for v in row] for row in records]
+    return {'traceEvents': events, 'displayTimeUnit': 'ms',
+            'latencyRecords': {'fields': list(FIELDS), 'rows': rows}}
+
+
+def load_records(path: str) -> np.ndarray:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)['latencyRecords']
+    columns = [data['fields'].index(name) for name in FIELDS]
+    rows = np.array([[np.nan if v is None else v for v in row] for row in data['rows']], dtype=float)
+    return rows[:, columns] if len(rows) else np.empty((0, len(FIELDS)))
+
+
+def analyze(records: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """各阶段延迟分布 (毫秒): n / mean / p50 / p95 / p99 / max，没有样本的阶段省略。"""
+    changed = _input_changed(records)
+    result = {}
+    for name, start_field, end_field, first_pickup_only in STAGES:
+        values = (records[:, F[end_field]] - records[:, F[start_field]]) * 1000.0
+        mask = ~np.isnan(values) & (changed if first_pickup_only else True)
+        values = values[mask]
+        if not len(values): continue
+        p50, p95, p99 = np.percentile(values, (50, 95, 99))
+        result[name] = {'n': int(len(values)), 'mean': float(values.mean()), 'p50': float(p50),
+                        'p95': float(p95), 'p99': float(p99), 'max': float(values.max())}
+    return result
+
+
+def analysis_text(records: np.ndarray) -> str:
+    lines = [f"{'阶段':<24}{'n':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"]
+    for name, s in analyze(records).items():
+        lines.append(f"{name:<24}{s['n']:>7}{s['mean']:>9.2f}{s['p50']:>9.2f}{s['p95']:>9.2f}"
+                     f"{s['p99']:>9.2f}{s['max']:>9.2f}")
+    return "\n".join(lines)
+
+
+# ----------------------------------------------------------------------
+# 自检
+# ----------------------------------------------------------------------
+def self_check():
+    path = os.path.join(tempfile.gettempdir(), "latency_trace_check.json")
+    tracer = LatencyTracer(capacity=64)
+    rng = np.random.default_rng(0)
+    t, input_time = 100.0, 99.995
+    for seq in range(1, 101):
+        if seq % 10 == 0: input_time = t - 0.004  # 每 10 个周期一次输入变化
+        speed = np.full(6, 1.0 if (seq // 20) % 2 else 0.0)
+        send_times = {arm: (t + 0.0003, t + 0.0003 + rng.uniform(0.001, 0.003)) for arm in ARMS}
+        tracer.record_tick(seq, input_time, t, t + 0.0002, send_times, {'left': speed, 'right': speed})
+        tracer.mark_motion('left', t + 0.03)
+        t += 0.01
+    records = tracer.records()
+    assert len(records) == 64 and records[-1, F['seq']] == 100 and np.all(np.diff(records[:, F['seq']]) == 1)
+    assert tracer.export(path)
+    loaded = load_records(path)
+    assert np.array_equal(np.isnan(loaded), np.isnan(records))
+    stages = analyze(loaded)
+    assert abs(stages['input_to_compute']['p50'] - 4.0) < 1e-6, stages['input_to_compute']
+    assert abs(stages['left_send_to_motion']['max'] - 29.7) < 1e-6 and 'right_send_to_motion' not in stages
+    print(analysis_text(loaded))
+
+    start = time.perf_counter()
+    for seq in range(20000):
+        tracer.record_tick(seq, 1.0, 2.0, 3.0, send_times, {'left': speed, 'right': speed})
+    print(f"record_tick: {(time.perf_counter() - start) / 20000 * 1e6:.2f} us/周期")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="输入到运动延迟追踪分析")
+    parser.add_argument('trace', nargs='?', help="导出的 Chrome trace JSON (settings.latency_trace_file)")
+    parser.add_argument('--self-check', action='store_true', help="运行自检")
+    args = parser.parse_args()
+    if args.self_check:
+        self_check()
+    elif args.trace:
+        print(analysis_text(load_records(args.trace)))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
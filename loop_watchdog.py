@@ -0,0 +1,199 @@
+# loop_watchdog.py
+# -*- coding: utf-8 -*-
+
+"""
+控制循环计时统计与看门狗。
+
+控制线程每个周期调用 record_tick(start, compute_end, send_end, end)，记录:
+- 周期 (本次与上次开始时间之差) 与抖动 (|周期 - 标称周期|)；
+- 计算耗时 (读取输入到得到最终速度)、发送耗时 (指令发送与等待返回)、整个周期耗时；
+主线程每帧调用 record_frame() 记录界面循环的帧间隔与处理耗时 (clock.tick 的限速会掩盖超时)。
+样本保存在定长环形缓冲区中，stats() 给出均值 / p50 / p95 / p99 / 最大值 (毫秒)，export() 导出为 JSON。
+
+看门狗线程每半个周期检查一次: 连续 miss_limit 个周期超时 (耗时超过周期)，或 miss_limit 个周期内
+没有完成任何控制周期 (控制线程卡在阻塞调用中) 时调用 on_trip 停止机械臂；恢复正常后自动重新布防。
+
+自检: python loop_watchdog.py
+"""
+
+import json
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+SAMPLE_CAPACITY = 2048  # 每项统计保留的最近样本数
+PERCENTILES = (50, 95, 99)
+
+
+class SampleRing:
+    """定长环形缓冲区 (只保留最近 capacity 个样本)。"""
+
+    def __init__(self, capacity: int = SAMPLE_CAPACITY):
+        self._data = np.zeros(capacity)
+        self.count = 0
+
+    def add(self, value: float):
+        self._data[self.count % len(self._data)] = value
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        """最近样本的统计 (毫秒)。"""
+        if self.count == 0: return {}
+        values = self._data[:min(self.count, len(self._data))] * 1000.0
+        summary = {'n': self.count, 'mean': float(values.mean())}
+        for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+            summary[f'p{p}'] = float(value)
+        summary['max'] = float(values.max())
+        return summary
+
+
+class LoopWatchdog:
+    """
+    Args:
+        period (float): 控制周期 (秒)。
+        miss_limit (int): 连续超时 / 无进展的周期数达到该值时触发。
+        on_trip (Callable[[str], None]): 触发时在看门狗线程中调用 (参数为原因)，不能依赖控制线程持有的锁。
+        name (str): 线程名与日志前缀。
+    """
+
+    def __init__(self, period: float, miss_limit: int, on_trip: Callable[[str], None], name: str = "control"):
+        self.period = float(period)
+        self.miss_limit = max(1, int(miss_limit))
+        self.on_trip = on_trip
+        self.name = name
+        self.samples: Dict[str, SampleRing] = {key: SampleRing() for key in
+                                               ('period', 'jitter', 'compute', 'send', 'tick', 'frame', 'frame_work')}
+        self.ticks = 0
+        self.deadline_misses = 0
+        self.consecutive_misses = 0
+        self.trips = 0
+        self._last_start: Optional[float] = None
+        self._last_end = time.monotonic()
+        self._tripped = False
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._last_end = time.monotonic()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"Watchdog-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive(): self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def record_tick(self, start: float, compute_end: float, send_end: float, end: float):
+        """控制线程每个周期结束时调用 (time.monotonic 时间戳)。"""
+        if self._last_start is not None:
+            period = start - self._last_start
+            self.samples['period'].add(period)
+            self.samples['jitter'].add(abs(period - self.period))
+        self.samples['compute'].add(compute_end - start)
+        self.samples['send'].add(send_end - compute_end)
+        self.samples['tick'].add(end - start)
+        if end - start > self.period:
+            self.deadline_misses += 1
+            self.consecutive_misses += 1
+        else:
+            self.consecutive_misses = 0
+        self._last_start = start
+        self._last_end = end
+        self.ticks += 1
+
+    def record_frame(self, frame_period: float, work_time: float):
+        """主线程每帧调用: 帧间隔与本帧事件处理 + 绘制耗时 (秒)。"""
+        self.samples['frame'].add(frame_period)
+        self.samples['frame_work'].add(work_time)
+
+    def _run(self):
+        while not self._stop_event.wait(self.period / 2):
+            stall = time.monotonic() - self._last_end
+            if stall > self.miss_limit * self.period:
+                reason = f"控制周期已 {stall * 1000:.0f} ms 未完成"
+            elif self.consecutive_misses >= self.miss_limit:
+                reason = f"连续 {self.consecutive_misses} 个控制周期超时"
+            else:
+                if self._tripped:
+                    self._tripped = False
+                    print(f"[Watchdog {self.name}] 控制循环已恢复，看门狗重新布防。")
+                continue
+            if self._tripped: continue
+            self._tripped = True
+            self.trips += 1
+            print(f"[Watchdog {self.name}] {reason}，停止机械臂。")
+            try:
+                self.on_trip(reason)
+            except Exception as e:
+                print(f"[Watchdog {self.name}] 停止回调异常: {e}")
+                traceback.print_exc()
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'period_ms': self.period * 1000.0,
+            'miss_limit': self.miss_limit,
+            'ticks': self.ticks,
+            'deadline_misses': self.deadline_misses,
+            'trips': self.trips,
+            'timing_ms': {key: ring.summary() for key, ring in self.samples.items()},
+        }
+
+    def stats_text(self) -> str:
+        timing = {key: ring.summary() for key, ring in self.samples.items()}
+
+        def fmt(key: str) -> str:
+            s = timing[key]
+            return f"{key} p50/p95/p99/max {s['p50']:.2f}/{s['p95']:.2f}/{s['p99']:.2f}/{s['max']:.2f}" if s else f"{key} -"
+
+        return (f"周期 {self.ticks}, 超时 {self.deadline_misses}, 看门狗触发 {self.trips}; "
+                + "; ".join(fmt(key) for key in ('period', 'jitter', 'compute', 'send', 'frame')) + " (ms)")
+
+    def export(self, path: str) -> bool:
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.stats(), f, ensure_ascii=False, indent=2)
+            return True
+        except OSError as e:
+            print(f"[Watchdog {self.name}] 导出统计到 {path} 失败: {e}")
+            return False
+
+
+# ----------------------------------------------------------------------
+# 自检
+# ----------------------------------------------------------------------
+def self_check():
+    period = 0.01
+    trips = []
+    watchdog = LoopWatchdog(period, 3, trips.append, name="check")
+    watchdog.start()
+    # 正常周期
+    for _ in range(20):
+        start = time.monotonic()
+        time.sleep(0.001)
+        watchdog.record_tick(start, start + 0.0005, time.monotonic(), time.monotonic())
+        time.sleep(period - (time.monotonic() - start))
+    assert not trips and watchdog.deadline_misses == 0
+    # 控制线程卡住: 看门狗在 miss_limit 个周期后触发一次
+    time.sleep(period * 6)
+    assert len(trips) == 1, trips
+    # 恢复后连续超时也会触发
+    for _ in range(4):
+        start = time.monotonic()
+        time.sleep(period * 1.5)
+        end = time.monotonic()
+        watchdog.record_tick(start, start, end, end)
+    time.sleep(period)
+    watchdog.stop()
+    assert len(trips) == 2 and watchdog.trips == 2, trips
+    print(f"触发原因: {trips}")
+    print(watchdog.stats_text())
+
+
+if __name__ == "__main__":
+    self_check()
@@ -1,14 +1,19 @@
 # main.py
 # -*- coding: utf-8 -*-
 
+import argparse
 import traceback
 from main_controller import DualArmController
 import config # 导入 config 以便访问 CONFIG_FILE
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="双臂控制器")
+    parser.add_argument('--headless', action='store_true', help="无界面模式 (覆盖配置文件中的 settings.headless)")
+    args = parser.parse_args()
+
     print("启动双臂控制器...")
     # 使用 config.py 中定义的配置文件路径
-    controller_app = DualArmController(config_path=config.CONFIG_FILE)
+    controller_app = DualArmController(config_path=config.CONFIG_FILE, headless=True if args.headless else None)
 
     try:
         # 执行设置（加载配置、初始化 Pygame 和机器人）
@@ -11,9 +11,9 @@ import numpy as np
 import traceback
 import threading
 import os
-import yaml
+from functools import partial
 import pygame
-from typing import Dict, Optional, Any, List, Tuple
+from typing import Dict, Optional, Any, List, Mapping, Set, Tuple
 
 # --- Vision/Camera/Math Imports ---
 try:
@@ -55,12 +55,39 @@ except ImportError:
     SCIPY_AVAILABLE = False
     R = None
 
+try:
+    from hans_robot.CPS import CPSClient as HansCPSClient
+    from hans_robot.long_jog_teleop import HansLongJogTeleop
+
+    HANS_AVAILABLE = True
+except ImportError:
+    print("警告: 未找到 Hans 机器人接口 'hans_robot'. Hans 机械臂将不可用。")
+    HANS_AVAILABLE = False
+    HansCPSClient = None
+    HansLongJogTeleop = None
+
 # --- Local Module Imports ---
 import config  # Import your config.py
-from robot_control import (initialize_robot, connect_arm_gripper, format_speed,
-                           attempt_reset_arm, send_jog_command)
+from robot_control import (initialize_robot, initialize_hans_robot, connect_arm_gripper, format_speed,
+                           send_jog_command, run_reset_arm_action, run_dual_reset_action)
 from ui import UIManager
+from headless_ui import HeadlessUIManager
 from CPS import CPSClient, desire_right_pose, desire_left_pose
+from elibot.gripper_command_worker import GripperCommandWorker
+from elibot.gripper_streamer import GripperPositionStreamer
+from control_loop import FixedRateControlThread, ControlState, JoystickSnapshot
+from arm_dispatch import ArmCommandDispatcher
+from control_bindings import ControlBindingTable, MOVEMENT_MODES
+from mounting_transforms import MountingTransforms
+from command_shaper import CommandShaper, ACTION_SEND, ACTION_STOP
+from action_executor import ActionExecutor, ActionTask, ACTION_DONE, ACTION_FAILED
+from loop_watchdog import LoopWatchdog
+from estop import EmergencyStop, ElibotStopChannel, HansStopChannel
+from latency_trace import LatencyTracer, MotionProbe
+from runtime_config import (RuntimeConfig, ConfigError, RESTART_REQUIRED, compile_config, diff_config, keep_values,
+                            load_calibration_matrix)
+from config_watcher import FileWatcher
+from arm_worker import ArmFleet, ArmProxy, RemoteTeleop, KIND_SPEEDL, KIND_JOG, KIND_STOP, KIND_TELEOP
 
 import vision_interaction
 
@@ -73,9 +100,11 @@ CalibrationDict = Dict[str, Optional[np.ndarray]]
 
 
 class DualArmController:
-    def __init__(self, config_path: str = config.CONFIG_FILE):
+    def __init__(self, config_path: str = config.CONFIG_FILE, headless: Optional[bool] = None):
         self.config_path: str = config_path
+        self.headless_override: Optional[bool] = headless  # 命令行 --headless，优先于配置文件
         self.config: Optional[Dict] = None  # Will be populated by load_and_set_config_variables
+        self.runtime_config: Optional[RuntimeConfig] = None  # 校验并编译后的配置 (见 runtime_config.py)
         self.ui_manager: UIManager = UIManager(self)
 
         # Initialize attributes with Python-level defaults from config.py
@@ -85,9 +114,17 @@ class DualArmController:
         self.right_robot_ip: str = config.DEFAULT_IP
         self.left_gripper_id: int = config.DEFAULT_GRIPPER_ID
         self.right_gripper_id: int = config.DEFAULT_GRIPPER_ID
+        self.left_gripper_port: Optional[str] = None  # 夹爪串口直连设备，None 表示经 TCI 转发
+        self.right_gripper_port: Optional[str] = None
         self.window_width: int = config.DEFAULT_WINDOW_WIDTH
         self.window_height: int = config.DEFAULT_WINDOW_HEIGHT
         self.font_size: int = config.DEFAULT_FONT_SIZE
+        self.left_robot_type: str = config.DEFAULT_ROBOT_TYPE
+        self.right_robot_type: str = config.DEFAULT_ROBOT_TYPE
+        self.left_hans_box_id: int = 0
+        self.right_hans_box_id: int = 1
+        self.hans_port: int = config.DEFAULT_HANS_PORT
+        self.hans_keepalive_period: float = config.DEFAULT_HANS_KEEPALIVE_PERIOD
         self.current_speed_xy: float = config.DEFAULT_XY_SPEED
         self.current_speed_z: float = config.DEFAULT_Z_SPEED
         self.rpy_speed: float = config.DEFAULT_RPY_SPEED  # For RPY jogging
@@ -101,13 +138,46 @@ class DualArmController:
         self.trigger_threshold: float = config.DEFAULT_TRIGGER_THRESHOLD
         self.gripper_speed: int = config.DEFAULT_GRIPPER_SPEED
         self.gripper_force: int = config.DEFAULT_GRIPPER_FORCE
+        self.gripper_monitor_rate: float = config.DEFAULT_GRIPPER_MONITOR_RATE
+        self.gripper_control_mode: str = config.DEFAULT_GRIPPER_CONTROL_MODE
+        self.control_rate: float = config.DEFAULT_CONTROL_RATE
+        self.ui_fps: int = config.DEFAULT_UI_FPS
+        self.input_stale_timeout: float = config.DEFAULT_INPUT_STALE_TIMEOUT
+        self.dispatch_deadline: float = config.DEFAULT_DISPATCH_DEADLINE
+        self.command_deadband: float = config.DEFAULT_COMMAND_DEADBAND
+        self.speedl_keepalive_fraction: float = config.DEFAULT_SPEEDL_KEEPALIVE_FRACTION
+        self.jog_keepalive_period: float = config.DEFAULT_JOG_KEEPALIVE_PERIOD
+        self.gripper_stream_rate: float = config.DEFAULT_GRIPPER_STREAM_RATE
+        self.grasp_current_threshold: int = config.DEFAULT_GRASP_CURRENT_THRESHOLD
+        self.gripper_analog_left_ctrl: Optional[Dict[str, Any]] = None
+        self.gripper_analog_right_ctrl: Optional[Dict[str, Any]] = None
         self.long_press_duration: float = config.DEFAULT_LONG_PRESS_DURATION
+        self.action_cancel_axes: List[int] = list(config.DEFAULT_ACTION_CANCEL_AXES)
+        self.action_cancel_threshold: float = config.DEFAULT_ACTION_CANCEL_THRESHOLD
+        self.reset_time_scaling: bool = config.DEFAULT_RESET_TIME_SCALING
+        self.headless: bool = config.DEFAULT_HEADLESS
+        self.headless_input: str = config.DEFAULT_HEADLESS_INPUT
+        self.headless_evdev_device: Optional[str] = None
+        self.headless_status: str = config.DEFAULT_HEADLESS_STATUS
+        self.headless_status_period: float = config.DEFAULT_HEADLESS_STATUS_PERIOD
+        self.udp_listen: str = config.DEFAULT_UDP_LISTEN
+        self.udp_input_deadline: float = config.DEFAULT_UDP_INPUT_DEADLINE
+        self.live_input: Optional[Any] = None  # 网络输入源: 控制线程直接读取最新数据包 (见 udp_teleop)
+        self.watchdog_miss_limit: int = config.DEFAULT_WATCHDOG_MISS_LIMIT
+        self.loop_stats_file: Optional[str] = None
+        self.estop_fast_path: bool = config.DEFAULT_ESTOP_FAST_PATH
+        self.latency_trace: bool = config.DEFAULT_LATENCY_TRACE
+        self.latency_trace_file: str = config.DEFAULT_LATENCY_TRACE_FILE
+        self.latency_motion_probe_period: float = config.DEFAULT_LATENCY_MOTION_PROBE_PERIOD
+        self.config_hot_reload: bool = config.DEFAULT_CONFIG_HOT_RELOAD
+        self.config_reload_poll_period: float = config.DEFAULT_CONFIG_RELOAD_POLL_PERIOD
+        self.arm_processes: bool = config.DEFAULT_ARM_PROCESSES
 
         # RPY Reset specific parameters - initial defaults, will be updated from YAML settings
-        self.reset_rpy_speed: float = 30.0  # Default RPY reset speed
-        self.reset_rpy_acc: float = 50.0  # Default RPY reset acceleration
-        self.reset_rpy_arot: float = 20.0  # Default RPY reset angular acceleration (if used)
-        self.reset_rpy_t_interval: float = 0.1  # Default RPY reset time interval (if used)
+        self.reset_rpy_speed: float = config.DEFAULT_RESET_RPY_SPEED  # Default RPY reset speed
+        self.reset_rpy_acc: float = config.DEFAULT_RESET_RPY_ACC  # Default RPY reset acceleration
+        self.reset_rpy_arot: float = config.DEFAULT_RESET_RPY_AROT  # Default RPY reset angular acceleration (if used)
+        self.reset_rpy_t_interval: float = config.DEFAULT_RESET_RPY_T_INTERVAL  # Default RPY reset time interval (if used)
 
         # Robot Controllers & Status
         self.controller_left: Optional[CPSClient] = None
@@ -118,6 +188,45 @@ class DualArmController:
         self.right_gripper_active: bool = False
         self.left_gripper_open: bool = True
         self.right_gripper_open: bool = True
+        # Hans 机械臂: 使用长点动遥操作驱动，controller_left/right 保持为 None
+        self.hans_clients: Dict[str, Any] = {}
+        self.hans_teleops: Dict[str, Any] = {}
+        # 每个夹爪一个非阻塞指令线程 (最新目标优先)，key 为 'left' / 'right'
+        self.gripper_workers: Dict[str, GripperCommandWorker] = {}
+        # 夹爪后台激活线程 (两臂并行)，激活完成前提交的指令在指令线程中排队
+        self.gripper_activation_threads: Dict[str, threading.Thread] = {}
+        # analog 夹爪模式: 每个夹爪一个目标位置流式发送线程
+        self.gripper_streamers: Dict[str, GripperPositionStreamer] = {}
+        # 固定频率控制线程: 主线程发布手柄快照，控制线程发布控制结果，均为引用替换
+        self.control_thread: Optional[FixedRateControlThread] = None
+        self.control_lock = threading.RLock()  # 控制周期与模式切换/停止互斥
+        self.input_snapshot: Optional[JoystickSnapshot] = None
+        self.control_state = ControlState(np.zeros(6), np.zeros(6), 0, 0.0)
+        # 控制循环计时统计 (周期/计算/发送/抖动) 与看门狗: 控制周期卡住或连续超时时停止机械臂
+        self.loop_watchdog: Optional[LoopWatchdog] = None
+        # 紧急停止快速通道: 每臂一条专用连接，停止帧不经过指令线程、_io_lock 和 control_lock
+        self.emergency_stop: Optional[EmergencyStop] = None
+        self.estop_latched: bool = False  # 急停按钮触发后保持停止，再按一次解除
+        self._reset_shapers_pending: bool = False  # 快速通道停止后由控制线程重置指令整形器
+        # 输入到运动的延迟追踪 (settings.latency_trace): 每周期一条记录，退出时导出 Chrome trace
+        self.latency_tracer: Optional[LatencyTracer] = None
+        self.motion_probes: Dict[str, MotionProbe] = {}
+        # 配置热重载: 监视配置文件与标定文件，校验通过后在控制周期之间替换 (见 reload_config)
+        self.config_watcher: Optional[FileWatcher] = None
+        # 每臂一个工作进程 (settings.arm_processes): 按 arms 注册表启动，left / right 的 controller 为 ArmProxy
+        self.arm_fleet: Optional[ArmFleet] = None
+        self.extra_arm_names: Tuple[str, ...] = ()  # left / right 以外已初始化的臂 (只做速度遥操作)
+        self.extra_arm_bindings: Optional[ControlBindingTable] = None
+        self.extra_arm_transforms: Optional[MountingTransforms] = None
+        # Elibot 臂每臂一个指令发送线程，两臂的速度指令并行发送
+        self.arm_dispatchers: Dict[str, ArmCommandDispatcher] = {}
+        self.command_shapers: Dict[str, CommandShaper] = {}  # 每臂一个速度指令整形器
+        self.control_bindings: Optional[ControlBindingTable] = None  # 移动控制绑定表 (首次使用时编译)
+        self.left_mount_rpy: List[float] = list(config.DEFAULT_LEFT_MOUNT_RPY)
+        self.right_mount_rpy: List[float] = list(config.DEFAULT_RIGHT_MOUNT_RPY)
+        self.mounting_transforms: Optional[MountingTransforms] = None  # 安装坐标系变换 (首次使用时构建)
+        # 回正/抓取等耗时运动: 每臂一个后台动作执行器，摇杆输入或停止按钮可随时取消
+        self.action_executors: Dict[str, ActionExecutor] = {}
 
         self.cameras: CameraDict = {}
         self.models: ModelDict = {}
@@ -127,12 +236,15 @@ class DualArmController:
         self.control_modes: List[str] = [config.MODE_XYZ, config.MODE_RPY, config.MODE_RESET, config.MODE_VISION]
         self.current_mode_index: int = 0
         self.control_mode: str = self.control_modes[0]
-        self.mode_button_press_time: Optional[float] = None
         self.status_message: str = "初始化中..."
 
         self.controls_map: Dict = {}  # Will be populated by load_and_set_config_variables
         self.audio_files_config: Dict = {}  # Will be populated
-        self.reset_rpy_poses_config: Dict[str, List[float]] = {}  # Will be populated
+        self.reset_rpy_poses_config: Mapping[str, np.ndarray] = {}  # Will be populated (只读 (3,) 数组)
+        self.camera_serials: Mapping[str, str] = {}  # setup 中的视觉配置 (Will be populated)
+        self.yolo_models: Mapping[str, str] = {}
+        self.calibration_files: Mapping[str, str] = {}
+        self.gripper_analog_axes: Dict[str, Tuple[int, float, float]] = {}  # 臂 -> (扳机轴序号, 松开值, 按到底值)
 
         self._update_control_attributes()  # Initialize control attributes (they will use defaults set above for now)
 
@@ -155,6 +267,8 @@ class DualArmController:
                                                                                       'index': config.DEFAULT_GRIPPER_L_BUTTON})
         self.gripper_toggle_right_ctrl = self.controls_map.get('gripper_toggle_right', {'type': 'button',
                                                                                         'index': config.DEFAULT_GRIPPER_R_BUTTON})
+        self.action_cancel_ctrl = self.controls_map.get('action_cancel')  # 取消正在执行的回正/抓取动作 (可选)
+        self.emergency_stop_ctrl = self.controls_map.get('emergency_stop')  # 急停 (快速通道，按下保持，再按解除)
         self.reset_left_arm_ctrl = self.controls_map.get('reset_left_arm')  # Original reset
         self.reset_right_arm_ctrl = self.controls_map.get('reset_right_arm')  # Original reset
 
@@ -174,6 +288,13 @@ class DualArmController:
         self.reset_right_arm_to_right_rpy_ctrl = self.controls_map.get('reset_right_arm_to_right_rpy')
         self.reset_right_arm_up_rpy_ctrl = self.controls_map.get('reset_right_arm_up_rpy')
         self.reset_right_arm_down_rpy_ctrl = self.controls_map.get('reset_right_arm_down_rpy')
+        # 双臂同时设置: controls 中以 reset_both_arms 开头的控件，pose 为 reset_rpy_poses 中去掉 left_/right_ 的名称
+        # analog 夹爪的扳机轴预先解析为 (序号, 松开值, 按到底值)，控制周期不再查字典
+        self.gripper_analog_axes = {side: (cfg['index'], cfg.get('rest', -1.0), cfg.get('full', 1.0))
+                                    for side, cfg in (('left', self.gripper_analog_left_ctrl),
+                                                      ('right', self.gripper_analog_right_ctrl)) if cfg}
+        self.reset_both_arms_ctrls = [cfg for key, cfg in self.controls_map.items()
+                                      if key.startswith('reset_both_arms') and isinstance(cfg, dict) and cfg.get('pose')]
 
     def setup(self) -> bool:
         print("=" * 10 + " 开始设置双臂控制器 " + "=" * 10)
@@ -189,30 +310,19 @@ class DualArmController:
                 print(f"  {self.status_message}")
                 return False
             # self.config should now be populated, and attributes like self.left_robot_ip should have correct values.
+            # (含 reset_rpy_speed 等 RPY 设置参数与 reset_rpy_poses，均已在加载时校验)
             print("  主配置文件已通过 config.py 加载并设置变量。")
-
-            # Explicitly load RPY reset specific motion parameters from self.config (YAML settings)
-            # This ensures they override the initial Python defaults if specified in YAML.
-            # config.load_and_set_config_variables in your config.py does *not* yet load these RPY specific ones.
-            if self.config and 'settings' in self.config:
-                settings_cfg = self.config.get('settings', {})
-                self.reset_rpy_speed = float(settings_cfg.get('reset_rpy_speed', self.reset_rpy_speed))
-                self.reset_rpy_acc = float(settings_cfg.get('reset_rpy_acc', self.reset_rpy_acc))
-                self.reset_rpy_arot = float(settings_cfg.get('reset_rpy_arot', self.reset_rpy_arot))
-                self.reset_rpy_t_interval = float(settings_cfg.get('reset_rpy_t_interval', self.reset_rpy_t_interval))
-                print(f"  RPY 重置参数已从 settings 更新: speed={self.reset_rpy_speed}, acc={self.reset_rpy_acc}")
+            print(f"  RPY 设置参数: speed={self.reset_rpy_speed}, acc={self.reset_rpy_acc}")
 
             # _update_control_attributes is called to ensure specific control dicts (like reset_left_arm_default_rpy_ctrl)
             # are populated from self.controls_map, which was filled by load_and_set_config_variables.
             self._update_control_attributes()
             print("  控制属性已更新。")
 
-            # Load RPY reset poses from self.config (populated by load_and_set_config_variables)
-            if isinstance(self.config.get('reset_rpy_poses'), dict):
-                self.reset_rpy_poses_config = self.config['reset_rpy_poses']
+            if self.reset_rpy_poses_config:
                 print(f"  已加载自定义RPY回正姿态: {list(self.reset_rpy_poses_config.keys())}")
             else:
-                print("  警告: 配置文件中 'reset_rpy_poses' 未找到或格式不正确。")
+                print("  警告: 配置文件中 'reset_rpy_poses' 未找到。")
 
         except Exception as e_cfg:
             self.status_message = f"错误: 加载配置阶段异常: {e_cfg}"
@@ -226,6 +336,11 @@ class DualArmController:
         print(f"  [调试] 字体路径将使用: {self.font_path}")
         print(f"  [调试] XYZ 速度: {self.current_speed_xy}")
 
+        if self.headless_override is not None:
+            self.headless = self.headless_override
+        if self.headless:
+            self.ui_manager = HeadlessUIManager(self)  # 不创建窗口、不加载字体和音频
+
         print("\n[Setup 2/5] 初始化 Pygame 和 UI...")
         try:
             if not self.ui_manager.init_pygame():  # init_pygame uses self.controller.font_path etc.
@@ -268,17 +383,13 @@ class DualArmController:
         return True
 
     def _initialize_vision_components(self) -> bool:
-        # This method relies on self.config being populated by load_and_set_config_variables
+        # camera_serials / yolo_models / calibration_files 由 load_and_set_config_variables 校验后设置
         all_vision_ok = True
-        setup_cfg = self.config.get('setup', {})
-        if not isinstance(setup_cfg, dict):
-            print("  错误: 'setup' 配置部分无效或缺失 (在 _initialize_vision_components)。")
-            return False
 
         print("  初始化相机...")
         if CAMERA_AVAILABLE:
-            camera_serials = setup_cfg.get('camera_serials', {})  # From YAML via self.config
-            if not camera_serials or not isinstance(camera_serials, dict):
+            camera_serials = self.camera_serials
+            if not camera_serials:
                 print("    警告: 未配置 'camera_serials' 或配置无效。")
                 all_vision_ok = False
             else:
@@ -317,7 +428,7 @@ class DualArmController:
 
         print("\n  加载YOLO模型...")
         if YOLO_AVAILABLE:
-            yolo_models_cfg = setup_cfg.get('yolo_models', {})  # From YAML via self.config
+            yolo_models_cfg = self.yolo_models
             if not yolo_models_cfg:
                 print("    警告: 未配置 'yolo_models'。")
                 all_vision_ok = False
@@ -349,9 +460,8 @@ class DualArmController:
             self.status_message = self._append_status("警告: scipy库不可用")
             all_vision_ok = False
         else:
-            calibration_files = setup_cfg.get('calibration_files', {})  # From YAML via self.config
-            if not calibration_files or not isinstance(calibration_files, dict) or not (
-                    'left' in calibration_files and 'right' in calibration_files):
+            calibration_files = self.calibration_files
+            if not ('left' in calibration_files and 'right' in calibration_files):
                 print("    警告: 未配置或配置不全 'calibration_files' (需要'left'和'right').")
                 self.status_message = self._append_status("警告: 标定配置不完整")
                 all_vision_ok = False
@@ -360,22 +470,12 @@ class DualArmController:
                 for arm_name, path in calibration_files.items():
                     if arm_name not in ['left', 'right']: continue
                     print(f"    加载 {arm_name} 臂标定: {path}...")
-                    if path and isinstance(path, str) and os.path.exists(path):
-                        try:
-                            with open(path, 'r') as f:
-                                calib_yaml = yaml.safe_load(f)
-                            matrix = calib_yaml.get('hand_eye_transformation_matrix')
-                            matrix_np = np.array(matrix, dtype=float)
-                            if matrix_np.shape == (4, 4):
-                                self.calibration[arm_name] = matrix_np
-                                print(f"    -> {arm_name} 臂标定 OK.")
-                                loaded_calib_count += 1
-                            else:
-                                print(f"    -> 错误: 文件 '{path}' 中矩阵结构无效 ({matrix_np.shape}).")
-                        except Exception as e:
-                            print(f"    -> 错误: 加载或解析标定 '{path}' 失败: {e}")
-                    else:
-                        print(f"    -> 错误: 标定文件路径无效 '{path}'.")
+                    try:
+                        self.calibration[arm_name] = load_calibration_matrix(path)
+                        print(f"    -> {arm_name} 臂标定 OK.")
+                        loaded_calib_count += 1
+                    except ConfigError as e:
+                        print(f"    -> 错误: 加载或解析标定失败: {e}")
                 if loaded_calib_count < 2 and (
                         'left' in calibration_files or 'right' in calibration_files):  # Check if at least one was configured but failed
                     print("    警告: 未能加载所有必需的臂标定矩阵。")
@@ -387,38 +487,178 @@ class DualArmController:
         print("\n[Robot Init] 开始连接和初始化机器人...")
         self.left_init_ok, self.right_init_ok = False, False
         self.left_gripper_active, self.right_gripper_active = False, False
+        if self.arm_processes: return self._init_arm_workers()
         all_ok = True
         # IPs are now from self.left_robot_ip, set by __init__ and then load_and_set_config_variables
         try:
-            print(f"  连接左臂 ({self.left_robot_ip})...")  # Uses the potentially YAML-loaded IP
-            self.controller_left = CPSClient(self.left_robot_ip, gripper_slave_id=self.left_gripper_id)
-            if self.controller_left.connect():
-                print("  左臂连接成功.")
-                self.left_init_ok = initialize_robot(self.controller_left, "左臂")
-                if self.left_init_ok: self.left_gripper_active = connect_arm_gripper(self.controller_left, "左臂")
+            if self.left_robot_type == 'hans':
+                self.left_init_ok = self._init_hans_arm('left', self.left_robot_ip, self.left_hans_box_id, "左臂")
                 all_ok &= self.left_init_ok
             else:
-                print("  错误: 左臂连接失败"); all_ok = False
+                print(f"  连接左臂 ({self.left_robot_ip})...")  # Uses the potentially YAML-loaded IP
+                self.controller_left = CPSClient(self.left_robot_ip, gripper_slave_id=self.left_gripper_id,
+                                                 gripper_port=self.left_gripper_port)
+                if self.controller_left.connect():
+                    print("  左臂连接成功.")
+                    self.left_init_ok = initialize_robot(self.controller_left, "左臂")
+                    if self.left_init_ok: self._start_gripper_activation('left', self.controller_left, "左臂")
+                    all_ok &= self.left_init_ok
+                else:
+                    print("  错误: 左臂连接失败"); all_ok = False
         except Exception as e:
             print(f"  左臂初始化异常: {e}"); traceback.print_exc(); all_ok = False
 
         try:
-            print(f"  连接右臂 ({self.right_robot_ip})...")  # Uses the potentially YAML-loaded IP
-            self.controller_right = CPSClient(self.right_robot_ip, gripper_slave_id=self.right_gripper_id)
-            if self.controller_right.connect():
-                print("  右臂连接成功.")
-                self.right_init_ok = initialize_robot(self.controller_right, "右臂")
-                if self.right_init_ok: self.right_gripper_active = connect_arm_gripper(self.controller_right, "右臂")
+            if self.right_robot_type == 'hans':
+                self.right_init_ok = self._init_hans_arm('right', self.right_robot_ip, self.right_hans_box_id, "右臂")
                 all_ok &= self.right_init_ok
             else:
-                print("  错误: 右臂连接失败"); all_ok = False
+                print(f"  连接右臂 ({self.right_robot_ip})...")  # Uses the potentially YAML-loaded IP
+                self.controller_right = CPSClient(self.right_robot_ip, gripper_slave_id=self.right_gripper_id,
+                                                  gripper_port=self.right_gripper_port)
+                if self.controller_right.connect():
+                    print("  右臂连接成功.")
+                    self.right_init_ok = initialize_robot(self.controller_right, "右臂")
+                    if self.right_init_ok: self._start_gripper_activation('right', self.controller_right, "右臂")
+                    all_ok &= self.right_init_ok
+                else:
+                    print("  错误: 右臂连接失败"); all_ok = False
         except Exception as e:
             print(f"  右臂初始化异常: {e}"); traceback.print_exc(); all_ok = False
 
         if not all_ok: self.status_message = self._append_status("警告: 机器人初始化失败!")
+        if self.estop_fast_path: self._init_emergency_stop()
         print("[Robot Init] 机器人初始化流程结束。")
         return all_ok
 
+    def _init_arm_workers(self) -> bool:
+        """
+        settings.arm_processes: 按 arms 注册表为每个臂启动工作进程，各臂并行连接和初始化。
+        left / right 的 Elibot 臂以 ArmProxy 作为 controller_left / right (回正、夹爪、视觉抓取经远程调用)，
+        Hans 臂以 RemoteTeleop 作为长点动驱动；其他臂只接受速度遥操作 (见 _send_extra_arm_commands)。
+        """
+        arms = self.runtime_config.arms
+        print(f"  启动机械臂工作进程: {', '.join(f'{name} ({arm.type}, {arm.ip})' for name, arm in arms.items())}...")
+        self.arm_fleet = ArmFleet(arms, {'hans_port': self.hans_port, 'hans_keepalive_period': self.hans_keepalive_period})
+        results = self.arm_fleet.start()
+        for side, arm_name in (('left', "左臂"), ('right', "右臂")):
+            worker = self.arm_fleet.workers.get(side)
+            if worker is None or not results[side]: continue
+            if worker.arm.type == 'hans':
+                self.hans_teleops[side] = RemoteTeleop(worker)
+            else:
+                proxy = ArmProxy(worker)
+                if side == 'left':
+                    self.controller_left = proxy
+                else:
+                    self.controller_right = proxy
+                self._start_gripper_activation(side, proxy, arm_name)
+            setattr(self, f"{side}_init_ok", True)
+            print(f"  {arm_name} 工作进程初始化成功.")
+        self.extra_arm_names = tuple(name for name in arms if name not in ('left', 'right') and results[name])
+        failed = [name for name, ok in results.items() if not ok]
+        if failed:
+            print(f"  错误: 工作进程初始化失败: {', '.join(failed)}")
+            self.status_message = self._append_status("警告: 机器人初始化失败!")
+        if self.estop_fast_path: self._init_emergency_stop()
+        print("[Robot Init] 机器人初始化流程结束。")
+        return not failed
+
+    def _init_hans_arm(self, side: str, ip: str, box_id: int, arm_name: str) -> bool:
+        """连接 Hans 机械臂并创建长点动遥操作驱动 (Hans 臂不支持夹爪与回正)。"""
+        if not HANS_AVAILABLE:
+            print(f"  错误: {arm_name} 配置为 Hans，但 Hans 接口不可用。")
+            return False
+        print(f"  连接{arm_name} (Hans, {ip})...")
+        # hans CPSClient 的连接表是类属性，多台 Hans 共享同一个实例即可，用 box_id 区分
+        client = next(iter(self.hans_clients.values()), None) or HansCPSClient()
+        if not initialize_hans_robot(client, box_id, ip, self.hans_port, arm_name):
+            return False
+        self.hans_clients[side] = client
+        self.hans_teleops[side] = HansLongJogTeleop(client, box_id=box_id,
+                                                    keepalive_period=self.hans_keepalive_period)
+        print(f"  {arm_name} Hans 长点动遥操作已就绪.")
+        return True
+
+    def _init_emergency_stop(self):
+        """为每个已初始化的臂建立专用停止连接 (失败的臂回退到主连接停止)。"""
+        self.emergency_stop = EmergencyStop()
+        for side, init_ok, controller, ip, arm_name in (
+                ('left', self.left_init_ok, self.controller_left, self.left_robot_ip, "左臂"),
+                ('right', self.right_init_ok, self.controller_right, self.right_robot_ip, "右臂")):
+            if not init_ok: continue
+            if side in self.hans_teleops:
+                channel = HansStopChannel(arm_name, ip, self.hans_port)
+            elif controller:
+                channel = ElibotStopChannel(arm_name, ip, controller.port)
+            else:
+                continue
+            if self.emergency_stop.add_channel(side, channel):
+                print(f"  {arm_name} 急停快速通道已建立 ({ip}:{channel.port}).")
+        for name in self.extra_arm_names:
+            worker = self.arm_fleet.workers[name]
+            if worker.arm.type == 'hans':
+                channel = HansStopChannel(name, worker.arm.ip, worker.port)
+            else:
+                channel = ElibotStopChannel(name, worker.arm.ip, worker.port)
+            if self.emergency_stop.add_channel(name, channel):
+                print(f"  {name} 急停快速通道已建立 ({worker.arm.ip}:{channel.port}).")
+
+    def _start_gripper_activation(self, side: str, controller, arm_name: str):
+        """
+        在后台线程中激活夹爪，不阻塞机器人初始化 (两臂并行激活，遥操作可以立即开始)。
+        指令线程先以未就绪状态创建，激活期间提交的夹爪指令排队，激活完成后执行。
+        """
+        self.gripper_workers[side] = GripperCommandWorker(controller, name=side, ready=False)
+        thread = threading.Thread(target=self._activate_gripper, args=(side, controller, arm_name),
+                                  name=f"GripperActivate-{side}", daemon=True)
+        self.gripper_activation_threads[side] = thread
+        thread.start()
+
+    def _activate_gripper(self, side: str, controller, arm_name: str):
+        start_time = time.monotonic()
+        ok = connect_arm_gripper(controller, arm_name)
+        worker = self.gripper_workers.get(side)
+        if worker is None or worker.is_closed():
+            return  # 激活期间程序已开始退出
+        if ok:
+            self._start_gripper_services(side, controller)
+            if side == 'left':
+                self.left_gripper_active = True
+            else:
+                self.right_gripper_active = True
+            worker.set_ready()
+            print(f"  {arm_name} 夹爪后台激活完成 ({time.monotonic() - start_time:.2f} s)。")
+        else:
+            worker.close()  # 取消排队的指令
+            self.gripper_workers.pop(side, None)
+            self.ui_manager.update_status_message(f"{arm_name} 夹爪激活失败")
+
+    def is_gripper_activating(self, side: str) -> bool:
+        thread = self.gripper_activation_threads.get(side)
+        return thread is not None and thread.is_alive()
+
+    def _start_gripper_services(self, side: str, controller):
+        """夹爪激活后启动状态监视器和非阻塞指令线程。"""
+        if self.gripper_monitor_rate and self.gripper_monitor_rate > 0:
+            controller.start_gripper_monitor(self.gripper_monitor_rate)
+        if side not in self.gripper_workers:
+            self.gripper_workers[side] = GripperCommandWorker(controller, name=side)
+        if self.gripper_control_mode == 'analog' and side in self.gripper_analog_axes:
+            if isinstance(controller, ArmProxy):  # 位置流在工作进程中发送，目标位置经共享内存传递
+                self.gripper_streamers[side] = controller.start_gripper_streamer(
+                    self.gripper_stream_rate, self.gripper_force, self.gripper_speed)
+                return
+            self.gripper_streamers[side] = GripperPositionStreamer(
+                controller, rate_hz=self.gripper_stream_rate, force=self.gripper_force, speed=self.gripper_speed,
+                name=side)
+
+    def get_gripper_snapshot(self, side: str):
+        """返回夹爪监视器的最新状态快照 (不产生通信)，无监视器或无数据时返回 None。"""
+        controller = self.controller_left if side == 'left' else self.controller_right
+        monitor = getattr(controller, 'gripper_monitor', None) if controller else None
+        return monitor.snapshot if monitor else None
+
     def _append_status(self, new_status_part: str) -> str:
         if self.status_message and ("警告" in self.status_message or "错误" in self.status_message):
             if new_status_part not in self.status_message: return f"{self.status_message} | {new_status_part}"
@@ -481,13 +721,22 @@ class DualArmController:
 
                 if checks_passed:
                     try:
-                        print(f"[{thread_name}] 调用 vision_interaction.handle_command_json (grasp)...")
-                        action_success = vision_interaction.handle_command_json(command_json, robot_controllers_dict,
-                                                                                camera_clients_dict, models_dict,
-                                                                                calibration_dict)
-                        final_status = f"抓取指令 " + ("成功" if action_success else "失败")
-                        self.ui_manager.play_sound(
-                            'action_success_general' if action_success else 'action_fail_general')
+                        # 抓取作为该臂的后台动作执行: 界面显示进度，摇杆输入或停止按钮可随时中止
+                        print(f"[{thread_name}] 提交抓取动作 (vision_interaction.handle_command_json)...")
+                        task = self.submit_arm_action(arm_choice, f"{arm_choice}臂抓取",
+                                                      lambda t: vision_interaction.handle_command_json(
+                                                          command_json, robot_controllers_dict, camera_clients_dict,
+                                                          models_dict, calibration_dict, task=t,
+                                                          grasp_current_threshold=self.grasp_current_threshold or None),
+                                                      success_sound='action_success_general',
+                                                      fail_sound='action_fail_general')
+                        if task is None:
+                            final_status = "急停中，未执行抓取指令"
+                        else:
+                            task.wait()
+                            action_success = task.state == ACTION_DONE
+                            final_status = f"抓取指令 " + ("成功" if action_success else
+                                                         "失败" if task.state == ACTION_FAILED else "已取消")
                     except Exception as e_handle:
                         print(
                             f"[{thread_name}] 调用 handle_command_json (grasp) 时发生错误: {e_handle}"); traceback.print_exc(); final_status = f"错误: 处理抓取指令失败"; self.ui_manager.play_sound(
@@ -519,10 +768,11 @@ class DualArmController:
         print(f"[{thread_name}] 视觉交互处理完毕。")
 
     def switch_control_mode(self):
-        self.stop_all_movement()
-        old_mode = self.control_mode
-        self.current_mode_index = (self.current_mode_index + 1) % len(self.control_modes)
-        self.control_mode = self.control_modes[self.current_mode_index]
+        with self.control_lock:  # 避免控制线程在停止之后按旧模式再发一次指令
+            self.stop_all_movement()
+            old_mode = self.control_mode
+            self.current_mode_index = (self.current_mode_index + 1) % len(self.control_modes)
+            self.control_mode = self.control_modes[self.current_mode_index]
         print(f"切换模式: {old_mode} -> {self.control_mode}")
         sound_event, status_msg = None, f"模式: {self.control_mode}"
         if self.control_mode == config.MODE_XYZ:
@@ -543,24 +793,108 @@ class DualArmController:
             print("切换模式时取消进行中的录音...")
             if vision_interaction.cancel_recording(): self.ui_manager.play_sound('vision_record_cancel')
 
+    def trigger_emergency_stop(self, reason: str, event_time: Optional[float] = None, latch: bool = True):
+        """
+        急停: 经专用连接向所有臂并行发出控制器原生停止帧并立即返回 (不获取任何锁)，停止确认与延迟在后台汇总。
+        event_time 为按钮事件处理开始的 time.monotonic() 时间，用于统计按钮到停止的延迟。
+        latch 为 True 时保持急停状态，控制线程不再发送运动指令，直到 release_emergency_stop()。
+        """
+        if latch: self.estop_latched = True
+        self._reset_shapers_pending = True
+        estop = self.emergency_stop
+        channel_sides = set(estop.channels) if estop else set()
+        if estop and channel_sides:
+            def on_report(report: str, all_ok: bool):
+                if not all_ok: self.ui_manager.play_sound('action_fail_general')
+                self.ui_manager.update_status_message(
+                    f"急停 ({reason}): {'已确认停止' if all_ok else '未能确认全部停止，请检查机械臂'}")
+
+            estop.trigger(reason, event_time, on_report)
+        # 没有专用通道的臂: 各臂并行经主连接发送 stop
+        stop_calls = [controller.stop for side, init_ok, controller in
+                      (('left', self.left_init_ok, self.controller_left), ('right', self.right_init_ok, self.controller_right))
+                      if init_ok and controller and side not in channel_sides]
+        stop_calls += [teleop.stop for teleop in self.hans_teleops.values()]  # 同时停止长点动驱动的保活
+        stop_calls += [partial(self._submit_worker_stop, name) for name in self.extra_arm_names
+                       if name not in channel_sides]
+        if stop_calls: threading.Thread(target=self._parallel_stop, args=(stop_calls,), daemon=True).start()
+        self.cancel_actions(reason)
+        self.ui_manager.update_status_message(f"急停: {reason}")
+
+    @staticmethod
+    def _parallel_stop(stop_calls):
+        def call(fn):
+            try:
+                fn()
+            except Exception as e:
+                print(f"[EStop] 发送停止失败: {e}")
+
+        threads = [threading.Thread(target=call, args=(fn,), daemon=True) for fn in stop_calls]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join(timeout=1.0)
+
+    def release_emergency_stop(self):
+        self.estop_latched = False
+        print("急停已解除")
+        self.ui_manager.update_status_message("急停已解除")
+
+    def toggle_emergency_stop(self, event_time: Optional[float] = None):
+        """急停按钮: 未急停时触发并保持，已急停时解除。"""
+        if self.estop_latched:
+            self.release_emergency_stop()
+        else:
+            self.ui_manager.play_sound('action_fail_general')
+            self.trigger_emergency_stop("急停按钮", event_time)
+
     def stop_all_movement(self):
+        """
+        模式切换与退出时的正常停止: 发送零速度 (按加速度减速)。急停与看门狗使用快速通道。
+        零速度经各臂的发送线程 (工作进程模式下为指令槽) 投递，替换其中尚未发送的速度/点动指令，
+        避免旧指令在停止之后执行。
+        """
         print("发送停止所有运动指令...")
         stop_payload = [0.0] * 6
         stop_acc, stop_arot, stop_t = 200, 20, 0.05  # Consider making these configurable
-        try:
-            if self.left_init_ok and self.controller_left: self.controller_left.moveBySpeedl(stop_payload, stop_acc,
-                                                                                             stop_arot, stop_t)
-            if self.right_init_ok and self.controller_right: self.controller_right.moveBySpeedl(stop_payload, stop_acc,
-                                                                                                stop_arot, stop_t)
-            time.sleep(0.1)
-        except Exception as e:
-            print(f"发送停止指令时出错: {e}")
+        self.cancel_actions("停止所有运动")  # 后台动作在取消时立即向对应臂发送 stop
+        with self.control_lock:  # 停止期间控制线程不发送新的速度指令
+            try:
+                checks = {}  # 臂 -> 停止是否送达的检查
+                for side, init_ok, controller in (('left', self.left_init_ok, self.controller_left),
+                                                  ('right', self.right_init_ok, self.controller_right)):
+                    if not (init_ok and controller): continue
+                    if isinstance(controller, ArmProxy):  # 写入指令槽，覆盖其中尚未执行的速度/点动指令
+                        worker = controller.worker
+                        checks[side] = partial(worker.succeeded,
+                                               worker.submit(KIND_SPEEDL, stop_payload, stop_acc, stop_arot, stop_t))
+                        continue
+                    dispatcher = self._dispatcher_for(side)
+                    seq = dispatcher.submit(controller.moveBySpeedl, stop_payload, stop_acc, stop_arot, stop_t)
+                    checks[side] = partial(dispatcher.succeeded, seq)
+                for teleop in self.hans_teleops.values(): teleop.stop()
+                for name in self.extra_arm_names:
+                    worker = self.arm_fleet.workers[name]
+                    if worker.arm.type == 'hans':
+                        RemoteTeleop(worker).stop()
+                    else:
+                        checks[name] = partial(worker.succeeded,
+                                               worker.submit(KIND_SPEEDL, stop_payload, stop_acc, stop_arot, stop_t))
+                deadline = time.monotonic() + config.STOP_CONFIRM_TIMEOUT
+                while any(check() is None for check in checks.values()) and time.monotonic() < deadline:
+                    time.sleep(0.001)
+                for name, shaper in self.command_shapers.items():
+                    delivered = checks[name]() if name in checks else True
+                    if not delivered: print(f"  {name} 停止指令未确认送达，恢复控制后重发")
+                    shaper.reset(shaper.mode, stopped=bool(delivered))  # 未送达时下个静止周期重发停止
+                time.sleep(0.1)
+            except Exception as e:
+                print(f"发送停止指令时出错: {e}")
 
     def toggle_gripper(self, side: str):
         controller = self.controller_left if side == 'left' else self.controller_right
         is_open = self.left_gripper_open if side == 'left' else self.right_gripper_open
         is_active = self.left_gripper_active if side == 'left' else self.right_gripper_active
-        if not controller or not is_active:
+        worker = self.gripper_workers.get(side)
+        if not controller or not (is_active or worker):
             self.ui_manager.play_sound('gripper_inactive')
             msg = f"{side} 夹爪无效或未初始化";
             print(msg);
@@ -570,10 +904,15 @@ class DualArmController:
         sound_event = ('left_close' if is_open else 'left_open') if side == 'left' else \
             ('right_close' if is_open else 'right_open')
         new_state_str = "关闭" if is_open else "打开"
-        print(f"切换 {side} 夹爪为: {new_state_str}")
+        print(f"切换 {side} 夹爪为: {new_state_str}" + ("" if is_active else " (夹爪激活中，指令排队)"))
         self.ui_manager.play_sound(sound_event)
         try:
-            action(speed=self.gripper_speed, force=self.gripper_force, wait=False)
+            if worker:
+                # 只提交目标，TCI 通信在指令线程中完成，不阻塞控制循环
+                worker.submit(255 if is_open else 0, force=self.gripper_force, speed=self.gripper_speed,
+                              callback=lambda f: self._on_gripper_command_done(side, new_state_str, f))
+            else:
+                action(speed=self.gripper_speed, force=self.gripper_force, wait=False)
             if side == 'left':
                 self.left_gripper_open = not is_open
             else:
@@ -584,6 +923,130 @@ class DualArmController:
             self.ui_manager.play_sound('action_fail_general')
             self.ui_manager.update_status_message(f"{side} 夹爪切换失败")
 
+    def _update_analog_grippers(self, snapshot: Optional[JoystickSnapshot]):
+        """analog 模式: 读取扳机轴并更新夹爪目标位置 (只写入最新值，由发送线程限频发送)。"""
+        if not snapshot: return
+        for side, streamer in list(self.gripper_streamers.items()):
+            axis_cfg = self.gripper_analog_axes.get(side)
+            if axis_cfg is None or axis_cfg[0] >= len(snapshot.axes): continue
+            axis, rest, full = axis_cfg  # 加载时已校验 full != rest
+            axis_val = snapshot.axes[axis]
+            ratio = min(1.0, max(0.0, (axis_val - rest) / (full - rest)))
+            position = int(round(ratio * 255))
+            streamer.set_target(position)
+            if side == 'left':
+                self.left_gripper_open = position < 128
+            else:
+                self.right_gripper_open = position < 128
+
+    def _on_gripper_command_done(self, side: str, new_state_str: str, future):
+        """夹爪指令完成回调 (在指令线程中执行)。被新指令替换的指令不提示。"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None and future.result():
+            return
+        print(f"切换 {side} 夹爪为 {new_state_str} 失败: {error if error else 'run_gripper 返回 False'}")
+        self.ui_manager.play_sound('action_fail_general')
+        self.ui_manager.update_status_message(f"{side} 夹爪切换失败")
+
+    # --- 后台动作 (回正/抓取) ---
+    def _executor_for(self, side: str) -> ActionExecutor:
+        executor = self.action_executors.get(side)
+        if executor is None:
+            executor = self.action_executors[side] = ActionExecutor(side)
+        return executor
+
+    def submit_arm_action(self, side: str, description: str, fn, *args,
+                          success_sound: Optional[str] = None, fail_sound: Optional[str] = None) -> Optional[ActionTask]:
+        """
+        把耗时运动提交到该臂的后台动作执行器并立即返回，fn(task, *args) 在执行器线程中运行。
+        side 为 'both' 时是双臂协同动作。涉及同一臂的尚未结束的动作被取消；
+        运行中被取消时立即向涉及的机械臂发送 stop。急停保持期间不提交，返回 None。
+        """
+        if self.estop_latched:
+            self.ui_manager.play_sound('action_fail_general')
+            self.ui_manager.update_status_message(f"急停中，忽略 {description}")
+            return None
+        sides = ('left', 'right') if side == 'both' else (side,)
+        controllers = [c for c in (self.controller_left if s == 'left' else self.controller_right for s in sides) if c]
+        for other in ('both',) if side != 'both' else ('left', 'right'):
+            if other in self.action_executors: self.action_executors[other].cancel(f"被 {description} 替换")
+
+        def stop_arms():
+            for controller in controllers: controller.stop()
+
+        def on_finish(task: ActionTask):
+            if task.state == ACTION_DONE:
+                if success_sound: self.ui_manager.play_sound(success_sound)
+                self.ui_manager.update_status_message(f"{description} 完成")
+            elif task.state == ACTION_FAILED:
+                if fail_sound: self.ui_manager.play_sound(fail_sound)
+                self.ui_manager.update_status_message(f"{description} 失败 (详情请查看控制台)")
+            elif not self.action_executors[side].is_busy():  # 被新动作替换时不覆盖新动作的状态
+                self.ui_manager.update_status_message(f"{description} 已取消 ({task.message})")
+
+        task = self._executor_for(side).submit(description, fn, *args,
+                                               on_cancel=stop_arms,
+                                               on_finish=on_finish)
+        self.ui_manager.update_status_message(f"{description} 执行中...")
+        return task
+
+    def cancel_actions(self, reason: str, side: Optional[str] = None) -> bool:
+        """取消后台动作 (side 为 None 时取消全部，单臂时同时取消双臂协同动作)，返回是否取消了正在进行的动作。"""
+        cancelled = False
+        for executor_side, executor in list(self.action_executors.items()):
+            if side is None or executor_side in (side, 'both'):
+                cancelled = executor.cancel(reason) or cancelled
+        if cancelled:
+            print(f"已取消后台动作: {reason}")
+        return cancelled
+
+    def is_action_running(self, side: Optional[str] = None) -> bool:
+        return any(executor.is_busy() for executor_side, executor in self.action_executors.items()
+                   if side is None or executor_side == side)
+
+    def get_action_task(self, side: str) -> Optional[ActionTask]:
+        """该臂最近的后台动作 (界面显示用)。"""
+        executor = self.action_executors.get(side)
+        return executor.latest() if executor else None
+
+    def _preempt_actions_from_input(self, snapshot: Optional[JoystickSnapshot], speed_left_cmd: np.ndarray,
+                                    speed_right_cmd: np.ndarray):
+        """遥操作输入抢占后台动作: 摇杆偏离中位取消两臂动作，某臂有移动指令时取消该臂动作。"""
+        if snapshot is None: return
+        for axis in self.action_cancel_axes:
+            if axis < len(snapshot.axes) and abs(snapshot.axes[axis]) > self.action_cancel_threshold:
+                self.cancel_actions(f"摇杆输入 (轴{axis})")
+                return
+        if np.any(speed_left_cmd): self.cancel_actions("左臂移动输入", 'left')
+        if np.any(speed_right_cmd): self.cancel_actions("右臂移动输入", 'right')
+
+    def attempt_reset_both_arms_rpy(self, pose_name: str):
+        """双臂同时设置到 reset_rpy_poses 中的 left_<pose_name> / right_<pose_name>，两臂并行运动。"""
+        description = f"双臂{pose_name} RPY设置"
+        if not (self.left_init_ok and self.controller_left and self.right_init_ok and self.controller_right):
+            msg = f"{description}失败: 双臂未全部初始化"
+            print(msg)
+            self.ui_manager.play_sound('action_fail_general')
+            self.ui_manager.update_status_message(msg)
+            return
+        arms = []
+        for side, controller, desire_func, move_func_name in (
+                ('left', self.controller_left, desire_left_pose, 'moveByJoint'),
+                ('right', self.controller_right, desire_right_pose, 'moveByJoint_right')):
+            target_rpy = self.reset_rpy_poses_config.get(f"{side}_{pose_name}")
+            if target_rpy is None:
+                msg = f"{description}失败: '{side}_{pose_name}' RPY姿态定义无效或缺失"
+                print(msg)
+                self.ui_manager.play_sound('action_fail_general')
+                self.ui_manager.update_status_message(msg)
+                return
+            arms.append((controller, side.capitalize() + "臂", target_rpy, desire_func, move_func_name))
+        self.submit_arm_action('both', description, run_dual_reset_action, arms, self.reset_rpy_speed,
+                               self.reset_time_scaling, success_sound='action_success_general',
+                               fail_sound='action_fail_general')
+
     # Original attempt_reset_arm methods (for full joint/pose resets if still needed)
     def attempt_reset_left_arm(self):
         if not self.left_init_ok or not self.controller_left:  # Added controller_left check
@@ -592,11 +1055,9 @@ class DualArmController:
             self.ui_manager.play_sound('left_reset_fail');
             self.ui_manager.update_status_message(msg)
             return
-        self.ui_manager.update_status_message("左臂回正中...")
-        success = attempt_reset_arm(self.controller_left, "左臂", config.TARGET_RESET_RPY_LEFT,
-                                    self.reset_speed, desire_left_pose, 'move_robot',  # Ensure 'move_robot' is correct
-                                    self.ui_manager.play_sound, 'left_reset_success', 'left_reset_fail')
-        self.ui_manager.update_status_message("左臂回正成功" if success else "左臂回正失败")
+        self.submit_arm_action('left', "左臂回正", run_reset_arm_action, self.controller_left, "左臂",
+                               config.TARGET_RESET_RPY_LEFT, self.reset_speed, desire_left_pose, 'move_robot',
+                               success_sound='left_reset_success', fail_sound='left_reset_fail')
 
     def attempt_reset_right_arm(self):
         if not self.right_init_ok or not self.controller_right:  # Added controller_right check
@@ -605,12 +1066,9 @@ class DualArmController:
             self.ui_manager.play_sound('right_reset_fail');
             self.ui_manager.update_status_message(msg)
             return
-        self.ui_manager.update_status_message("右臂回正中...")
-        success = attempt_reset_arm(self.controller_right, "右臂", config.TARGET_RESET_RPY_RIGHT,
-                                    self.reset_speed, desire_right_pose, 'move_right_robot',
-                                    # Ensure 'move_right_robot' is correct
-                                    self.ui_manager.play_sound, 'right_reset_success', 'right_reset_fail')
-        self.ui_manager.update_status_message("右臂回正成功" if success else "右臂回正失败")
+        self.submit_arm_action('right', "右臂回正", run_reset_arm_action, self.controller_right, "右臂",
+                               config.TARGET_RESET_RPY_RIGHT, self.reset_speed, desire_right_pose, 'move_right_robot',
+                               success_sound='right_reset_success', fail_sound='right_reset_fail')
 
     def _attempt_reset_rpy_orientation(self, arm_side: str, pose_key_in_yaml: str,
                                        action_description: str,
@@ -631,15 +1089,13 @@ class DualArmController:
             return
 
         target_rpy_array = self.reset_rpy_poses_config.get(pose_key_in_yaml)
-        if target_rpy_array is None or not isinstance(target_rpy_array, list) or len(target_rpy_array) != 3:
+        if target_rpy_array is None:
             msg = f"{action_description} RPY设置失败: '{pose_key_in_yaml}' RPY姿态定义无效或缺失"
             print(msg)
             if self.ui_manager: self.ui_manager.play_sound(final_fail_sound)
             if self.ui_manager: self.ui_manager.update_status_message(msg)
             return
 
-        self.ui_manager.update_status_message(f"{action_description} RPY设置中 ({target_rpy_array})...")
-
         # 根据手臂选择对应的 desire_pose_func 和 move_func_name
         desire_function_for_arm = desire_left_pose if arm_side == 'left' else desire_right_pose
 
@@ -652,29 +1108,14 @@ class DualArmController:
         arm_name_for_function = arm_side.capitalize() + "臂"
 
         print(
-            f"  调用 attempt_reset_arm 进行RPY设置: arm={arm_name_for_function}, target_rpy={target_rpy_array}, speed={self.reset_rpy_speed}, move_func='{robot_move_method_name}'")
-
-        # 调用您提供的、可工作的 attempt_reset_arm 函数
-        # 注意：如果 attempt_reset_arm 需要 acc 参数，您需要在这里传递 self.reset_rpy_acc
-        # 并确保 attempt_reset_arm 函数定义也接受并使用它。
-        # 假设当前 attempt_reset_arm 的签名与您之前提供的一致（即不强制要求 acc）。
-        success = attempt_reset_arm(
-            controller=robot_controller,
-            arm_name=arm_name_for_function,
-            target_rpy=target_rpy_array,
-            reset_speed=self.reset_rpy_speed,  # 使用为RPY设置的速度
-            desire_pose_func=desire_function_for_arm,
-            move_func_name=robot_move_method_name,  # 使用 'move_left_robot' 或 'move_right_robot'
-            sound_player=self.ui_manager.play_sound if self.ui_manager else None,
-            success_sound=final_success_sound,  # 正确传递处理后的声音key
-            fail_sound=final_fail_sound  # 正确传递处理后的声音key
-        )
+            f"  提交 RPY 设置动作: arm={arm_name_for_function}, target_rpy={target_rpy_array}, speed={self.reset_rpy_speed}, move_func='{robot_move_method_name}'")
 
-        if success:
-            self.ui_manager.update_status_message(f"{action_description} RPY设置成功")
-        else:
-            # attempt_reset_arm 内部会打印失败信息，这里只更新UI
-            self.ui_manager.update_status_message(f"{action_description} RPY设置失败 (详情请查看控制台)")
+        # 运动在后台动作执行器中进行，界面和遥操作不被阻塞；结束时由回调播放提示音并更新状态
+        self.submit_arm_action(arm_side, f"{action_description} RPY设置", run_reset_arm_action,
+                               robot_controller, arm_name_for_function, target_rpy_array,
+                               self.reset_rpy_speed,  # 使用为RPY设置的速度
+                               desire_function_for_arm, robot_move_method_name,
+                               success_sound=final_success_sound, fail_sound=final_fail_sound)
 
     # ... (所有 attempt_reset_left/right_arm_..._rpy 方法保持不变) ...
     def attempt_reset_left_arm_default_rpy(self):
@@ -803,110 +1244,339 @@ class DualArmController:
             success_sound_key='right_reset_success',
             fail_sound_key='right_reset_fail'
         )
-    def _calculate_speed_commands(self) -> Tuple[np.ndarray, np.ndarray]:
-        speed_left_cmd, speed_right_cmd = np.zeros(6), np.zeros(6)
-        if not self.ui_manager.joystick: return speed_left_cmd, speed_right_cmd
-        current_mode_prefix = self.control_mode.lower() + "_"
-        if self.control_mode in [config.MODE_XYZ, config.MODE_RPY]:
-            for action, control_cfg in self.controls_map.items():  # self.controls_map is from YAML via load_and_set_config_variables
-                if not isinstance(control_cfg, dict): continue
-                if action.startswith(current_mode_prefix) and ('_arm' in action):
-                    if self.ui_manager.get_joystick_input_state(
-                            control_cfg):  # get_joystick_input_state uses self.trigger_threshold
-                        target_array = None
-                        if 'left_arm' in action:
-                            target_array = speed_left_cmd
-                        elif 'right_arm' in action:
-                            target_array = speed_right_cmd
-                        else:
-                            continue
-                        axis_idx, base_speed = -1, 0.0
-                        direction = 1.0 if '_pos' in action else -1.0 if '_neg' in action else 1.0
-                        if self.control_mode == config.MODE_XYZ:
-                            if '_x' in action:
-                                axis_idx, base_speed = 0, self.current_speed_xy
-                            elif '_y' in action:
-                                axis_idx, base_speed = 1, self.current_speed_xy
-                            elif '_z' in action:
-                                axis_idx, base_speed = 2, self.current_speed_z
-                        elif self.control_mode == config.MODE_RPY:  # RPY Jogging
-                            if '_roll' in action:
-                                axis_idx, base_speed = 3, self.rpy_speed
-                            elif '_pitch' in action:
-                                axis_idx, base_speed = 4, self.rpy_speed
-                            elif '_yaw' in action:
-                                axis_idx, base_speed = 5, self.rpy_speed
-                        if axis_idx != -1:
-                            if control_cfg.get('type') == 'axis':
-                                try:
-                                    axis_val = self.ui_manager.joystick.get_axis(control_cfg.get('index', -1))
-                                    target_array[axis_idx] = base_speed * abs(axis_val) * direction
-                                except (pygame.error, IndexError):
-                                    target_array[axis_idx] = 0
-                            else:
-                                target_array[axis_idx] = base_speed * direction
-        return speed_left_cmd, speed_right_cmd
+    def _calculate_speed_commands(self, snapshot: Optional[JoystickSnapshot]) -> Tuple[np.ndarray, np.ndarray]:
+        # controls 中的移动绑定在首次使用时编译为 numpy 绑定表，每周期只做一次矩阵乘
+        if self.control_bindings is None:
+            self.control_bindings = ControlBindingTable(self.controls_map, self.trigger_threshold)
+        return self.control_bindings.speed_commands(self.control_mode, snapshot, self._speed_scale())
+
+    def _speed_scale(self) -> Tuple[float, ...]:
+        return (self.current_speed_xy, self.current_speed_xy, self.current_speed_z,
+                self.rpy_speed, self.rpy_speed, self.rpy_speed)
 
     def _apply_transformations(self, speed_left_cmd: np.ndarray, speed_right_cmd: np.ndarray) -> Tuple[
         np.ndarray, np.ndarray]:
-        if R is None: return speed_left_cmd, speed_right_cmd
-        speed_left_final, speed_right_final = np.zeros(6), np.zeros(6)
+        # 安装姿态在首次使用时转换为矩阵，之后每周期只做一次矩阵乘
+        if self.mounting_transforms is None:
+            self.mounting_transforms = MountingTransforms(self.left_mount_rpy, self.right_mount_rpy)
+        return self.mounting_transforms.apply(self.control_mode, speed_left_cmd, speed_right_cmd)
+
+    def _dispatcher_for(self, side: str) -> ArmCommandDispatcher:
+        dispatcher = self.arm_dispatchers.get(side)
+        if dispatcher is None:
+            dispatcher = self.arm_dispatchers[side] = ArmCommandDispatcher(side)
+        return dispatcher
+
+    def _shaper_for(self, side: str) -> CommandShaper:
+        """返回该臂当前模式的指令整形器 (模式切换后重置，保活周期按模式取值)。"""
+        shaper = self.command_shapers.get(side)
+        if shaper is None:
+            shaper = self.command_shapers[side] = CommandShaper(self.command_deadband, 1.0, name=side)
+        if shaper.mode != self.control_mode:
+            shaper.reset(self.control_mode)
+            shaper.keepalive_period = (self.t_interval * self.speedl_keepalive_fraction
+                                       if self.control_mode == config.MODE_XYZ else self.jog_keepalive_period)
+        return shaper
+
+    def _send_robot_commands(self, speed_left_final: np.ndarray,
+                             speed_right_final: np.ndarray) -> Dict[str, Tuple[float, float]]:
+        """两臂指令同时投递给各自的发送线程，然后等待两边返回或到达截止时间。返回本周期各臂的 (发送, 返回) 时间。"""
+        tickets, send_times = [], {}
+        for side, init_ok, controller, speed in (('left', self.left_init_ok, self.controller_left, speed_left_final),
+                                                 ('right', self.right_init_ok, self.controller_right,
+                                                  speed_right_final)):
+            if not (init_ok and controller): continue
+            if self.control_mode not in (config.MODE_XYZ, config.MODE_RPY): continue
+            shaper = self._shaper_for(side)
+            action = shaper.decide(speed)
+            if action not in (ACTION_SEND, ACTION_STOP): continue  # 静止或与上次相同，不发送
+            if isinstance(controller, ArmProxy):  # 工作进程发送: 写入指令槽后立即返回，不等待
+                self._submit_worker_command(controller.worker, action, speed, shaper)
+                continue
+            dispatcher = self._dispatcher_for(side)
+            if self.control_mode == config.MODE_XYZ:
+                # 停止即发送一次零速度 (按正常加速度减速)
+                seq = dispatcher.submit(controller.moveBySpeedl, list(speed), self.acc, self.arot, self.t_interval)
+            elif action == ACTION_STOP:  # RPY Jogging: 松开时显式停止，不再等 jog 超时
+                seq = dispatcher.submit(controller.stop)
+            else:
+                seq = dispatcher.submit(send_jog_command, controller, speed, self.min_speed, self.max_speed)
+            if action == ACTION_STOP: shaper.track_stop(partial(dispatcher.succeeded, seq))  # 确认送达前持续重发
+            tickets.append((side, dispatcher, seq))
+        deadline = time.monotonic() + self.dispatch_deadline
+        for side, dispatcher, seq in tickets:
+            if dispatcher.wait(seq, deadline):
+                done_seq, send_start, send_end = dispatcher.last_send
+                if done_seq == seq: send_times[side] = (send_start, send_end)
+        # Hans 臂在 XYZ 和 RPY 模式下都通过长点动驱动 (驱动内部只在方向变化时发送指令)
+        for side, init_ok, speed in (('left', self.left_init_ok, speed_left_final),
+                                     ('right', self.right_init_ok, speed_right_final)):
+            teleop = self.hans_teleops.get(side)
+            if not (init_ok and teleop): continue
+            send_start = time.monotonic()
+            teleop.update(speed)
+            send_times[side] = (send_start, time.monotonic())
+        return send_times
+
+    def _submit_worker_command(self, worker, action: str, speed: np.ndarray, shaper: CommandShaper) -> int:
+        """按当前模式把 Elibot 速度指令写入工作进程的指令槽 (与 _send_robot_commands 中的调用一一对应)。"""
         if self.control_mode == config.MODE_XYZ:
-            speed_left_final, speed_right_final = speed_left_cmd.copy(), speed_right_cmd.copy()
-            try:
-                rot_left = R.from_euler('xyz', [65, 0, 10], degrees=True).as_matrix(); speed_left_final[
-                                                                                       :3] = speed_left_cmd[
-                                                                                             :3] @ rot_left
-            except Exception as e:
-                print(f"L Transform Err: {e}"); speed_left_final[:3] = 0
-            try:
-                rot_right = R.from_euler('xyz', [65.334, -4.208, -9.079], degrees=True).as_matrix(); speed_right_final[
-                                                                                                     :3] = speed_right_cmd[
-                                                                                                           :3] @ rot_right
-            except Exception as e:
-                print(f"R Transform Err: {e}"); speed_right_final[:3] = 0
-            speed_left_final[3:], speed_right_final[3:] = 0.0, 0.0
-        elif self.control_mode == config.MODE_RPY:  # RPY Jogging
-            speed_left_final[3:], speed_right_final[3:] = speed_left_cmd[3:], speed_right_cmd[3:]
-        return speed_left_final, speed_right_final
+            cmd_id = worker.submit(KIND_SPEEDL, speed, self.acc, self.arot, self.t_interval)
+        elif action == ACTION_STOP:
+            cmd_id = worker.submit(KIND_STOP, speed)
+        else:
+            cmd_id = worker.submit(KIND_JOG, speed, min_speed=self.min_speed, max_speed=self.max_speed)
+        if action == ACTION_STOP: shaper.track_stop(partial(worker.succeeded, cmd_id))
+        return cmd_id
+
+    def _submit_worker_stop(self, name: str):
+        worker = self.arm_fleet.workers[name]
+        if worker.arm.type == 'hans':
+            RemoteTeleop(worker).stop()
+        else:
+            worker.submit(KIND_STOP, np.zeros(6))
 
-    def _send_robot_commands(self, speed_left_final: np.ndarray, speed_right_final: np.ndarray):
-        if self.control_mode == config.MODE_XYZ:
-            if self.left_init_ok and self.controller_left:
-                try:
-                    self.controller_left.moveBySpeedl(list(speed_left_final), self.acc, self.arot, self.t_interval)
-                except Exception as e:
-                    print(f"L Speedl Err: {e}")
-            if self.right_init_ok and self.controller_right:
-                try:
-                    self.controller_right.moveBySpeedl(list(speed_right_final), self.acc, self.arot, self.t_interval)
-                except Exception as e:
-                    print(f"R Speedl Err: {e}")
-        elif self.control_mode == config.MODE_RPY:  # RPY Jogging
-            if self.left_init_ok and self.controller_left: send_jog_command(self.controller_left, speed_left_final,
-                                                                            self.min_speed, self.max_speed)
-            if self.right_init_ok and self.controller_right: send_jog_command(self.controller_right, speed_right_final,
-                                                                              self.min_speed, self.max_speed)
+    def _send_extra_arm_commands(self, snapshot: Optional[JoystickSnapshot]):
+        """
+        left / right 以外的臂 (工作进程模式): 速度来自 controls 中的 <模式>_<臂名>_arm_<分量> 绑定，
+        经该臂的安装变换与指令整形后写入其工作进程 (不等待发送)。
+        """
+        names = self.extra_arm_names
+        if self.extra_arm_bindings is None:
+            self.extra_arm_bindings = ControlBindingTable(self.controls_map, self.trigger_threshold, arms=names)
+        if self.extra_arm_transforms is None:
+            self.extra_arm_transforms = MountingTransforms(*(self.runtime_config.arms[name].mount_rpy for name in names))
+        commands = self.extra_arm_bindings.speed_commands(self.control_mode, snapshot, self._speed_scale())
+        for name, speed in zip(names, self.extra_arm_transforms.apply(self.control_mode, *commands)):
+            worker = self.arm_fleet.workers[name]
+            if worker.arm.type == 'hans':  # 长点动驱动在工作进程中只在方向变化时发送
+                worker.submit(KIND_TELEOP, speed)
+                continue
+            shaper = self._shaper_for(name)
+            action = shaper.decide(speed)
+            if action in (ACTION_SEND, ACTION_STOP): self._submit_worker_command(worker, action, speed, shaper)
+
+    def _control_tick(self):
+        """控制线程的一个周期: 读取最新手柄快照 -> 计算速度 -> 发送指令 -> 发布控制结果。"""
+        with self.control_lock:
+            tick_start = time.monotonic()
+            watchdog = self.loop_watchdog
+            if self._reset_shapers_pending:  # 急停/看门狗已停止机械臂，之后的指令重新发送
+                self._reset_shapers_pending = False
+                for shaper in self.command_shapers.values(): shaper.reset(shaper.mode)
+            snapshot, twist = self.input_snapshot, None
+            if self.live_input is not None:
+                snapshot, twist = self.live_input.latest()  # 超过截止时间的网络输入已为 None
+            if snapshot is not None and snapshot.age() > self.input_stale_timeout:
+                snapshot = None  # 界面线程卡住时不沿用旧输入，按无输入 (速度为 0) 处理
+            if self.gripper_streamers: self._update_analog_grippers(snapshot)
+            if twist is not None:  # 网络 6 自由度速度直接作为速度指令 (限制在最大速度内)
+                speed_left_cmd = np.clip(twist[0], -self.max_speed, self.max_speed)
+                speed_right_cmd = np.clip(twist[1], -self.max_speed, self.max_speed)
+            else:
+                speed_left_cmd, speed_right_cmd = self._calculate_speed_commands(snapshot)
+            if self.action_executors and self.is_action_running():
+                self._preempt_actions_from_input(snapshot, speed_left_cmd, speed_right_cmd)
+            speed_left_final, speed_right_final = self._apply_transformations(speed_left_cmd, speed_right_cmd)
+            compute_end = time.monotonic()
+            send_times = {}
+            if self.control_mode in [config.MODE_XYZ, config.MODE_RPY] and not self.estop_latched:
+                if self.left_init_ok or self.right_init_ok:
+                    send_times = self._send_robot_commands(speed_left_final, speed_right_final)
+                if self.extra_arm_names: self._send_extra_arm_commands(snapshot)
+            send_end = time.monotonic()
+            seq = self.control_state.seq + 1
+            self.control_state = ControlState(speed_left_final, speed_right_final, seq, tick_start)
+            tracer = self.latency_tracer
+            if tracer is not None:
+                tracer.record_tick(seq, snapshot.event_time if snapshot is not None else np.nan, tick_start,
+                                   compute_end, send_times, {'left': speed_left_final, 'right': speed_right_final})
+            if watchdog is not None: watchdog.record_tick(tick_start, compute_end, send_end, time.monotonic())
+
+    def _on_watchdog_trip(self, reason: str):
+        """看门狗线程调用。控制线程可能正卡在阻塞调用中并持有 control_lock，急停路径不获取任何锁。"""
+        self.trigger_emergency_stop(f"控制循环异常: {reason}", latch=False)
 
     def run_main_loop(self):
         if not self.running: print("错误: 控制器未成功设置，无法启动主循环."); return
-        print("\n--- 控制循环开始 (按 ESC 退出) ---")
-        while self.running:
-            self.ui_manager.handle_events()
-            if not self.running: break
-            speed_left_cmd, speed_right_cmd = self._calculate_speed_commands()
-            speed_left_final, speed_right_final = self._apply_transformations(speed_left_cmd, speed_right_cmd)
-            if self.control_mode in [config.MODE_XYZ, config.MODE_RPY]:
-                if self.left_init_ok or self.right_init_ok:
-                    self._send_robot_commands(speed_left_final, speed_right_final)
-            self.ui_manager.status_message = self.status_message  # Ensure UI has the latest controller status
-            self.ui_manager.draw_display(speed_left_final, speed_right_final)
-            self.ui_manager.clock.tick(30)
+        print(f"\n--- 控制循环开始 (按 {'Ctrl+C' if self.headless else 'ESC'} 退出) ---")
+        # 速度计算与指令发送在固定频率的控制线程中进行，主线程只处理事件、采样手柄和绘制界面
+        self.control_thread = FixedRateControlThread(self._control_tick, self.control_rate)
+        if self.latency_trace: self._start_latency_trace()
+        if self.watchdog_miss_limit > 0:
+            self.loop_watchdog = LoopWatchdog(self.control_thread.period, self.watchdog_miss_limit, self._on_watchdog_trip)
+            self.loop_watchdog.start()
+        self.control_thread.start()
+        if self.config_hot_reload: self._start_config_watcher()
+        try:
+            while self.running:
+                frame_start = time.monotonic()
+                self.ui_manager.handle_events()
+                if not self.running: break
+                self.input_snapshot = self.ui_manager.capture_input_snapshot()
+                state = self.control_state
+                self.ui_manager.status_message = self.status_message  # Ensure UI has the latest controller status
+                self.ui_manager.draw_display(state.speed_left, state.speed_right)
+                work_time = time.monotonic() - frame_start
+                frame_ms = self.ui_manager.clock.tick(self.ui_fps)  # 距上一帧的时间 (含限速等待)
+                if self.loop_watchdog is not None: self.loop_watchdog.record_frame(frame_ms / 1000.0, work_time)
+        finally:
+            self._stop_control_thread()
         print("--- 控制循环已终止 ---")
 
+    def _start_latency_trace(self):
+        """创建延迟追踪缓冲区；设置了探测周期时为每个 Elibot 臂建立专用连接轮询 TCP 位姿。"""
+        self.latency_tracer = LatencyTracer()
+        print(f"  延迟追踪已启用，退出时导出到 {self.latency_trace_file}")
+        if self.latency_motion_probe_period <= 0: return
+        for side, init_ok, controller in (('left', self.left_init_ok, self.controller_left),
+                                          ('right', self.right_init_ok, self.controller_right)):
+            if not (init_ok and controller): continue  # Hans 臂不做运动探测
+            probe_client = CPSClient(controller.ip, controller.port)  # 专用连接，不与控制指令争用 socket
+            if not probe_client.connect():
+                print(f"  {side} 运动探测连接失败，延迟追踪不记录实际运动时间")
+                continue
+            self.motion_probes[side] = MotionProbe(side, probe_client.getTCPPose, self.latency_tracer,
+                                                   self.latency_motion_probe_period, probe_client.disconnect)
+            self.motion_probes[side].start()
+
+    def _stop_latency_trace(self):
+        for side, probe in self.motion_probes.items():
+            probe.stop()
+            print(f"  {side} 运动探测: 轮询 {probe.polls}, 运动状态变化 {probe.changes}")
+        self.motion_probes = {}
+        tracer, self.latency_tracer = self.latency_tracer, None
+        if tracer is None or tracer.count == 0: return
+        if tracer.export(self.latency_trace_file):
+            print(f"  延迟追踪 ({tracer.count} 个周期) 已导出到 {self.latency_trace_file} "
+                  f"(chrome://tracing 或 ui.perfetto.dev 打开，python latency_trace.py {self.latency_trace_file} 分析)")
+
+    def _config_watch_paths(self) -> List[str]:
+        return [self.config_path] + [path for side, path in self.calibration_files.items() if side in ('left', 'right')]
+
+    def _start_config_watcher(self):
+        self.config_watcher = FileWatcher(self._config_watch_paths(), self._on_config_files_changed,
+                                          self.config_reload_poll_period)
+        self.config_watcher.start()
+        print(f"  配置热重载已启用 ({self.config_watcher.backend}): 监视 {len(self.config_watcher.paths)} 个文件")
+
+    def _stop_config_watcher(self):
+        if self.config_watcher is None: return
+        self.config_watcher.stop()
+        self.config_watcher = None
+
+    def _on_config_files_changed(self, paths: Set[str]):
+        """监视线程调用: 重新加载后更新监视列表 (标定文件路径可能已修改)。"""
+        print(f"[Config] 检测到文件变化: {', '.join(os.path.basename(path) for path in sorted(paths))}")
+        self.reload_config(paths)
+        if self.config_watcher is not None: self.config_watcher.set_paths(self._config_watch_paths())
+
+    def reload_config(self, changed_files: Optional[Set[str]] = None) -> bool:
+        """
+        重新读取并校验配置文件与标定文件，在控制周期之间替换配置 (不重新连接机械臂、不重新激活夹爪)。
+
+        - 校验失败 (任一文件) 时保留当前配置，不做部分应用；
+        - 只应用与当前配置不同的项，未修改的项保留运行中的值 (例如用按钮调整过的速度)；
+        - RESTART_REQUIRED 中的项 (IP、机器人类型、夹爪、相机、控制频率、输入源等) 只报告，重启后生效。
+        绑定表、安装变换等派生对象在调用线程中预先构建，持有 control_lock 时只做引用替换。
+
+        Args:
+            changed_files: 变化的文件 (绝对路径)；None 表示重新读取所有标定文件。
+        """
+        old = self.runtime_config
+        try:
+            raw = config.load_config(self.config_path)
+            if raw is None: raise ConfigError(self.config_path, "无法读取或解析")
+            new = compile_config(raw)
+            # 标定: 路径修改或文件变化的臂重新读取
+            calibration = dict(self.calibration)
+            calibration_updated = []
+            for side in ('left', 'right'):
+                path = new.setup.calibration_files.get(side)
+                if path is None:
+                    if calibration.pop(side, None) is not None: calibration_updated.append(side)
+                    continue
+                if (changed_files is None or os.path.abspath(path) in changed_files
+                        or path != self.calibration_files.get(side)):
+                    calibration[side] = load_calibration_matrix(path)
+                    calibration_updated.append(side)
+        except ConfigError as e:
+            self.status_message = f"配置重载失败，保留当前配置: {e}"
+            print(f"[Config] {self.status_message}")
+            self.ui_manager.update_status_message(self.status_message)
+            self.ui_manager.play_sound('action_fail_general')
+            return False
+
+        changes = diff_config(old, new) if old is not None else ()
+        deferred = [path for path in changes if path in RESTART_REQUIRED]
+        applied = [path for path in changes if path not in RESTART_REQUIRED]
+        if not applied and not calibration_updated:
+            if not deferred:
+                print("[Config] 配置内容未变化。")
+                return True
+            print(f"[Config] 以下修改需要重新连接或重启后生效，当前未应用: {', '.join(deferred)}")
+            self.status_message = f"配置修改需重启后生效 ({len(deferred)} 项)"
+            self.ui_manager.update_status_message(self.status_message)
+            return True
+
+        # 预先构建派生对象 (控制周期中不再编译)
+        controls_changed = any(path.startswith('controls.') for path in applied) or 'settings.trigger_threshold' in applied
+        bindings = self.control_bindings
+        if controls_changed:
+            bindings = ControlBindingTable(new.controls_map(), new.settings.trigger_threshold)
+            snapshot = self.input_snapshot
+            if snapshot is not None:
+                for mode in MOVEMENT_MODES:
+                    bindings.get(mode, len(snapshot.axes), len(snapshot.buttons), len(snapshot.hats))
+        transforms = self.mounting_transforms
+        if 'setup.left_mount_rpy' in applied or 'setup.right_mount_rpy' in applied:
+            transforms = MountingTransforms(new.setup.left_mount_rpy, new.setup.right_mount_rpy)
+        reset_shapers = any(path in applied for path in ('settings.command_deadband', 'settings.t',
+                                                         'settings.speedl_keepalive_fraction',
+                                                         'settings.jog_keepalive_period'))
+
+        with self.control_lock:  # 控制周期持有该锁: 以下替换发生在两个周期之间
+            config.apply_runtime_config(self, new, changed=set(applied))
+            if controls_changed:
+                self._update_control_attributes()
+                self.control_bindings = bindings
+                self.extra_arm_bindings = None  # 下个周期按新的 controls 重新编译
+            self.mounting_transforms = transforms
+            if reset_shapers: self.command_shapers = {}  # 下个周期按新的死区/保活周期重新创建
+            self.current_speed_xy = min(self.max_speed, max(self.min_speed, self.current_speed_xy))
+            self.current_speed_z = min(self.max_speed, max(self.min_speed, self.current_speed_z))
+            self.calibration = calibration
+            self.config = raw
+            self.runtime_config = keep_values(new, old, deferred) if old is not None else new
+
+        if applied: print(f"[Config] 配置已重载，应用 {len(applied)} 项: {', '.join(applied)}")
+        if calibration_updated: print(f"[Config] 标定已更新: {', '.join(calibration_updated)}")
+        msg = f"配置已重载 ({len(applied) + len(calibration_updated)} 项)"
+        if deferred:
+            print(f"[Config] 以下修改需要重新连接或重启后生效，当前未应用: {', '.join(deferred)}")
+            msg += f"，{len(deferred)} 项需重启后生效"
+        self.status_message = msg
+        self.ui_manager.update_status_message(msg)
+        return True
+
+    def _stop_control_thread(self):
+        self._stop_config_watcher()
+        if self.loop_watchdog is not None:
+            self.loop_watchdog.stop()  # 先停看门狗，控制线程正常退出不会被判为卡住
+            print(f"  控制循环计时: {self.loop_watchdog.stats_text()}")
+            if self.loop_stats_file and self.loop_watchdog.export(self.loop_stats_file):
+                print(f"  控制循环统计已导出到 {self.loop_stats_file}")
+            self.loop_watchdog = None
+        if self.control_thread is None: return
+        self.control_thread.stop()
+        print(f"  控制线程统计: {self.control_thread.stats_text()}")
+        self.control_thread = None
+        self._stop_latency_trace()
+
     def cleanup(self):
         print("\n" + "=" * 10 + " 开始清理和退出 " + "=" * 10)
         self.running = False
+        self._stop_control_thread()
         print("  [Cleanup 1/4] 发送停止运动指令...")
         self.stop_all_movement()
         print("  [Cleanup 2/4] 关闭相机...")
@@ -921,6 +1591,31 @@ class DualArmController:
                         print(f"    关闭相机 '{cam_name}' 时出错: {e_cam_close}")
             self.cameras = {}
         print("  [Cleanup 3/4] 断开机器人连接...")
+        if self.emergency_stop is not None:
+            print(f"    急停快速通道: {self.emergency_stop.stats_text()}")
+            self.emergency_stop.close()
+            self.emergency_stop = None
+        for side, streamer in self.gripper_streamers.items():
+            streamer.close()
+            print(f"    {side} 夹爪位置流: 更新 {streamer.updates}, 发送 {streamer.writes}, "
+                  f"合并 {streamer.coalesced}, 去重跳过 {streamer.skipped}, 失败 {streamer.failed}")
+        self.gripper_streamers = {}
+        for side, worker in self.gripper_workers.items():
+            try:
+                worker.close()
+            except Exception as worker_e:
+                print(f"    关闭 {side} 夹爪指令线程时出错: {worker_e}")
+        self.gripper_workers = {}
+        for side, executor in self.action_executors.items():
+            executor.close()
+            print(f"    {side} 后台动作: {executor.stats_text()}")
+        self.action_executors = {}
+        for side, dispatcher in self.arm_dispatchers.items():
+            dispatcher.close()
+            print(f"    {side} 指令发送线程: {dispatcher.stats_text()}")
+        self.arm_dispatchers = {}
+        for side, shaper in self.command_shapers.items():
+            print(f"    {side} 速度指令整形: {shaper.stats_text()}")
         controllers_to_disconnect = [("左臂", self.controller_left), ("右臂", self.controller_right)]
         for name, controller_obj in controllers_to_disconnect:
             if controller_obj:
@@ -932,6 +1627,29 @@ class DualArmController:
                 self.controller_left = None
             else:
                 self.controller_right = None
+        for side, teleop in self.hans_teleops.items():
+            try:
+                print(f"    停止 Hans {side} 长点动驱动 (统计: {teleop.get_stats()})..."); teleop.close()
+            except Exception as teleop_e:
+                print(f"    停止 Hans {side} 长点动驱动时出错: {teleop_e}")
+        self.hans_teleops = {}
+        for side, box_id in (('left', self.left_hans_box_id), ('right', self.right_hans_box_id)):
+            client = self.hans_clients.get(side)
+            if client:
+                try:
+                    client.HRIF_DisConnect(box_id)
+                except Exception as disconn_e:
+                    print(f"    断开 Hans {side} 连接时出错: {disconn_e}")
+        self.hans_clients = {}
+        if self.arm_fleet is not None:
+            print(f"    机械臂工作进程: {self.arm_fleet.stats_text()}")
+            self.arm_fleet.close()
+            self.arm_fleet = None
+        for side, thread in self.gripper_activation_threads.items():
+            if thread.is_alive():
+                thread.join(timeout=1.0)  # 连接已断开 (工作进程已结束)，激活轮询发现链路关闭后立即返回
+        self.gripper_activation_threads = {}
+        self.extra_arm_names = ()
         self.left_init_ok = False;
         self.right_init_ok = False
         print("  [Cleanup 4/4] 关闭 Pygame...")
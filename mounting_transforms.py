@@ -0,0 +1,123 @@
+# mounting_transforms.py
+# -*- coding: utf-8 -*-
+
+"""
+机械臂安装坐标系变换 (手柄坐标系 -> 各臂基座坐标系)。
+
+安装姿态在 YAML 的 setup.left_mount_rpy / right_mount_rpy 中配置 (xyz 欧拉角，单位度，
+与 scipy Rotation.from_euler('xyz', ...) 的约定相同)，启动时转换一次为 3x3 矩阵，
+再按控制模式组装成 6N x 6N 的块对角矩阵 (N 为臂数，双臂时为 12x12):
+- XYZ 模式: 线速度乘安装旋转 (v @ R)，角速度置 0；
+- RPY 模式: 线速度置 0，角速度原样传递；
+- 其他模式: 全部为 0。
+每个控制周期把各臂指令写入预分配的缓冲区，一次矩阵乘得到各臂最终速度。
+
+等价性检查与基准测试: python mounting_transforms.py
+"""
+
+import time
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+import config
+
+try:
+    from scipy.spatial.transform import Rotation as R
+except ImportError:
+    R = None
+
+
+def euler_xyz_to_matrix(rpy_deg: Sequence[float]) -> np.ndarray:
+    """xyz 外旋欧拉角 (度) 转旋转矩阵，等价于 Rotation.from_euler('xyz', rpy_deg, degrees=True).as_matrix()。"""
+    rx, ry, rz = np.radians(np.asarray(rpy_deg, dtype=float))
+    cx, sx, cy, sy, cz, sz = np.cos(rx), np.sin(rx), np.cos(ry), np.sin(ry), np.cos(rz), np.sin(rz)
+    rot_x = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    rot_y = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    rot_z = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    return rot_z @ rot_y @ rot_x
+
+
+class MountingTransforms:
+    """
+    Args:
+        *arm_rpys (Sequence[float]): 各臂安装姿态 (xyz 欧拉角，度)，依次为左臂、右臂 (及其他臂)。
+    """
+
+    def __init__(self, *arm_rpys: Sequence[float]):
+        self.arm_rpys = tuple(tuple(float(v) for v in rpy) for rpy in arm_rpys)
+        self.rotations = tuple(euler_xyz_to_matrix(rpy) for rpy in self.arm_rpys)
+
+        n = 6 * len(self.rotations)
+        xyz = np.zeros((n, n))
+        rpy = np.zeros((n, n))
+        for i, rot in enumerate(self.rotations):
+            xyz[6 * i:6 * i + 3, 6 * i:6 * i + 3] = rot
+            rpy[6 * i + 3:6 * i + 6, 6 * i + 3:6 * i + 6] = np.eye(3)
+        self._matrices: Dict[str, np.ndarray] = {config.MODE_XYZ: xyz, config.MODE_RPY: rpy}
+        self._zero = np.zeros((n, n))
+        self._stacked = np.zeros(n)  # 预分配的各臂指令缓冲区 (仅在控制线程中使用)
+
+    def apply(self, mode: str, *speed_cmds: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """返回各臂最终速度 (顺序与构造参数相同)。结果是新数组 (可以直接发布给界面和发送线程)。"""
+        stacked = self._stacked
+        for i, speed_cmd in enumerate(speed_cmds):
+            stacked[6 * i:6 * i + 6] = speed_cmd
+        out = stacked @ self._matrices.get(mode, self._zero)
+        if len(speed_cmds) == 2: return out[:6], out[6:]
+        return tuple(out[6 * i:6 * i + 6] for i in range(len(speed_cmds)))
+
+
+# ----------------------------------------------------------------------
+# 等价性检查与基准测试
+# ----------------------------------------------------------------------
+LEGACY_LEFT_RPY = (65, 0, 10)
+LEGACY_RIGHT_RPY = (65.334, -4.208, -9.079)
+
+
+def _legacy_apply_transformations(mode, speed_left_cmd, speed_right_cmd):
+    """旧版 _apply_transformations (每次调用构造 scipy Rotation)，仅用于对比。"""
+    speed_left_final, speed_right_final = np.zeros(6), np.zeros(6)
+    if mode == config.MODE_XYZ:
+        speed_left_final, speed_right_final = speed_left_cmd.copy(), speed_right_cmd.copy()
+        rot_left = R.from_euler('xyz', list(LEGACY_LEFT_RPY), degrees=True).as_matrix()
+        speed_left_final[:3] = speed_left_cmd[:3] @ rot_left
+        rot_right = R.from_euler('xyz', list(LEGACY_RIGHT_RPY), degrees=True).as_matrix()
+        speed_right_final[:3] = speed_right_cmd[:3] @ rot_right
+        speed_left_final[3:], speed_right_final[3:] = 0.0, 0.0
+    elif mode == config.MODE_RPY:
+        speed_left_final[3:], speed_right_final[3:] = speed_left_cmd[3:], speed_right_cmd[3:]
+    return speed_left_final, speed_right_final
+
+
+def self_check(iterations: int = 5000):
+    transforms = MountingTransforms(LEGACY_LEFT_RPY, LEGACY_RIGHT_RPY)
+    rng = np.random.default_rng(0)
+    modes = (config.MODE_XYZ, config.MODE_RPY, config.MODE_VISION, config.MODE_RESET)
+    if R is None:
+        print("未安装 scipy，跳过与旧实现的对比。")
+        return
+    for rpy in (LEGACY_LEFT_RPY, LEGACY_RIGHT_RPY, (0, 0, 0), (-170, 45, 90)):
+        assert np.allclose(euler_xyz_to_matrix(rpy), R.from_euler('xyz', list(rpy), degrees=True).as_matrix())
+    for _ in range(1000):
+        left, right = rng.uniform(-100, 100, 6), rng.uniform(-100, 100, 6)
+        for mode in modes:
+            old_l, old_r = _legacy_apply_transformations(mode, left, right)
+            new_l, new_r = transforms.apply(mode, left, right)
+            assert np.allclose(old_l, new_l) and np.allclose(old_r, new_r), (mode, old_l, new_l, old_r, new_r)
+    print(f"等价性检查通过: 1000 组随机指令 x {len(modes)} 种模式。")
+
+    left, right = rng.uniform(-100, 100, 6), rng.uniform(-100, 100, 6)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        _legacy_apply_transformations(config.MODE_XYZ, left, right)
+    legacy_us = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        transforms.apply(config.MODE_XYZ, left, right)
+    cached_us = (time.perf_counter() - start) / iterations * 1e6
+    print(f"XYZ 模式: 旧实现 {legacy_us:.2f} us/周期, 预计算矩阵 {cached_us:.2f} us/周期 ({legacy_us / cached_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    self_check()
@@ -1,13 +1,18 @@
 import socket
 import json
+import itertools
+import threading
 import time
 import numpy as np
 import ast
 # 假设新的 Gripper 类在这个路径下 (与 CPSClient 在同一目录或已正确安装)
 from elibot.Jodell_gripper import Gripper  # <<< 确保这里的 Gripper 是你修改后的版本
+from elibot.gripper_ops import GripperOpsMixin, TciGripperLink
 from scipy.spatial.transform import Rotation as R
 import traceback  # 导入 traceback 模块
 
+REQUEST_ID_BASE = 1  # 请求 id 从这里递增，单条与批量请求共用，每条请求唯一
+
 
 def desire_left_pose(rpy_array=None):
     # 计算 inv(rpy = (65, 0, 10)) @ rpy = (180, 0, 0)
@@ -35,24 +40,40 @@ def desire_right_pose(rpy_array=None):
     return rpy_angles
 
 
-class CPSClient:
+class CPSClient(GripperOpsMixin):
     """
     此类用于通过TCP/IP控制Elibot机器人，并通过TCI接口与Jodell夹爪通信。
     适配了新的 Gripper 类，该类负责生成Modbus命令的十六进制字符串。
     """
 
-    def __init__(self, ip, port=8055, gripper_slave_id=0x09):
+    def __init__(self, ip, port=8055, gripper_slave_id=0x09, gripper_port=None, gripper_baud_rate=None):
         """
         初始化CPS客户端。
         Args:
             ip (str): 机器人控制器的IP地址。
             port (int): 机器人控制器的端口号 (默认为8055)。
             gripper_slave_id (int): Jodell夹爪的Modbus从站ID (默认为9)。
+            gripper_port (str): 夹爪 RS-485 串口设备 (例如 /dev/ttyUSB0)；None 表示经 TCI 转发。
+            gripper_baud_rate (int): 串口直连时的波特率，None 使用夹爪默认值。
         """
         self.ip = ip
         self.port = port
         self.sock = None
         self.tci_opened = False  # 用于跟踪TCI接口状态
+        self.tci_pipelining = True  # True: tci_transaction 把 flush/send/recv 合并为一次往返
+        self._io_lock = threading.RLock()  # 保证一次请求/回复不被其他线程打断
+        # TCI 事务锁: 主连接与夹爪监视专用连接 (open_aux_connection) 共用，同一时间只有一个事务占用夹爪总线
+        self._tci_lock = threading.RLock()
+        self._rx_buffer = ""  # 未消费的回复数据 (一次 recv 可能包含多条或半条回复)
+        self._json_decoder = json.JSONDecoder()
+        self._request_ids = itertools.count(REQUEST_ID_BASE)
+        self.stale_replies = 0  # 丢弃的过期回复 (之前超时的请求的迟到回复)
+        self.gripper_monitor = None  # 后台夹爪状态监视器 (start_gripper_monitor 创建)
+        if gripper_port:
+            from elibot.serial_gripper import SerialGripperLink
+            self.gripper_link = SerialGripperLink(gripper_port, slave_id=gripper_slave_id, baud_rate=gripper_baud_rate)
+        else:
+            self.gripper_link = TciGripperLink(self)
         # 确保 Gripper 类被正确实例化，并传入slave_id
         try:
             self.gripper = Gripper(slave_id=gripper_slave_id)  # <<< 使用新的 Gripper 类
@@ -70,6 +91,8 @@ class CPSClient:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             # 设置一个超时时间，例如 5 秒
             self.sock.settimeout(5.0)
+            # 关闭 Nagle，小包 JSON-RPC 请求立即发出
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.sock.connect((self.ip, self.port))
             print("机器人连接成功！")
             return True
@@ -86,6 +109,19 @@ class CPSClient:
             self.sock = None
             return False
 
+    def open_aux_connection(self):
+        """
+        建立到同一控制器的另一条 JSON-RPC 连接 (夹爪状态监视等后台轮询使用，不占用本连接的 socket 与 _io_lock)。
+        两条连接的 TCI 事务共用本连接的 _tci_lock。失败时返回 None。
+        """
+        aux = CPSClient(self.ip, self.port, gripper_slave_id=self.gripper.slave_id if self.gripper else 0x09)
+        if not aux.connect():
+            return None
+        aux._tci_lock = self._tci_lock
+        aux.tci_pipelining = self.tci_pipelining
+        aux.tci_opened = True  # TCI 转发由本连接打开 (控制器上的状态与连接无关)
+        return aux
+
     def send_power_on_cmd(self):
         print("发送机器人上电指令...")
         method = "set_robot_power_status"
@@ -279,10 +315,11 @@ class CPSClient:
     def disconnect(self):
         print("--- 开始断开连接 ---")
         if self.sock:
-            # 关闭 TCI 接口（如果打开了）
-            if hasattr(self, 'tci_opened') and self.tci_opened:
-                print("正在关闭 TCI 接口...")
-                self.close_tci()  # 调用关闭 TCI 的方法
+            self.stop_gripper_monitor()
+            # 关闭夹爪链路 (TCI 接口或串口，如果打开了)
+            if self.gripper_link.is_open():
+                print(f"正在关闭夹爪链路 ({self.gripper_link.name})...")
+                self.gripper_link.close()
             print("正在关闭socket连接...")
             try:
                 # 尝试优雅关闭
@@ -291,33 +328,64 @@ class CPSClient:
                 pass  # 可能已经关闭了
             finally:
                 self.sock.close()
+                self._rx_buffer = ""
                 print("Socket连接已关闭。")
                 self.sock = None
         else:
             print("连接已经断开或未建立。")
         print("断开连接流程结束。")
 
-    def sendCMD(self, cmd, params=None, id=1):
-        """向机器人控制器发送JSON-RPC命令。"""
-        if not self.sock:
-            print(f"错误: Socket未连接，无法发送命令 '{cmd}'")
-            return False, "Socket not connected", None
-        if not params:
-            params = {}
-        sendStr = json.dumps({
+    @staticmethod
+    def _encode_request(cmd, params=None, id=1) -> str:
+        return json.dumps({
             "jsonrpc": "2.0",
             "method": cmd,
-            "params": params,
+            "params": params or {},
             "id": id
         }) + "\n"
+
+    def _recv_json(self) -> dict:
+        """从 socket 读取一条完整的 JSON 回复，多余的数据留在缓冲区供下一次读取。"""
+        while True:
+            text = self._rx_buffer.lstrip()
+            if text:
+                try:
+                    jdata, end = self._json_decoder.raw_decode(text)
+                    self._rx_buffer = text[end:]
+                    return jdata
+                except json.JSONDecodeError:
+                    pass  # 回复尚不完整，继续接收
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise socket.error("连接已被控制器关闭")
+            self._rx_buffer = text + chunk.decode('utf-8')
+
+    def _recv_reply(self, ids) -> dict:
+        """
+        读取下一条 id 属于 ids 的回复。id 为 null 的回复 (控制器无法解析请求时的错误) 也返回；
+        其他 id 的回复是之前超时的请求迟到的回复，丢弃。
+        """
+        while True:
+            jdata = self._recv_json()
+            if not isinstance(jdata, dict) or jdata.get("id") is None or jdata.get("id") in ids:
+                return jdata
+            self.stale_replies += 1
+
+    def sendCMD(self, cmd, params=None):
+        """
+        向机器人控制器发送JSON-RPC命令。每条请求使用唯一的 id，
+        之前超时的请求的迟到回复不会被当作本次的回复。
+        """
+        if not self.sock:
+            print(f"错误: Socket未连接，无法发送命令 '{cmd}'")
+            return False, "Socket not connected", None
+        id = next(self._request_ids)
+        sendStr = self._encode_request(cmd, params, id)
         # print(f"发送指令: {sendStr.strip()}") # 调试: 打印发送的 JSON
         try:
-            self.sock.sendall(sendStr.encode('utf-8'))
-            # 增加接收缓冲区大小，以防回复过长
-            ret = self.sock.recv(4096)
-            ret_decoded = ret.decode('utf-8')
-            # print(f"收到原始回复: {ret_decoded}") # 调试: 打印原始回复
-            jdata = json.loads(ret_decoded)
+            with self._io_lock:
+                self.sock.sendall(sendStr.encode('utf-8'))
+                jdata = self._recv_reply((id,))
             # print(f"解析后JSON: {jdata}") # 调试: 打印解析后的 JSON
             if "result" in jdata:
                 return True, jdata["result"], jdata["id"]
@@ -329,20 +397,57 @@ class CPSClient:
                 return False, "Unexpected response format", None
         except socket.timeout:
             print(f"错误: Socket接收指令 '{cmd}' 的回复超时")
-            # self.disconnect() # 可以考虑在这里断开
+            self._rx_buffer = ""  # 丢弃半条回复，避免与后续回复错位
             return False, "Socket recv timed out", None
-        except socket.error as e:
+        except (socket.error, UnicodeDecodeError) as e:
             print(f"错误: Socket在发送/接收指令 '{cmd}' 时出错: {e}")
-            # self.disconnect() # 可以考虑在这里断开
+            self._rx_buffer = ""
             return False, str(e), None
-        except json.JSONDecodeError as e:
-            print(f"错误: 解析指令 '{cmd}' 的JSON回复失败: {ret_decoded}")
-            return False, f"JSON Decode Error: {e}", None
         except Exception as e:
             print(f"错误: 执行 sendCMD 处理指令 '{cmd}' 时发生意外错误:")
             traceback.print_exc()
             return False, str(e), None
 
+    def sendCMD_batch(self, calls):
+        """
+        流水线发送多条 JSON-RPC 命令: 一次 sendall 发出全部请求，再按 id 收齐回复。
+        每条请求使用唯一的 id，只有 id 属于本批的回复计入，之前超时的请求的迟到回复被丢弃。
+        Args:
+            calls (list): [(cmd, params), ...]
+        Returns:
+            list: 与 calls 一一对应的 (success, result)。
+        """
+        if not self.sock:
+            return [(False, "Socket not connected")] * len(calls)
+        ids = [next(self._request_ids) for _ in calls]
+        payload = "".join(self._encode_request(cmd, params, i) for (cmd, params), i in zip(calls, ids))
+        replies = {}
+        try:
+            with self._io_lock:
+                self.sock.sendall(payload.encode('utf-8'))
+                pending = set(ids)
+                while pending:
+                    jdata = self._recv_reply(pending)
+                    reply_id = jdata.get("id") if isinstance(jdata, dict) else None
+                    if reply_id is None:  # 无法对应到某条请求，未收到回复的请求报告失败
+                        print(f"警告: 批量指令 {[c for c, _ in calls]} 收到无 id 的回复: {jdata}")
+                        break
+                    pending.discard(reply_id)
+                    replies[reply_id] = jdata
+        except (socket.timeout, socket.error, UnicodeDecodeError) as e:
+            print(f"错误: 批量发送指令 {[c for c, _ in calls]} 时出错: {e}")
+            self._rx_buffer = ""
+        results = []
+        for (cmd, _), i in zip(calls, ids):
+            jdata = replies.get(i)
+            if jdata is None:
+                results.append((False, "No response"))
+            elif "result" in jdata:
+                results.append((True, jdata["result"]))
+            else:
+                results.append((False, jdata.get("error", "Unexpected response format")))
+        return results
+
     # --- 机器人运动控制方法 (保持不变) ---
     def getJointPos(self):
         # ... (代码保持不变) ...
@@ -466,25 +571,26 @@ class CPSClient:
             print(f"发送 MoveByJoint 指令失败: {err_msg}")
             return False
 
-    def moveBySpeedl(self, speed_l, acc, arot, t, id=-1):
+    def moveBySpeedl(self, speed_l, acc, arot, t):
         # ... (代码保持不变) ...
         # print(f"--- 开始速度控制运动 MoveBySpeedl ---")
         # print(f"速度向量: {speed_l}, 线性加速度: {acc}, 旋转加速度: {arot}, 持续时间: {t}")
         params = {"v": speed_l, "acc": acc, "arot": arot, "t": t}
         # print("发送 MoveBySpeedl 指令...")
-        ret, result, ret_id = self.sendCMD("moveBySpeedl", params, id)
+        ret, result, ret_id = self.sendCMD("moveBySpeedl", params)
         # print(f"MoveBySpeedl 指令回复: ret={ret}, result={result}, id={ret_id}")
         if not ret:
             err_msg = result.get('message', str(result)) if isinstance(result, dict) else str(result)
             print(f"发送 MoveBySpeedl 指令失败: {err_msg}")
         return ret, result, ret_id
 
-    def inverseKinematic(self, targetPose, unit_type=0):
-        # ... (代码保持不变) ...
+    def inverseKinematic(self, targetPose, unit_type=0, referencePos=None):
+        # referencePos: IK 参考关节角，调用方已读取当前关节位置时传入以省去一次查询
         unit_str = "毫米/度" if unit_type == 0 else "米/弧度"
         print(f"--- 开始逆运动学计算 IK ---")
         print(f"目标位姿: {targetPose} ({unit_str})")
-        referencePos = self.getJointPos()
+        if referencePos is None:
+            referencePos = self.getJointPos()
         if referencePos is None:
             print("错误：无法获取当前关节位置作为IK参考！")
             return None
@@ -585,6 +691,28 @@ class CPSClient:
         success, result, req_id = self.sendCMD("jog", params)
         return success, result, req_id
 
+    def stop(self):
+        """
+        停止机器人当前运动 (jog / 速度运动 / 关节运动)。
+
+        JSON-RPC Method: stop
+        """
+        success, result, req_id = self.sendCMD("stop")
+        if not success:
+            print(f"发送 stop 指令失败: {result}")
+        return success, result, req_id
+
+    def getRobotState(self):
+        """
+        获取机器人状态: '0' 停止, '1' 暂停, '2' 急停, '3' 运行, '4' 报警, '5' 碰撞。
+
+        JSON-RPC Method: getRobotState
+        Returns:
+            str | None: 状态字符串，获取失败返回 None。
+        """
+        success, state, _ = self.sendCMD("getRobotState")
+        return state if success else None
+
     def move_robot(self, target_pose, speed=10, block=True):
         # ... (代码保持不变) ...
         print(f"--- 开始 Move Robot (IK + MoveByJoint) ---")
@@ -747,287 +875,62 @@ class CPSClient:
             print(f"关闭 TCI 失败: {err_msg}")
         return suc, result
 
-    # ============================================
-    # == 夹爪控制方法 (适配新的 Gripper 类) ==
-    # ============================================
-
-    def connect_gripper(self) -> bool:
+    def tci_transaction(self, request, expected_len: int = 0, timeout: int = 200, flush: bool = True):
         """
-        连接并激活夹爪。
-        使用 self.gripper 生成命令，通过 TCI 发送/接收。
-        Returns:
-            bool: True 如果连接并激活成功，否则 False。
-        """
-        if not self.gripper:
-            print("夹爪错误: Gripper 类未初始化!")
-            return False
-
-        print("--- 开始连接并激活夹爪 ---")
-        # 1. 打开 TCI 接口
-        suc_open, _ = self.open_tci()
-        if not suc_open:
-            print("连接夹爪失败：无法打开 TCI。")
-            return False
-
-        # 2. 设置 TCI 串口参数 (使用夹爪的默认参数)
-        serial_params = self.gripper.serial_params
-        suc_set, _ = self.set_tci(
-            baud_rate=serial_params.get("baud_rate", 115200),
-            bits=serial_params.get("data_bits", 8),
-            event=serial_params.get("event", "N"),
-            stop=serial_params.get("stop_bits", 1)
-        )
-        if not suc_set:
-            print("连接夹爪失败：无法设置 TCI 参数。")
-            self.close_tci()
-            return False
-
-        # 3. 清空 TCI 缓冲区
-        self.flush_tci()
-        time.sleep(0.1)  # 短暂等待
-
-        try:
-            # --- 4. 发送激活序列 ---
-            # 4.1 发送复位指令 (rACT=0)
-            reset_cmd_hex = self.gripper.activate_request()  # 获取复位命令的 hex 字符串
-            print(f"发送夹爪复位指令 (Hex): {reset_cmd_hex}")
-            suc_send_reset, _ = self.send_tci(reset_cmd_hex, hex_format=1)
-            if not suc_send_reset:
-                print("激活失败：发送复位指令时出错。")
-                self.close_tci()
-                return False
-            time.sleep(0.5)  # 等待夹爪处理复位
-
-            # 4.2 发送使能指令 (rACT=1)
-            enable_cmd_hex = self.gripper.enable_gripper()  # 获取使能命令的 hex 字符串
-            print(f"发送夹爪使能指令 (Hex): {enable_cmd_hex}")
-            suc_send_enable, _ = self.send_tci(enable_cmd_hex, hex_format=1)
-            if not suc_send_enable:
-                print("激活失败：发送使能指令时出错。")
-                self.close_tci()
-                return False
-            time.sleep(0.5)  # 等待夹爪处理使能
-            # (可选) 接收并解码使能响应
-
-            # --- 5. 轮询状态直到激活完成 ---
-            print("等待夹爪激活完成...")
-            start_time = time.time()
-            activation_success = False
-            while time.time() - start_time < 15:  # 15秒超时
-                # read_gripper_state 内部处理了命令生成、发送、接收、解码
-                state_tuple = self._read_and_decode_gripper_state()
-                if state_tuple:
-                    (activate_state, move_state, hand_state, current_position,
-                     error_code, current_speed, current_force) = state_tuple
-
-                    # 检查错误 (忽略激活过程中可能出现的 '需要激活' 错误 0x01 或 0x05?)
-                    # Jodell 手册中 0x01 是需要激活位，0x05 也是类似含义
-                    fault_code_to_check = error_code & ~0x01 & ~0x05  # 忽略01和05错误
-                    if fault_code_to_check != 0:
-                        print(f"激活失败：夹爪报错！错误码: 0x{error_code:02X}")
-                        self.gripper._print_fault_description_cn(error_code)
-                        return False  # 出现严重错误，激活失败
-
-                    # 检查激活状态 (gSTA = 3 表示激活完成)
-                    if activate_state == 3:
-                        print("夹爪激活成功!")
-                        activation_success = True
-                        break
-                    else:
-                        print(f"夹爪仍在激活中 (激活状态码: {activate_state})...")
-                else:
-                    print("读取夹爪状态失败，重试...")
-
-                    # 可以增加连续失败计数器来提前退出
-
-                time.sleep(1)  # 轮询间隔
-
-            if not activation_success:
-                print("夹爪激活超时或失败!")
-                # 尝试读取最后状态
-                final_state = self._read_and_decode_gripper_state()
-                if final_state: print(f"超时前最后读取的状态: {final_state}")
-                self.close_tci()
-                return False
-
-            print("--- 夹爪连接并激活成功 ---")
-            return True
-
-        except Exception as e:
-            print(f"连接或激活夹爪过程中发生意外错误:")
-            traceback.print_exc()
-            self.close_tci()  # 确保关闭 TCI
-            return False
-
-    def _read_and_decode_gripper_state(self, register_count=3) -> tuple | None:
-        """
-        内部方法：生成读取命令，发送，接收，解码，并返回状态元组。
+        一次 TCI 事务: 清空接收缓冲区、发送请求帧、接收 expected_len 字节的回复。
+        tci_pipelining 为 True 时三条 JSON-RPC 请求在一次 sendall 中发出 (一次网络往返)，
+        控制器收到 expected_len 字节即返回，不再使用固定的 sleep 等待。
         Args:
-            register_count (int): 要读取的寄存器数量。
+            request (bytes | str): 请求帧 (bytes 或十六进制字符串)。
+            expected_len (int): 期望的回复字节数；0 表示只发送不接收。
+            timeout (int): 控制器端接收超时 (毫秒)。
+            flush (bool): 发送前是否清空 TCI 接收缓冲区。
         Returns:
-            tuple | None: 解析后的状态元组，或在失败时返回 None。
-        """
-        if not self.gripper or not self.tci_opened:
-            # print("读取状态错误：夹爪未初始化或TCI未打开。") # 减少打印
-            return None
-
-        # 1. 生成读取命令的 Hex 字符串
-        read_cmd_hex = self.gripper.read_gripper_state(register_count)
-
-        # 2. 清空可能存在的旧数据 (可选，但读取前通常不清空)
-        self.flush_tci()
-
-        # 3. 发送读取命令
-        suc_send, _ = self.send_tci(read_cmd_hex, hex_format=1)
-        if not suc_send:
-            print("读取状态失败：发送读取命令时出错。")
-            return None
-        time.sleep(0.05)  # 短暂等待响应
-
-        # 4. 接收响应 (需要估计合适的字节数)
-        # 读取3个寄存器=6字节数据, 响应帧=Addr(1)+FC(1)+ByteCount(1)+Data(6)+CRC(2)=11字节
-        # 设置 count 稍大一些，例如 30
-        expected_len = 1 + 1 + 1 + (register_count * 2) + 2
-        suc_recv, _, size, buf_hex = self.recv_tci(count=expected_len + 10, hex_format=1, timeout=500)
-
-        if not suc_recv or not buf_hex:
-            # print("读取状态失败：接收响应时出错或无数据。") # 减少打印
-            return None
-
-        # 5. 解码响应字符串
-        fc, payload = self.gripper.decode_response(buf_hex)
-
-        # 6. 如果解码成功且功能码正确，则解码状态数据
-        if fc == 0x04 and payload:  # 检查是否为读输入寄存器成功响应
-            state_tuple = self.gripper.decode_state_data(fc, payload)
-            return state_tuple
-        elif fc is not None:  # 收到了响应，但不是预期的 FC04
-            print(f"读取状态错误：收到非预期的功能码 0x{fc:02X}")
-            return None
-        else:  # decode_response 失败 (例如 CRC 错误)
-            print("读取状态错误：解码响应失败。")
-            return None
-
-    def run_gripper(self, target_position: int, force: int = 100, speed: int = 100, wait: bool = True,
-                    timeout: int = 20) -> bool:
+            tuple: (success, response_bytes)。success 表示请求已发送；
+                   超时未收到回复或只发送时 response_bytes 为 b""，发送失败时为 None。
         """
-        控制夹爪移动到指定位置。
-        Args:
-            target_position (int): 目标位置 (0=开, 255=关)。
-            force (int): 目标力 (0-255)。
-            speed (int): 目标速度 (0-255)。
-            wait (bool): 是否阻塞等待运动完成 (默认 True)。
-            timeout (int): 等待运动完成的超时时间 (秒, 默认 20)。
-        Returns:
-            bool: True 如果命令发送成功 (wait=False) 或运动成功完成 (wait=True)。
-        """
-        if not self.gripper:
-            print("夹爪错误: Gripper 类未初始化!")
-            return False
         if not self.tci_opened:
-            print("夹爪错误: TCI 未打开，无法操作。")
-            return False
-        # if not self.is_gripper_activated(): # 需要一个检查激活状态的方法
-        #     print("夹爪错误: 夹爪未激活。")
-        #     return False
-
-        action_desc = "打开" if target_position == 0 else (
-            "关闭" if target_position == 255 else f"移动到 {target_position}")
-        print(f"--- 开始执行夹爪操作: {action_desc} ---")
+            return False, None
+        request_hex = request if isinstance(request, str) else request.hex().upper()
+        calls = []
+        if flush:
+            calls.append(("flush_tci", None))
+        calls.append(("send_tci", {"send_buf": request_hex, "hex": 1}))
+        if expected_len > 0:
+            calls.append(("recv_tci", {"count": expected_len, "hex": 1, "timeout": timeout}))
+
+        with self._tci_lock:
+            if self.tci_pipelining:
+                results = self.sendCMD_batch(calls)
+            else:
+                results = []
+                with self._io_lock:
+                    for cmd, params in calls:
+                        suc, result, _ = self.sendCMD(cmd, params)
+                        results.append((suc, result))
 
+        suc_send, _ = results[1 if flush else 0]
+        if not suc_send:
+            print(f"TCI 事务失败: 发送 {request_hex} 出错。")
+            return False, None
+        if expected_len <= 0:
+            return True, b""
+        suc_recv, result = results[-1]
+        if not suc_recv:
+            return True, b""
         try:
-            # 1. 清空 TCI 缓冲区
-            self.flush_tci()
-            time.sleep(0.1)
-
-            # 2. 生成并发送移动命令
-            move_cmd_hex = self.gripper.run_gripper(target_position, force, speed)
-            print(f"发送夹爪移动指令 (Hex): {move_cmd_hex}")
-            suc_send, _ = self.send_tci(move_cmd_hex, hex_format=1)
-            if not suc_send:
-                print(f"发送夹爪移动指令失败。")
-                return False
-            time.sleep(0.1)  # 等待命令被接收
-
-            # 3. (可选) 接收并解码对移动命令的响应 (通常只是确认)
-            # suc_recv, _, _, buf = self.recv_tci(...)
-            # if suc_recv and buf: self.gripper.decode_response(buf)
-
-            # 4. 如果需要，等待运动完成
-            if wait:
-                print("等待夹爪运动完成...")
-                start_time = time.time()
-                movement_complete = False
-                last_pos = -1
-                while time.time() - start_time < timeout:
-                    state_tuple = self._read_and_decode_gripper_state()
-                    if state_tuple:
-                        (activate_state, move_state, hand_state, current_position,
-                         error_code, current_speed, current_force) = state_tuple
-
-                        if current_position != last_pos:
-                            # print(f"  夹爪移动中: 位置={current_position}, 运动状态(gGTO)={'运动' if move_state else '停止'}, 夹持状态(gOBJ)={hand_state}, 错误=0x{error_code:02X}")
-                            last_pos = current_position
-
-                        # 检查是否有错误
-                        if error_code != 0:
-                            print(f"夹爪运动中报错！错误码: 0x{error_code:02X}")
-                            self.gripper._print_fault_description_cn(error_code)
-                            return False  # 运动失败
-
-                        # 检查是否停止 (gGTO=False)
-                        if not move_state:
-                            print(f"夹爪已停止。当前位置: {current_position}")
-                            # 可以进一步根据 hand_state 判断停止原因
-                            if hand_state == 3:
-                                print("  原因: 到达目标位置 (未检测到物体)")
-                            elif hand_state == 1:
-                                print("  原因: 检测到物体 (内撑模式)")
-                            elif hand_state == 2:
-                                print("  原因: 检测到物体 (外夹模式)")
-                            else:
-                                print(f"  原因: 未知停止状态 (gOBJ={hand_state})")
-                            movement_complete = True
-                            break  # 退出等待循环
-                    else:
-                        print("等待运动完成时读取状态失败，重试...")
-                        # 增加连续失败计数
-
-                    time.sleep(0.3)  # 轮询间隔
-
-                if not movement_complete:
-                    print(f"夹爪运动等待超时 ({timeout}秒)!")
-                    final_state = self._read_and_decode_gripper_state()
-                    if final_state: print(f"超时前最后读取的状态: {final_state}")
-                    return False  # 超时，运动失败
-
-                print(f"--- 夹爪操作 ({action_desc}) 成功完成 ---")
-                return True  # 运动成功完成
-
-            else:  # 非阻塞模式
-                print("移动指令已发送 (非阻塞)。")
-                return True  # 命令发送成功
-
-        except Exception as e:
-            print(f"执行夹爪操作 ({action_desc}) 时发生意外错误:")
-            traceback.print_exc()
-            return False
-
-    def open_gripper(self, speed=200, force=150, wait=False, timeout=10) -> bool:
-        """完全打开夹爪。"""
-        time.sleep(0.1)
-        return self.run_gripper(target_position=0, speed=speed, force=force, wait=wait, timeout=timeout)
-
-    def close_gripper(self, speed=200, force=150, wait=False, timeout=10) -> bool:
-        """完全关闭夹爪。"""
-        time.sleep(0.1)
-
-        return self.run_gripper(target_position=255, speed=speed, force=force, wait=wait, timeout=timeout)
-
-    def read_gripper_state_tuple(self) -> tuple | None:
-        """读取并返回解析后的夹爪状态元组。"""
-        return self._read_and_decode_gripper_state(register_count=3)
+            data = json.loads(result) if isinstance(result, str) else result
+            buf = data.get("buf", "") if isinstance(data, dict) else ""
+            return True, bytes.fromhex(buf)
+        except (json.JSONDecodeError, ValueError):
+            print(f"TCI 事务: 无法解析回复 '{result}'")
+            return True, b""
 
+    # ============================================
+    # == 夹爪控制方法 (适配新的 Gripper 类) ==
+    # ============================================
+    # 夹爪操作 (connect_gripper / run_gripper / open_gripper / close_gripper / 状态读取与监视)
+    # 由 GripperOpsMixin 提供，通过 self.gripper_link 收发帧。
 
 # --- 姿态计算函数 (保持不变) ---
 def desire_left_pose(rpy_array=None):
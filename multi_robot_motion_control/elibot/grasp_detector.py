@@ -0,0 +1,110 @@
+# grasp_detector.py
+# -*- coding: utf-8 -*-
+
+"""
+基于夹爪反馈 (gOBJ 与电流) 的抓取完成检测。
+
+关闭夹爪后不再轮询 gGTO 再固定等待 1 秒，而是订阅 GripperMonitor 的快照:
+- gOBJ 为 1/2 (内撑/外夹检测到物体) 连续 stable_samples 次，视为抓稳；
+- 电流超过 current_threshold 且位置不再变化连续 stable_samples 次，同样视为抓稳
+  (适用于 gOBJ 更新较慢的型号)；
+- gOBJ 为 3 (到达目标位置且未检测到物体) 且位置接近目标，判定为空抓；
+- 故障码非 0，判定为故障。
+检测期间临时提高监视器读取频率，结束后恢复。
+"""
+
+import time
+from concurrent.futures import CancelledError
+from typing import NamedTuple, Optional
+
+from elibot.gripper_monitor import GripperMonitor, GripperSnapshot
+
+GRASP_OBJECT = "object"  # 抓到物体
+GRASP_EMPTY = "empty"  # 空抓
+GRASP_FAULT = "fault"  # 夹爪故障
+GRASP_TIMEOUT = "timeout"  # 超时未判定
+
+DEFAULT_BOOST_RATE = 100.0  # 检测期间的监视器读取频率 (Hz)
+DEFAULT_STABLE_SAMPLES = 2  # 判定抓稳所需的连续样本数
+
+
+class GraspResult(NamedTuple):
+    outcome: str  # GRASP_OBJECT / GRASP_EMPTY / GRASP_FAULT / GRASP_TIMEOUT
+    snapshot: Optional[GripperSnapshot]  # 判定时的快照
+    elapsed: float  # 从开始检测到判定的时间 (秒)
+
+    @property
+    def grasped(self) -> bool:
+        return self.outcome == GRASP_OBJECT
+
+
+class GraspDetector:
+    """
+    Args:
+        monitor (GripperMonitor): 正在运行的夹爪状态监视器。
+        stable_samples (int): 判定抓稳所需的连续样本数。
+        current_threshold (int | None): 电流判定阈值 (0-255)，None 表示只用 gOBJ。
+        boost_rate_hz (float): 检测期间的监视器读取频率。
+        target_position (int): 关闭的目标位置，用于确认空抓 (默认 255 = 完全闭合)。
+        position_tolerance (int): 判定到达目标位置的容差。
+    """
+
+    def __init__(self, monitor: GripperMonitor, stable_samples: int = DEFAULT_STABLE_SAMPLES,
+                 current_threshold: Optional[int] = None, boost_rate_hz: float = DEFAULT_BOOST_RATE,
+                 target_position: int = 255, position_tolerance: int = 5):
+        self.monitor = monitor
+        self.target_position = target_position
+        self.position_tolerance = position_tolerance
+        self.stable_samples = max(1, stable_samples)
+        self.current_threshold = current_threshold
+        self.boost_rate_hz = boost_rate_hz
+
+    def _make_predicate(self, result_box: dict):
+        """返回带状态的判定函数；判定结果写入 result_box['outcome']。"""
+        contact_count = 0
+        last_position = None
+
+        def predicate(snap: GripperSnapshot) -> bool:
+            nonlocal contact_count, last_position
+            if snap.error_code:
+                result_box["outcome"] = GRASP_FAULT
+                return True
+            if snap.hand_state == 3 and abs(snap.position - self.target_position) <= self.position_tolerance:
+                result_box["outcome"] = GRASP_EMPTY
+                return True
+            stalled = last_position is not None and snap.position == last_position
+            last_position = snap.position
+            by_current = (self.current_threshold is not None and snap.current is not None
+                          and snap.current >= self.current_threshold and stalled)
+            if snap.hand_state in (1, 2) or by_current:
+                contact_count += 1
+            else:
+                contact_count = 0
+            if contact_count >= self.stable_samples:
+                result_box["outcome"] = GRASP_OBJECT
+                return True
+            return False
+
+        return predicate
+
+    def wait(self, timeout: float = 5.0, after: Optional[float] = None) -> GraspResult:
+        """
+        阻塞等待抓取判定。
+        Args:
+            timeout (float): 超时 (秒)。
+            after (float): 只考虑该 monotonic 时间之后的快照 (通常为发送关闭指令的时间)。
+        """
+        start = time.monotonic()
+        after = start if after is None else after
+        original_rate = self.monitor.rate_hz
+        self.monitor.set_rate(max(original_rate, self.boost_rate_hz))
+        result_box = {"outcome": GRASP_TIMEOUT}
+        try:
+            future = self.monitor.wait_for(self._make_predicate(result_box), timeout=timeout, after=after)
+            snap = future.result(timeout + 1.0)
+        except (TimeoutError, CancelledError):
+            snap = self.monitor.snapshot
+            result_box["outcome"] = GRASP_TIMEOUT
+        finally:
+            self.monitor.set_rate(original_rate)
+        return GraspResult(result_box["outcome"], snap, time.monotonic() - start)
@@ -0,0 +1,125 @@
+# gripper_command_worker.py
+# -*- coding: utf-8 -*-
+
+"""
+非阻塞的夹爪指令工作线程 (每个夹爪一个)。
+
+调用方 (例如 pygame 事件处理中的 toggle_gripper) 提交目标后立即返回，
+TCI 通信在工作线程中完成。待执行槽位深度为 1，采用"最新优先":
+新目标会替换尚未开始执行的旧目标，被替换的 Future 会被取消。
+执行结果通过 Future (或 submit 时传入的回调) 返回。
+
+以 ready=False 创建时 (夹爪仍在后台激活)，提交的指令先保留在槽位中，
+调用 set_ready() 后才开始执行；激活失败时 close() 会取消排队的指令。
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+
+class GripperCommand:
+    """一条夹爪运动指令。"""
+    __slots__ = ("target_position", "force", "speed", "future")
+
+    def __init__(self, target_position: int, force: int, speed: int, future: Future):
+        self.target_position = target_position
+        self.force = force
+        self.speed = speed
+        self.future = future
+
+
+class GripperCommandWorker:
+    """
+    Args:
+        client: elibot.CPS.CPSClient 实例。
+        name (str): 线程名与日志前缀。
+        ready (bool): 夹爪是否已激活；False 时指令排队直到 set_ready()。
+    """
+
+    def __init__(self, client, name: str = "gripper", ready: bool = True):
+        self.client = client
+        self.name = name
+        self._pending: Optional[GripperCommand] = None  # 深度为 1 的待执行槽位
+        self._cond = threading.Condition()
+        self._closed = False
+        self._ready = ready
+        self.submitted = 0
+        self.replaced = 0
+        self.executed = 0
+        self._thread = threading.Thread(target=self._run, name=f"GripperWorker-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, target_position: int, force: int = 100, speed: int = 100,
+               callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """
+        提交新的目标位置并立即返回。
+        Returns:
+            Future: 结果为 run_gripper 的返回值 (bool)；被更新的指令替换时为 cancelled。
+        """
+        future: Future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        command = GripperCommand(target_position, force, speed, future)
+        with self._cond:
+            if self._closed:
+                future.set_exception(RuntimeError(f"夹爪 {self.name} 指令线程已关闭"))
+                return future
+            replaced, self._pending = self._pending, command
+            self.submitted += 1
+            if replaced is not None:
+                self.replaced += 1
+            self._cond.notify()
+        if replaced is not None:
+            replaced.future.cancel()
+        return future
+
+    def set_ready(self):
+        """夹爪激活完成，开始执行排队的指令。"""
+        with self._cond:
+            self._ready = True
+            self._cond.notify()
+
+    def is_ready(self) -> bool:
+        return self._ready
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def pending(self) -> bool:
+        with self._cond:
+            return self._pending is not None
+
+    def close(self, timeout: float = 2.0):
+        """停止线程；尚未执行的指令被取消，正在执行的指令会完成。"""
+        with self._cond:
+            self._closed = True
+            dropped, self._pending = self._pending, None
+            self._cond.notify()
+        if dropped is not None:
+            dropped.future.cancel()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def _take(self) -> Optional[GripperCommand]:
+        with self._cond:
+            while not self._closed and (self._pending is None or not self._ready):
+                self._cond.wait()
+            command, self._pending = self._pending, None
+            return command
+
+    def _run(self):
+        while True:
+            command = self._take()
+            if command is None:
+                return  # 已关闭
+            if not command.future.set_running_or_notify_cancel():
+                continue
+            try:
+                ok = self.client.run_gripper(command.target_position, force=command.force,
+                                             speed=command.speed, wait=False)
+                command.future.set_result(bool(ok))
+            except Exception as e:
+                print(f"[GripperWorker {self.name}] 执行夹爪指令出错: {e}")
+                command.future.set_exception(e)
+            self.executed += 1
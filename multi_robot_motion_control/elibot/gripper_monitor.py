@@ -0,0 +1,219 @@
+# gripper_monitor.py
+# -*- coding: utf-8 -*-
+
+"""
+Jodell 夹爪后台状态监视器。
+
+监视线程按固定频率读取 0x07D0-0x07D2 状态寄存器，把结果发布为不可变快照
+(GripperSnapshot)。发布只是一次引用替换，读取方 (UI、抓取逻辑、安全检查)
+直接读 monitor.snapshot，不加锁、也不产生 TCI 通信。
+
+需要等待某个条件 (例如运动停止、检测到物体) 时使用 wait_for()，
+它返回一个 concurrent.futures.Future，由监视线程在条件满足或超时时完成。
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, NamedTuple, Optional
+
+DEFAULT_MONITOR_RATE = 20.0  # 默认读取频率 (Hz)
+MAX_MONITOR_RATE = 200.0  # 读取频率上限 (Hz)，受 TCI 往返时间限制
+
+
+class GripperSnapshot(NamedTuple):
+    """一次状态读取的结果 (不可变)。字段顺序前 7 项与旧版状态元组一致。"""
+    activate_state: int  # gSTA: 0=复位, 1=激活中, 3=激活完成
+    move_state: bool  # gGTO
+    hand_state: int  # gOBJ: 0=移动中, 1=内撑接触, 2=外夹接触, 3=到达无物体
+    position: int  # 当前位置回显 (0-255)
+    error_code: int  # 故障代码 (0=无故障)
+    speed: int  # 当前速度回显 (0-255)
+    current: int  # 当前电流 gCU (0-255)
+    timestamp: float  # 发出读取请求的时间 (time.monotonic)
+    seq: int  # 快照序号，每次成功读取 +1
+
+    def as_state_tuple(self) -> tuple:
+        return tuple(self[:7])
+
+
+class _Waiter:
+    __slots__ = ("predicate", "deadline", "after", "future")
+
+    def __init__(self, predicate, deadline, after, future):
+        self.predicate = predicate
+        self.deadline = deadline
+        self.after = after
+        self.future = future
+
+
+class GripperMonitor:
+    """
+    单个夹爪的后台状态监视线程。
+
+    Args:
+        client: elibot.CPS.CPSClient 实例 (TCI 已打开，夹爪已激活)。
+        rate_hz (float): 读取频率 (Hz)。
+        register_count (int): 每次读取的状态寄存器数量 (3 = 0x07D0-0x07D2)。
+        name (str): 线程名与日志前缀。
+        link: 读取使用的夹爪链路 (见 gripper_ops.monitor_link)，None 为 client.gripper_link。
+    """
+
+    def __init__(self, client, rate_hz: float = DEFAULT_MONITOR_RATE, register_count: int = 3,
+                 name: str = "gripper", link=None):
+        self.client = client
+        self.link = link or client.gripper_link
+        self.register_count = register_count
+        self.name = name
+        self.rate_hz = self._clamp_rate(rate_hz)
+
+        self.snapshot: Optional[GripperSnapshot] = None  # 最新快照 (引用替换发布)
+        self.reads_ok = 0
+        self.reads_failed = 0
+        self.consecutive_failures = 0
+
+        self._waiters: List[_Waiter] = []
+        self._waiters_lock = threading.Lock()
+        self._wake_event = threading.Event()  # 修改频率或停止时提前唤醒
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"GripperMonitor-{self.name}", daemon=True)
+        self._thread.start()
+        print(f"[GripperMonitor {self.name}] 已启动 ({self.rate_hz:.0f} Hz)。")
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        with self._waiters_lock:
+            waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.future.done():
+                waiter.future.cancel()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def set_rate(self, rate_hz: float):
+        """修改读取频率，立即生效。"""
+        self.rate_hz = self._clamp_rate(rate_hz)
+        self._wake_event.set()
+
+    # ------------------------------------------------------------------
+    # 读取接口 (不产生通信)
+    # ------------------------------------------------------------------
+    def age(self) -> float:
+        """最新快照距今的秒数，没有快照时返回 inf。"""
+        snap = self.snapshot
+        return time.monotonic() - snap.timestamp if snap else float("inf")
+
+    def is_fresh(self, max_age: float = 0.5) -> bool:
+        return self.age() <= max_age
+
+    def wait_for(self, predicate: Callable[[GripperSnapshot], bool], timeout: Optional[float] = None,
+                 after: Optional[float] = None) -> Future:
+        """
+        等待满足 predicate 的快照。
+        Args:
+            predicate: 接收 GripperSnapshot，返回 True 表示条件满足。
+            timeout (float): 超时秒数，超时后 Future 以 TimeoutError 结束；None 表示不超时。
+            after (float): 只考虑在此 monotonic 时间之后发出读取的快照
+                           (例如发送运动指令的时间，避免用到指令之前的旧状态)。
+        Returns:
+            Future: 结果为满足条件的 GripperSnapshot。
+        """
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        waiter = _Waiter(predicate, deadline, after, future)
+        snap = self.snapshot
+        if snap is not None and self._check_waiter(waiter, snap):
+            return future
+        with self._waiters_lock:
+            self._waiters.append(waiter)
+        return future
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _clamp_rate(rate_hz: float) -> float:
+        return max(0.5, min(MAX_MONITOR_RATE, float(rate_hz)))
+
+    @staticmethod
+    def _check_waiter(waiter: _Waiter, snap: GripperSnapshot) -> bool:
+        """条件满足时完成 Future 并返回 True。"""
+        if waiter.after is not None and snap.timestamp < waiter.after:
+            return False
+        try:
+            matched = waiter.predicate(snap)
+        except Exception as e:
+            waiter.future.set_exception(e)
+            return True
+        if matched:
+            waiter.future.set_result(snap)
+        return matched
+
+    def _service_waiters(self, snap: Optional[GripperSnapshot]):
+        with self._waiters_lock:
+            if not self._waiters:
+                return
+            waiters = self._waiters
+        now = time.monotonic()
+        remaining = []
+        for waiter in waiters:
+            if waiter.future.done():
+                continue
+            if snap is not None and self._check_waiter(waiter, snap):
+                continue
+            if waiter.deadline is not None and now >= waiter.deadline:
+                waiter.future.set_exception(TimeoutError(f"夹爪 {self.name} 等待条件超时"))
+                continue
+            remaining.append(waiter)
+        with self._waiters_lock:
+            # 服务期间新加入的 waiter 保留在列表尾部
+            self._waiters = remaining + self._waiters[len(waiters):]
+
+    def _read_once(self) -> Optional[GripperSnapshot]:
+        request_time = time.monotonic()
+        try:
+            state = self.client._read_and_decode_gripper_state(self.register_count, self.link)
+        except Exception as e:
+            state = None
+            if self.consecutive_failures == 0:
+                print(f"[GripperMonitor {self.name}] 读取状态异常: {e}")
+        if state is None:
+            self.reads_failed += 1
+            self.consecutive_failures += 1
+            return None
+        self.reads_ok += 1
+        self.consecutive_failures = 0
+        prev = self.snapshot
+        return GripperSnapshot(*state, timestamp=request_time, seq=(prev.seq + 1) if prev else 1)
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            snap = self._read_once()
+            if snap is not None:
+                self.snapshot = snap  # 引用替换即发布
+            self._service_waiters(snap)
+
+            next_tick += 1.0 / self.rate_hz
+            delay = next_tick - time.monotonic()
+            if delay <= 0:
+                next_tick = time.monotonic()  # 读取慢于设定频率，重新对齐
+                continue
+            self._wake_event.clear()
+            if self._wake_event.wait(delay):
+                next_tick = time.monotonic()  # 频率被修改或停止，立即进入下一次读取
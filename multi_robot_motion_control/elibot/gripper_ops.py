@@ -0,0 +1,411 @@
+# gripper_ops.py
+# -*- coding: utf-8 -*-
+
+"""
+与传输方式无关的 Jodell 夹爪操作。
+
+GripperOpsMixin 提供 connect_gripper / run_gripper / open_gripper / close_gripper /
+read_gripper_state_tuple 以及状态监视器管理，所有 Modbus 帧通过 self.gripper_link 收发。
+链路对象需实现:
+    name                          -- 日志/线程名
+    open(serial_params) -> bool   -- 打开并配置链路
+    close()
+    is_open() -> bool
+    transaction(frame, expected_len) -> (success, response_bytes)
+        success 表示请求已发送；expected_len 为 0 时只发送不接收，
+        超时未收到回复时 response_bytes 为 b""。
+    send(frame) -> bool
+        最便宜的写路径: 只发送，不清空接收缓冲区、不等待回复
+        (残留的确认帧由下一次 transaction 清掉)。用于连续位置流。
+    monitor_link() -> link
+        后台线程 (激活轮询、状态监视器、位置流) 使用的链路。TCI 为到控制器的独立连接 (TciMonitorLink)，
+        轮询与位置写入不占用运动指令的 socket；串口返回自身。不是自身时由使用方关闭。
+
+TciGripperLink 通过机械臂控制器的 TCI 转发 (elibot.CPS.CPSClient)，
+串口直连见 elibot.serial_gripper.SerialGripperLink。
+"""
+
+import time
+import traceback
+from concurrent.futures import CancelledError
+
+from elibot.gripper_monitor import GripperMonitor, DEFAULT_MONITOR_RATE
+
+ACTIVATION_TIMEOUT = 15.0  # 等待激活完成的超时 (秒)
+RESET_SETTLE_TIMEOUT = 0.5  # 复位后等待 gSTA 回到 0 的最长时间 (秒)
+POLL_INTERVAL_MIN = 0.02  # 激活轮询的初始间隔 (秒)
+POLL_INTERVAL_MAX = 0.25  # 激活轮询的最大间隔 (秒)
+POLL_BACKOFF = 1.5  # 每次轮询后间隔的增长倍数
+
+
+def _activation_fault(error_code: int) -> int:
+    """去掉激活过程中会出现的 '需要激活' 类错误位 (0x01 / 0x05) 后的故障码。"""
+    return error_code & ~0x01 & ~0x05
+
+
+class TciGripperLink:
+    """经 Elibot 控制器 TCI 串口转发的夹爪链路。"""
+
+    def __init__(self, client):
+        self.client = client
+        self.name = f"tci:{client.ip}"
+
+    def open(self, serial_params: dict) -> bool:
+        suc_open, _ = self.client.open_tci()
+        if not suc_open:
+            return False
+        suc_set, _ = self.client.set_tci(
+            baud_rate=serial_params.get("baud_rate", 115200),
+            bits=serial_params.get("data_bits", 8),
+            event=serial_params.get("event", "N"),
+            stop=serial_params.get("stop_bits", 1)
+        )
+        if not suc_set:
+            print("连接夹爪失败：无法设置 TCI 参数。")
+            self.client.close_tci()
+            return False
+        self.client.flush_tci()  # 之后每次事务前 tci_transaction 都会再清空，无需额外等待
+        return True
+
+    def close(self):
+        if self.client.tci_opened:
+            self.client.close_tci()
+
+    def is_open(self) -> bool:
+        return self.client.tci_opened
+
+    def transaction(self, frame: bytes, expected_len: int):
+        return self.client.tci_transaction(frame, expected_len)
+
+    def send(self, frame: bytes) -> bool:
+        # 只有一条 send_tci 请求 (一次 JSON-RPC 往返)
+        suc, _ = self.client.tci_transaction(frame, 0, flush=False)
+        return suc
+
+    def monitor_link(self):
+        connection = self.client.open_aux_connection()
+        if connection is None:
+            print(f"[{self.name}] 无法建立夹爪专用连接，与运动指令共用主连接。")
+            return self
+        return TciMonitorLink(self.client, connection)
+
+
+class TciMonitorLink(TciGripperLink):
+    """
+    夹爪后台线程 (激活轮询、状态监视器、位置流) 专用的 TCI 链路: 到同一控制器的另一条 JSON-RPC 连接。
+    状态轮询 (慢或超时的 recv_tci) 与位置写入不占用主连接的 socket 与 _io_lock，不阻塞速度指令流；
+    两条连接上的 TCI 事务仍由主连接的 _tci_lock 串行化 (共用同一条夹爪串口总线)。
+    """
+
+    def __init__(self, client, connection):
+        super().__init__(connection)
+        self.owner = client
+        self.name = f"tci-monitor:{client.ip}"
+
+    def open(self, serial_params: dict) -> bool:
+        return self.is_open()  # TCI 转发由主连接打开和配置
+
+    def close(self):
+        self.client.tci_opened = False  # 只断开监视连接，不关闭控制器上的 TCI 转发
+        self.client.disconnect()
+
+    def is_open(self) -> bool:
+        return self.owner.tci_opened and self.client.sock is not None
+
+    def transaction(self, frame: bytes, expected_len: int):
+        if not self.owner.tci_opened: return False, None
+        return self.client.tci_transaction(frame, expected_len)
+
+    def send(self, frame: bytes) -> bool:
+        return self.owner.tci_opened and super().send(frame)
+
+    def monitor_link(self):
+        return self
+
+
+class GripperOpsMixin:
+    """
+    夹爪操作混入类。使用方需提供 self.gripper (Jodell_gripper.Gripper)、
+    self.gripper_link (见模块说明) 和 self.gripper_monitor (初始为 None)。
+    """
+
+    def connect_gripper(self, timeout: float = ACTIVATION_TIMEOUT) -> bool:
+        """
+        连接并激活夹爪。
+        使用 self.gripper 生成命令，通过 gripper_link (TCI 或串口) 打开链路；复位、使能与激活轮询
+        经 monitor_link() 收发 (TCI 为到控制器的独立连接)，激活期间不与速度指令争用主连接。
+        夹爪已报告激活完成 (gSTA=3) 时跳过复位/使能；否则发送复位、使能，
+        并以自适应间隔轮询激活状态 (先密后疏)，不再使用固定等待。
+        Args:
+            timeout (float): 等待激活完成的超时 (秒)。
+        Returns:
+            bool: True 如果连接并激活成功，否则 False。
+        """
+        if not self.gripper:
+            print("夹爪错误: Gripper 类未初始化!")
+            return False
+
+        print("--- 开始连接并激活夹爪 ---")
+        # 1-3. 打开通信链路并按夹爪串口参数配置 (TCI: open/setopt/flush; 串口: 打开端口)
+        if not self.gripper_link.open(self.gripper.serial_params):
+            print(f"连接夹爪失败：无法打开通信链路 ({self.gripper_link.name})。")
+            return False
+
+        link = self.gripper_link.monitor_link()
+        try:
+            # --- 4. 已激活则直接使用 (例如程序重启而夹爪未断电) ---
+            state_tuple = self._read_and_decode_gripper_state(link=link)
+            if state_tuple and state_tuple[0] == 3 and _activation_fault(state_tuple[4]) == 0:
+                print("夹爪已处于激活状态 (gSTA=3)，跳过复位/使能。")
+                print("--- 夹爪连接并激活成功 ---")
+                return True
+
+            # --- 5. 发送激活序列 ---
+            # 5.1 发送复位指令 (rACT=0)，等待 gSTA 回到 0 (最多 RESET_SETTLE_TIMEOUT)
+            reset_frame = self.gripper.activate_request_frame()
+            print(f"发送夹爪复位指令 (Hex): {reset_frame.hex().upper()}")
+            suc_send_reset, _ = link.transaction(reset_frame, 0)
+            if not suc_send_reset:
+                print("激活失败：发送复位指令时出错。")
+                self.gripper_link.close()
+                return False
+            self._poll_gripper_state(lambda st: st[0] == 0, RESET_SETTLE_TIMEOUT, link)
+
+            # 5.2 发送使能指令 (rACT=1)
+            enable_frame = self.gripper.enable_gripper_frame()
+            print(f"发送夹爪使能指令 (Hex): {enable_frame.hex().upper()}")
+            suc_send_enable, _ = link.transaction(enable_frame, 0)
+            if not suc_send_enable:
+                print("激活失败：发送使能指令时出错。")
+                self.gripper_link.close()
+                return False
+
+            # --- 6. 自适应轮询直到激活完成 ---
+            print("等待夹爪激活完成...")
+            faults = []
+
+            def activated(st) -> bool:
+                # 忽略激活过程中的 '需要激活' 类错误 (Jodell 手册中 0x01 / 0x05)
+                if _activation_fault(st[4]) != 0:
+                    faults.append(st[4])
+                    return True
+                return st[0] == 3
+
+            state_tuple = self._poll_gripper_state(activated, timeout, link)
+            if faults:
+                print(f"激活失败：夹爪报错！错误码: 0x{faults[-1]:02X}")
+                self.gripper._print_fault_description_cn(faults[-1])
+                return False  # 出现严重错误，激活失败
+
+            if state_tuple is None:
+                print("夹爪激活超时或失败!")
+                # 尝试读取最后状态
+                final_state = self._read_and_decode_gripper_state(link=link)
+                if final_state: print(f"超时前最后读取的状态: {final_state}")
+                self.gripper_link.close()
+                return False
+
+            print("夹爪激活成功!")
+            print("--- 夹爪连接并激活成功 ---")
+            return True
+
+        except Exception as e:
+            print(f"连接或激活夹爪过程中发生意外错误:")
+            traceback.print_exc()
+            self.gripper_link.close()  # 确保关闭链路
+            return False
+        finally:
+            if link is not self.gripper_link: link.close()
+
+    def _poll_gripper_state(self, predicate, timeout: float, link=None) -> tuple | None:
+        """
+        以自适应间隔轮询夹爪状态，直到 predicate(state_tuple) 为 True。
+        间隔从 POLL_INTERVAL_MIN 开始按 POLL_BACKOFF 倍增长到 POLL_INTERVAL_MAX。
+        Returns:
+            tuple | None: 满足条件的状态元组，超时或链路已关闭 (例如程序退出时断开连接) 返回 None。
+        """
+        link = link or self.gripper_link
+        deadline = time.monotonic() + timeout
+        interval = POLL_INTERVAL_MIN
+        last_activate_state = None
+        while True:
+            if not link.is_open():
+                return None
+            state_tuple = self._read_and_decode_gripper_state(link=link)
+            if state_tuple:
+                if predicate(state_tuple):
+                    return state_tuple
+                if state_tuple[0] != last_activate_state:
+                    print(f"夹爪激活状态码: {state_tuple[0]}")
+                    last_activate_state = state_tuple[0]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(interval, remaining))
+            interval = min(POLL_INTERVAL_MAX, interval * POLL_BACKOFF)
+
+    def _read_and_decode_gripper_state(self, register_count=3, link=None) -> tuple | None:
+        """
+        内部方法：生成读取命令，发送，接收，解码，并返回状态元组。
+        Args:
+            register_count (int): 要读取的寄存器数量。
+            link: 使用的链路，None 为 self.gripper_link (监视器传入 monitor_link)。
+        Returns:
+            tuple | None: 解析后的状态元组，或在失败时返回 None。
+        """
+        link = link or self.gripper_link
+        if not self.gripper or not link.is_open():
+            # print("读取状态错误：夹爪未初始化或链路未打开。") # 减少打印
+            return None
+
+        # 一次事务: 清空 + 发送读取命令 + 接收回复
+        # 回复帧 = Addr(1) + FC(1) + ByteCount(1) + Data(2*N) + CRC(2)
+        expected_len = 1 + 1 + 1 + (register_count * 2) + 2
+        suc, response = link.transaction(self.gripper.read_gripper_state_frame(register_count), expected_len)
+        if not suc or not response:
+            # print("读取状态失败：发送/接收出错或无数据。") # 减少打印
+            return None
+
+        # 直接解码为状态记录 (包含长度/地址/功能码/CRC 校验)
+        state = self.gripper.decode_state(response)
+        if state is None:
+            print("读取状态错误：解码响应失败。")
+            return None
+        return state.as_tuple()
+
+    def run_gripper(self, target_position: int, force: int = 100, speed: int = 100, wait: bool = True,
+                    timeout: int = 20) -> bool:
+        """
+        控制夹爪移动到指定位置。
+        Args:
+            target_position (int): 目标位置 (0=开, 255=关)。
+            force (int): 目标力 (0-255)。
+            speed (int): 目标速度 (0-255)。
+            wait (bool): 是否阻塞等待运动完成 (默认 True)。
+            timeout (int): 等待运动完成的超时时间 (秒, 默认 20)。
+        Returns:
+            bool: True 如果命令发送成功 (wait=False) 或运动成功完成 (wait=True)。
+        """
+        if not self.gripper:
+            print("夹爪错误: Gripper 类未初始化!")
+            return False
+        if not self.gripper_link.is_open():
+            print(f"夹爪错误: 通信链路 ({self.gripper_link.name}) 未打开，无法操作。")
+            return False
+        # if not self.is_gripper_activated(): # 需要一个检查激活状态的方法
+        #     print("夹爪错误: 夹爪未激活。")
+        #     return False
+
+        action_desc = "打开" if target_position == 0 else (
+            "关闭" if target_position == 255 else f"移动到 {target_position}")
+        print(f"--- 开始执行夹爪操作: {action_desc} ---")
+
+        try:
+            # 1. 一次事务发送移动命令，并等待 8 字节的 FC10 写确认
+            command_time = time.monotonic()
+            move_frame = self.gripper.run_gripper_frame(target_position, force, speed)
+            suc_send, ack = self.gripper_link.transaction(move_frame, 8)
+            if not suc_send:
+                print(f"发送夹爪移动指令失败。")
+                return False
+            fc, _ = self.gripper.decode_response(ack)
+            if fc != self.gripper.FC_WRITE_MULTIPLE:
+                print(f"警告: 夹爪移动指令未收到有效确认 (回复: {ack.hex().upper() if ack else '无'})")
+
+            # 2. 如果需要，等待运动完成
+            if wait:
+                print("等待夹爪运动完成...")
+                state_tuple = self._wait_gripper_motion_end(timeout, after=command_time)
+                if state_tuple is None:
+                    print(f"夹爪运动等待超时 ({timeout}秒)!")
+                    final_state = self.read_gripper_state_tuple()
+                    if final_state: print(f"超时前最后读取的状态: {final_state}")
+                    return False  # 超时，运动失败
+
+                (activate_state, move_state, hand_state, current_position,
+                 error_code, current_speed, current_force) = state_tuple
+                # 检查是否有错误
+                if error_code != 0:
+                    print(f"夹爪运动中报错！错误码: 0x{error_code:02X}")
+                    self.gripper._print_fault_description_cn(error_code)
+                    return False  # 运动失败
+
+                print(f"夹爪已停止。当前位置: {current_position}")
+                # 可以进一步根据 hand_state 判断停止原因
+                if hand_state == 3:
+                    print("  原因: 到达目标位置 (未检测到物体)")
+                elif hand_state == 1:
+                    print("  原因: 检测到物体 (内撑模式)")
+                elif hand_state == 2:
+                    print("  原因: 检测到物体 (外夹模式)")
+                else:
+                    print(f"  原因: 未知停止状态 (gOBJ={hand_state})")
+                print(f"--- 夹爪操作 ({action_desc}) 成功完成 ---")
+                return True  # 运动成功完成
+
+            else:  # 非阻塞模式
+                print("移动指令已发送 (非阻塞)。")
+                return True  # 命令发送成功
+
+        except Exception as e:
+            print(f"执行夹爪操作 ({action_desc}) 时发生意外错误:")
+            traceback.print_exc()
+            return False
+
+    @staticmethod
+    def _is_motion_end(state) -> bool:
+        """状态元组/快照: 报错或 gGTO 为 False 视为运动结束。"""
+        return state[4] != 0 or not state[1]
+
+    def _wait_gripper_motion_end(self, timeout: float, after: float = None) -> tuple | None:
+        """
+        等待夹爪运动结束，返回结束时的状态元组；超时返回 None。
+        监视器运行时等待其快照 (不产生额外通信)，否则按 0.3 秒间隔轮询。
+        """
+        monitor = self.gripper_monitor
+        if monitor is not None and monitor.is_running():
+            try:
+                snap = monitor.wait_for(self._is_motion_end, timeout=timeout, after=after).result(timeout + 1.0)
+                return snap.as_state_tuple()
+            except (TimeoutError, CancelledError):
+                return None
+
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            state_tuple = self._read_and_decode_gripper_state()
+            if state_tuple:
+                if self._is_motion_end(state_tuple):
+                    return state_tuple
+            else:
+                print("等待运动完成时读取状态失败，重试...")
+            time.sleep(0.3)  # 轮询间隔
+        return None
+
+    def start_gripper_monitor(self, rate_hz: float = DEFAULT_MONITOR_RATE):
+        """启动后台夹爪状态监视器 (需在夹爪激活之后调用)，返回 GripperMonitor。"""
+        if self.gripper_monitor is None:
+            self.gripper_monitor = GripperMonitor(self, rate_hz=rate_hz, name=self.gripper_link.name,
+                                                  link=self.gripper_link.monitor_link())
+        else:
+            self.gripper_monitor.set_rate(rate_hz)
+        self.gripper_monitor.start()
+        return self.gripper_monitor
+
+    def stop_gripper_monitor(self):
+        if self.gripper_monitor is not None:
+            self.gripper_monitor.stop()
+            if self.gripper_monitor.link is not self.gripper_link: self.gripper_monitor.link.close()
+            self.gripper_monitor = None
+
+    def open_gripper(self, speed=200, force=150, wait=False, timeout=10) -> bool:
+        """完全打开夹爪。"""
+        return self.run_gripper(target_position=0, speed=speed, force=force, wait=wait, timeout=timeout)
+
+    def close_gripper(self, speed=200, force=150, wait=False, timeout=10) -> bool:
+        """完全关闭夹爪。"""
+        return self.run_gripper(target_position=255, speed=speed, force=force, wait=wait, timeout=timeout)
+
+    def read_gripper_state_tuple(self) -> tuple | None:
+        """读取并返回解析后的夹爪状态元组。"""
+        return self._read_and_decode_gripper_state(register_count=3)
+
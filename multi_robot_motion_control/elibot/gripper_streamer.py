@@ -0,0 +1,107 @@
+# gripper_streamer.py
+# -*- coding: utf-8 -*-
+
+"""
+夹爪目标位置的连续流式发送 (用于模拟量扳机按比例控制夹爪)。
+
+控制循环每帧调用 set_target() 写入最新目标 (0-255)，只是一次赋值，不会等待通信。
+发送线程按以下规则把目标写给夹爪:
+- 合并: 只发送最新的目标，两次发送之间到达的中间值被丢弃；
+- 限频: 两次发送间隔不小于 1 / rate_hz；
+- 去重: 与上一次发送的位置相差小于 min_step 时不发送。
+写入走链路的 send() (只发送、不等确认)，256 个位置的 Modbus 帧在创建时预先生成。
+TCI 链路下位置流使用到控制器的独立连接 (gripper_link.monitor_link())，每次写入的 JSON-RPC 往返
+不占用运动指令的 socket，不延迟速度指令；close() 时断开该连接。
+"""
+
+import threading
+import time
+from typing import Optional
+
+DEFAULT_STREAM_RATE = 20.0  # 默认最大发送频率 (Hz)
+MAX_STREAM_RATE = 100.0  # 发送频率上限 (Hz)，受 TCI 单次往返时间限制
+
+
+class GripperPositionStreamer:
+    """
+    Args:
+        client: 带 gripper / gripper_link 的夹爪客户端 (CPSClient 或 SerialGripperClient)。
+        rate_hz (float): 最大发送频率 (Hz)。
+        force (int): 流式控制时使用的目标力 (0-255)。
+        speed (int): 流式控制时使用的目标速度 (0-255)。
+        min_step (int): 与上次发送位置的最小差值，小于该值不发送。
+        name (str): 线程名与日志前缀。
+    """
+
+    def __init__(self, client, rate_hz: float = DEFAULT_STREAM_RATE, force: int = 100, speed: int = 255,
+                 min_step: int = 1, name: str = "gripper"):
+        self.client = client
+        self.name = name
+        self.period = 1.0 / max(0.5, min(MAX_STREAM_RATE, float(rate_hz)))
+        self.min_step = max(1, int(min_step))
+        self.link = client.gripper_link.monitor_link()  # 不是 client.gripper_link 时由 close() 关闭
+        # 预先生成全部位置的帧，发送时只做一次下标查找
+        self._frames = tuple(client.gripper.run_gripper_frame(pos, force, speed) for pos in range(256))
+
+        self._target: Optional[int] = None  # 最新目标 (引用替换)
+        self.last_sent: Optional[int] = None
+        self._last_send_time = 0.0
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+
+        self.updates = 0  # set_target 中目标发生变化的次数
+        self.writes = 0
+        self.skipped = 0  # 因与上次发送相同 (差值小于 min_step) 而未发送
+        self.failed = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"GripperStream-{name}", daemon=True)
+        self._thread.start()
+
+    def set_target(self, position: int):
+        """设置最新目标位置 (0-255)，立即返回。"""
+        position = 0 if position < 0 else 255 if position > 255 else int(position)
+        if position == self._target:
+            return
+        self._target = position
+        self.updates += 1
+        self._wake_event.set()
+
+    @property
+    def coalesced(self) -> int:
+        """被更新的目标覆盖而没有发送的中间目标数。"""
+        return max(0, self.updates - self.writes - self.skipped - self.failed)
+
+    def close(self, timeout: float = 1.0):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        if self.link is not self.client.gripper_link: self.link.close()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake_event.wait()
+            if self._stop_event.is_set():
+                return
+            # 限频: 距离上次发送不足一个周期则等待，等待期间到达的目标会覆盖 self._target
+            delay = self._last_send_time + self.period - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                return
+            self._wake_event.clear()  # 在取目标之前清除，之后的 set_target 会再次唤醒
+            target = self._target
+            if target is None:
+                continue
+            if self.last_sent is not None and abs(target - self.last_sent) < self.min_step:
+                self.skipped += 1
+                continue
+            try:
+                ok = self.link.send(self._frames[target])
+            except Exception as e:
+                print(f"[GripperStream {self.name}] 发送目标位置出错: {e}")
+                ok = False
+            self._last_send_time = time.monotonic()
+            if ok:
+                self.last_sent = target
+                self.writes += 1
+            else:
+                self.failed += 1
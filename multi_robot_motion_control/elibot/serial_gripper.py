@@ -0,0 +1,356 @@
+# serial_gripper.py
+# -*- coding: utf-8 -*-
+
+"""
+Jodell 夹爪 RS-485 串口直连 (不经过机械臂控制器的 TCI 转发)。
+
+SerialGripperLink 实现 gripper_ops 中约定的链路接口:
+- 发送前保证 Modbus RTU 帧间静默 (inter_frame_gap，默认按波特率计算的 3.5 字符时间，
+  波特率 > 19200 时按规范取 1.75 ms)；
+- 接收时在字节流中按 "从站地址 + 功能码" 定位帧头，CRC 不通过就丢弃一个字节继续查找
+  (帧重同步)，可以跳过线上的噪声和上一次残留的半帧。
+
+SerialGripperClient 是只有夹爪的客户端，公开方法与 CPSClient 的夹爪方法相同。
+CPSClient(gripper_port=...) 也会使用本链路。
+
+自检/延迟对比 (与同目录模块一样以 elibot 包导入，需在 multi_robot_motion_control 目录下运行):
+    cd multi_robot_motion_control && python -m elibot.serial_gripper [--tci-ip IP]
+用伪终端模拟夹爪测试串口链路，并与 TCI 路径比较状态读取的往返延迟
+(默认 TCI 路径为本机模拟控制器，给出 --tci-ip 时连接真实控制器)。
+"""
+
+import struct
+import threading
+import time
+from typing import Optional, Tuple
+
+try:
+    import serial  # pyserial
+
+    SERIAL_AVAILABLE = True
+except ImportError:
+    serial = None
+    SERIAL_AVAILABLE = False
+
+from elibot.Jodell_gripper import Gripper, crc16_modbus
+from elibot.gripper_ops import GripperOpsMixin
+
+EXCEPTION_FRAME_LEN = 5  # 地址 + 功能码|0x80 + 异常码 + CRC(2)
+
+
+def modbus_inter_frame_gap(baud_rate: int) -> float:
+    """Modbus RTU 帧间静默时间 (秒): 3.5 个字符时间，波特率高于 19200 时固定 1.75 ms。"""
+    if baud_rate > 19200:
+        return 0.00175
+    return 3.5 * 11.0 / baud_rate  # 1 起始位 + 8 数据位 + (校验) + 停止位，按 11 位计
+
+
+class SerialGripperLink:
+    """
+    Args:
+        port (str): 串口设备，例如 /dev/ttyUSB0。
+        slave_id (int): 夹爪从站地址，用于接收时定位帧头。
+        baud_rate (int | None): 波特率，None 时使用 open() 传入的夹爪串口参数。
+        timeout (float): 等待回复的超时 (秒)。
+        inter_frame_gap (float | None): 帧间静默时间 (秒)，None 时按波特率计算。
+    """
+
+    def __init__(self, port: str, slave_id: int = 0x09, baud_rate: Optional[int] = None,
+                 timeout: float = 0.2, inter_frame_gap: Optional[float] = None):
+        self.port = port
+        self.slave_id = slave_id
+        self.baud_rate = baud_rate
+        self.timeout = timeout
+        self.inter_frame_gap = inter_frame_gap
+        self.name = f"serial:{port}"
+        self._serial = None
+        self._lock = threading.RLock()  # 监视线程与指令线程共用一个串口
+        self._last_activity = 0.0  # 最近一次收发结束的时间 (monotonic)
+        self.resync_drops = 0  # 重同步时丢弃的字节数
+
+    def open(self, serial_params: dict) -> bool:
+        if not SERIAL_AVAILABLE:
+            print("错误: 未安装 pyserial，无法使用串口直连夹爪。")
+            return False
+        if self.is_open():
+            return True
+        baud_rate = self.baud_rate or serial_params.get("baud_rate", 115200)
+        parity = {"N": serial.PARITY_NONE, "E": serial.PARITY_EVEN, "O": serial.PARITY_ODD}.get(
+            str(serial_params.get("event", "N")).upper(), serial.PARITY_NONE)
+        try:
+            self._serial = serial.Serial(self.port, baudrate=baud_rate,
+                                         bytesize=serial_params.get("data_bits", 8), parity=parity,
+                                         stopbits=serial_params.get("stop_bits", 1), timeout=0)
+        except (serial.SerialException, OSError) as e:
+            print(f"打开夹爪串口 {self.port} 失败: {e}")
+            self._serial = None
+            return False
+        if self.inter_frame_gap is None:
+            self.inter_frame_gap = modbus_inter_frame_gap(baud_rate)
+        self._serial.reset_input_buffer()
+        print(f"夹爪串口已打开: {self.port} @ {baud_rate} (帧间隔 {self.inter_frame_gap * 1000:.2f} ms)")
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._serial is not None:
+                try:
+                    self._serial.close()
+                except (serial.SerialException, OSError):
+                    pass
+                self._serial = None
+
+    def is_open(self) -> bool:
+        return self._serial is not None and self._serial.is_open
+
+    def transaction(self, frame: bytes, expected_len: int) -> Tuple[bool, Optional[bytes]]:
+        if not self.is_open():
+            return False, None
+        with self._lock:
+            try:
+                gap_left = self._last_activity + self.inter_frame_gap - time.monotonic()
+                if gap_left > 0:
+                    time.sleep(gap_left)
+                self._serial.reset_input_buffer()  # 丢弃上一次事务残留的字节
+                self._serial.write(frame)
+                self._serial.flush()
+                response = b""
+                if expected_len > 0:
+                    response = self._read_frame(frame[1], expected_len, time.monotonic() + self.timeout)
+                self._last_activity = time.monotonic()
+                return True, response
+            except (serial.SerialException, OSError) as e:
+                print(f"夹爪串口事务失败 ({self.port}): {e}")
+                return False, None
+
+    def monitor_link(self):
+        return self  # 串口不承载运动指令，监视器与指令线程共用 (由 _lock 串行化)
+
+    def send(self, frame: bytes) -> bool:
+        if not self.is_open():
+            return False
+        with self._lock:
+            try:
+                gap_left = self._last_activity + self.inter_frame_gap - time.monotonic()
+                if gap_left > 0:
+                    time.sleep(gap_left)
+                self._serial.write(frame)
+                self._serial.flush()
+                self._last_activity = time.monotonic()
+                return True
+            except (serial.SerialException, OSError) as e:
+                print(f"夹爪串口发送失败 ({self.port}): {e}")
+                return False
+
+    def _read_frame(self, function_code: int, expected_len: int, deadline: float) -> bytes:
+        """从字节流中找出一帧完整且 CRC 正确的回复；超时返回 b""。"""
+        buf = bytearray()
+        header_ok = (function_code, function_code | 0x80)
+        while True:
+            # 重同步: 丢弃帧头之前的字节
+            start = 0
+            while start + 1 < len(buf) and not (buf[start] == self.slave_id and buf[start + 1] in header_ok):
+                start += 1
+            if start:
+                self.resync_drops += start
+                del buf[:start]
+            if len(buf) >= 2:
+                frame_len = EXCEPTION_FRAME_LEN if buf[1] & 0x80 else expected_len
+                if len(buf) >= frame_len:
+                    candidate = bytes(buf[:frame_len])
+                    if crc16_modbus(candidate[:-2]) == struct.unpack_from("<H", candidate, frame_len - 2)[0]:
+                        return candidate
+                    self.resync_drops += 1
+                    del buf[0]  # 假帧头，跳过一个字节继续查找
+                    continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return b""
+            chunk = self._serial.read(max(1, self._serial.in_waiting))
+            if chunk:
+                buf += chunk
+            else:
+                time.sleep(min(0.0005, remaining))
+
+
+class SerialGripperClient(GripperOpsMixin):
+    """
+    只通过串口控制夹爪的客户端，方法与 CPSClient 的夹爪方法一致
+    (connect_gripper / run_gripper / open_gripper / close_gripper / read_gripper_state_tuple ...)。
+    """
+
+    def __init__(self, port: str, gripper_slave_id: int = 0x09, baud_rate: Optional[int] = None,
+                 timeout: float = 0.2, inter_frame_gap: Optional[float] = None):
+        self.gripper = Gripper(slave_id=gripper_slave_id)
+        self.gripper_link = SerialGripperLink(port, slave_id=gripper_slave_id, baud_rate=baud_rate,
+                                              timeout=timeout, inter_frame_gap=inter_frame_gap)
+        self.gripper_monitor = None
+
+    def disconnect(self):
+        self.stop_gripper_monitor()
+        self.gripper_link.close()
+
+
+# ----------------------------------------------------------------------
+# 自检与延迟对比 (伪终端模拟夹爪 / 本机模拟 TCI 控制器)
+# ----------------------------------------------------------------------
+class _FakeJodellGripper:
+    """最简夹爪模型: 响应 FC10 写和 FC04 读，位置立即到达目标。"""
+
+    def __init__(self, slave_id=0x09):
+        self.slave_id = slave_id
+        self.position = 0
+        self.activated = False
+
+    def handle(self, frame: bytes) -> bytes:
+        if len(frame) < 4 or frame[0] != self.slave_id or crc16_modbus(frame[:-2]) != struct.unpack("<H", frame[-2:])[0]:
+            return b""
+        if frame[1] == 0x10:
+            address, count = struct.unpack_from(">HH", frame, 2)
+            values = struct.unpack_from(f">{count}H", frame, 7)
+            if address == 0x03E8:
+                self.activated = bool(values[0] & 0x01)
+                if count >= 2:
+                    self.position = values[1] >> 8
+            body = frame[:6]
+        elif frame[1] == 0x04:
+            status = (0xC0 | 0x31) if self.activated else 0x00  # gOBJ=3, gSTA=3, gACT=1
+            body = struct.pack(">BBBHHH", self.slave_id, 0x04, 6, status, self.position << 8, 0x1400)
+        else:
+            return b""
+        return body + struct.pack("<H", crc16_modbus(body))
+
+    def expected_request_len(self, head: bytes) -> int:
+        if head[1] == 0x04:
+            return 8
+        if head[1] == 0x10 and len(head) >= 7:
+            return 9 + head[6]
+        return 0
+
+
+def _serve_pty(master_fd, gripper: _FakeJodellGripper, stop: threading.Event, noise: bytes = b"\x00\xFF\x09"):
+    """在伪终端主端模拟夹爪；每个回复前注入噪声字节以验证重同步。"""
+    import os
+    import select
+    buf = b""
+    while not stop.is_set():
+        ready, _, _ = select.select([master_fd], [], [], 0.05)
+        if not ready:
+            continue
+        try:
+            buf += os.read(master_fd, 256)
+        except OSError:
+            return
+        while len(buf) >= 7:
+            need = gripper.expected_request_len(buf)
+            if need == 0:
+                buf = buf[1:]
+                continue
+            if len(buf) < need:
+                break
+            request, buf = buf[:need], buf[need:]
+            reply = gripper.handle(request)
+            if reply:
+                os.write(master_fd, noise + reply)
+
+
+def _start_fake_tci_controller(gripper: _FakeJodellGripper):
+    """本机模拟 Elibot JSON-RPC 控制器 (只实现 TCI 相关指令)。返回 (host, port)。"""
+    import json
+    import socket
+
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.bind(("127.0.0.1", 0))
+    srv.listen(1)
+
+    def serve():
+        conn, _ = srv.accept()
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        text, pending = "", b""
+        while True:
+            data = conn.recv(4096)
+            if not data:
+                return
+            text += data.decode("utf-8")
+            out = ""
+            while "\n" in text:
+                line, text = text.split("\n", 1)
+                request = json.loads(line)
+                method, result = request["method"], True
+                if method == "send_tci":
+                    pending = gripper.handle(bytes.fromhex(request["params"]["send_buf"]))
+                elif method == "recv_tci":
+                    result = json.dumps({"result": True, "size": len(pending), "buf": pending.hex().upper()})
+                    pending = b""
+                out += json.dumps({"jsonrpc": "2.0", "result": result, "id": request["id"]}) + "\n"
+            if out:
+                conn.sendall(out.encode("utf-8"))
+
+    threading.Thread(target=serve, daemon=True).start()
+    return srv.getsockname()
+
+
+def _measure(client, iterations: int) -> float:
+    """返回状态读取的平均往返时间 (毫秒)。"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if client.read_gripper_state_tuple() is None:
+            raise RuntimeError("读取夹爪状态失败")
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    import argparse
+    import os
+    import sys
+
+    parser = argparse.ArgumentParser(description="夹爪串口链路自检与 TCI 延迟对比")
+    parser.add_argument("--tci-ip", help="真实 Elibot 控制器 IP (默认使用本机模拟控制器)")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    if not SERIAL_AVAILABLE:
+        print("未安装 pyserial，跳过串口自检。")
+        sys.exit(1)
+
+    # 1. 伪终端自检: 激活、开合、带噪声的重同步
+    master_fd, slave_fd = os.openpty()
+    fake = _FakeJodellGripper()
+    stop = threading.Event()
+    threading.Thread(target=_serve_pty, args=(master_fd, fake, stop), daemon=True).start()
+    client = SerialGripperClient(os.ttyname(slave_fd))
+    assert client.connect_gripper(), "串口激活失败"
+    assert client.close_gripper(wait=True) and client.read_gripper_state_tuple()[3] == 255
+    assert client.open_gripper(wait=True) and client.read_gripper_state_tuple()[3] == 0
+    assert client.gripper_link.resync_drops > 0, "噪声字节应触发重同步"
+    print(f"串口自检通过 (重同步丢弃 {client.gripper_link.resync_drops} 字节)。")
+
+    # 2. 延迟对比
+    serial_ms = _measure(client, args.iterations)
+    from elibot.CPS import CPSClient
+    if args.tci_ip:
+        tci_client = CPSClient(args.tci_ip)
+    else:
+        host, port = _start_fake_tci_controller(_FakeJodellGripper())
+        tci_client = CPSClient(host, port)
+    if not tci_client.connect() or not tci_client.connect_gripper():
+        print("TCI 路径不可用，只输出串口结果。")
+        tci_ms = None
+    else:
+        tci_ms = _measure(tci_client, args.iterations)
+        tci_client.disconnect()
+    print(f"\n状态读取平均往返 ({args.iterations} 次):")
+    print(f"  串口直连 ({client.gripper_link.name}): {serial_ms:.3f} ms")
+    if tci_ms is not None:
+        print(f"  TCI 转发 ({'模拟控制器' if not args.tci_ip else args.tci_ip}): {tci_ms:.3f} ms")
+        if not args.tci_ip:
+            print("  (模拟控制器不包含真实 RS-485 传输与控制器转发时间，仅用于验证流程)")
+    client.disconnect()
+    stop.set()
+    os.close(slave_fd)
+    os.close(master_fd)
+
+
+if __name__ == "__main__":
+    main()
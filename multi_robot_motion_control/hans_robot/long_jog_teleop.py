@@ -0,0 +1,273 @@
+# long_jog_teleop.py
+# -*- coding: utf-8 -*-
+
+"""
+Hans 机械臂的长点动 (LongJog) 遥操作驱动。
+
+手柄控制器每个周期输出一个 6 维速度向量 [vx, vy, vz, wx, wy, wz]，
+Elibot 直接使用 moveBySpeedl，而 Hans 只提供固定速度的长点动:
+HRIF_LongJogL / HRIF_LongJogJ 开始运动后，必须在 500ms 内持续发送
+HRIF_LongMoveEvent，否则运动会停止。
+
+本模块把速度向量映射到单个长点动轴 (取归一化后幅值最大的分量)，
+只在轴/方向变化时发送启停指令，由定时线程负责发送保活，
+输入释放或输入流中断时在一个保活周期内停止。
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple, Dict, Any, Sequence
+
+# Hans 长点动方向编码
+HANS_DIR_NEG = 0
+HANS_DIR_POS = 1
+
+DEFAULT_KEEPALIVE_PERIOD = 0.2  # 保活周期 (秒)，控制器要求 <= 0.5s
+DEFAULT_DEADBAND = 0.05  # 速度分量死区 (归一化后)
+DEFAULT_LINEAR_MAX = 50.0  # 长点动线速度上限 (mm/s)，用于归一化
+DEFAULT_ANGULAR_MAX = 10.0  # 长点动角速度上限 (deg/s)，用于归一化
+OVERRIDE_STEP = 0.05  # 速度倍率量化步长，避免频繁发送 SetOverride
+
+JogTarget = Optional[Tuple[int, int]]  # (轴ID, 方向) 或 None 表示停止
+
+
+class HansLongJogTeleop:
+    """
+    把 6 维速度指令转换为 Hans 长点动指令的遥操作驱动。
+
+    Args:
+        client: hans_robot.CPS.CPSClient 实例 (已连接并使能)。
+        box_id (int): 电箱ID。
+        rbt_id (int): 机器人ID，一般为 0。
+        keepalive_period (float): 保活周期 (秒)。
+        deadband (float): 归一化死区，低于该值视为无输入。
+        linear_max (float): 线速度归一化上限 (mm/s)。
+        angular_max (float): 角速度归一化上限 (deg/s)。
+        joint_space (bool): True 使用 LongJogJ (关节空间)，否则使用 LongJogL (笛卡尔空间)。
+        use_override (bool): 是否用 HRIF_SetOverride 把速度幅值映射为倍率。
+    """
+
+    def __init__(self, client, box_id: int = 0, rbt_id: int = 0,
+                 keepalive_period: float = DEFAULT_KEEPALIVE_PERIOD,
+                 deadband: float = DEFAULT_DEADBAND,
+                 linear_max: float = DEFAULT_LINEAR_MAX,
+                 angular_max: float = DEFAULT_ANGULAR_MAX,
+                 joint_space: bool = False,
+                 use_override: bool = True):
+        if keepalive_period <= 0 or keepalive_period > 0.5:
+            raise ValueError(f"keepalive_period 必须在 (0, 0.5] 秒内: {keepalive_period}")
+        self.client = client
+        self.box_id = box_id
+        self.rbt_id = rbt_id
+        self.keepalive_period = keepalive_period
+        self.deadband = deadband
+        self.linear_max = linear_max
+        self.angular_max = angular_max
+        self.joint_space = joint_space
+        self.use_override = use_override
+
+        # 所有对 client 的调用都经过此锁，Hans 的 sendAndRecv 不是线程安全的
+        self._io_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._switch_lock = threading.Lock()  # 保证启停切换不被保活线程打断
+        self._active: JogTarget = None  # 当前正在运行的长点动
+        self._override: Optional[float] = None  # 最近一次发送的倍率
+        self._last_update_time: float = 0.0  # 最近一次收到输入的时间 (monotonic)
+
+        # 统计
+        self._stats_lock = threading.Lock()
+        self._command_times: deque = deque()  # 最近 1 秒内的指令时间戳
+        self.starts_sent = 0
+        self.stops_sent = 0
+        self.keepalives_sent = 0
+        self.overrides_sent = 0
+        self.updates_received = 0
+        self.errors = 0
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._keepalive_loop, name=f"HansLongJog-{box_id}", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+    def update(self, speed_vector: Sequence[float]):
+        """
+        输入一个周期的 6 维速度指令。只在目标轴/方向改变时发送启停指令。
+        """
+        target, ratio = self._select_target(speed_vector)
+        with self._state_lock:
+            self._last_update_time = time.monotonic()
+            self.updates_received += 1
+        self._apply(target)
+        if target is not None and self.use_override:
+            self._maybe_set_override(ratio)
+
+    def stop(self):
+        """立即停止当前长点动。"""
+        self._apply(None)
+
+    def close(self):
+        """停止运动并结束保活线程。"""
+        self._stop_event.set()
+        self.stop()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
+    def is_moving(self) -> bool:
+        with self._state_lock:
+            return self._active is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """返回指令统计，其中 command_rate_hz 为最近 1 秒的指令发送频率。"""
+        now = time.monotonic()
+        with self._stats_lock:
+            self._trim_command_times(now)
+            rate = float(len(self._command_times))
+            return {
+                "command_rate_hz": rate,
+                "starts": self.starts_sent,
+                "stops": self.stops_sent,
+                "keepalives": self.keepalives_sent,
+                "overrides": self.overrides_sent,
+                "updates": self.updates_received,
+                "errors": self.errors,
+            }
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+    def _select_target(self, speed_vector: Sequence[float]) -> Tuple[JogTarget, float]:
+        """选择归一化幅值最大的分量作为长点动轴，返回 (目标, 归一化幅值)。"""
+        best_axis, best_mag, best_sign = -1, 0.0, 0
+        for axis in range(6):
+            value = float(speed_vector[axis])
+            limit = self.linear_max if axis < 3 else self.angular_max
+            mag = abs(value) / limit if limit > 0 else 0.0
+            if mag > best_mag:
+                best_axis, best_mag, best_sign = axis, mag, (1 if value > 0 else -1)
+        if best_axis < 0 or best_mag < self.deadband:
+            return None, 0.0
+        direction = HANS_DIR_POS if best_sign > 0 else HANS_DIR_NEG
+        return (best_axis, direction), min(1.0, best_mag)
+
+    def _send_jog(self, target: Tuple[int, int], state: int) -> bool:
+        axis, direction = target
+        with self._io_lock:
+            if self.joint_space:
+                ret = self.client.HRIF_LongJogJ(self.box_id, self.rbt_id, axis, direction, state)
+            else:
+                ret = self.client.HRIF_LongJogL(self.box_id, self.rbt_id, axis, direction, state)
+        self._record_command()
+        if ret != 0:
+            with self._stats_lock:
+                self.errors += 1
+            print(f"[HansLongJog] 长点动指令失败: 轴={axis}, 方向={direction}, 状态={state}, 错误码={ret}")
+            return False
+        return True
+
+    def _apply(self, target: JogTarget):
+        """切换到 target；目标未变化时不发送任何指令。"""
+        with self._switch_lock:
+            with self._state_lock:
+                current = self._active
+            if target != current:
+                self._switch(current, target)
+
+    def _switch(self, current: JogTarget, target: JogTarget):
+        """从 current 切换到 target：先关闭旧轴，再开启新轴。"""
+        if current is not None:
+            self._send_jog(current, 0)
+            with self._stats_lock:
+                self.stops_sent += 1
+        started = False
+        if target is not None:
+            started = self._send_jog(target, 1)
+            with self._stats_lock:
+                self.starts_sent += 1
+        with self._state_lock:
+            self._active = target if started else None
+
+    def _maybe_set_override(self, ratio: float):
+        quantized = max(OVERRIDE_STEP, round(ratio / OVERRIDE_STEP) * OVERRIDE_STEP)
+        if self._override is not None and abs(quantized - self._override) < 1e-6:
+            return
+        with self._io_lock:
+            ret = self.client.HRIF_SetOverride(self.box_id, self.rbt_id, quantized)
+        self._record_command()
+        with self._stats_lock:
+            self.overrides_sent += 1
+        if ret == 0:
+            self._override = quantized
+        else:
+            with self._stats_lock:
+                self.errors += 1
+
+    def _keepalive_loop(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            next_tick += self.keepalive_period
+            now = time.monotonic()
+            with self._state_lock:
+                active = self._active
+                stale = now - self._last_update_time > self.keepalive_period
+            if active is not None:
+                if stale:
+                    # 输入流中断 (控制循环卡住或输入已释放但未再调用 update)，在一个周期内停止
+                    print("[HansLongJog] 输入超时，停止长点动。")
+                    self.stop()
+                else:
+                    with self._io_lock:
+                        ret = self.client.HRIF_LongMoveEvent(self.box_id, self.rbt_id)
+                    self._record_command()
+                    with self._stats_lock:
+                        self.keepalives_sent += 1
+                        if ret != 0:
+                            self.errors += 1
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()  # 发生超时，重新对齐
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def _record_command(self):
+        now = time.monotonic()
+        with self._stats_lock:
+            self._command_times.append(now)
+            self._trim_command_times(now)
+
+    def _trim_command_times(self, now: float):
+        while self._command_times and now - self._command_times[0] > 1.0:
+            self._command_times.popleft()
+
+
+if __name__ == "__main__":
+    # 无硬件演示: 用一个记录调用的假客户端观察指令合并与保活
+    class _FakeHansClient:
+        def __init__(self):
+            self.log = []
+
+        def HRIF_LongJogL(self, box, rbt, axis, direction, state):
+            self.log.append(("LongJogL", axis, direction, state)); return 0
+
+        def HRIF_LongJogJ(self, box, rbt, axis, direction, state):
+            self.log.append(("LongJogJ", axis, direction, state)); return 0
+
+        def HRIF_LongMoveEvent(self, box, rbt):
+            self.log.append(("LongMoveEvent",)); return 0
+
+        def HRIF_SetOverride(self, box, rbt, vel):
+            self.log.append(("SetOverride", vel)); return 0
+
+    fake = _FakeHansClient()
+    teleop = HansLongJogTeleop(fake, keepalive_period=0.1)
+    for _ in range(30):  # 30Hz 按住 +X
+        teleop.update([40.0, 0, 0, 0, 0, 0]); time.sleep(1 / 30)
+    for _ in range(15):  # 切换到 -Z
+        teleop.update([0, 0, -30.0, 0, 0, 0]); time.sleep(1 / 30)
+    teleop.update([0] * 6)  # 松开
+    time.sleep(0.3)
+    print(f"统计: {teleop.get_stats()}")
+    print(f"指令序列 (前 10 条): {fake.log[:10]}")
+    teleop.close()
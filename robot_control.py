@@ -3,6 +3,7 @@
 
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from CPS import CPSClient # 确保 CPSClient 在 CPS.py 中
 
 # 导入 config 中的常量或直接在这里定义
@@ -12,6 +13,7 @@ from config import (TARGET_RESET_RPY_LEFT, TARGET_RESET_RPY_RIGHT,
 # 假设 desire_left_pose 和 desire_right_pose 在 CPS.py 中
 
 from CPS import desire_left_pose, desire_right_pose
+from action_executor import run_motion, wait_for_motions
 
 
 
@@ -48,6 +50,38 @@ def initialize_robot(controller, arm_name):
         traceback.print_exc()
         return False
 
+def initialize_hans_robot(client, box_id, ip, port, arm_name, rbt_id=0):
+    """连接并初始化单个 Hans 机器人（连接、上电、启动控制器、使能）"""
+    print(f"\n--- 初始化 {arm_name} (Hans, 电箱ID={box_id}) ---")
+    try:
+        print(f"[{arm_name}] 1/4: 连接 {ip}:{port}...")
+        ret = client.HRIF_Connect(box_id, ip, port)
+        if ret != 0 or not client.HRIF_IsConnected(box_id):
+            raise RuntimeError(f"{arm_name} 连接失败 (错误码: {ret})")
+
+        print(f"[{arm_name}] 2/4: 上电...")
+        ret = client.HRIF_Electrify(box_id)
+        if ret != 0:
+            print(f"警告: {arm_name} 上电返回错误码 {ret} (可能已上电).")
+        time.sleep(0.5)
+
+        print(f"[{arm_name}] 3/4: 启动主站...")
+        ret = client.HRIF_Connect2Controller(box_id)
+        if ret != 0:
+            print(f"警告: {arm_name} 启动主站返回错误码 {ret} (可能已启动).")
+        time.sleep(0.5)
+
+        print(f"[{arm_name}] 4/4: 使能...")
+        ret = client.HRIF_GrpEnable(box_id, rbt_id)
+        if ret != 0:
+            raise RuntimeError(f"{arm_name} 使能失败 (错误码: {ret})")
+        print(f"--- {arm_name} 初始化完成 ---")
+        return True
+    except Exception as e:
+        print(f"错误: 初始化 {arm_name} 时: {e}")
+        traceback.print_exc()
+        return False
+
 def connect_arm_gripper(controller, arm_name):
     """尝试连接并激活单个夹爪"""
     print(f"--- 尝试连接 {arm_name} 夹爪 ---")
@@ -81,31 +115,36 @@ def run_vision_mode():
     # 在这里实现视觉模式的具体逻辑
     pass
 
+def compute_reset_target_pose(controller, arm_name, target_rpy, desire_pose_func):
+    """读取当前 TCP 位姿，仅把姿态部分替换为目标 RPY。失败返回 None。"""
+    current_pose = controller.getTCPPose()
+    if current_pose is None:
+        print(f"错误：无法获取 {arm_name} 当前 TCP 位姿。")
+        return None
+
+    try:
+        rpy_angles = desire_pose_func(rpy_array=target_rpy)
+    except NameError:
+         print(f"错误: 函数 {desire_pose_func.__name__} 未定义!")
+         return None
+    except Exception as e_desire:
+         print(f"错误: 调用 {desire_pose_func.__name__} 时出错: {e_desire}")
+         return None
+
+    target_pose = list(current_pose) # 创建副本
+    target_pose[3:6] = rpy_angles    # 仅修改姿态部分
+    print(f"  {arm_name} 目标位姿 (仅姿态): {target_pose}")
+    return target_pose
+
 def attempt_reset_arm(controller, arm_name, target_rpy, reset_speed, desire_pose_func, move_func_name, sound_player=None, success_sound=None, fail_sound=None):
-    """尝试将指定机械臂回正到目标姿态 (通用函数)"""
+    """尝试将指定机械臂回正到目标姿态 (通用函数，阻塞直到运动结束)"""
     print(f"尝试将 {arm_name} 回正到垂直姿态...")
     try:
-        current_pose = controller.getTCPPose()
-        if current_pose is None:
-            print(f"错误：无法获取 {arm_name} 当前 TCP 位姿。")
+        target_pose = compute_reset_target_pose(controller, arm_name, target_rpy, desire_pose_func)
+        if target_pose is None:
             if sound_player and fail_sound: sound_player(fail_sound)
             return False
 
-        try:
-            rpy_angles = desire_pose_func(rpy_array=target_rpy)
-        except NameError:
-             print(f"错误: 函数 {desire_pose_func.__name__} 未定义!")
-             if sound_player and fail_sound: sound_player(fail_sound)
-             return False
-        except Exception as e_desire:
-             print(f"错误: 调用 {desire_pose_func.__name__} 时出错: {e_desire}")
-             if sound_player and fail_sound: sound_player(fail_sound)
-             return False
-
-        target_pose = list(current_pose) # 创建副本
-        target_pose[3:6] = rpy_angles    # 仅修改姿态部分
-        print(f"  {arm_name} 目标位姿 (仅姿态): {target_pose}")
-
         # 获取移动方法
         move_method = getattr(controller, move_func_name, None)
         if move_method is None:
@@ -136,6 +175,101 @@ def attempt_reset_arm(controller, arm_name, target_rpy, reset_speed, desire_pose
         if sound_player and fail_sound: sound_player(fail_sound)
         return False
 
+def run_reset_arm_action(task, controller, arm_name, target_rpy, reset_speed, desire_pose_func, move_func_name):
+    """
+    attempt_reset_arm 的后台动作版本 (在 ActionExecutor 中运行)。
+    运动以非阻塞方式下发，进度写入 task，取消时立即返回 (机械臂由 on_cancel 停止)。
+    提示音和界面状态由提交方的结束回调负责。
+    """
+    print(f"[动作] 将 {arm_name} 回正到目标姿态 {target_rpy}...")
+    target_pose = compute_reset_target_pose(controller, arm_name, target_rpy, desire_pose_func)
+    if target_pose is None:
+        return False
+    success = run_motion(task, controller, move_func_name, target_pose, reset_speed)
+    print(f"{arm_name} 回正{'成功' if success else '失败'}。")
+    return success
+
+MIN_SCALED_JOINT_SPEED = 1.0 # 时间缩放后较短行程一臂的最低关节速度
+
+def _prepare_joint_reset(controller, arm_name, target_rpy, desire_pose_func):
+    """单臂回正准备 (TCP 位姿 -> 目标位姿 -> IK)，返回 (起始关节, 目标关节)，失败返回 None。"""
+    target_pose = compute_reset_target_pose(controller, arm_name, target_rpy, desire_pose_func)
+    if target_pose is None:
+        return None
+    start_joints = controller.getJointPos()
+    if start_joints is None:
+        print(f"错误：无法获取 {arm_name} 当前关节位置。")
+        return None
+    target_joints = controller.inverseKinematic(target_pose, referencePos=start_joints)
+    if target_joints is None:
+        print(f"错误：{arm_name} 逆运动学计算失败。")
+        return None
+    for idx, (ik_val, pos_val) in enumerate(zip(target_joints, start_joints)):
+        if abs(ik_val - pos_val) > 180:
+            print(f"错误：{arm_name} 第 {idx + 1} 个关节角度差值 {abs(ik_val - pos_val):.2f} 度超过 180 度，取消回正。")
+            return None
+    return start_joints, target_joints
+
+def scale_joint_speeds(joint_deltas, speed, min_speed=MIN_SCALED_JOINT_SPEED):
+    """
+    按各臂最大关节行程缩放关节速度，使各臂大致同时到位:
+    行程最长的一臂使用 speed，其余按行程比例降速 (不低于 min_speed)。
+    忽略加减速段，仅为近似同步。
+    """
+    longest = max(joint_deltas) if joint_deltas else 0.0
+    if longest <= 1e-6:
+        return [speed] * len(joint_deltas)
+    return [max(min_speed, speed * delta / longest) for delta in joint_deltas]
+
+def run_dual_reset_action(task, arms, reset_speed, time_scaled=True):
+    """
+    双臂同时回正 (在 ActionExecutor 中运行)。
+
+    两臂的 TCP 位姿读取和 IK 计算并行进行，两条关节运动指令同时下发，再等待两臂都到位，
+    总耗时约为较慢一臂的运动时间。time_scaled 为 True 时按关节行程缩放速度，使两臂同时到达。
+
+    Args:
+        arms: [(controller, arm_name, target_rpy, desire_pose_func, joint_move_func_name), ...]，
+              joint_move_func_name 为 'moveByJoint' / 'moveByJoint_right'。
+    """
+    names = "、".join(arm[1] for arm in arms)
+    print(f"[动作] {names} 同时回正...")
+    with ThreadPoolExecutor(max_workers=len(arms), thread_name_prefix="DualReset") as pool:
+        plans = list(pool.map(lambda arm: _prepare_joint_reset(arm[0], arm[1], arm[2], arm[3]), arms))
+        if any(plan is None for plan in plans):
+            return False
+        task.check_cancelled()
+
+        deltas = [max(abs(t - s) for s, t in zip(start, target)) for start, target in plans]
+        speeds = scale_joint_speeds(deltas, reset_speed) if time_scaled else [reset_speed] * len(arms)
+        for arm, delta, speed in zip(arms, deltas, speeds):
+            print(f"  {arm[1]} 最大关节行程 {delta:.1f} 度, 关节速度 {speed:.1f}")
+
+        def send(item):
+            (controller, _, _, _, move_func_name), (_, target_joints), speed = item
+            return getattr(controller, move_func_name)(target_joints, speed=speed, block=False)
+
+        sent = list(pool.map(lambda item: _safe_call(send, item), zip(arms, plans, speeds)))
+    if not all(sent) or task.cancelled:
+        for arm, ok in zip(arms, sent):
+            if ok: arm[0].stop()  # 一臂下发失败或已取消时停止已经开始运动的另一臂
+        task.check_cancelled()
+        print(f"{names} 回正失败: 关节运动指令下发失败。")
+        return False
+
+    motions = [(arm[0], start, target) for arm, (start, target) in zip(arms, plans)]
+    success = wait_for_motions(task, motions)
+    print(f"{names} 同时回正{'成功' if success else '失败'}。")
+    return success
+
+def _safe_call(fn, *args):
+    """在线程池中调用，异常时打印并返回 False (例如 moveByJoint 的关节限位检查)。"""
+    try:
+        return fn(*args)
+    except Exception as e:
+        print(f"下发关节运动时出错: {e}")
+        return False
+
 def map_speed_to_jog(speed, min_speed, max_speed):
     """将速度值映射到 Jog 指令所需的百分比 (示例)"""
     # 这个映射关系需要根据你的机器人控制器 API 定义来调整
@@ -0,0 +1,444 @@
+# runtime_config.py
+# -*- coding: utf-8 -*-
+
+"""
+加载时校验并编译 dual_arm_config.yaml。
+
+YAML 在启动时整体校验一次并编译为冻结的 slots dataclass (RuntimeConfig):
+- 未知的配置段 / 键、类型错误、取值越界都抛出 ConfigError，消息带完整路径 (如 settings.max_speed)，
+  拼错的键在启动时即失败，而不是运行中读到默认值；
+- 安装姿态、回正姿态编译为只读 numpy 数组，控制项编译为 ControlConfig (轴控制补全默认阈值)；
+- arms 为机械臂注册表 (名称 -> ArmConfig)。未配置时由 setup 中 left_/right_ 开头的项生成 left 与 right；
+  配置了 left / right 时反过来覆盖 setup 中对应的项，两种写法得到相同的控制器属性；
+- 控制循环只读取 load_and_set_config_variables 从这里设置好的控制器属性和数组，不再逐周期查字典。
+
+热重载 (config_watcher.py) 时用 diff_config 比较新旧配置，RESTART_REQUIRED 中的项需要重新连接设备或
+在启动时创建了线程/资源，只报告不应用。标定文件由 load_calibration_matrix 读取并校验。
+
+校验: python runtime_config.py [配置文件]
+"""
+
+import sys
+import types
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Mapping, Optional, Tuple
+
+import numpy as np
+import yaml
+
+import config
+
+SECTIONS = ('setup', 'arms', 'settings', 'controls', 'reset_rpy_poses', 'audio_files')
+CONTROL_TYPES = ('button', 'axis', 'hat')
+CONTROL_KEYS = ('type', 'index', 'axis', 'direction', 'threshold', 'pose', 'rest', 'full')
+# settings 中与控制器属性名不同的键
+SETTING_ATTRS = {'initial_xy_speed': 'current_speed_xy', 'initial_z_speed': 'current_speed_z', 't': 't_interval'}
+
+
+class ConfigError(ValueError):
+    """配置校验失败。path 为出错项的完整路径 (例如 'settings.max_speed')。"""
+
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path}: {message}")
+        self.path = path
+
+
+def _opt(default: Any, minimum: Optional[float] = None, choices: Optional[tuple] = None, positive: bool = False):
+    """带校验信息的字段 (类型取自注解)。数组和映射默认值为只读对象，经 default_factory 共享。"""
+    metadata = {'minimum': minimum, 'choices': choices, 'positive': positive}
+    if isinstance(default, (np.ndarray, types.MappingProxyType)):
+        return field(default_factory=lambda: default, metadata=metadata)  # 只读，可以共享
+    return field(default=default, metadata=metadata)
+
+
+def _vec3(values) -> np.ndarray:
+    array = np.array(values, dtype=float)
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class SetupConfig:
+    font_path: Optional[str] = _opt(config.DEFAULT_FONT_PATH)
+    left_robot_ip: str = _opt(config.DEFAULT_IP)
+    right_robot_ip: str = _opt(config.DEFAULT_IP)
+    left_robot_type: str = _opt(config.DEFAULT_ROBOT_TYPE, choices=('elibot', 'hans'))
+    right_robot_type: str = _opt(config.DEFAULT_ROBOT_TYPE, choices=('elibot', 'hans'))
+    left_gripper_id: int = _opt(config.DEFAULT_GRIPPER_ID, minimum=0)
+    right_gripper_id: int = _opt(config.DEFAULT_GRIPPER_ID, minimum=0)
+    left_gripper_port: Optional[str] = _opt(None)  # None = 经 TCI 转发
+    right_gripper_port: Optional[str] = _opt(None)
+    left_hans_box_id: int = _opt(0, minimum=0)
+    right_hans_box_id: int = _opt(1, minimum=0)
+    hans_port: int = _opt(config.DEFAULT_HANS_PORT, positive=True)
+    left_mount_rpy: np.ndarray = _opt(_vec3(config.DEFAULT_LEFT_MOUNT_RPY))
+    right_mount_rpy: np.ndarray = _opt(_vec3(config.DEFAULT_RIGHT_MOUNT_RPY))
+    window_width: int = _opt(config.DEFAULT_WINDOW_WIDTH, positive=True)
+    window_height: int = _opt(config.DEFAULT_WINDOW_HEIGHT, positive=True)
+    font_size: int = _opt(config.DEFAULT_FONT_SIZE, positive=True)
+    camera_serials: Mapping[str, str] = _opt(types.MappingProxyType({}))
+    yolo_models: Mapping[str, str] = _opt(types.MappingProxyType({}))
+    calibration_files: Mapping[str, str] = _opt(types.MappingProxyType({}))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ArmConfig:
+    """arms 中的一个机械臂 (settings.arm_processes 为 true 时每个臂一个工作进程)。"""
+    type: str = _opt(config.DEFAULT_ROBOT_TYPE, choices=('elibot', 'hans'))
+    ip: str = _opt(config.DEFAULT_IP)
+    port: Optional[int] = _opt(None)  # None = Elibot 8055 / Hans setup.hans_port
+    gripper_id: int = _opt(config.DEFAULT_GRIPPER_ID, minimum=0)
+    gripper_port: Optional[str] = _opt(None)  # None = 经 TCI 转发
+    hans_box_id: int = _opt(0, minimum=0)
+    mount_rpy: np.ndarray = _opt(_vec3((0.0, 0.0, 0.0)))
+
+
+@dataclass(frozen=True, slots=True)
+class SettingsConfig:
+    initial_xy_speed: float = _opt(config.DEFAULT_XY_SPEED, minimum=0)
+    initial_z_speed: float = _opt(config.DEFAULT_Z_SPEED, minimum=0)
+    rpy_speed: float = _opt(config.DEFAULT_RPY_SPEED, minimum=0)
+    speed_increment: float = _opt(config.DEFAULT_SPEED_INCREMENT, positive=True)
+    min_speed: float = _opt(config.DEFAULT_MIN_SPEED, minimum=0)
+    max_speed: float = _opt(config.DEFAULT_MAX_SPEED, positive=True)
+    acc: float = _opt(config.DEFAULT_ACC, positive=True)
+    arot: float = _opt(config.DEFAULT_AROT, positive=True)
+    t: float = _opt(config.DEFAULT_T, positive=True)
+    trigger_threshold: float = _opt(config.DEFAULT_TRIGGER_THRESHOLD, minimum=0)
+    long_press_duration: float = _opt(config.DEFAULT_LONG_PRESS_DURATION, positive=True)
+    gripper_speed: int = _opt(config.DEFAULT_GRIPPER_SPEED, minimum=0)
+    gripper_force: int = _opt(config.DEFAULT_GRIPPER_FORCE, minimum=0)
+    gripper_monitor_rate: float = _opt(config.DEFAULT_GRIPPER_MONITOR_RATE, minimum=0)
+    gripper_control_mode: str = _opt(config.DEFAULT_GRIPPER_CONTROL_MODE, choices=('toggle', 'analog'))
+    gripper_stream_rate: float = _opt(config.DEFAULT_GRIPPER_STREAM_RATE, positive=True)
+    grasp_current_threshold: int = _opt(config.DEFAULT_GRASP_CURRENT_THRESHOLD, minimum=0)
+    control_rate: float = _opt(config.DEFAULT_CONTROL_RATE, positive=True)
+    ui_fps: int = _opt(config.DEFAULT_UI_FPS, positive=True)
+    input_stale_timeout: float = _opt(config.DEFAULT_INPUT_STALE_TIMEOUT, positive=True)
+    dispatch_deadline: float = _opt(config.DEFAULT_DISPATCH_DEADLINE, positive=True)
+    command_deadband: float = _opt(config.DEFAULT_COMMAND_DEADBAND, minimum=0)
+    speedl_keepalive_fraction: float = _opt(config.DEFAULT_SPEEDL_KEEPALIVE_FRACTION, positive=True)
+    jog_keepalive_period: float = _opt(config.DEFAULT_JOG_KEEPALIVE_PERIOD, positive=True)
+    action_cancel_axes: Tuple[int, ...] = _opt(tuple(config.DEFAULT_ACTION_CANCEL_AXES), minimum=0)
+    action_cancel_threshold: float = _opt(config.DEFAULT_ACTION_CANCEL_THRESHOLD, minimum=0)
+    reset_speed: float = _opt(config.DEFAULT_RESET_SPEED, positive=True)
+    reset_time_scaling: bool = _opt(config.DEFAULT_RESET_TIME_SCALING)
+    reset_rpy_speed: float = _opt(config.DEFAULT_RESET_RPY_SPEED, positive=True)
+    reset_rpy_acc: float = _opt(config.DEFAULT_RESET_RPY_ACC, positive=True)
+    reset_rpy_arot: float = _opt(config.DEFAULT_RESET_RPY_AROT, positive=True)
+    reset_rpy_t_interval: float = _opt(config.DEFAULT_RESET_RPY_T_INTERVAL, positive=True)
+    hans_keepalive_period: float = _opt(config.DEFAULT_HANS_KEEPALIVE_PERIOD, positive=True)
+    headless: bool = _opt(config.DEFAULT_HEADLESS)
+    headless_input: str = _opt(config.DEFAULT_HEADLESS_INPUT, choices=('joystick', 'evdev', 'udp', 'none'))
+    headless_evdev_device: Optional[str] = _opt(None)  # None = 自动选择
+    headless_status: str = _opt(config.DEFAULT_HEADLESS_STATUS)
+    headless_status_period: float = _opt(config.DEFAULT_HEADLESS_STATUS_PERIOD, positive=True)
+    udp_listen: str = _opt(config.DEFAULT_UDP_LISTEN)
+    udp_input_deadline: float = _opt(config.DEFAULT_UDP_INPUT_DEADLINE, positive=True)
+    watchdog_miss_limit: int = _opt(config.DEFAULT_WATCHDOG_MISS_LIMIT, minimum=0)
+    loop_stats_file: Optional[str] = _opt(None)  # None = 不导出
+    latency_trace: bool = _opt(config.DEFAULT_LATENCY_TRACE)
+    latency_trace_file: str = _opt(config.DEFAULT_LATENCY_TRACE_FILE)
+    latency_motion_probe_period: float = _opt(config.DEFAULT_LATENCY_MOTION_PROBE_PERIOD, minimum=0)
+    estop_fast_path: bool = _opt(config.DEFAULT_ESTOP_FAST_PATH)
+    config_hot_reload: bool = _opt(config.DEFAULT_CONFIG_HOT_RELOAD)
+    config_reload_poll_period: float = _opt(config.DEFAULT_CONFIG_RELOAD_POLL_PERIOD, positive=True)
+    arm_processes: bool = _opt(config.DEFAULT_ARM_PROCESSES)
+
+
+@dataclass(frozen=True, slots=True)
+class ControlConfig:
+    """controls 中的一项。as_dict() 给出 evaluate_control / 绑定表使用的字典形式。"""
+    type: str
+    index: int
+    axis: Optional[str] = None  # hat 的分量 'x' / 'y'
+    direction: int = 1
+    threshold: Optional[float] = None  # axis 类型在编译时补全为 trigger_threshold
+    pose: Optional[str] = None  # reset_both_arms*: reset_rpy_poses 中去掉 left_/right_ 的名称
+    rest: Optional[float] = None  # gripper_analog_*: 松开与按到底时的轴值
+    full: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self) if getattr(self, f.name) is not None}
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class RuntimeConfig:
+    setup: SetupConfig
+    settings: SettingsConfig
+    controls: Mapping[str, ControlConfig]
+    reset_rpy_poses: Mapping[str, np.ndarray]  # 只读 (3,) 数组
+    audio_files: Mapping[str, str]
+    arms: Mapping[str, ArmConfig]  # 机械臂注册表 (顺序与配置文件相同，left / right 在前)
+
+    def controls_map(self) -> dict:
+        """controls 的字典形式 (界面事件处理与绑定表编译使用)。"""
+        return {name: control.as_dict() for name, control in self.controls.items()}
+
+
+# ----------------------------------------------------------------------
+# 校验与编译
+# ----------------------------------------------------------------------
+def _describe(value: Any) -> str:
+    return f"{type(value).__name__} {value!r}"
+
+
+def _number(path: str, value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ConfigError(path, f"应为数字，实际为 {_describe(value)}")
+    return float(value)
+
+
+def _integer(path: str, value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ConfigError(path, f"应为整数，实际为 {_describe(value)}")
+    return value
+
+
+def _string(path: str, value: Any) -> str:
+    if not isinstance(value, str) or not value:
+        raise ConfigError(path, f"应为非空字符串，实际为 {_describe(value)}")
+    return value
+
+
+def _mapping(path: str, value: Any) -> dict:
+    if value is None: return {}
+    if not isinstance(value, dict):
+        raise ConfigError(path, f"应为映射 (key: value)，实际为 {_describe(value)}")
+    return value
+
+
+def _string_map(path: str, value: Any) -> Mapping[str, str]:
+    return types.MappingProxyType({str(k): _string(f"{path}.{k}", v) for k, v in _mapping(path, value).items()})
+
+
+def _rpy(path: str, value: Any) -> np.ndarray:
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ConfigError(path, f"应为 3 个数字 [roll, pitch, yaw]，实际为 {_describe(value)}")
+    return _vec3([_number(f"{path}[{i}]", v) for i, v in enumerate(value)])
+
+
+def _convert(path: str, annotation: Any, value: Any) -> Any:
+    """按字段注解转换并检查类型。"""
+    if annotation is float: return _number(path, value)
+    if annotation is int: return _integer(path, value)
+    if annotation is bool:
+        if not isinstance(value, bool): raise ConfigError(path, f"应为 true / false，实际为 {_describe(value)}")
+        return value
+    if annotation is str: return _string(path, value)
+    if annotation == Optional[str]: return None if value is None else _string(path, value)
+    if annotation == Optional[int]: return None if value is None else _integer(path, value)
+    if annotation == Tuple[int, ...]:
+        if not isinstance(value, (list, tuple)): raise ConfigError(path, f"应为整数列表，实际为 {_describe(value)}")
+        return tuple(_integer(f"{path}[{i}]", v) for i, v in enumerate(value))
+    if annotation is np.ndarray: return _rpy(path, value)
+    if annotation == Mapping[str, str]: return _string_map(path, value)
+    raise TypeError(f"{path}: 不支持的字段类型 {annotation}")
+
+
+def _check_range(path: str, value: Any, meta: Mapping) -> Any:
+    if meta.get('choices') is not None:
+        value = value.lower()
+        if value not in meta['choices']:
+            raise ConfigError(path, f"应为 {' / '.join(meta['choices'])} 之一，实际为 {value!r}")
+    values = value if isinstance(value, tuple) else (value,)
+    for v in values:
+        if meta.get('minimum') is not None and v < meta['minimum']:
+            raise ConfigError(path, f"不能小于 {meta['minimum']}，实际为 {v}")
+        if meta.get('positive') and v <= 0:
+            raise ConfigError(path, f"应大于 0，实际为 {v}")
+    return value
+
+
+def _compile_section(cls, section: str, raw: Any):
+    raw = _mapping(section, raw)
+    known = {f.name: f for f in fields(cls)}
+    unknown = [key for key in raw if key not in known]
+    if unknown:
+        raise ConfigError(f"{section}.{unknown[0]}", f"未知的配置项 (可用: {', '.join(known)})")
+    values = {}
+    for key, value in raw.items():
+        path = f"{section}.{key}"
+        values[key] = _check_range(path, _convert(path, known[key].type, value), known[key].metadata)
+    return cls(**values)
+
+
+def _compile_control(path: str, raw: Any, default_threshold: float) -> ControlConfig:
+    raw = _mapping(path, raw)
+    unknown = [key for key in raw if key not in CONTROL_KEYS]
+    if unknown: raise ConfigError(f"{path}.{unknown[0]}", f"未知的控制属性 (可用: {', '.join(CONTROL_KEYS)})")
+    if 'type' not in raw: raise ConfigError(f"{path}.type", "缺少控制类型 (button / axis / hat)")
+    ctrl_type = raw['type']
+    if ctrl_type not in CONTROL_TYPES:
+        raise ConfigError(f"{path}.type", f"应为 button / axis / hat 之一，实际为 {ctrl_type!r}")
+    if 'index' not in raw: raise ConfigError(f"{path}.index", "缺少序号")
+    index = _check_range(f"{path}.index", _integer(f"{path}.index", raw['index']), {'minimum': 0})
+    direction = _integer(f"{path}.direction", raw.get('direction', 1))
+    if direction not in (1, -1): raise ConfigError(f"{path}.direction", f"应为 1 或 -1，实际为 {direction}")
+    axis = raw.get('axis')
+    if ctrl_type == 'hat':
+        axis = axis if axis is not None else 'x'
+        if axis not in ('x', 'y'): raise ConfigError(f"{path}.axis", f"hat 分量应为 x 或 y，实际为 {axis!r}")
+    elif axis is not None:
+        raise ConfigError(f"{path}.axis", "只有 hat 类型可以设置 axis")
+    threshold = raw.get('threshold')
+    if threshold is not None: threshold = _number(f"{path}.threshold", threshold)
+    elif ctrl_type == 'axis': threshold = default_threshold
+    rest = _number(f"{path}.rest", raw['rest']) if 'rest' in raw else None
+    full = _number(f"{path}.full", raw['full']) if 'full' in raw else None
+    # 未设置时按默认值 rest=-1 / full=1 比较
+    if (rest is not None or full is not None) and (-1.0 if rest is None else rest) == (1.0 if full is None else full):
+        raise ConfigError(f"{path}.full", "full 与 rest 不能相同")
+    pose = _string(f"{path}.pose", raw['pose']) if 'pose' in raw else None
+    return ControlConfig(ctrl_type, index, axis, direction, threshold, pose, rest, full)
+
+
+def _compile_arms(raw: Any, setup: SetupConfig) -> Tuple[SetupConfig, Mapping[str, ArmConfig]]:
+    """编译 arms 注册表，并与 setup 中 left_/right_ 开头的项互相补全。"""
+    if raw is None:
+        arms = {side: ArmConfig(getattr(setup, f"{side}_robot_type"), getattr(setup, f"{side}_robot_ip"), None,
+                                getattr(setup, f"{side}_gripper_id"), getattr(setup, f"{side}_gripper_port"),
+                                getattr(setup, f"{side}_hans_box_id"), getattr(setup, f"{side}_mount_rpy"))
+                for side in ('left', 'right')}
+        return setup, types.MappingProxyType(arms)
+    arms = {}
+    for name, value in _mapping('arms', raw).items():
+        name = str(name)
+        if not name.isidentifier() or '_arm' in name:
+            raise ConfigError(f"arms.{name}", "臂名称只能包含字母、数字和下划线，且不能包含 '_arm' (用于控制项名称)")
+        arms[name] = _compile_section(ArmConfig, f"arms.{name}", value)
+    if not arms: raise ConfigError('arms', "至少需要配置一个机械臂")
+    legacy = {}
+    for side in ('left', 'right'):
+        arm = arms.get(side)
+        if arm is None: continue
+        legacy.update({f"{side}_robot_type": arm.type, f"{side}_robot_ip": arm.ip, f"{side}_gripper_id": arm.gripper_id,
+                       f"{side}_gripper_port": arm.gripper_port, f"{side}_hans_box_id": arm.hans_box_id,
+                       f"{side}_mount_rpy": arm.mount_rpy})
+    ordered = {name: arms[name] for name in sorted(arms, key=lambda n: (n not in ('left', 'right'), n != 'left'))}
+    return replace(setup, **legacy), types.MappingProxyType(ordered)
+
+
+def compile_config(raw: Any) -> RuntimeConfig:
+    """校验 YAML 解析结果并编译为 RuntimeConfig，任何错误抛出带路径的 ConfigError。"""
+    raw = _mapping("<root>", raw)
+    unknown = [key for key in raw if key not in SECTIONS]
+    if unknown: raise ConfigError(str(unknown[0]), f"未知的配置段 (可用: {', '.join(SECTIONS)})")
+    setup = _compile_section(SetupConfig, 'setup', raw.get('setup'))
+    setup, arms = _compile_arms(raw.get('arms'), setup)
+    settings = _compile_section(SettingsConfig, 'settings', raw.get('settings'))
+    if settings.min_speed > settings.max_speed:
+        raise ConfigError("settings.min_speed", f"不能大于 max_speed ({settings.max_speed})")
+    controls = {str(name): _compile_control(f"controls.{name}", value, settings.trigger_threshold)
+                for name, value in _mapping('controls', raw.get('controls')).items()}
+    poses = {str(name): _rpy(f"reset_rpy_poses.{name}", value)
+             for name, value in _mapping('reset_rpy_poses', raw.get('reset_rpy_poses')).items()}
+    for name, control in controls.items():
+        if control.pose is None: continue
+        for side in ('left', 'right'):
+            if f"{side}_{control.pose}" not in poses:
+                raise ConfigError(f"controls.{name}.pose", f"reset_rpy_poses 中缺少 {side}_{control.pose}")
+    return RuntimeConfig(setup, settings, types.MappingProxyType(controls), types.MappingProxyType(poses),
+                         _string_map('audio_files', raw.get('audio_files')), arms)
+
+
+def load_runtime_config(path: str) -> RuntimeConfig:
+    """读取并编译配置文件 (文件或 YAML 语法错误同样以 ConfigError 报告)。"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = yaml.safe_load(f)
+    except OSError as e:
+        raise ConfigError(path, f"无法读取: {e}")
+    except yaml.YAMLError as e:
+        raise ConfigError(path, f"YAML 语法错误: {e}")
+    if raw is None: raise ConfigError(path, "配置文件为空")
+    return compile_config(raw)
+
+
+# ----------------------------------------------------------------------
+# 热重载
+# ----------------------------------------------------------------------
+# 修改后需要重新连接机械臂/夹爪/相机，或对应的线程、窗口、音频在启动时已创建的项 (热重载时只报告)
+RESTART_REQUIRED = frozenset(
+    [f"setup.{name}" for name in SetupConfig.__slots__ if name not in ('left_mount_rpy', 'right_mount_rpy',
+                                                                       'calibration_files')]
+    + [f"settings.{name}" for name in (
+        'gripper_monitor_rate', 'gripper_control_mode', 'gripper_stream_rate', 'control_rate', 'hans_keepalive_period',
+        'headless', 'headless_input', 'headless_evdev_device', 'headless_status', 'udp_listen', 'udp_input_deadline',
+        'watchdog_miss_limit', 'latency_trace', 'latency_trace_file', 'latency_motion_probe_period',
+        'estop_fast_path', 'config_hot_reload', 'config_reload_poll_period', 'arm_processes')]
+    + ['audio_files', 'arms'])
+
+
+def _same(a: Any, b: Any) -> bool:
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return isinstance(a, np.ndarray) and isinstance(b, np.ndarray) and np.array_equal(a, b)
+    return a == b
+
+
+def diff_config(old: RuntimeConfig, new: RuntimeConfig) -> Tuple[str, ...]:
+    """
+    返回两份配置中不同的项 (路径): setup / settings 的字段为 'settings.max_speed' 形式，
+    controls 与 reset_rpy_poses 为 'controls.<名称>'，audio_files 与 arms 整体为 'audio_files' / 'arms'。
+    """
+    changed = []
+    for section in ('setup', 'settings'):
+        old_values, new_values = getattr(old, section), getattr(new, section)
+        for name in old_values.__slots__:
+            a, b = getattr(old_values, name), getattr(new_values, name)
+            if not _same(a, b): changed.append(f"{section}.{name}")
+    for section in ('controls', 'reset_rpy_poses'):
+        old_items, new_items = getattr(old, section), getattr(new, section)
+        for name in sorted(set(old_items) | set(new_items)):
+            if name not in old_items or name not in new_items or not _same(old_items[name], new_items[name]):
+                changed.append(f"{section}.{name}")
+    if old.audio_files != new.audio_files: changed.append('audio_files')
+    # left / right 除 port 外的项与 setup 中的 left_/right_ 项相同，已按 setup 的字段比较
+    if list(old.arms) != list(new.arms) or any(
+            not all(_same(getattr(old.arms[name], key), getattr(new.arms[name], key))
+                    for key in (('port',) if name in ('left', 'right') else ArmConfig.__slots__))
+            for name in old.arms):
+        changed.append('arms')
+    return tuple(changed)
+
+
+def keep_values(new: RuntimeConfig, old: RuntimeConfig, paths) -> RuntimeConfig:
+    """new 中 paths 列出的项恢复为 old 的值 (热重载时未应用的修改)，得到实际运行中的配置。"""
+    def section(name: str):
+        keep = {path.split('.', 1)[1] for path in paths if path.startswith(name + '.')}
+        return replace(getattr(new, name), **{key: getattr(getattr(old, name), key) for key in keep})
+
+    return RuntimeConfig(section('setup'), section('settings'), new.controls, new.reset_rpy_poses,
+                         old.audio_files if 'audio_files' in paths else new.audio_files,
+                         old.arms if 'arms' in paths else new.arms)
+
+
+def load_calibration_matrix(path: str) -> np.ndarray:
+    """读取手眼标定 YAML 中的 hand_eye_transformation_matrix，校验为 4x4 数字矩阵 (只读)。"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = yaml.safe_load(f)
+    except OSError as e:
+        raise ConfigError(path, f"无法读取: {e}")
+    except yaml.YAMLError as e:
+        raise ConfigError(path, f"YAML 语法错误: {e}")
+    matrix = _mapping(path, raw).get('hand_eye_transformation_matrix')
+    try:
+        matrix_np = np.array(matrix, dtype=float)
+    except (TypeError, ValueError):
+        raise ConfigError(f"{path}: hand_eye_transformation_matrix", f"应为 4x4 数字矩阵，实际为 {_describe(matrix)}")
+    if matrix_np.shape != (4, 4) or not np.all(np.isfinite(matrix_np)):
+        raise ConfigError(f"{path}: hand_eye_transformation_matrix", f"应为 4x4 数字矩阵，实际形状 {matrix_np.shape}")
+    matrix_np.flags.writeable = False
+    return matrix_np
+
+
+if __name__ == "__main__":
+    config_path = sys.argv[1] if len(sys.argv) > 1 else config.CONFIG_FILE
+    try:
+        runtime = load_runtime_config(config_path)
+    except ConfigError as e:
+        print(f"配置错误: {e}")
+        sys.exit(1)
+    print(f"{config_path} 校验通过: 机械臂 {', '.join(runtime.arms)}, 控制项 {len(runtime.controls)}, "
+          f"回正姿态 {len(runtime.reset_rpy_poses)}, 提示音 {len(runtime.audio_files)}")
@@ -0,0 +1,367 @@
+# udp_teleop.py
+# -*- coding: utf-8 -*-
+
+"""
+UDP 网络遥操作输入。
+
+数据包 (小端): 20 字节包头 + 负载
+- 包头: magic b'DT', 版本, 类型, 会话号 (uint32, 发送端每次启动随机生成), 序号 (uint32),
+  发送时间 (float64, 发送端 time.time())
+- PACKET_JOYSTICK: 轴/按钮/hat 数量 (3 x uint8)，轴 int16 (x 32767)，按钮 uint32 位图，hat int8 x 2
+- PACKET_TWIST: 左右臂 6 维速度 12 x float32 (mm/s, deg/s)，与手柄计算出的速度指令同一坐标系
+  (之后同样经过安装坐标系变换)
+
+接收 (UdpInputSource, settings.headless_input: udp):
+- 后台线程接收。每个发送端记录会话号与最后接受的序号 (数据流中断后仍保留)，同一会话中序号不比已接受的
+  更新的数据包 (乱序/重复/重放) 直接丢弃；发送端重启后以新的会话号重新开始序号，已结束的会话不再接受；
+- 数据包的年龄 (本机接收时间 - 发送时间，减去以传输时间最小值估计的两端时钟偏差) 超过 deadline 时丢弃；
+  发送端时钟向后跳变时，约 TRANSIT_WINDOW 个数据包后偏差估计更新，之后恢复接受；
+- 数据流有效期间只接受同一发送端；
+- 控制线程每周期通过 latest() 直接读取最新数据 (不经主线程帧率)；超过 deadline 没有新数据包时
+  返回无输入 (速度为 0)，主线程 poll() 同时松开所有按钮。
+
+测试发送端:
+  python udp_teleop.py --host 192.168.1.10 --source joystick     # 转发本机手柄
+  python udp_teleop.py --source sine --loss 0.1 --reorder 0.05   # 合成输入，模拟丢包/乱序
+  python udp_teleop.py --source twist --twist 20 0 0 0 0 0 --arm left
+"""
+
+import argparse
+import collections
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from control_loop import JoystickSnapshot
+from input_sources import InputSource
+
+PACKET_MAGIC = b'DT'
+PACKET_VERSION = 2
+PACKET_JOYSTICK = 1
+PACKET_TWIST = 2
+
+HEADER = struct.Struct('<2sBBIId')  # magic, 版本, 类型, 会话号, 序号, 发送时间
+JOYSTICK_COUNTS = struct.Struct('<BBB')
+TWIST_PAYLOAD = struct.Struct('<12f')
+
+UDP_NUM_AXES = 8  # 接收端固定的手柄布局 (数据包中多出的部分被截断，不足的补 0)
+UDP_NUM_BUTTONS = 32  # 按钮位图为 uint32
+UDP_NUM_HATS = 2
+AXIS_SCALE = 32767.0
+SEQ_MODULO = 1 << 32
+RECV_TIMEOUT = 0.2  # 接收线程检查停止标志的周期 (秒)
+TRANSIT_WINDOW = 256  # 传输时间样本数 (时钟偏差估计与抖动统计)
+MAX_PEERS = 16  # 记录会话与序号的发送端数量上限 (超出时丢弃最久未收到的)
+RETIRED_SESSIONS = 8  # 每个发送端记录的已结束会话数
+
+
+def new_session_id() -> int:
+    return random.getrandbits(32) or 1
+
+
+def encode_joystick_packet(session: int, seq: int, axes: Sequence[float], buttons: Sequence[int],
+                           hats: Sequence[Sequence[int]], send_time: Optional[float] = None) -> bytes:
+    axes, buttons, hats = list(axes)[:255], list(buttons)[:UDP_NUM_BUTTONS], list(hats)[:255]
+    mask = 0
+    for i, pressed in enumerate(buttons):
+        if pressed: mask |= 1 << i
+    payload = JOYSTICK_COUNTS.pack(len(axes), len(buttons), len(hats))
+    payload += struct.pack(f'<{len(axes)}h', *(int(round(max(-1.0, min(1.0, v)) * AXIS_SCALE)) for v in axes))
+    payload += struct.pack('<I', mask)
+    payload += struct.pack(f'<{2 * len(hats)}b', *(int(c) for hat in hats for c in hat))
+    return HEADER.pack(PACKET_MAGIC, PACKET_VERSION, PACKET_JOYSTICK, session, seq % SEQ_MODULO,
+                       time.time() if send_time is None else send_time) + payload
+
+
+def encode_twist_packet(session: int, seq: int, twist_left: Sequence[float], twist_right: Sequence[float],
+                        send_time: Optional[float] = None) -> bytes:
+    return HEADER.pack(PACKET_MAGIC, PACKET_VERSION, PACKET_TWIST, session, seq % SEQ_MODULO,
+                       time.time() if send_time is None else send_time) + \
+        TWIST_PAYLOAD.pack(*(float(v) for v in list(twist_left) + list(twist_right)))
+
+
+def decode_packet(data: bytes) -> Tuple[int, int, int, float, tuple]:
+    """
+    返回 (类型, 会话号, 序号, 发送时间, 负载)。负载: 手柄为 (axes, buttons, hats)，速度为 (left, right)。
+    格式错误抛出 ValueError。
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("数据包过短")
+    magic, version, packet_type, session, seq, send_time = HEADER.unpack_from(data)
+    if magic != PACKET_MAGIC or version != PACKET_VERSION:
+        raise ValueError("magic/版本不匹配")
+    offset = HEADER.size
+    if packet_type == PACKET_TWIST:
+        if len(data) != offset + TWIST_PAYLOAD.size: raise ValueError("速度数据包长度错误")
+        values = TWIST_PAYLOAD.unpack_from(data, offset)
+        return packet_type, session, seq, send_time, (np.array(values[:6]), np.array(values[6:]))
+    if packet_type != PACKET_JOYSTICK:
+        raise ValueError(f"未知数据包类型 {packet_type}")
+    num_axes, num_buttons, num_hats = JOYSTICK_COUNTS.unpack_from(data, offset)
+    offset += JOYSTICK_COUNTS.size
+    if len(data) != offset + 2 * num_axes + 4 + 2 * num_hats: raise ValueError("手柄数据包长度错误")
+    axes = struct.unpack_from(f'<{num_axes}h', data, offset)
+    offset += 2 * num_axes
+    (mask,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    flat_hats = struct.unpack_from(f'<{2 * num_hats}b', data, offset)
+    return packet_type, session, seq, send_time, (tuple(v / AXIS_SCALE for v in axes),
+                                                  tuple((mask >> i) & 1 for i in range(num_buttons)),
+                                                  tuple(zip(flat_hats[0::2], flat_hats[1::2])))
+
+
+def seq_newer(seq: int, last: int) -> bool:
+    """考虑 uint32 回绕的序号比较: seq 是否比 last 新。"""
+    return 0 < (seq - last) % SEQ_MODULO < SEQ_MODULO // 2
+
+
+class _PeerState:
+    """一个发送端的会话、最后接受的序号与传输时间样本 (只在接收线程中使用)。"""
+    __slots__ = ("session", "last_seq", "retired", "transit")
+
+    def __init__(self, session: int):
+        self.session = session
+        self.last_seq: Optional[int] = None
+        self.retired = collections.deque(maxlen=RETIRED_SESSIONS)
+        self.transit = collections.deque(maxlen=TRANSIT_WINDOW)  # 本机接收时间 - 发送时间 (含时钟偏差)
+
+    def age(self, transit: float) -> float:
+        """数据包年龄: 传输时间减去最小传输时间 (两端时钟偏差与最小网络延迟的估计)。"""
+        return transit - min(self.transit)
+
+
+def _pad(values: Sequence, size: int, fill) -> tuple:
+    values = tuple(values)[:size]
+    return values + (fill,) * (size - len(values))
+
+
+class UdpInputSource(InputSource):
+    """
+    Args:
+        listen (str): 监听地址 'host:port'。
+        deadline (float): 超过该时间 (秒) 没有新数据包视为无输入。
+    """
+
+    kind = "udp"
+    live = True  # 控制线程直接通过 latest() 读取
+
+    def __init__(self, listen: str, deadline: float):
+        super().__init__()
+        host, _, port = str(listen).rpartition(':')
+        self.listen_addr = (host or '0.0.0.0', int(port))
+        self.deadline = float(deadline)
+        self.num_axes, self.num_buttons, self.num_hats = UDP_NUM_AXES, UDP_NUM_BUTTONS, UDP_NUM_HATS
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._neutral = JoystickSnapshot((0.0,) * UDP_NUM_AXES, (0,) * UDP_NUM_BUTTONS, ((0, 0),) * UDP_NUM_HATS, 0.0)
+        # 以下由接收线程整体替换 (引用赋值)，其他线程只读
+        self._snapshot: Optional[JoystickSnapshot] = None  # 最近的手柄数据，timestamp 为本机接收时间
+        self._twist: Optional[Tuple[np.ndarray, np.ndarray, float]] = None  # (左, 右, 接收时间)
+        self._peers: "collections.OrderedDict[tuple, _PeerState]" = collections.OrderedDict()
+        self._last_rx = 0.0
+        self._peer = None  # 当前数据流的发送端
+        self._emitted = self._neutral  # poll() 已转换为事件的状态
+        self._was_fresh = False
+        self.received = 0
+        self.accepted = 0
+        self.out_of_order = 0
+        self.expired = 0  # 年龄超过 deadline 的数据包
+        self.malformed = 0
+        self.foreign = 0
+        self.timeouts = 0
+
+    def open(self) -> bool:
+        try:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._sock.bind(self.listen_addr)
+            self._sock.settimeout(RECV_TIMEOUT)
+        except OSError as e:
+            print(f"  错误: UDP 监听 {self.listen_addr[0]}:{self.listen_addr[1]} 失败: {e}")
+            self._sock = None
+            return False
+        self.device_name = f"UDP {self.listen_addr[0]}:{self.listen_addr[1]}"
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="UdpTeleopReceiver", daemon=True)
+        self._thread.start()
+        return True
+
+    def _fresh(self, now: float) -> bool:
+        return now - self._last_rx <= self.deadline
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                data, peer = self._sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # 套接字已关闭
+            now = time.monotonic()
+            self.received += 1
+            try:
+                packet_type, session, seq, send_time, payload = decode_packet(data)
+            except (ValueError, struct.error):
+                self.malformed += 1
+                continue
+            if self._peer is not None and peer != self._peer and self._fresh(now):
+                self.foreign += 1  # 数据流有效期间只接受当前发送端
+                continue
+            state = self._peer_state(peer, session)
+            if state is None or (state.last_seq is not None and not seq_newer(seq, state.last_seq)):
+                self.out_of_order += 1  # 已结束的会话，或同一会话中的旧序号 (乱序/重复/重放)
+                continue
+            transit = time.time() - send_time
+            state.transit.append(transit)  # 过期的数据包也作为样本: 发送端时钟向后跳变后偏差估计能够恢复
+            if state.age(transit) > self.deadline:
+                self.expired += 1
+                continue
+            state.last_seq = seq
+            self._peer, self._last_rx = peer, now
+            self.accepted += 1
+            if packet_type == PACKET_TWIST:
+                self._twist = (payload[0], payload[1], now)
+            else:
+                axes, buttons, hats = payload
+                parts = (_pad(axes, UDP_NUM_AXES, 0.0), _pad(buttons, UDP_NUM_BUTTONS, 0),
+                         _pad(hats, UDP_NUM_HATS, (0, 0)))
+                previous = self._snapshot
+                changed = previous is None or parts != (previous.axes, previous.buttons, previous.hats)
+                self._snapshot = JoystickSnapshot(*parts, now, now if changed else previous.event_time)
+
+    def _peer_state(self, peer, session: int) -> Optional[_PeerState]:
+        """该发送端的状态；新的会话号开始新的序号，已结束的会话返回 None。"""
+        state = self._peers.get(peer)
+        if state is None:
+            state = self._peers[peer] = _PeerState(session)
+            if len(self._peers) > MAX_PEERS: self._peers.popitem(last=False)
+        elif session != state.session:
+            if session in state.retired: return None
+            state.retired.append(state.session)
+            state.session, state.last_seq = session, None
+        self._peers.move_to_end(peer)
+        return state
+
+    def latest(self) -> Tuple[Optional[JoystickSnapshot], Optional[Tuple[np.ndarray, np.ndarray]]]:
+        """(手柄快照, (左臂速度, 右臂速度))，超过 deadline 的部分为 None (控制线程按无输入处理)。"""
+        now = time.monotonic()
+        snapshot, twist = self._snapshot, self._twist
+        if snapshot is not None and now - snapshot.timestamp > self.deadline: snapshot = None
+        if twist is not None and now - twist[2] > self.deadline: twist = None
+        return snapshot, (twist[:2] if twist is not None else None)
+
+    def poll(self) -> list:
+        """把最新手柄状态与上次的差异转换为 pygame 事件 (超时则全部回到中位/松开)。"""
+        now = time.monotonic()
+        fresh = self._fresh(now)
+        if self._was_fresh and not fresh:
+            self.timeouts += 1
+            print(f"[UDP] {self.deadline * 1000:.0f} ms 未收到数据包，速度归零并松开所有按钮")
+        self._was_fresh = fresh
+        snapshot = self._snapshot if fresh and self._snapshot is not None else self._neutral
+        previous, events = self._emitted, []
+        for i, (old, new) in enumerate(zip(previous.axes, snapshot.axes)):
+            if old != new: events.append(pygame.event.Event(pygame.JOYAXISMOTION, axis=i, value=new, instance_id=0))
+        for i, (old, new) in enumerate(zip(previous.buttons, snapshot.buttons)):
+            if old != new:
+                event_type = pygame.JOYBUTTONDOWN if new else pygame.JOYBUTTONUP
+                events.append(pygame.event.Event(event_type, button=i, instance_id=0))
+        for i, (old, new) in enumerate(zip(previous.hats, snapshot.hats)):
+            if old != new: events.append(pygame.event.Event(pygame.JOYHATMOTION, hat=i, value=tuple(new), instance_id=0))
+        self._emitted = snapshot
+        return events
+
+    def stats_text(self) -> str:
+        state = self._peers.get(self._peer)
+        transit = list(state.transit) if state is not None else []
+        jitter = np.std(transit) * 1000 if len(transit) > 1 else 0.0
+        return (f"接收 {self.received}, 接受 {self.accepted}, 乱序/重复 {self.out_of_order}, 过期 {self.expired}, "
+                f"格式错误 {self.malformed}, 其他发送端 {self.foreign}, 超时 {self.timeouts}, 传输抖动 {jitter:.2f} ms")
+
+    def close(self):
+        if self._sock is None: return
+        self._stop_event.set()
+        self._sock.close()
+        if self._thread is not None: self._thread.join(timeout=1.0)
+        self._sock = None
+        print(f"[UDP] 输入统计: {self.stats_text()}")
+
+
+# ----------------------------------------------------------------------
+# 测试发送端
+# ----------------------------------------------------------------------
+def run_sender(args):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    addr = (args.host, args.port)
+    joystick = None
+    if args.source == 'joystick':
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.display.init()
+        pygame.joystick.init()
+        if pygame.joystick.get_count() == 0:
+            print("未检测到手柄。")
+            return
+        joystick = pygame.joystick.Joystick(0)
+        joystick.init()
+        print(f"转发手柄 {joystick.get_name()} -> {addr[0]}:{addr[1]}")
+    else:
+        print(f"发送 {args.source} -> {addr[0]}:{addr[1]}")
+
+    period = 1.0 / args.rate
+    session = new_session_id()
+    seq, sent, dropped, held = 0, 0, 0, None
+    start = next_send = time.monotonic()
+    try:
+        while args.duration <= 0 or time.monotonic() - start < args.duration:
+            seq += 1
+            if joystick is not None:
+                pygame.event.pump()
+                packet = encode_joystick_packet(session, seq, [joystick.get_axis(i) for i in range(joystick.get_numaxes())],
+                                                [joystick.get_button(i) for i in range(joystick.get_numbuttons())],
+                                                [joystick.get_hat(i) for i in range(joystick.get_numhats())])
+            elif args.source == 'twist':
+                zero = [0.0] * 6
+                packet = encode_twist_packet(session, seq, args.twist if args.arm in ('left', 'both') else zero,
+                                             args.twist if args.arm in ('right', 'both') else zero)
+            else:
+                phase = 2 * np.pi * (time.monotonic() - start) / 4.0
+                packet = encode_joystick_packet(session, seq, [0.8 * np.sin(phase), 0.0, 0.0, 0.0, 0.0, 0.0], [0] * 15, [(0, 0)])
+
+            if random.random() < args.loss:
+                dropped += 1
+            elif held is None and random.random() < args.reorder:
+                held = packet  # 晚一个周期发送，接收端应丢弃
+            else:
+                sock.sendto(packet, addr)
+                sent += 1
+                if held is not None:
+                    sock.sendto(held, addr)
+                    sent, held = sent + 1, None
+            next_send += period
+            delay = next_send - time.monotonic()
+            if delay > 0: time.sleep(delay)
+    except KeyboardInterrupt:
+        pass
+    print(f"已发送 {sent} 个数据包 (模拟丢包 {dropped})。")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UDP 遥操作测试发送端")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=47200)
+    parser.add_argument('--rate', type=float, default=100.0, help="发送频率 (Hz)")
+    parser.add_argument('--source', choices=['joystick', 'sine', 'twist'], default='sine')
+    parser.add_argument('--twist', type=float, nargs=6, default=[20.0, 0, 0, 0, 0, 0], help="twist 模式的速度")
+    parser.add_argument('--arm', choices=['left', 'right', 'both'], default='both')
+    parser.add_argument('--loss', type=float, default=0.0, help="模拟丢包概率")
+    parser.add_argument('--reorder', type=float, default=0.0, help="模拟乱序概率")
+    parser.add_argument('--duration', type=float, default=0.0, help="发送时长 (秒, 0 表示直到 Ctrl+C)")
+    run_sender(parser.parse_args())
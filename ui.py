@@ -19,6 +19,10 @@ from robot_control import format_speed
 import vision_interaction
 # 导入 config 模块以访问模式常量
 import config
+from control_loop import JoystickSnapshot
+from joystick_state import JoystickStateCache, evaluate_control
+
+ACTION_STATUS_LINGER = 5.0  # 后台动作结束后结果在界面上保留的时间 (秒)
 
 
 class UIManager:
@@ -35,10 +39,8 @@ class UIManager:
         self.num_buttons: int = 0
         self.status_message: str = ""
 
-        # 用于处理 axis 和 hat 一次性触发的标志位 (更鲁棒的方案)
-        # key: (type, index, axis_char, direction) or (type, index) for button
-        # value: True if action was triggered and awaiting release/neutral
-        self.action_triggered_flags: dict[tuple, bool] = {}
+        # 事件驱动的手柄状态缓存 (轴/按钮/hat、上升沿与长按计时)，handle_events 中逐事件更新
+        self.input_cache: Optional[JoystickStateCache] = None
 
     def init_pygame(self) -> bool:
         """初始化 Pygame 相关模块"""
@@ -114,6 +116,9 @@ class UIManager:
                 self.num_axes = self.joystick.get_numaxes()
                 self.num_buttons = self.joystick.get_numbuttons()
                 print(f"    能力: Hats={self.num_hats}, Axes={self.num_axes}, Buttons={self.num_buttons}")
+                instance_id = self.joystick.get_instance_id() if hasattr(self.joystick, 'get_instance_id') else None
+                self.input_cache = JoystickStateCache(self.num_axes, self.num_buttons, self.num_hats, instance_id)
+                self.input_cache.seed(self.joystick)
                 self.status_message = f"手柄: {joystick_name} 已连接"
 
             self.clock = pygame.time.Clock()
@@ -165,211 +170,194 @@ class UIManager:
             event.type == pygame.JOYBUTTONDOWN and \
             event.button == control_config.get('index', -1)
 
+    def capture_input_snapshot(self) -> Optional[JoystickSnapshot]:
+        """当前手柄状态快照 (需在主线程、handle_events 之后调用)，无手柄时返回 None。"""
+        if self.input_cache is None:
+            return None
+        return self.input_cache.snapshot()  # 由事件更新的缓存构建，没有新事件时复用上次的元组
+
     def get_joystick_input_state(self, control_config: Optional[dict],
-                                 event: Optional[pygame.event.Event] = None) -> bool:
+                                 event: Optional[pygame.event.Event] = None,
+                                 snapshot: Optional[JoystickSnapshot] = None) -> bool:
         """
         检查单个控制配置是否被激活。
-        如果提供了 event, 则基于事件触发 (适合一次性动作，需要外部状态管理防重复)。
-        如果未提供 event, 则基于当前轮询状态 (适合持续性动作)。
+        如果提供了 event, 则基于事件触发 (一次性动作: 上升沿检测，松开/回中之前不会重复触发)。
+        如果未提供 event, 则返回当前状态 (适合持续性动作)。
+        如果提供了 snapshot, 则从该手柄快照读取 (控制线程使用)，否则读取事件驱动的状态缓存。
         """
-        if not self.joystick or not pygame.joystick.get_init() or not control_config:
+        if not control_config:
+            return False
+        threshold = self.controller.trigger_threshold
+        if snapshot is not None:
+            return evaluate_control(control_config, snapshot.axes, snapshot.buttons, snapshot.hats, threshold)
+        if self.input_cache is None:
             return False
-
-        ctrl_type = control_config.get('type')
-        ctrl_index = control_config.get('index', -1)
-
-        # 为一次性动作生成唯一的键
-        action_key = None
-        if ctrl_type == 'button':
-            action_key = ('button', ctrl_index)
-        elif ctrl_type == 'axis':
-            action_key = ('axis', ctrl_index, control_config.get('direction', 1))
-        elif ctrl_type == 'hat':
-            action_key = ('hat', ctrl_index, control_config.get('axis', 'x'), control_config.get('direction', 1))
-
-        is_currently_active = False  # 当前帧输入是否激活
-
-        if ctrl_type == 'button':
-            if not (0 <= ctrl_index < self.num_buttons): return False
-            is_currently_active = self.joystick.get_button(ctrl_index) == 1
-        elif ctrl_type == 'axis':
-            if not (0 <= ctrl_index < self.num_axes): return False
-            axis_val = self.joystick.get_axis(ctrl_index)
-            threshold = control_config.get('threshold', self.controller.trigger_threshold)
-            direction = control_config.get('direction', 1)
-            if (direction == 1 and axis_val > threshold) or \
-                    (direction == -1 and axis_val < -threshold):
-                is_currently_active = True
-        elif ctrl_type == 'hat':
-            if not (0 <= ctrl_index < self.num_hats): return False
-            hat_val_tuple = self.joystick.get_hat(ctrl_index)  # (x, y)
-            hat_axis_cfg = control_config.get('axis', 'x')
-            direction = control_config.get('direction', 1)
-            if (hat_axis_cfg == 'x' and hat_val_tuple[0] == direction) or \
-                    (hat_axis_cfg == 'y' and hat_val_tuple[1] == direction):
-                is_currently_active = True
-
-        # 对于事件驱动的一次性动作 (如RPY重置)
         if event:  # 仅在事件发生时评估是否首次触发
-            if is_currently_active:
-                if not self.action_triggered_flags.get(action_key, False):
-                    self.action_triggered_flags[action_key] = True  # 标记为已触发
-                    return True  # 首次触发
-            else:  # 控制器回到非激活状态
-                if action_key in self.action_triggered_flags:
-                    self.action_triggered_flags[action_key] = False  # 重置标志
-            return False  # 非首次触发或未激活
-        else:  # 对于持续性动作，直接返回当前状态
-            return is_currently_active
+            return self.input_cache.control_pressed(control_config, threshold)
+        return self.input_cache.control_active(control_config, threshold)
 
     def handle_events(self):
-        current_time = time.time()
         if not pygame.get_init() or not self.controller.running:
             self.controller.running = False;
             return
 
         for event in pygame.event.get():
-            if event.type == pygame.QUIT: self.controller.running = False; return
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                self.controller.running = False;
-                return
+            if not self._dispatch_event(event): return
 
-            if not self.joystick: continue
+    def _dispatch_event(self, event: pygame.event.Event) -> bool:
+        """处理单个输入事件，返回 False 表示已请求退出 (不再处理后续事件)。"""
+        if event.type == pygame.QUIT: self.controller.running = False; return False
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.controller.running = False;
+            return False
 
-            # --- 通用控制 (主要基于按钮按下/松开) ---
+        if self.input_cache is None: return True
+        # 急停按钮最先处理 (事件时间作为按钮到停止延迟的起点)，不经过下面的任何判断
+        if event.type == pygame.JOYBUTTONDOWN and self._check_button_event(self.controller.emergency_stop_ctrl, event):
+            self.input_cache.handle_event(event)
+            self.controller.toggle_emergency_stop(time.monotonic())
+            return True
+        self.input_cache.handle_event(event)  # 先更新状态缓存，下面的判断都读取缓存
+
+        # --- 通用控制 (主要基于按钮按下/松开) ---
+        if event.type == pygame.JOYBUTTONDOWN:
+            # 停止按钮: 取消正在执行的回正/抓取动作 (机械臂立即停止)
+            if self._check_button_event(self.controller.action_cancel_ctrl, event):
+                if self.controller.cancel_actions("停止按钮"): self.play_sound('action_fail_general')
+            # 模式切换按钮按下 (按下即中止后台动作，松开时再切换模式)
+            elif self._check_button_event(self.controller.mode_switch_control, event):
+                self.controller.cancel_actions("模式按钮")
+            # 速度增加
+            elif self._check_button_event(self.controller.speed_inc_control, event) and \
+                    self.controller.control_mode in [config.MODE_XYZ, config.MODE_RPY]:
+                self.controller.current_speed_xy = min(self.controller.max_speed,
+                                                       self.controller.current_speed_xy + self.controller.speed_increment)
+                self.controller.current_speed_z = min(self.controller.max_speed,
+                                                      self.controller.current_speed_z + self.controller.speed_increment)
+                self.play_sound('speed_change_confirm')  # 确保此声音在YAML中定义
+            # 速度减少
+            elif self._check_button_event(self.controller.speed_dec_control, event) and \
+                    self.controller.control_mode in [config.MODE_XYZ, config.MODE_RPY]:
+                self.controller.current_speed_xy = max(self.controller.min_speed,
+                                                       self.controller.current_speed_xy - self.controller.speed_increment)
+                self.controller.current_speed_z = max(self.controller.min_speed,
+                                                      self.controller.current_speed_z - self.controller.speed_increment)
+                self.play_sound('speed_change_confirm')
+            # 左夹爪
+            elif self._check_button_event(self.controller.gripper_toggle_left_ctrl, event):
+                self.controller.toggle_gripper('left')
+            # 右夹爪
+            elif self._check_button_event(self.controller.gripper_toggle_right_ctrl, event):
+                self.controller.toggle_gripper('right')
+
+        if event.type == pygame.JOYBUTTONUP:
+            # 模式切换按钮松开
+            if self.controller.mode_switch_control and \
+                    event.button == self.controller.mode_switch_control.get('index', -1):
+                press_duration = self.input_cache.last_hold_time(event.button)  # 按下到松开的时长
+                if press_duration < self.controller.long_press_duration:
+                    self.controller.switch_control_mode()
+
+        # --- 模式专属控制 (RPY重置使用 get_joystick_input_state 并传递 event) ---
+        if self.controller.control_mode == config.MODE_RESET:
+            # 对于RPY重置，我们希望在事件（按钮按下、轴移动到阈值、hat按下）发生时触发一次
+            # get_joystick_input_state(config, event) 现在处理这种一次性触发逻辑
+            both_arms_ctrl = next((cfg for cfg in self.controller.reset_both_arms_ctrls
+                                   if self.get_joystick_input_state(cfg, event)), None)
+            if both_arms_ctrl:
+                self.controller.attempt_reset_both_arms_rpy(str(both_arms_ctrl['pose']))
+            elif self.get_joystick_input_state(self.controller.reset_left_arm_default_rpy_ctrl, event):
+                self.controller.attempt_reset_left_arm_default_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_left_arm_forward_rpy_ctrl, event):
+                self.controller.attempt_reset_left_arm_forward_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_left_arm_backward_rpy_ctrl, event):
+                self.controller.attempt_reset_left_arm_backward_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_left_arm_to_left_rpy_ctrl, event):
+                self.controller.attempt_reset_left_arm_to_left_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_left_arm_to_right_rpy_ctrl, event):
+                self.controller.attempt_reset_left_arm_to_right_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_left_arm_up_rpy_ctrl, event):
+                self.controller.attempt_reset_left_arm_up_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_left_arm_down_rpy_ctrl, event):
+                self.controller.attempt_reset_left_arm_down_rpy()
+
+            elif self.get_joystick_input_state(self.controller.reset_right_arm_default_rpy_ctrl, event):
+                self.controller.attempt_reset_right_arm_default_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_right_arm_forward_rpy_ctrl, event):
+                self.controller.attempt_reset_right_arm_forward_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_right_arm_backward_rpy_ctrl, event):
+                self.controller.attempt_reset_right_arm_backward_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_right_arm_to_left_rpy_ctrl, event):
+                self.controller.attempt_reset_right_arm_to_left_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_right_arm_to_right_rpy_ctrl, event):
+                self.controller.attempt_reset_right_arm_to_right_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_right_arm_up_rpy_ctrl, event):
+                self.controller.attempt_reset_right_arm_up_rpy()
+            elif self.get_joystick_input_state(self.controller.reset_right_arm_down_rpy_ctrl, event):
+                self.controller.attempt_reset_right_arm_down_rpy()
+
+            # 原始关节回正 (如果按键不冲突且配置存在) - 通常是按钮类型
+            elif self._check_button_event(self.controller.reset_left_arm_ctrl, event):
+                print("[UI Event] 左臂原始关节回正按钮按下...")
+                self.controller.attempt_reset_left_arm()
+            elif self._check_button_event(self.controller.reset_right_arm_ctrl, event):
+                print("[UI Event] 右臂原始关节回正按钮按下...")
+                self.controller.attempt_reset_right_arm()
+
+        elif self.controller.control_mode == config.MODE_VISION:
+            # 视觉模式按钮通常是一次性按下触发
             if event.type == pygame.JOYBUTTONDOWN:
-                # 模式切换按钮按下
-                if self._check_button_event(self.controller.mode_switch_control, event):
-                    if self.controller.mode_button_press_time is None:
-                        self.controller.mode_button_press_time = current_time
-                # 速度增加
-                elif self._check_button_event(self.controller.speed_inc_control, event) and \
-                        self.controller.control_mode in [config.MODE_XYZ, config.MODE_RPY]:
-                    self.controller.current_speed_xy = min(self.controller.max_speed,
-                                                           self.controller.current_speed_xy + self.controller.speed_increment)
-                    self.controller.current_speed_z = min(self.controller.max_speed,
-                                                          self.controller.current_speed_z + self.controller.speed_increment)
-                    self.play_sound('speed_change_confirm')  # 确保此声音在YAML中定义
-                # 速度减少
-                elif self._check_button_event(self.controller.speed_dec_control, event) and \
-                        self.controller.control_mode in [config.MODE_XYZ, config.MODE_RPY]:
-                    self.controller.current_speed_xy = max(self.controller.min_speed,
-                                                           self.controller.current_speed_xy - self.controller.speed_increment)
-                    self.controller.current_speed_z = max(self.controller.min_speed,
-                                                          self.controller.current_speed_z - self.controller.speed_increment)
-                    self.play_sound('speed_change_confirm')
-                # 左夹爪
-                elif self._check_button_event(self.controller.gripper_toggle_left_ctrl, event):
-                    self.controller.toggle_gripper('left')
-                # 右夹爪
-                elif self._check_button_event(self.controller.gripper_toggle_right_ctrl, event):
-                    self.controller.toggle_gripper('right')
-
-            if event.type == pygame.JOYBUTTONUP:
-                # 模式切换按钮松开
-                if self.controller.mode_switch_control and \
-                        event.button == self.controller.mode_switch_control.get('index', -1):
-                    if self.controller.mode_button_press_time is not None:
-                        press_duration = current_time - self.controller.mode_button_press_time
-                        if press_duration < self.controller.long_press_duration:
-                            self.controller.switch_control_mode()
-                        self.controller.mode_button_press_time = None
-
-            # --- 模式专属控制 (RPY重置使用 get_joystick_input_state 并传递 event) ---
-            if self.controller.control_mode == config.MODE_RESET:
-                # 对于RPY重置，我们希望在事件（按钮按下、轴移动到阈值、hat按下）发生时触发一次
-                # get_joystick_input_state(config, event) 现在处理这种一次性触发逻辑
-                if self.get_joystick_input_state(self.controller.reset_left_arm_default_rpy_ctrl, event):
-                    self.controller.attempt_reset_left_arm_default_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_left_arm_forward_rpy_ctrl, event):
-                    self.controller.attempt_reset_left_arm_forward_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_left_arm_backward_rpy_ctrl, event):
-                    self.controller.attempt_reset_left_arm_backward_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_left_arm_to_left_rpy_ctrl, event):
-                    self.controller.attempt_reset_left_arm_to_left_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_left_arm_to_right_rpy_ctrl, event):
-                    self.controller.attempt_reset_left_arm_to_right_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_left_arm_up_rpy_ctrl, event):
-                    self.controller.attempt_reset_left_arm_up_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_left_arm_down_rpy_ctrl, event):
-                    self.controller.attempt_reset_left_arm_down_rpy()
-
-                elif self.get_joystick_input_state(self.controller.reset_right_arm_default_rpy_ctrl, event):
-                    self.controller.attempt_reset_right_arm_default_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_right_arm_forward_rpy_ctrl, event):
-                    self.controller.attempt_reset_right_arm_forward_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_right_arm_backward_rpy_ctrl, event):
-                    self.controller.attempt_reset_right_arm_backward_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_right_arm_to_left_rpy_ctrl, event):
-                    self.controller.attempt_reset_right_arm_to_left_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_right_arm_to_right_rpy_ctrl, event):
-                    self.controller.attempt_reset_right_arm_to_right_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_right_arm_up_rpy_ctrl, event):
-                    self.controller.attempt_reset_right_arm_up_rpy()
-                elif self.get_joystick_input_state(self.controller.reset_right_arm_down_rpy_ctrl, event):
-                    self.controller.attempt_reset_right_arm_down_rpy()
-
-                # 原始关节回正 (如果按键不冲突且配置存在) - 通常是按钮类型
-                elif self._check_button_event(self.controller.reset_left_arm_ctrl, event):
-                    print("[UI Event] 左臂原始关节回正按钮按下...")
-                    self.controller.attempt_reset_left_arm()
-                elif self._check_button_event(self.controller.reset_right_arm_ctrl, event):
-                    print("[UI Event] 右臂原始关节回正按钮按下...")
-                    self.controller.attempt_reset_right_arm()
-
-            elif self.controller.control_mode == config.MODE_VISION:
-                # 视觉模式按钮通常是一次性按下触发
-                if event.type == pygame.JOYBUTTONDOWN:
-                    controls_map = self.controller.controls_map
-                    start_rec_cfg = controls_map.get('vision_start_record')
-                    stop_rec_cfg = controls_map.get('vision_stop_record_confirm')
-                    cancel_rec_cfg = controls_map.get('vision_cancel_record')
-
-                    if self._check_button_event(start_rec_cfg, event):
-                        if not vision_interaction.is_recording:
-                            print("[UI Event] Vision Mode: 'Start Record' button pressed.")
-                            self.play_sound('vision_record_start')  # 确保此声音在YAML中定义
-                            if vision_interaction.start_recording_thread():
-                                self.update_status_message("录音中...按[确认键]结束, [取消键]取消")
-                            else:
-                                self.update_status_message("启动录音失败"); self.play_sound('action_fail_general')
+                controls_map = self.controller.controls_map
+                start_rec_cfg = controls_map.get('vision_start_record')
+                stop_rec_cfg = controls_map.get('vision_stop_record_confirm')
+                cancel_rec_cfg = controls_map.get('vision_cancel_record')
+
+                if self._check_button_event(start_rec_cfg, event):
+                    if not vision_interaction.is_recording:
+                        print("[UI Event] Vision Mode: 'Start Record' button pressed.")
+                        self.play_sound('vision_record_start')  # 确保此声音在YAML中定义
+                        if vision_interaction.start_recording_thread():
+                            self.update_status_message("录音中...按[确认键]结束, [取消键]取消")
                         else:
-                            print("[UI Event] Vision Mode: Already recording."); self.play_sound(
-                                'already_recording_error'); self.update_status_message("已在录音中!")
-                    elif self._check_button_event(stop_rec_cfg, event):
-                        if vision_interaction.is_recording:
-                            print("[UI Event] Vision Mode: 'Stop Record & Confirm' button pressed.")
-                            self.play_sound('vision_record_stop')  # 确保此声音在YAML中定义
-                            saved_audio_path = vision_interaction.stop_recording_and_save()
-                            if saved_audio_path:
-                                self.update_status_message("处理语音指令...")
-                                if hasattr(self.controller, '_threaded_process_vision_audio'):
-                                    thread = threading.Thread(target=self.controller._threaded_process_vision_audio,
-                                                              args=(saved_audio_path,))
-                                    thread.daemon = True;
-                                    thread.start()
-                                else:
-                                    msg = "错误: 控制器缺少 _threaded_process_vision_audio 方法."; print(
-                                        f"[UI Event Error] {msg}"); self.update_status_message(msg); self.play_sound(
-                                        'action_fail_general')
+                            self.update_status_message("启动录音失败"); self.play_sound('action_fail_general')
+                    else:
+                        print("[UI Event] Vision Mode: Already recording."); self.play_sound(
+                            'already_recording_error'); self.update_status_message("已在录音中!")
+                elif self._check_button_event(stop_rec_cfg, event):
+                    if vision_interaction.is_recording:
+                        print("[UI Event] Vision Mode: 'Stop Record & Confirm' button pressed.")
+                        self.play_sound('vision_record_stop')  # 确保此声音在YAML中定义
+                        saved_audio_path = vision_interaction.stop_recording_and_save()
+                        if saved_audio_path:
+                            self.update_status_message("处理语音指令...")
+                            if hasattr(self.controller, '_threaded_process_vision_audio'):
+                                thread = threading.Thread(target=self.controller._threaded_process_vision_audio,
+                                                          args=(saved_audio_path,))
+                                thread.daemon = True;
+                                thread.start()
                             else:
-                                msg = "录音数据处理失败 (无数据/保存失败)"; print(
-                                    f"[UI Event] {msg}"); self.update_status_message(msg); self.play_sound(
+                                msg = "错误: 控制器缺少 _threaded_process_vision_audio 方法."; print(
+                                    f"[UI Event Error] {msg}"); self.update_status_message(msg); self.play_sound(
                                     'action_fail_general')
                         else:
-                            print("[UI Event] Vision Mode: Not recording, cannot stop."); self.play_sound(
-                                'not_recording_error'); self.update_status_message("未开始录音")
-                    elif self._check_button_event(cancel_rec_cfg, event):
-                        if vision_interaction.is_recording:
-                            print("[UI Event] Vision Mode: 'Cancel Record' button pressed.")
-                            if vision_interaction.cancel_recording():
-                                self.play_sound('vision_record_cancel'); self.update_status_message(
-                                    "录音已取消. 按[开始键]重新开始.")
-                            else:
-                                self.update_status_message("取消录音失败."); self.play_sound('action_fail_general')
+                            msg = "录音数据处理失败 (无数据/保存失败)"; print(
+                                f"[UI Event] {msg}"); self.update_status_message(msg); self.play_sound(
+                                'action_fail_general')
+                    else:
+                        print("[UI Event] Vision Mode: Not recording, cannot stop."); self.play_sound(
+                            'not_recording_error'); self.update_status_message("未开始录音")
+                elif self._check_button_event(cancel_rec_cfg, event):
+                    if vision_interaction.is_recording:
+                        print("[UI Event] Vision Mode: 'Cancel Record' button pressed.")
+                        if vision_interaction.cancel_recording():
+                            self.play_sound('vision_record_cancel'); self.update_status_message(
+                                "录音已取消. 按[开始键]重新开始.")
                         else:
-                            print("[UI Event] Vision Mode: No recording to cancel."); self.update_status_message(
-                                "无录音可取消")
+                            self.update_status_message("取消录音失败."); self.play_sound('action_fail_general')
+                    else:
+                        print("[UI Event] Vision Mode: No recording to cancel."); self.update_status_message(
+                            "无录音可取消")
+        return True
 
     def draw_display(self, speed_left_final: np.ndarray, speed_right_final: np.ndarray):
         if not self.screen or not self.info_font or not pygame.get_init(): return
@@ -389,12 +377,19 @@ class UIManager:
             mode_color, mode_name_cn = C_CYAN, "姿态设置模式"
 
         lines_to_draw.append((f"当前模式: {mode_name_cn}", mode_color))
+        if controller.estop_latched:
+            estop_idx = controller.emergency_stop_ctrl.get('index', '?') if controller.emergency_stop_ctrl else '?'
+            lines_to_draw.append((f"急停中: 机械臂已停止，按 B{estop_idx} 解除", C_RED))
         lines_to_draw.append((f"左臂({controller.left_robot_ip}): {'OK' if controller.left_init_ok else 'ERR'} | "
                               f"右臂({controller.right_robot_ip}): {'OK' if controller.right_init_ok else 'ERR'}"))
-        lines_to_draw.append((f"左夹爪: {'打开' if controller.left_gripper_open else '关闭'} "
-                              f"({'活动' if controller.left_gripper_active else '无效'}) | "
-                              f"右夹爪: {'打开' if controller.right_gripper_open else '关闭'} "
-                              f"({'活动' if controller.right_gripper_active else '无效'})", C_YELLOW))
+        lines_to_draw.append((f"左夹爪: {self._format_gripper_status('left')} | "
+                              f"右夹爪: {self._format_gripper_status('right')}", C_YELLOW))
+        if controller.action_executors:
+            action_line = (f"动作: 左 {self._format_action_status('left')} | "
+                           f"右 {self._format_action_status('right')}")
+            if 'both' in controller.action_executors:
+                action_line += f" | 双臂 {self._format_action_status('both')}"
+            lines_to_draw.append((action_line, C_CYAN))
 
         if controller.control_mode in [config.MODE_XYZ, config.MODE_RPY]:
             speed_dec_idx = controller.speed_dec_control.get('index', '?') if controller.speed_dec_control else '?'
@@ -465,6 +460,11 @@ class UIManager:
             for i in range(0, len(valid_right_texts), 2): lines_to_draw.append(
                 (" | ".join(valid_right_texts[i:i + 2]), C_CYAN))
 
+            if controller.reset_both_arms_ctrls:
+                lines_to_draw.append(("--- 双臂同时 RPY ---", C_WHITE))
+                both_texts = [fmt_reset_ctrl(cfg, str(cfg.get('pose'))) for cfg in controller.reset_both_arms_ctrls]
+                lines_to_draw.append((" | ".join(text for text in both_texts if text), C_CYAN))
+
             if controller.reset_left_arm_ctrl or controller.reset_right_arm_ctrl:  # Original joint reset
                 lines_to_draw.append(("--- 原始关节回正 ---", C_GRAY_ALT))
                 if controller.reset_left_arm_ctrl: lines_to_draw.append(
@@ -531,6 +531,30 @@ class UIManager:
             y_pos += LINE_SPACING
         pygame.display.flip()
 
+    def _format_action_status(self, side: str) -> str:
+        """后台动作状态文本: 执行中显示进度，结束后保留结果 ACTION_STATUS_LINGER 秒。"""
+        task = self.controller.get_action_task(side)
+        if task is None or (task.finished_at is not None and
+                            time.monotonic() - task.finished_at > ACTION_STATUS_LINGER):
+            return "空闲"
+        return task.status_text()
+
+    def _format_gripper_status(self, side: str) -> str:
+        """夹爪状态文本: 有监视器快照时显示实际位置/物体检测/故障，否则显示本地开合标志。"""
+        controller = self.controller
+        is_open = controller.left_gripper_open if side == 'left' else controller.right_gripper_open
+        is_active = controller.left_gripper_active if side == 'left' else controller.right_gripper_active
+        if not is_active:
+            if controller.is_gripper_activating(side):
+                return f"{'打开' if is_open else '关闭'} (激活中)"
+            return f"{'打开' if is_open else '关闭'} (无效)"
+        snap = controller.get_gripper_snapshot(side)
+        if snap is None:
+            return f"{'打开' if is_open else '关闭'} (活动)"
+        obj_text = {0: "运动中", 1: "内撑夹持", 2: "外夹夹持", 3: "无物体"}.get(snap.hand_state, "?")
+        fault_text = f" 故障0x{snap.error_code:02X}" if snap.error_code else ""
+        return f"位置{snap.position:3d} {obj_text} 电流{snap.current}{fault_text}"
+
     def quit(self):
         print("正在退出 UIManager...")
         if self.mixer_initialized: pygame.mixer.quit(); print("  Pygame Mixer 已退出。")